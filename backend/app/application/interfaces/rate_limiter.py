@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+
+
+class ILoginRateLimiter(ABC):
+    """ログイン試行回数制限のインターフェース"""
+
+    @abstractmethod
+    def check(self, client_ip: str | None, login_id: str) -> float:
+        """
+        ログイン試行を1回分記録し、制限を超えているかを判定
+
+        Args:
+            client_ip: クライアントのIPアドレス（不明な場合はNone）
+            login_id: ログインID
+
+        Returns:
+            float: 制限を超えている場合は再試行までの秒数、許可する場合は0
+        """
+        pass
@@ -21,6 +21,16 @@ class ISecurityService(ABC):
         """
         pass
 
+    @abstractmethod
+    def revoke_access_token(self, access_token: str) -> None:
+        """
+        アクセストークンを失効させる
+
+        Args:
+            access_token: アクセストークン
+        """
+        pass
+
     @abstractmethod
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """
@@ -34,3 +44,45 @@ class ISecurityService(ABC):
             bool: パスワードが一致するかどうか
         """
         pass
+
+    @abstractmethod
+    async def verify_password_async(
+        self, plain_password: str, hashed_password: str
+    ) -> bool:
+        """
+        パスワードを検証（ハッシュ計算はイベントループ外で実行）
+
+        Args:
+            plain_password: 平文パスワード
+            hashed_password: ハッシュ化されたパスワード
+
+        Returns:
+            bool: パスワードが一致するかどうか
+        """
+        pass
+
+    @abstractmethod
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        ハッシュが現在のコスト設定より弱く、再ハッシュが必要かを判定
+
+        Args:
+            hashed_password: ハッシュ化されたパスワード
+
+        Returns:
+            bool: 再ハッシュが必要な場合True
+        """
+        pass
+
+    @abstractmethod
+    async def hash_password_async(self, plain_password: str) -> str:
+        """
+        パスワードをハッシュ化（ハッシュ計算はイベントループ外で実行）
+
+        Args:
+            plain_password: 平文パスワード
+
+        Returns:
+            str: ハッシュ化されたパスワード
+        """
+        pass
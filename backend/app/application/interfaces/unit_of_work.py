@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
-from contextlib import AbstractContextManager
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, AbstractContextManager
+from typing import TypeVar
 
+T = TypeVar('T')
 
-class IUnitOfWork(ABC, AbstractContextManager):
+
+class IUnitOfWork(AbstractContextManager, ABC):
     """
     トランザクション管理のインターフェース
 
@@ -19,6 +23,23 @@ class IUnitOfWork(ABC, AbstractContextManager):
         """
         pass
 
+    @abstractmethod
+    def run_in_transaction(
+        self, fn: Callable[['IUnitOfWork'], T], call_site: str | None = None
+    ) -> T:
+        """
+        fn を実行してコミットする
+        シリアライズ失敗・デッドロックの場合はロールバックして fn から再実行する
+
+        Args:
+            fn: トランザクション内で実行する処理（このUoWを受け取る）
+            call_site: メトリクスに記録する呼び出し箇所
+
+        Returns:
+            fn の戻り値
+        """
+        pass
+
     @abstractmethod
     def rollback(self) -> None:
         """トランザクションをロールバックする"""
@@ -43,3 +64,65 @@ class IUnitOfWork(ABC, AbstractContextManager):
         例外が発生した場合は自動的にロールバックする
         """
         pass
+
+
+class IAsyncUnitOfWork(AbstractAsyncContextManager, ABC):
+    """
+    トランザクション管理のインターフェース（非同期版）
+
+    使用例:
+        async with uow:
+            user = await user_repository.create(new_user)
+            await uow.commit()
+    """
+
+    @abstractmethod
+    async def commit(self) -> None:
+        """
+        トランザクションをコミットする
+        """
+        pass
+
+    @abstractmethod
+    async def run_in_transaction(
+        self,
+        fn: Callable[['IAsyncUnitOfWork'], Awaitable[T]],
+        call_site: str | None = None,
+    ) -> T:
+        """
+        fn を実行してコミットする
+        シリアライズ失敗・デッドロックの場合はロールバックして fn から再実行する
+
+        Args:
+            fn: トランザクション内で実行する処理（このUoWを受け取るコルーチン関数）
+            call_site: メトリクスに記録する呼び出し箇所
+
+        Returns:
+            fn の戻り値
+        """
+        pass
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        """トランザクションをロールバックする"""
+        pass
+
+    @abstractmethod
+    async def flush(self) -> None:
+        """
+        変更をデータベースに送信するがコミットはしない
+        """
+        pass
+
+    @abstractmethod
+    async def __aenter__(self):
+        """コンテキストマネージャー開始"""
+        pass
+
+    @abstractmethod
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """
+        コンテキストマネージャー終了
+        例外が発生した場合は自動的にロールバックする
+        """
+        pass
@@ -6,6 +6,7 @@ class LoginInputDTO(BaseModel):
 
     login_id: str = Field(..., description='ログインID')
     password: str = Field(..., description='パスワード')
+    client_ip: str | None = Field(None, description='クライアントのIPアドレス')
 
 
 class LoginOutputDTO(BaseModel):
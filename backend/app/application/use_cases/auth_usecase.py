@@ -1,15 +1,23 @@
 import logging
+import math
 
-# from app.domain.repositories.user_repository import IUserRepository
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
+from app.application.interfaces.rate_limiter import ILoginRateLimiter
 from app.application.interfaces.security_service import ISecurityService
+from app.application.interfaces.unit_of_work import IAsyncUnitOfWork, IUnitOfWork
 from app.application.schemas.auth_schemas import (
     LoginInputDTO,
     LoginOutputDTO,
     LogoutOutputDTO,
     StatusOutputDTO,
 )
+from app.domain.entities.user import User
+from app.domain.repositories.user_repository import (
+    IAsyncUserRepository,
+    IUserRepository,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +28,25 @@ class AuthUsecase:
     def __init__(
         self,
         security_service: ISecurityService,
-        # user_repository: IUserRepository  # 将来のDB認証用
+        # DB認証を使う場合のみ指定（非同期版のリポジトリも受け付ける）
+        user_repository: IUserRepository | IAsyncUserRepository | None = None,
+        unit_of_work: IUnitOfWork
+        | IAsyncUnitOfWork
+        | None = None,  # 再ハッシュの保存に使用
+        rate_limiter: ILoginRateLimiter | None = None,
     ):
         self.security_service = security_service
-        # self.user_repository = user_repository
+        self.user_repository = user_repository
+        self.unit_of_work = unit_of_work
+        self.rate_limiter = rate_limiter
+
+    async def login(self, input_dto: LoginInputDTO) -> LoginOutputDTO:
+        # 試行回数の制限はパスワード検証（bcrypt）より前に判定する
+        self._check_rate_limit(input_dto)
+
+        if self.user_repository is not None:
+            return await self._login_with_repository(input_dto)
 
-    def login(self, input_dto: LoginInputDTO) -> LoginOutputDTO:
         # ============================================================
         # 【暫定実装】ハードコーディングでの認証
         # ============================================================
@@ -42,39 +63,127 @@ class AuthUsecase:
                 detail='ログインIDまたはパスワードが正しくありません',
             )
 
-        # ============================================================
-        # 【将来実装】DBを使用した認証（参考実装）
-        # ============================================================
-        # login_id = input_dto.login_id
-        # password = input_dto.password
-        #
-        # user_data = self.user_repository.get_by_login_id(login_id)
-        #
-        # if user_data is None:
-        #     raise HTTPException(
-        #         status_code=status.HTTP_401_UNAUTHORIZED,
-        #         detail="ログインIDもしくはパスワードが違います。"
-        #     )
-        #
-        # is_authenticated = self.security_service.verify_password(
-        #     password, user_data.password
-        # )
-        # if not is_authenticated:
-        #     raise HTTPException(
-        #         status_code=status.HTTP_401_UNAUTHORIZED,
-        #         detail="ログインIDもしくはパスワードが違います。"
-        #     )
-        #
-        # # logger.info("ログイン成功")
-        #
-        # access_token = self.security_service.create_access_token(user_id=user_data.id)
-        # return LoginOutputDTO(
-        #     access_token=access_token,
-        #     user_id=user_data.id
-        # )
-
-    def logout(self) -> LogoutOutputDTO:
+    def _check_rate_limit(self, input_dto: LoginInputDTO) -> None:
+        """ログイン試行回数の制限を超えている場合は429を送出"""
+        if self.rate_limiter is None:
+            return
+        retry_after = self.rate_limiter.check(input_dto.client_ip, input_dto.login_id)
+        if retry_after > 0:
+            logger.warning('ログイン試行回数の上限に達しました')
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail='ログインの試行回数が多すぎます。しばらくしてから再度お試しください',
+                headers={'Retry-After': str(math.ceil(retry_after))},
+            )
+
+    async def _login_with_repository(self, input_dto: LoginInputDTO) -> LoginOutputDTO:
+        """DBを使用した認証（bcryptの検証はイベントループ外で実行）"""
+        user_data = await self._get_user_by_login_id(input_dto.login_id)
+
+        if user_data is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='ログインIDまたはパスワードが正しくありません',
+            )
+
+        is_authenticated = await self.security_service.verify_password_async(
+            input_dto.password, user_data.password
+        )
+        if not is_authenticated:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='ログインIDまたはパスワードが正しくありません',
+            )
+
+        logger.info('ログイン成功')
+
+        if self.security_service.needs_rehash(user_data.password):
+            await self._rehash_password(user_data, input_dto.password)
+
+        access_token = self.security_service.create_access_token(user_id=user_data.id)
+        return LoginOutputDTO(access_token=access_token, user_id=user_data.id)
+
+    async def _get_user_by_login_id(self, login_id: str) -> User | None:
+        """
+        ユーザーを取得して読み取りのトランザクションを終える
+        （同期版のリポジトリはスレッドプールで実行）
+
+        bcryptの検証（待ち行列での待機を含む）の間に idle in transaction のまま
+        プールの接続を保持しないよう、検証の前にトランザクションを終えて接続を返す。
+        再ハッシュの保存は新しいトランザクションで行う。
+        """
+        if isinstance(self.user_repository, IAsyncUserRepository):
+            user = await self.user_repository.get_by_login_id(login_id)
+            if self.unit_of_work is not None:
+                await self.unit_of_work.rollback()
+            return user
+        return await run_in_threadpool(self._get_user_by_login_id_sync, login_id)
+
+    def _get_user_by_login_id_sync(self, login_id: str) -> User | None:
+        user = self.user_repository.get_by_login_id(login_id)
+        if self.unit_of_work is not None:
+            self.unit_of_work.rollback()
+        return user
+
+    async def _rehash_password(self, user_data: User, plain_password: str) -> None:
+        """
+        現在のコスト設定でパスワードを再ハッシュして保存する
+
+        平文パスワードが手元にあるログイン成功時にのみ行えるため、マイグレーションは不要。
+        失敗してもログイン自体は成功させる（次回のログインで再試行される）。
+        """
+        try:
+            new_hash = await self.security_service.hash_password_async(plain_password)
+            if await self._save_password(user_data, new_hash):
+                logger.info(f'パスワードを再ハッシュしました: user_id={user_data.id}')
+            else:
+                logger.info(
+                    'パスワードが変更されていたため再ハッシュを保存しませんでした: '
+                    f'user_id={user_data.id}'
+                )
+        except Exception as e:
+            logger.warning(
+                f'パスワードの再ハッシュに失敗しました: user_id={user_data.id}: {e}'
+            )
+
+    async def _save_password(self, user_data: User, new_hash: str) -> bool:
+        """
+        再ハッシュを保存する（読み込んだ時点のハッシュのままの場合のみ）
+
+        ハッシュの計算中に他の処理がパスワードや他の列を変更していても上書きしない。
+
+        Returns:
+            bool: 保存した場合True
+        """
+        if isinstance(self.user_repository, IAsyncUserRepository):
+            if self.unit_of_work is None:
+                return await self.user_repository.update_password(
+                    user_data.id, user_data.password, new_hash
+                )
+            return await self.unit_of_work.run_in_transaction(
+                lambda _: self.user_repository.update_password(
+                    user_data.id, user_data.password, new_hash
+                ),
+                call_site='auth.rehash_password',
+            )
+        return await run_in_threadpool(self._save_password_sync, user_data, new_hash)
+
+    def _save_password_sync(self, user_data: User, new_hash: str) -> bool:
+        if self.unit_of_work is None:
+            return self.user_repository.update_password(
+                user_data.id, user_data.password, new_hash
+            )
+        return self.unit_of_work.run_in_transaction(
+            lambda _: self.user_repository.update_password(
+                user_data.id, user_data.password, new_hash
+            ),
+            call_site='auth.rehash_password',
+        )
+
+    def logout(self, access_token: str | None = None) -> LogoutOutputDTO:
         """ログアウト処理（Cookieはエンドポイント側で削除）"""
+        if access_token:
+            self.security_service.revoke_access_token(access_token)
         logger.info('ログアウト成功')
         return LogoutOutputDTO(message='ログアウトしました')
 
@@ -20,14 +20,158 @@ class Settings(BaseSettings):
     stage: str = 'development'  # デフォルトは開発環境
     database_url: str = ''
 
+    # 読み取り専用レプリカ（Auroraのリーダーエンドポイント。空の場合はプライマリのみ）
+    postgres_replica_host: str = ''
+    # 書き込んだユーザーの読み取りをプライマリに固定する秒数（レプリカの遅延の上限）
+    db_read_your_writes_seconds: float = 5.0
+    # レプリカに接続できなかった場合に、レプリカを使わずプライマリで読む秒数
+    db_replica_retry_seconds: float = 30.0
+
+    # ロギング（整形・出力はバックグラウンドのスレッドで行う）
+    log_level: str = 'INFO'
+    log_format: str = 'json'  # json（1行1レコード）または text
+    # ファイル名・行番号・関数名を出力する（ログの呼び出しごとにスタックを辿る）
+    log_caller_info: bool = False
+    # backend からの相対パス（空の場合は標準出力のみ。python -m app.server では使わない）
+    log_file: str = 'app/logs/app.log'
+    log_file_max_bytes: int = 10 * 1024 * 1024  # サイズでローテーション（0で無効）
+    log_file_rotate_when: str = ''  # 時刻でローテーション（例: midnight。サイズより優先）
+    log_file_backup_count: int = 5
+    # INFO以下のレコードの一部だけを出力する（ロガー名[:メッセージに含む文字列]=残す割合）
+    log_sampling: str = 'uvicorn.access:/health=0.01'
+
+    # 本番用の起動（python -m app.server）
+    server_host: str = '0.0.0.0'
+    server_port: int = 8000
+    # ワーカーを入れ替えるまでのリクエスト数（0で無効）と、全ワーカーが同時に
+    # 入れ替わらないよう加える乱数の上限
+    server_max_requests: int = 0
+    server_max_requests_jitter: int = 0
+    server_max_rss_mb: float = (
+        0  # ワーカーを入れ替えるメモリ使用量（RSS）の上限（0で無効）
+    )
+    # SIGTERM後も受け付けを続ける秒数（ALBの登録解除が反映されるまで）と、
+    # 処理中のリクエストの完了を待つ秒数（合計をECSの stopTimeout より短くする）
+    server_drain_delay_seconds: float = 5.0
+    server_graceful_timeout_seconds: float = 20.0
+    # keep-alive の接続を閉じるまでの秒数（ALBのアイドルタイムアウトより長くする）
+    server_keepalive_seconds: int = 75
+    server_access_log: bool = True  # アクセスログ（/health は LOG_SAMPLING で間引く）
+    # X-Forwarded-For を信頼する接続元（カンマ区切りのIPアドレス・CIDR。本番は ALB のサブネット。
+    # 未設定のままログインの試行回数の制限を有効にすると app.server の起動時にエラーを記録する）
+    forwarded_allow_ips: str = '127.0.0.1'
+
+    # 起動時のウォームアップ（接続の確立・鍵の解析・bcryptの初期化・主要なルートの実行）
+    # 完了するまでワーカーはリクエストを受け付けず、/health は503を返す
+    warmup_enabled: bool = True
+    # 事前に確立する接続数（負の場合はプールの常時保持数。0で確立しない）
+    warmup_db_connections: int = -1
+    warmup_timeout_seconds: float = 30.0  # 超えた場合は残りを打ち切って受け付けを始める
+
+    # コネクションプール（DB_POOL_SIZE / DB_MAX_OVERFLOW が負の場合は
+    # DB_MAX_CONNECTIONS をワーカー数で割って算出する）
+    # python -m app.server で0以下の場合はタスクに割り当てられたCPU数
+    web_concurrency: int = 1  # 1タスクあたりのワーカープロセス数
+    db_max_connections: int = 30  # 1タスク（全ワーカー合計）で使用する接続数の上限
+    db_pool_size: int = -1
+    db_max_overflow: int = -1
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_connect_timeout_seconds: int = 10
+
+    # PgBouncer（transaction pooling）経由で接続する（POSTGRES_HOST / POSTGRES_PORT は
+    # PgBouncer を指定する）。接続をまたぐ状態（セッション単位の SET・プリペアドステートメント）を使わない
+    db_pgbouncer_mode: bool = False
+    db_pgbouncer_pool_size: int = 0  # プロセスで保持する接続数（0の場合はNullPool）
+
+    # SQLの実行時間・ロック待ち・トランザクション内の待機の上限（ミリ秒。0で無制限）
+    # リクエストの期限までの残り時間が短い場合はトランザクションごとに短くする
+    db_statement_timeout_ms: int = 30_000
+    db_lock_timeout_ms: int = 5_000
+    db_idle_in_transaction_timeout_ms: int = 60_000
+
+    # リクエストの期限（ヘッダーで残り時間をミリ秒で受け取る。既定値より長くはできない）
+    request_timeout_header: str = 'X-Request-Timeout-Ms'
+    request_default_timeout_ms: float = 0  # 0の場合はヘッダー・ルートの既定値のみ
+
+    # SQLの計測（リクエストごとのクエリ数・DB時間を Server-Timing ヘッダーで返す）
+    db_query_instrumentation_enabled: bool = True
+    db_slow_query_ms: float = 200.0  # これより遅いSQLをログに出力する
+    db_n_plus_one_threshold: int = 10  # 1リクエストで同じSQLがこの回数を超えたら警告する
+
+    # メトリクス（GET /metrics。Prometheus のテキスト形式）
+    metrics_enabled: bool = True
+    # python -m app.server のワーカーが値を書き出すディレクトリ（空の場合は一時ディレクトリ）
+    metrics_multiprocess_dir: str = ''
+    # /metrics に応答する接続元（IPアドレス・CIDR。X-Forwarded-For 付きのリクエストは常に拒否）
+    metrics_allow_ips: str = '127.0.0.1,::1,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16'
+
+    # リクエスト単位のプロファイル（署名したヘッダーのリクエスト、またはサンプリングした
+    # リクエストのみ。鍵が空かつ割合が0の場合はミドルウェアを組み込まない）
+    profiling_secret: str = ''  # ヘッダーの値の署名鍵（scripts/profile_token.py で発行）
+    profiling_header: str = 'X-Profile'
+    profiling_sample_rate: float = 0.0  # 全リクエストのうちプロファイルする割合
+    profiling_interval_ms: float = 5.0  # スタックを記録する間隔
+    profiling_max_seconds: float = 30.0  # これより長いリクエストは途中まで記録する
+    profiling_max_concurrent: int = 1  # ワーカーごとに同時にプロファイルするリクエスト数
+    profiling_format: str = 'speedscope'  # speedscope または collapsed
+    profiling_dir: str = 'app/logs/profiles'  # backend からの相対パス
+    profiling_max_files: int = 50  # 超えた分は古いものから削除する
+
+    # 一覧のページネーションのカーソルを署名する鍵（空の場合はプロセスごとの一時的な鍵）
+    pagination_cursor_secret: str = ''
+
     # 認証機能の有効/無効
     enable_auth: bool = True
 
     # JWT settings
     jwt_expiration_hours: str = '24'
-    jwt_algorithm: str = 'RS256'  # RS256 for RSA, HS256 for HMAC (deprecated)
-    jwt_private_key: str = ''  # RSA private key for signing (RS256)
-    jwt_public_key: str = ''  # RSA public key for verification (RS256)
+    jwt_algorithm: str = 'RS256'  # RS256 (RSA) / ES256 (ECDSA P-256) / EdDSA (Ed25519)
+    jwt_private_key: str = ''  # private key for signing (PEM)
+    jwt_public_key: str = ''  # public key for verification (PEM)
+    jwt_key_id: str = ''  # 署名鍵のkid（空の場合は公開鍵から導出）
+    jwt_verification_keys: str = ''  # ローテーション中の追加検証鍵 (JSON: {"kid": "PEM"})
+    # 検証済みトークンのキャッシュ上限（0で無効）
+    jwt_verified_token_cache_size: int = 10000
+
+    # /auth/verify のレスポンスをキャッシュしてよい最大秒数（トークンの有効期限が上限）
+    auth_status_max_age_seconds: int = 60
+
+    # ログイン時のユーザー参照先（static: 暫定のハードコード認証, database: usersテーブル）
+    auth_user_source: str = 'static'
+    # DB認証で AsyncSession（asyncpg）を使用する
+    database_async_enabled: bool = False
+
+    # ユーザーエンティティのキャッシュ（TTL + LRU。プロセスごとに保持するため、
+    # 他のワーカーでの更新は TTL が経過するまで反映されない。ログインでは使わない）
+    user_cache_enabled: bool = False
+    user_cache_ttl_seconds: float = 30.0
+    user_cache_negative_ttl_seconds: float = 5.0  # 存在しないユーザーの結果を保持する秒数
+    user_cache_max_entries: int = 10_000
+
+    # パスワードハッシュ（bcrypt）専用スレッドプール
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 16  # 超過分は503で即座に拒否
+
+    # bcryptコスト（0の場合は起動時の調整結果またはライブラリ既定値の12）
+    bcrypt_rounds: int = 0
+    bcrypt_calibrate_on_startup: bool = False  # app.server が fork 前に1回だけ計測する
+    bcrypt_target_ms: float = 250.0  # 調整時に1回のハッシュに許容する時間
+
+    # ログイン試行回数の制限（期間あたりの回数。超過分はパスワード検証前に429で拒否）
+    login_rate_limit_enabled: bool = True
+    login_rate_limit_ip_attempts: int = 30
+    login_rate_limit_login_id_attempts: int = 10
+    login_rate_limit_window_seconds: float = 60.0
+    login_rate_limit_shards: int = 64
+    login_rate_limit_max_keys: int = 100_000  # 保持するバケット数の上限
+
+    # トークン失効リスト（ブルームフィルタ + revoked_tokens テーブル）
+    token_revocation_enabled: bool = False
+    token_revocation_capacity: int = 1_000_000  # フィルタの想定件数
+    token_revocation_error_rate: float = 0.001  # フィルタの偽陽性率
+    token_revocation_sync_interval_seconds: float = 5.0  # 他プロセスの失効を取り込む間隔
 
     # 一旦これだけ書いてる
     class Config:
@@ -1,19 +1,73 @@
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+
+from fastapi.concurrency import contextmanager_in_threadpool
+
 from app.application.use_cases.auth_usecase import AuthUsecase
+from app.config import get_settings
+from app.infrastructure.security.rate_limiter import (
+    LoginRateLimiter,
+    get_login_rate_limiter,
+)
 from app.infrastructure.security.security_service_impl import SecurityServiceImpl
 
-# from app.infrastructure.db.repositories.user_repository_impl import UserRepositoryImpl
-# from app.infrastructure.db.session import get_db
-# from sqlalchemy.orm import Session
-# from fastapi import Depends
 
+async def get_auth_usecase() -> AsyncIterator[AuthUsecase]:
+    """
+    AuthUsecaseを取得
 
-def get_auth_usecase() -> AuthUsecase:
+    DATABASE_ASYNC_ENABLED=true の場合は AsyncSession を使用し、
+    DBアクセスを含めてイベントループ上で完結させる（スレッドプールを占有しない）。
+    それ以外は従来どおり同期セッションをスレッドプールで扱う。
+
+    パスワードの照合に使うため、ユーザーはキャッシュ（USER_CACHE_ENABLED）を使わずに
+    DBから読む。キャッシュはプロセスごとに保持するため、他のワーカー・タスクで
+    パスワードを変更した後も TTL の間は古いパスワードでログインできてしまう。
+    """
+    settings = get_settings()
     security_service = SecurityServiceImpl()
-    return AuthUsecase(security_service=security_service)
+    rate_limiter = get_login_rate_limiter()
+
+    if settings.auth_user_source != 'database':
+        yield AuthUsecase(security_service=security_service, rate_limiter=rate_limiter)
+        return
+
+    # DBを使用する場合（AUTH_USER_SOURCE=database）
+    # DBの層は使用する構成の場合のみ、最初のリクエスト（またはウォームアップ）で読み込む
+    if settings.database_async_enabled:
+        from app.infrastructure.db.async_unit_of_work import AsyncSQLAlchemyUnitOfWork
+        from app.infrastructure.db.repositories.async_user_repository_impl import (
+            AsyncUserRepositoryImpl,
+        )
+
+        async with AsyncSQLAlchemyUnitOfWork() as uow:
+            yield AuthUsecase(
+                security_service=security_service,
+                user_repository=AsyncUserRepositoryImpl(uow.session),
+                unit_of_work=uow,
+                rate_limiter=rate_limiter,
+            )
+        return
+
+    sync_usecase = _sync_database_auth_usecase(security_service, rate_limiter)
+    async with contextmanager_in_threadpool(sync_usecase) as usecase:
+        yield usecase
+
 
+@contextmanager
+def _sync_database_auth_usecase(
+    security_service: SecurityServiceImpl, rate_limiter: LoginRateLimiter | None
+) -> Iterator[AuthUsecase]:
+    """同期セッションを使用するAuthUsecase（セッションの開始・終了はスレッドプールで実行）"""
+    from app.infrastructure.db.repositories.user_repository_impl import (
+        UserRepositoryImpl,
+    )
+    from app.infrastructure.db.unit_of_work import SQLAlchemyUnitOfWork
 
-# 【将来実装】DBを使用する場合
-# def get_auth_usecase(session: Session = Depends(get_db)) -> AuthUsecase:
-#     security_service = SecurityServiceImpl()
-#     user_repository = UserRepositoryImpl(session)
-#     return AuthUsecase(security_service=security_service, user_repository=user_repository)
+    with SQLAlchemyUnitOfWork() as uow:
+        yield AuthUsecase(
+            security_service=security_service,
+            user_repository=UserRepositoryImpl(uow.session),
+            unit_of_work=uow,
+            rate_limiter=rate_limiter,
+        )
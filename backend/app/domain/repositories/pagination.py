@@ -0,0 +1,42 @@
+"""一覧取得のページ（キーセットページネーション）
+
+リポジトリの一覧取得は OFFSET ではなく、並び順のキー（最後は一意な列）の値で
+次のページの開始位置を指定する。開始位置は署名付きの不透明なカーソル文字列として
+受け渡し、呼び出し側はカーソルの中身に依存しない。
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+T = TypeVar('T')
+U = TypeVar('U')
+
+
+class InvalidCursorError(ValueError):
+    """カーソルが不正（改ざん・別の一覧のカーソル・形式の誤り）"""
+
+
+@dataclass(frozen=True, slots=True)
+class Page(Generic[T]):
+    """一覧の1ページ分の結果"""
+
+    items: list[T]
+    next_cursor: str | None = None  # 次のページのカーソル（最後のページの場合はNone）
+    prev_cursor: str | None = None  # 前のページのカーソル（最初のページの場合はNone）
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+    def map(self, func: Callable[[T], U]) -> 'Page[U]':
+        """カーソルはそのままに、要素を変換したページを返す"""
+        return Page(
+            items=[func(item) for item in self.items],
+            next_cursor=self.next_cursor,
+            prev_cursor=self.prev_cursor,
+        )
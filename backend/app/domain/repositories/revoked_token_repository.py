@@ -0,0 +1,71 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from datetime import datetime
+
+
+class IRevokedTokenRepository(ABC):
+    """失効トークンリポジトリのインターフェース"""
+
+    @abstractmethod
+    def add(self, jti: str, expires_at: datetime, revoked_at: datetime) -> None:
+        """
+        失効したトークンを登録（登録済みの場合は何もしない）
+
+        Args:
+            jti: トークンID
+            expires_at: トークンの有効期限（UTC）
+            revoked_at: 失効日時（UTC）
+        """
+        pass
+
+    @abstractmethod
+    def exists(self, jti: str) -> bool:
+        """
+        トークンが失効済みかを確認
+
+        Args:
+            jti: トークンID
+
+        Returns:
+            bool: 失効済みの場合True
+        """
+        pass
+
+    @abstractmethod
+    def iter_active_jtis(self, now: datetime) -> Iterator[str]:
+        """
+        有効期限内の失効トークンIDを列挙
+
+        Args:
+            now: 現在日時（UTC）
+
+        Returns:
+            Iterator[str]: トークンID
+        """
+        pass
+
+    @abstractmethod
+    def list_revoked_since(self, since: datetime) -> list[str]:
+        """
+        指定日時以降に失効したトークンIDを取得
+
+        Args:
+            since: 基準日時（UTC）
+
+        Returns:
+            list[str]: トークンID
+        """
+        pass
+
+    @abstractmethod
+    def delete_expired(self, now: datetime) -> int:
+        """
+        有効期限を過ぎた失効トークンを削除
+
+        Args:
+            now: 現在日時（UTC）
+
+        Returns:
+            int: 削除した件数
+        """
+        pass
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 
 from app.domain.entities.user import User
+from app.domain.repositories.pagination import Page
 
 
 class IUserRepository(ABC):
@@ -58,6 +60,23 @@ class IUserRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def update_password(
+        self, user_id: int, current_password: str, new_password: str
+    ) -> bool:
+        """
+        パスワード（ハッシュ）だけを更新（現在の値が current_password の場合のみ）
+
+        Args:
+            user_id: ユーザーID
+            current_password: 読み込んだ時点のハッシュ
+            new_password: 新しいハッシュ
+
+        Returns:
+            bool: 更新した場合True（読み込んだ後に変更・削除されていた場合はFalse）
+        """
+        pass
+
     @abstractmethod
     def delete(self, user_id: int) -> bool:
         """
@@ -70,3 +89,177 @@ class IUserRepository(ABC):
             bool: 削除成功の場合True
         """
         pass
+
+    @abstractmethod
+    def create_many(self, users: Sequence[User]) -> list[User]:
+        """
+        複数のユーザーをまとめて作成
+
+        Args:
+            users: ユーザーエンティティのリスト（idは無視される）
+
+        Returns:
+            list[User]: 作成されたユーザーエンティティ（入力と同じ順序）
+        """
+        pass
+
+    @abstractmethod
+    def upsert_many(self, users: Sequence[User]) -> list[User]:
+        """
+        複数のユーザーをまとめて作成し、ログインIDが既存のユーザーは更新する
+
+        Args:
+            users: ユーザーエンティティのリスト（idは無視される。同じログインIDが
+                複数ある場合は後のものを採用する）
+
+        Returns:
+            list[User]: 作成・更新されたユーザーエンティティ（ログインIDの初出順）
+        """
+        pass
+
+    @abstractmethod
+    def list_page(self, cursor: str | None = None, limit: int = 50) -> Page[User]:
+        """
+        ユーザーをID順に1ページ分取得
+
+        Args:
+            cursor: 前回のページの next_cursor / prev_cursor（最初のページはNone）
+            limit: 1ページの件数
+
+        Returns:
+            Page[User]: ユーザーエンティティと前後のページのカーソル
+
+        Raises:
+            InvalidCursorError: カーソルが不正な場合
+        """
+        pass
+
+
+class IAsyncUserRepository(ABC):
+    """ユーザーリポジトリのインターフェース（非同期版。AsyncSessionを使用する実装向け）"""
+
+    @abstractmethod
+    async def get_by_login_id(self, login_id: str) -> User | None:
+        """
+        ログインIDでユーザーを取得
+
+        Args:
+            login_id: ログインID
+
+        Returns:
+            Optional[User]: ユーザーエンティティ（存在しない場合はNone）
+        """
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, user_id: int) -> User | None:
+        """
+        IDでユーザーを取得
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            Optional[User]: ユーザーエンティティ（存在しない場合はNone）
+        """
+        pass
+
+    @abstractmethod
+    async def create(self, user: User) -> User:
+        """
+        ユーザーを作成
+
+        Args:
+            user: ユーザーエンティティ
+
+        Returns:
+            User: 作成されたユーザーエンティティ
+        """
+        pass
+
+    @abstractmethod
+    async def update(self, user: User) -> User:
+        """
+        ユーザーを更新
+
+        Args:
+            user: ユーザーエンティティ
+
+        Returns:
+            User: 更新されたユーザーエンティティ
+        """
+        pass
+
+    @abstractmethod
+    async def update_password(
+        self, user_id: int, current_password: str, new_password: str
+    ) -> bool:
+        """
+        パスワード（ハッシュ）だけを更新（現在の値が current_password の場合のみ）
+
+        Args:
+            user_id: ユーザーID
+            current_password: 読み込んだ時点のハッシュ
+            new_password: 新しいハッシュ
+
+        Returns:
+            bool: 更新した場合True（読み込んだ後に変更・削除されていた場合はFalse）
+        """
+        pass
+
+    @abstractmethod
+    async def delete(self, user_id: int) -> bool:
+        """
+        ユーザーを削除
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            bool: 削除成功の場合True
+        """
+        pass
+
+    @abstractmethod
+    async def create_many(self, users: Sequence[User]) -> list[User]:
+        """
+        複数のユーザーをまとめて作成
+
+        Args:
+            users: ユーザーエンティティのリスト（idは無視される）
+
+        Returns:
+            list[User]: 作成されたユーザーエンティティ（入力と同じ順序）
+        """
+        pass
+
+    @abstractmethod
+    async def upsert_many(self, users: Sequence[User]) -> list[User]:
+        """
+        複数のユーザーをまとめて作成し、ログインIDが既存のユーザーは更新する
+
+        Args:
+            users: ユーザーエンティティのリスト（idは無視される。同じログインIDが
+                複数ある場合は後のものを採用する）
+
+        Returns:
+            list[User]: 作成・更新されたユーザーエンティティ（ログインIDの初出順）
+        """
+        pass
+
+    @abstractmethod
+    async def list_page(self, cursor: str | None = None, limit: int = 50) -> Page[User]:
+        """
+        ユーザーをID順に1ページ分取得
+
+        Args:
+            cursor: 前回のページの next_cursor / prev_cursor（最初のページはNone）
+            limit: 1ページの件数
+
+        Returns:
+            Page[User]: ユーザーエンティティと前後のページのカーソル
+
+        Raises:
+            InvalidCursorError: カーソルが不正な場合
+        """
+        pass
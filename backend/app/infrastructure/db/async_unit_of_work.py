@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.interfaces.unit_of_work import IAsyncUnitOfWork
+from app.infrastructure.db.retry import (
+    DEFAULT_RETRY_POLICY,
+    RetryPolicy,
+    call_site_of,
+    is_retryable,
+    record_exhausted,
+    record_retry,
+)
+from app.infrastructure.db.session import AsyncSessionLocal
+from app.infrastructure.db.timeouts import (
+    DbTimeouts,
+    apply_transaction_timeouts,
+    check_deadline,
+    remaining_seconds,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class AsyncSQLAlchemyUnitOfWork(IAsyncUnitOfWork):
+    """
+    SQLAlchemy（AsyncSession）用のUnit of Work実装
+
+    DBの待ち時間にスレッドを占有しないため、async def のルートから直接使用できる。
+
+    使用例:
+        uow = AsyncSQLAlchemyUnitOfWork()
+        async with uow:
+            repository = AsyncUserRepositoryImpl(uow.session)
+            user = await repository.create(new_user)
+            await uow.commit()
+
+        # シリアライズ失敗・デッドロック時にトランザクション全体を再実行する場合
+        async with uow:
+            repository = AsyncUserRepositoryImpl(uow.session)
+            user = await uow.run_in_transaction(lambda _: repository.create(new_user))
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        timeouts: DbTimeouts | None = None,
+    ):
+        self._session_factory = session_factory
+        self._retry_policy = retry_policy
+        self._timeouts = timeouts
+        self.session: AsyncSession = None
+
+    async def __aenter__(self):
+        """セッションを開始（リクエストの期限を過ぎている場合は DeadlineExceededError）"""
+        check_deadline()
+        self.session = self._session_factory()
+        apply_transaction_timeouts(self.session.sync_session, self._timeouts)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """
+        セッションを終了
+        例外が発生していた場合は自動的にロールバック
+        """
+        if exc_type is not None:
+            await self.rollback()
+        await self.session.close()
+        return False  # 例外を再送出
+
+    async def commit(self):
+        """
+        トランザクションをコミット
+
+        失敗した場合はロールバックして例外を送出する。
+        再実行が必要な処理は run_in_transaction を使用する。
+        """
+        try:
+            await self.session.commit()
+            logger.debug('トランザクションをコミットしました')
+        except DBAPIError as e:
+            await self.session.rollback()
+            logger.error(f'トランザクションエラー: {e}')
+            raise
+
+    async def run_in_transaction(
+        self,
+        fn: Callable[['AsyncSQLAlchemyUnitOfWork'], Awaitable[T]],
+        call_site: str | None = None,
+    ) -> T:
+        """
+        fn を実行してコミットする。シリアライズ失敗・デッドロックの場合は
+        ロールバックして fn から再実行する（待機はイベントループを止めない）
+
+        Args:
+            fn: トランザクション内で実行する処理（このUoWを受け取るコルーチン関数）
+            call_site: メトリクスに記録する呼び出し箇所（省略時は fn の名前）
+
+        Returns:
+            fn の戻り値
+        """
+        call_site = call_site or call_site_of(fn)
+        policy = self._retry_policy
+        delay = policy.base_delay
+        attempt = 0
+
+        while True:
+            attempt += 1
+            started = time.perf_counter()
+            try:
+                result = await fn(self)
+                await self.session.commit()
+                return result
+            except DBAPIError as e:
+                await self.session.rollback()
+                elapsed = time.perf_counter() - started
+                if not is_retryable(e):
+                    raise
+                if attempt >= policy.max_attempts:
+                    record_exhausted(call_site, elapsed)
+                    logger.error(
+                        f'トランザクションの再実行が上限({policy.max_attempts})に達しました: '
+                        f'{call_site}: {e}'
+                    )
+                    raise
+
+                delay = policy.next_delay(delay)
+                remaining = remaining_seconds()
+                if remaining is not None and remaining <= delay:
+                    # 待機するとリクエストの期限を過ぎるため、再実行しない
+                    record_exhausted(call_site, elapsed)
+                    raise
+                record_retry(call_site, e, elapsed + delay)
+                logger.warning(
+                    f'トランザクションを再実行します {attempt}/{policy.max_attempts} '
+                    f'({delay * 1000:.0f}ms後): {call_site}: {e}'
+                )
+                await asyncio.sleep(delay)
+
+    async def rollback(self):
+        """トランザクションをロールバック"""
+        await self.session.rollback()
+        logger.debug('トランザクションをロールバックしました')
+
+    async def flush(self):
+        """
+        変更をデータベースに送信するがコミットはしない
+        """
+        await self.session.flush()
+        logger.debug('変更をフラッシュしました')
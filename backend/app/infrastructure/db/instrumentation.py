@@ -0,0 +1,177 @@
+"""SQLの計測
+
+エンジンの before/after_cursor_execute で各SQLの実行時間を計測し、
+リクエストごとの集計（track_request_queries で開始したコンテキスト）に加算する。
+
+- クエリ数・DB時間の合計（Server-Timing ヘッダーで返す）
+- 同じ文（正規化後）の実行回数（1リクエストで閾値を超えたものを N+1 の疑いとして警告する）
+- 閾値より遅い文は正規化した文とあわせてログに出力する（失敗した文も含む）
+- プロファイル中のリクエスト（ACTIVE_PROFILE）では、各文の実行区間をプロファイルに記録する
+
+本番で常時有効にできるよう、1文あたりの処理は時刻の取得と辞書の更新に留め、
+文の正規化は結果をキャッシュする。
+"""
+
+import logging
+import re
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from app.config import Settings
+from app.infrastructure.metrics.registry import REGISTRY
+from app.infrastructure.profiling.request_profiler import ACTIVE_PROFILE
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERIES = REGISTRY.counter('db_slow_queries_total', '閾値より遅かったSQL')
+
+# 正規化: バインドパラメータ・リテラルを ? に置き換え、IN のリストと複数行の VALUES を畳む
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|\$\d+|(?<![:\w]):\w+|\?')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_MULTI_VALUES = re.compile(
+    r'\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+'
+)
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> str:
+    """
+    SQLを正規化（値の違いだけの文を同じ文として扱う）
+
+    例:
+        SELECT * FROM users WHERE id IN (%(id_1)s, %(id_2)s) LIMIT 10
+        → SELECT * FROM users WHERE id IN (...) LIMIT ?
+    """
+    normalized = _WHITESPACE.sub(' ', statement).strip()
+    normalized = _STRING_LITERAL.sub('?', normalized)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _IN_LIST.sub('IN (...)', normalized)
+    return _MULTI_VALUES.sub('(...)', normalized)
+
+
+@dataclass(slots=True)
+class RequestQueryStats:
+    """1リクエストで実行したSQLの集計"""
+
+    label: str = ''
+    count: int = 0
+    total_seconds: float = 0.0
+    statements: dict[str, int] = field(default_factory=dict)
+
+    def record(self, normalized: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_seconds += elapsed
+        self.statements[normalized] = self.statements.get(normalized, 0) + 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """threshold 回を超えて実行した文（N+1 の疑い）を回数の多い順に返す"""
+        return sorted(
+            ((sql, n) for sql, n in self.statements.items() if n > threshold),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    def server_timing(self) -> str:
+        """Server-Timing ヘッダーの値"""
+        return f'db;dur={self.total_seconds * 1000:.2f};desc="{self.count} queries"'
+
+
+_request_stats: ContextVar[RequestQueryStats | None] = ContextVar(
+    'request_query_stats', default=None
+)
+
+
+@contextmanager
+def track_request_queries(label: str = '') -> Iterator[RequestQueryStats]:
+    """
+    このコンテキスト（およびそこから起動したスレッドプール上の処理）のSQLを集計する
+
+    Args:
+        label: ログに出力する名前（リクエストのメソッドとパスなど）
+    """
+    stats = RequestQueryStats(label=label)
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+class QueryInstrumentation:
+    """エンジンに登録するSQLの計測処理"""
+
+    def __init__(self, slow_query_seconds: float):
+        self.slow_query_seconds = slow_query_seconds
+
+    def attach(self, engine: 'Engine') -> None:
+        """エンジンにイベントを登録（非同期エンジンの場合は sync_engine を渡す）"""
+        from sqlalchemy import event
+
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine, 'handle_error', self._handle_error)
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        # 開始時刻は文の実行のコンテキストに持たせる（接続の info に積むと、失敗した文の
+        # 時刻がプールの接続に残り続ける）
+        if context is not None:
+            context._query_started_at = time.perf_counter()  # noqa: SLF001
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        self._record(context, statement, failed=False)
+
+    def _handle_error(self, exception_context) -> None:
+        """失敗した文（タイムアウトによる中断など）も実行時間を記録する"""
+        self._record(
+            exception_context.execution_context, exception_context.statement, failed=True
+        )
+
+    def _record(self, context, statement: str | None, failed: bool) -> None:
+        started = getattr(context, '_query_started_at', None)
+        if started is None or statement is None:
+            return
+        context._query_started_at = None  # noqa: SLF001
+        elapsed = time.perf_counter() - started
+        stats = _request_stats.get()
+        slow = elapsed >= self.slow_query_seconds
+        profile = ACTIVE_PROFILE.get()
+        if stats is None and not slow and profile is None:
+            return
+
+        normalized = normalize_statement(statement)
+        if stats is not None:
+            stats.record(normalized, elapsed)
+        if profile is not None:
+            profile.record_sql(normalized, elapsed)
+        if slow:
+            SLOW_QUERIES.inc()
+            label = stats.label if stats is not None else '-'
+            result = '（失敗）' if failed else ''
+            logger.warning(
+                f'遅いSQL{result} {elapsed * 1000:.1f}ms [{label}]: {normalized}'
+            )
+
+
+def instrument_engine(engine: 'Engine', settings: Settings) -> None:
+    """設定が有効な場合にエンジンへSQLの計測を登録する"""
+    if not settings.db_query_instrumentation_enabled:
+        return
+    QueryInstrumentation(slow_query_seconds=settings.db_slow_query_ms / 1000).attach(
+        engine
+    )
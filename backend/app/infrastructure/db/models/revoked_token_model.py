@@ -0,0 +1,15 @@
+"""失効トークンDBモデル"""
+
+from sqlalchemy import Column, DateTime, String
+
+from app.infrastructure.db.models.base import Base
+
+
+class RevokedTokenModel(Base):
+    """失効したアクセストークン（jti）のテーブル"""
+
+    __tablename__ = 'revoked_tokens'
+
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)  # トークンのexp（UTC）
+    revoked_at = Column(DateTime, nullable=False, index=True)  # 失効日時（UTC）
@@ -0,0 +1,57 @@
+"""コネクションプールのメトリクス
+
+- 貸し出し中・待機中（プール内）・オーバーフローの接続数は収集時にプールから読み取る
+- 接続の取得にかかった時間（空きを待つ時間と、新しい接続の確立を含む）はヒストグラムに記録する
+
+取得時間はプールのクラスを置き換えて計測する（SQLAlchemy にはプールから取り出す前の
+イベントがないため）。エンジンごとにサブクラスを作り、dispose() でプールが作り直されても
+同じラベルで記録されるようにする。
+"""
+
+import time
+from collections.abc import Iterable
+
+from sqlalchemy import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.infrastructure.metrics.registry import REGISTRY, Gauge, label_key
+
+POOL_WAIT_SECONDS = REGISTRY.histogram(
+    'db_pool_checkout_wait_seconds',
+    'コネクションプールから接続を取得するまでの時間（空きの待ち・接続の確立を含む）',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+
+
+def timed_pool_class(base: type[QueuePool], engine_name: str) -> type[QueuePool]:
+    """接続の取得にかかった時間を記録するプールのクラス"""
+    key = label_key({'engine': engine_name})
+
+    class TimedPool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                POOL_WAIT_SECONDS.observe_key(time.perf_counter() - started, key)
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f'Timed{base.__name__}'
+    return TimedPool
+
+
+def collect_pool_gauges(engines: Iterable[tuple[str, Engine]]) -> list[Gauge]:
+    """構築済みのエンジンのプールの接続数（NullPool など接続を保持しないプールは除く）"""
+    checked_out = Gauge('db_pool_checked_out', 'プールから貸し出し中の接続数')
+    idle = Gauge('db_pool_idle', 'プール内で待機中の接続数')
+    overflow = Gauge('db_pool_overflow', '常時保持する数を超えて確立している接続数')
+    size = Gauge('db_pool_size', 'プールが常時保持する接続数')
+    for name, engine in engines:
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        checked_out.set(pool.checkedout(), engine=name)
+        idle.set(pool.checkedin(), engine=name)
+        # 常時保持する数まで確立していない間は負の値になる
+        overflow.set(max(0, pool.overflow()), engine=name)
+        size.set(pool.size(), engine=name)
+    return [checked_out, idle, overflow, size]
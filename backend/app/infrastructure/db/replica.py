@@ -0,0 +1,151 @@
+"""読み取り専用トランザクションの接続先の選択
+
+読み取り専用のUnit of Workはレプリカ（Auroraのリーダー）で実行し、次の場合はプライマリを使う。
+
+- レプリカが設定されていない
+- そのユーザーが直近（DB_READ_YOUR_WRITES_SECONDS 以内）に書き込んでいる
+  （レプリカの遅延で自分の書き込みが見えなくなるのを避ける）
+- レプリカに接続できない（DB_REPLICA_RETRY_SECONDS の間はレプリカへの接続を試みない）
+
+書き込みの記録はプロセスごとに保持するため、別のワーカーで書き込んだ直後の読み取りは
+レプリカに振り分けられることがある。
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.infrastructure.db.session import (
+    ReplicaSessionLocal,
+    SessionLocal,
+    get_engine_registry,
+)
+from app.infrastructure.metrics.registry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+READ_SESSIONS = REGISTRY.counter(
+    'db_read_sessions_total', '読み取り専用トランザクションを実行した接続先'
+)
+
+
+class ReadReplicaRouter:
+    """
+    読み取り専用セッションの接続先を選ぶ
+
+    使用例:
+        router = ReadReplicaRouter(SessionLocal, ReplicaSessionLocal)
+        session = router.read_session(sticky_key=str(user_id))
+        ...
+        router.record_write(str(user_id))  # 書き込みをコミットした後
+    """
+
+    def __init__(
+        self,
+        primary_factory: Callable[[], Session],
+        replica_factory: Callable[[], Session] | None,
+        read_your_writes_seconds: float = 5.0,
+        retry_seconds: float = 30.0,
+        max_tracked_writers: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._primary_factory = primary_factory
+        self._replica_factory = replica_factory
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.retry_seconds = retry_seconds
+        self.max_tracked_writers = max_tracked_writers
+        self._clock = clock
+        # 書き込んだキー → プライマリに固定する期限（期限の早い順に並ぶ）
+        self._recent_writes: OrderedDict[str, float] = OrderedDict()
+        self._replica_unavailable_until = 0.0
+        self._lock = threading.Lock()
+
+    def read_session(self, sticky_key: str | None = None) -> Session:
+        """
+        読み取り専用トランザクション用のセッションを生成
+
+        Args:
+            sticky_key: 書き込みを追跡するキー（ユーザーIDなど）
+
+        Returns:
+            Session: レプリカまたはプライマリのセッション
+        """
+        if self._replica_factory is None:
+            return self._primary('no_replica')
+        if sticky_key is not None and self.is_sticky(sticky_key):
+            return self._primary('read_your_writes')
+        if self._clock() < self._replica_unavailable_until:
+            return self._primary('replica_unavailable')
+
+        session = self._replica_factory()
+        try:
+            # 最初のクエリの前に接続し、接続できない場合はプライマリで読む
+            session.connection()
+        except DBAPIError as e:
+            session.close()
+            self._replica_unavailable_until = self._clock() + self.retry_seconds
+            logger.warning(
+                f'レプリカに接続できないため、{self.retry_seconds:.0f}秒間'
+                f'プライマリで読み取ります: {e}'
+            )
+            return self._primary('replica_unavailable')
+
+        READ_SESSIONS.inc(target='replica', reason='read_only')
+        return session
+
+    def record_write(self, sticky_key: str) -> None:
+        """
+        書き込みのコミットを記録（以後 read_your_writes_seconds の間はプライマリで読む）
+
+        Args:
+            sticky_key: 書き込みを追跡するキー（ユーザーIDなど）
+        """
+        if self._replica_factory is None or self.read_your_writes_seconds <= 0:
+            return
+        now = self._clock()
+        with self._lock:
+            self._recent_writes[sticky_key] = now + self.read_your_writes_seconds
+            self._recent_writes.move_to_end(sticky_key)
+            # 期限は書き込み順に並ぶため、先頭から期限切れ・上限超過分を削除する
+            while self._recent_writes:
+                key, until = next(iter(self._recent_writes.items()))
+                if until > now and len(self._recent_writes) <= self.max_tracked_writers:
+                    break
+                del self._recent_writes[key]
+
+    def is_sticky(self, sticky_key: str) -> bool:
+        """直近に書き込んだキーか（プライマリで読む必要があるか）"""
+        with self._lock:
+            until = self._recent_writes.get(sticky_key)
+        return until is not None and until > self._clock()
+
+    def _primary(self, reason: str) -> Session:
+        READ_SESSIONS.inc(target='primary', reason=reason)
+        return self._primary_factory()
+
+
+_router: ReadReplicaRouter | None = None
+_router_lock = threading.Lock()
+
+
+def get_read_replica_router() -> ReadReplicaRouter:
+    """プロセス共通の接続先ルーターを取得"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                settings = get_settings()
+                has_replica = get_engine_registry().has_replica
+                _router = ReadReplicaRouter(
+                    SessionLocal,
+                    ReplicaSessionLocal if has_replica else None,
+                    read_your_writes_seconds=settings.db_read_your_writes_seconds,
+                    retry_seconds=settings.db_replica_retry_seconds,
+                )
+    return _router
@@ -0,0 +1,218 @@
+from collections.abc import Sequence
+
+from sqlalchemy import select
+
+from app.domain.entities.user import User
+from app.domain.repositories.pagination import Page
+from app.domain.repositories.user_repository import IAsyncUserRepository
+from app.infrastructure.db.models.user_model import UserModel
+from app.infrastructure.db.repositories.base_repository import AsyncBaseRepository
+from app.infrastructure.db.repositories.keyset_pagination import KeysetPaginator
+
+
+class AsyncUserRepositoryImpl(AsyncBaseRepository[UserModel], IAsyncUserRepository):
+    """ユーザーリポジトリの実装（AsyncSession版）"""
+
+    model = UserModel
+    # 一覧はID順（主キーのインデックスを範囲検索する）
+    _paginator = KeysetPaginator((UserModel.id,), scope='users')
+
+    async def get_by_login_id(self, login_id: str) -> User | None:
+        """
+        ログインIDでユーザーを取得
+
+        Args:
+            login_id: ログインID
+
+        Returns:
+            Optional[User]: ユーザーエンティティ（存在しない場合はNone）
+        """
+        stmt = select(UserModel).where(UserModel.login_id == login_id).limit(1)
+        user_model = await self.session.scalar(stmt)
+        if user_model is None:
+            return None
+        return self._to_entity(user_model)
+
+    async def get_by_id(self, user_id: int) -> User | None:
+        """
+        IDでユーザーを取得
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            Optional[User]: ユーザーエンティティ（存在しない場合はNone）
+        """
+        user_model = await self.session.get(UserModel, user_id)
+        if user_model is None:
+            return None
+        return self._to_entity(user_model)
+
+    async def create(self, user: User) -> User:
+        """
+        ユーザーを作成
+
+        Args:
+            user: ユーザーエンティティ
+
+        Returns:
+            User: 作成されたユーザーエンティティ
+        """
+        user_model = UserModel(
+            login_id=user.login_id,
+            password=user.password,
+            email=user.email,
+            name=user.name,
+        )
+        self.session.add(user_model)
+        await self.session.flush()  # IDを取得するためにflush
+        return self._to_entity(user_model)
+
+    async def update(self, user: User) -> User:
+        """
+        ユーザーを更新
+
+        Args:
+            user: ユーザーエンティティ
+
+        Returns:
+            User: 更新されたユーザーエンティティ
+        """
+        # UPDATE ... RETURNING の1文で更新する（事前のSELECTは行わない）
+        row = await self._update_by_pk(user.id, self._to_values(user))
+        if row is None:
+            raise ValueError(f'User with id {user.id} not found')
+        return User(**row)
+
+    async def update_password(
+        self, user_id: int, current_password: str, new_password: str
+    ) -> bool:
+        """
+        パスワード（ハッシュ）だけを更新（現在の値が current_password の場合のみ）
+
+        Args:
+            user_id: ユーザーID
+            current_password: 読み込んだ時点のハッシュ
+            new_password: 新しいハッシュ
+
+        Returns:
+            bool: 更新した場合True（読み込んだ後に変更・削除されていた場合はFalse）
+        """
+        # 他の列は書き込まず、読み込んだ後の変更を上書きしないようハッシュを条件にする
+        row = await self._update_returning(
+            (UserModel.id == user_id, UserModel.password == current_password),
+            {'password': new_password},
+        )
+        return row is not None
+
+    async def delete(self, user_id: int) -> bool:
+        """
+        ユーザーを削除
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            bool: 削除成功の場合True
+        """
+        # DELETE ... RETURNING の1文で削除する（事前のSELECTは行わない）
+        return await self._delete_by_pk(user_id)
+
+    async def create_many(self, users: Sequence[User]) -> list[User]:
+        """
+        複数のユーザーをまとめて作成
+
+        Args:
+            users: ユーザーエンティティのリスト（idは無視される）
+
+        Returns:
+            list[User]: 作成されたユーザーエンティティ（入力と同じ順序）
+        """
+        # 1件ずつflushせず、INSERT ... RETURNING でまとめて作成してIDを取得する
+        rows = await self._insert_many_returning(
+            [self._to_values(user) for user in users]
+        )
+        return self._in_login_id_order(rows, [user.login_id for user in users])
+
+    async def upsert_many(self, users: Sequence[User]) -> list[User]:
+        """
+        複数のユーザーをまとめて作成し、ログインIDが既存のユーザーは更新する
+
+        Args:
+            users: ユーザーエンティティのリスト（idは無視される。同じログインIDが
+                複数ある場合は後のものを採用する）
+
+        Returns:
+            list[User]: 作成・更新されたユーザーエンティティ（ログインIDの初出順）
+        """
+        # 1文の中で同じ行を2回更新できないため、ログインIDの重複は後のものを残す
+        values = {user.login_id: self._to_values(user) for user in users}
+        rows = await self._upsert_many_returning(
+            list(values.values()),
+            index_elements=('login_id',),
+            update_columns=('password', 'email', 'name'),
+        )
+        return self._in_login_id_order(rows, list(values))
+
+    async def list_page(self, cursor: str | None = None, limit: int = 50) -> Page[User]:
+        """
+        ユーザーをID順に1ページ分取得
+
+        Args:
+            cursor: 前回のページの next_cursor / prev_cursor（最初のページはNone）
+            limit: 1ページの件数
+
+        Returns:
+            Page[User]: ユーザーエンティティと前後のページのカーソル
+        """
+        page = await self._keyset_page(select(UserModel), self._paginator, cursor, limit)
+        return page.map(self._to_entity)
+
+    def _to_entity(self, user_model: UserModel) -> User:
+        """
+        DBモデルをエンティティに変換
+
+        Args:
+            user_model: ユーザーDBモデル
+
+        Returns:
+            User: ユーザーエンティティ
+        """
+        return User(
+            id=user_model.id,
+            login_id=user_model.login_id,
+            password=user_model.password,
+            email=user_model.email,
+            name=user_model.name,
+        )
+
+    def _to_values(self, user: User) -> dict:
+        """
+        エンティティを書き込む列の値に変換（idは含めない）
+
+        Args:
+            user: ユーザーエンティティ
+
+        Returns:
+            dict: 列名と値
+        """
+        return {
+            'login_id': user.login_id,
+            'password': user.password,
+            'email': user.email,
+            'name': user.name,
+        }
+
+    def _in_login_id_order(self, rows: list, login_ids: list[str]) -> list[User]:
+        """
+        RETURNING の行（順序不定）を指定したログインIDの順に並べてエンティティに変換
+
+        Args:
+            rows: 作成・更新された行
+            login_ids: 並べる順序（ログインID）
+
+        Returns:
+            list[User]: ユーザーエンティティ
+        """
+        by_login_id = {row['login_id']: row for row in rows}
+        return [User(**by_login_id[login_id]) for login_id in login_ids]
@@ -0,0 +1,328 @@
+"""リポジトリ共通の単一ステートメント操作
+
+更新・削除を「SELECTで取得 → ORMオブジェクトを変更 → flush」で行うと、
+DBとの往復が2回になり、アイデンティティマップの管理コストもかかる。
+ここでは UPDATE / DELETE ... RETURNING を1文で発行し、結果を行（マッピング）として返す。
+
+主キー指定の更新・削除はバインドパラメータを使った文をモデル・更新列ごとに一度だけ組み立て、
+以後は値だけを渡して実行する（文の構築とキャッシュキー生成のコストを省く）。
+
+複数行の作成・upsertは INSERT ... RETURNING を1文（insertmanyvalues により
+ドライバの executemany ではなく複数行VALUESにまとめて）発行し、採番されたIDを含む行を返す。
+RETURNING の行の順序はDBによっては保証されないため（SQLiteでは順序を指定すると
+1行ずつのINSERTに分割される）、入力との対応は一意キーで取ること。
+ORMのbulk insertは値がNoneの列の有無で文を分けるため、テーブルに対するINSERTを使う。
+
+一覧は KeysetPaginator（keyset_pagination.py）でページ単位に取得する（_keyset_page）。
+
+RETURNING は PostgreSQL と SQLite（3.35以降）で使用できる。
+ORMのアイデンティティマップは同期しないため、同じセッションで事前に読み込んだ
+オブジェクトには更新が反映されない点に注意（戻り値の行を使うこと）。
+"""
+
+import threading
+from collections.abc import Mapping, Sequence
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import (
+    ColumnElement,
+    Delete,
+    Insert,
+    Select,
+    Update,
+    bindparam,
+    delete,
+    insert,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.domain.repositories.pagination import Page
+from app.infrastructure.db.models.base import Base
+from app.infrastructure.db.repositories.keyset_pagination import KeysetPaginator
+
+ModelT = TypeVar('ModelT', bound=Base)
+
+# ORMのアイデンティティマップを同期しない（SELECTの追加発行やオブジェクトの走査を避ける）
+_NO_SYNC = {'synchronize_session': False}
+
+# 主キー・更新値のバインドパラメータ名（列名と同じ名前はSQLAlchemyが予約しているため接頭辞を付ける）
+_PK_PARAM = 'pk_'
+_VALUE_PARAM = 'v_'
+
+# ON CONFLICT ... DO UPDATE を組み立てられる方言ごとの insert
+_UPSERT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+_statement_cache: dict[tuple, Insert | Update | Delete] = {}
+_statement_cache_lock = threading.Lock()
+
+
+class _StatementBuilder(Generic[ModelT]):
+    """UPDATE / DELETE ... RETURNING 文の組み立て"""
+
+    model: type[ModelT]
+
+    def _update_statement(
+        self, where: tuple[ColumnElement[bool], ...], values: Mapping[str, Any]
+    ) -> Update:
+        return (
+            update(self.model)
+            .where(*where)
+            .values(**values)
+            .returning(*self.model.__table__.columns)
+            .execution_options(**_NO_SYNC)
+        )
+
+    def _delete_statement(self, where: tuple[ColumnElement[bool], ...]) -> Delete:
+        return (
+            delete(self.model)
+            .where(*where)
+            .returning(*self.model.__table__.primary_key.columns)
+            .execution_options(**_NO_SYNC)
+        )
+
+    def _pk_where(self) -> tuple[ColumnElement[bool], ...]:
+        return tuple(
+            column == bindparam(f'{_PK_PARAM}{column.key}')
+            for column in self.model.__table__.primary_key.columns
+        )
+
+    def _pk_params(self, pk: Any) -> dict[str, Any]:
+        columns = self.model.__table__.primary_key.columns
+        values = pk if isinstance(pk, tuple) else (pk,)
+        return {
+            f'{_PK_PARAM}{column.key}': value
+            for column, value in zip(columns, values, strict=True)
+        }
+
+    def _cached_statement(self, key: tuple, build) -> Insert | Update | Delete:
+        stmt = _statement_cache.get(key)
+        if stmt is None:
+            with _statement_cache_lock:
+                stmt = _statement_cache.setdefault(key, build())
+        return stmt
+
+    def _update_by_pk_statement(self, columns: tuple[str, ...]) -> Update:
+        return self._cached_statement(
+            ('update', self.model, columns),
+            lambda: self._update_statement(
+                self._pk_where(),
+                {column: bindparam(f'{_VALUE_PARAM}{column}') for column in columns},
+            ),
+        )
+
+    def _delete_by_pk_statement(self) -> Delete:
+        return self._cached_statement(
+            ('delete', self.model), lambda: self._delete_statement(self._pk_where())
+        )
+
+    def _insert_many_statement(self) -> Insert:
+        return self._cached_statement(
+            ('insert', self.model),
+            lambda: insert(self.model.__table__).returning(*self.model.__table__.columns),
+        )
+
+    def _upsert_many_statement(
+        self,
+        dialect_name: str,
+        index_elements: tuple[str, ...],
+        update_columns: tuple[str, ...],
+    ) -> Insert:
+        def build() -> Insert:
+            dialect_insert = _UPSERT_INSERTS.get(dialect_name)
+            if dialect_insert is None:
+                raise NotImplementedError(f'{dialect_name} のupsertには対応していません')
+            stmt = dialect_insert(self.model.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(index_elements),
+                set_={column: stmt.excluded[column] for column in update_columns},
+            )
+            return stmt.returning(*self.model.__table__.columns)
+
+        return self._cached_statement(
+            ('upsert', self.model, dialect_name, index_elements, update_columns), build
+        )
+
+    def _update_by_pk_params(self, pk: Any, values: Mapping[str, Any]) -> dict[str, Any]:
+        params = self._pk_params(pk)
+        params.update({f'{_VALUE_PARAM}{key}': value for key, value in values.items()})
+        return params
+
+
+class BaseRepository(_StatementBuilder[ModelT]):
+    """
+    同期セッション用のリポジトリ基底クラス
+
+    使用例:
+        class DrawingRepositoryImpl(BaseRepository[DrawingModel], IDrawingRepository):
+            model = DrawingModel
+
+            def rename(self, drawing_id: int, name: str) -> Drawing | None:
+                row = self._update_by_pk(drawing_id, {'name': name})
+                return Drawing(**row) if row else None
+    """
+
+    def __init__(self, session: Session):
+        """
+        コンストラクタ
+
+        Args:
+            session: SQLAlchemyのセッション
+        """
+        self.session = session
+
+    def _update_returning(
+        self, where: tuple[ColumnElement[bool], ...], values: Mapping[str, Any]
+    ) -> Mapping[str, Any] | None:
+        """条件に一致する行を1文で更新し、更新後の行を返す（一致しない場合はNone）"""
+        result = self.session.execute(self._update_statement(where, values))
+        return result.mappings().first()
+
+    def _delete_returning(self, where: tuple[ColumnElement[bool], ...]) -> int:
+        """条件に一致する行を1文で削除し、削除した件数を返す"""
+        result = self.session.execute(self._delete_statement(where))
+        return len(result.all())
+
+    def _update_by_pk(
+        self, pk: Any, values: Mapping[str, Any]
+    ) -> Mapping[str, Any] | None:
+        """主キーで指定した行を1文で更新し、更新後の行を返す（存在しない場合はNone）"""
+        stmt = self._update_by_pk_statement(tuple(values))
+        result = self.session.execute(stmt, self._update_by_pk_params(pk, values))
+        return result.mappings().first()
+
+    def _delete_by_pk(self, pk: Any) -> bool:
+        """主キーで指定した行を1文で削除する（存在しない場合はFalse）"""
+        result = self.session.execute(self._delete_by_pk_statement(), self._pk_params(pk))
+        return result.first() is not None
+
+    def _insert_many_returning(
+        self, rows: Sequence[Mapping[str, Any]]
+    ) -> list[Mapping[str, Any]]:
+        """複数行を1文で作成し、作成した行（採番されたIDを含む）を返す（順序は不定）"""
+        if not rows:
+            return []
+        result = self.session.execute(self._insert_many_statement(), list(rows))
+        return list(result.mappings())
+
+    def _upsert_many_returning(
+        self,
+        rows: Sequence[Mapping[str, Any]],
+        index_elements: tuple[str, ...],
+        update_columns: tuple[str, ...],
+    ) -> list[Mapping[str, Any]]:
+        """
+        複数行を1文で作成し、index_elements が既存行と重複する場合は update_columns を更新する
+        （作成・更新した行を返す。順序は不定）
+
+        同じ文の中で同じ行を2回更新することはできないため、rows の index_elements は
+        重複しないようにしておくこと。
+        """
+        if not rows:
+            return []
+        stmt = self._upsert_many_statement(
+            self.session.get_bind().dialect.name, index_elements, update_columns
+        )
+        result = self.session.execute(stmt, list(rows))
+        return list(result.mappings())
+
+    def _keyset_page(
+        self,
+        statement: Select,
+        paginator: KeysetPaginator,
+        cursor: str | None,
+        limit: int,
+    ) -> Page[ModelT]:
+        """
+        一覧の1ページ分のORMオブジェクトを取得（OFFSETを使わずキーの範囲で読む）
+
+        Args:
+            statement: 絞り込み条件まで指定した SELECT（ORDER BY / LIMIT は指定しない）
+            paginator: 並び順のキー
+            cursor: 前回のページのカーソル（最初のページはNone）
+            limit: 1ページの件数
+
+        Raises:
+            InvalidCursorError: カーソルが不正な場合
+        """
+        query = paginator.query(statement, cursor, limit)
+        rows = self.session.execute(query.statement).scalars().all()
+        return paginator.page(query, rows)
+
+
+class AsyncBaseRepository(_StatementBuilder[ModelT]):
+    """非同期セッション用のリポジトリ基底クラス（BaseRepositoryと同じ操作を提供）"""
+
+    def __init__(self, session: AsyncSession):
+        """
+        コンストラクタ
+
+        Args:
+            session: SQLAlchemyの非同期セッション
+        """
+        self.session = session
+
+    async def _update_returning(
+        self, where: tuple[ColumnElement[bool], ...], values: Mapping[str, Any]
+    ) -> Mapping[str, Any] | None:
+        """条件に一致する行を1文で更新し、更新後の行を返す（一致しない場合はNone）"""
+        result = await self.session.execute(self._update_statement(where, values))
+        return result.mappings().first()
+
+    async def _delete_returning(self, where: tuple[ColumnElement[bool], ...]) -> int:
+        """条件に一致する行を1文で削除し、削除した件数を返す"""
+        result = await self.session.execute(self._delete_statement(where))
+        return len(result.all())
+
+    async def _update_by_pk(
+        self, pk: Any, values: Mapping[str, Any]
+    ) -> Mapping[str, Any] | None:
+        """主キーで指定した行を1文で更新し、更新後の行を返す（存在しない場合はNone）"""
+        stmt = self._update_by_pk_statement(tuple(values))
+        result = await self.session.execute(stmt, self._update_by_pk_params(pk, values))
+        return result.mappings().first()
+
+    async def _delete_by_pk(self, pk: Any) -> bool:
+        """主キーで指定した行を1文で削除する（存在しない場合はFalse）"""
+        result = await self.session.execute(
+            self._delete_by_pk_statement(), self._pk_params(pk)
+        )
+        return result.first() is not None
+
+    async def _insert_many_returning(
+        self, rows: Sequence[Mapping[str, Any]]
+    ) -> list[Mapping[str, Any]]:
+        """複数行を1文で作成し、作成した行（採番されたIDを含む）を返す（順序は不定）"""
+        if not rows:
+            return []
+        result = await self.session.execute(self._insert_many_statement(), list(rows))
+        return list(result.mappings())
+
+    async def _upsert_many_returning(
+        self,
+        rows: Sequence[Mapping[str, Any]],
+        index_elements: tuple[str, ...],
+        update_columns: tuple[str, ...],
+    ) -> list[Mapping[str, Any]]:
+        """複数行を1文で作成し、重複する場合は更新する（BaseRepositoryと同じ）"""
+        if not rows:
+            return []
+        stmt = self._upsert_many_statement(
+            self.session.get_bind().dialect.name, index_elements, update_columns
+        )
+        result = await self.session.execute(stmt, list(rows))
+        return list(result.mappings())
+
+    async def _keyset_page(
+        self,
+        statement: Select,
+        paginator: KeysetPaginator,
+        cursor: str | None,
+        limit: int,
+    ) -> Page[ModelT]:
+        """一覧の1ページ分のORMオブジェクトを取得（BaseRepositoryと同じ）"""
+        query = paginator.query(statement, cursor, limit)
+        rows = (await self.session.execute(query.statement)).scalars().all()
+        return paginator.page(query, rows)
@@ -0,0 +1,444 @@
+"""ユーザーリポジトリの読み込みキャッシュ
+
+get_by_id / get_by_login_id の結果をプロセス内にTTL + LRUで保持する（存在しない場合の
+Noneも短いTTLで保持する）。更新・削除・作成による無効化はトランザクションのコミット後に行う。
+コミット前に無効化すると、並行するリクエストがコミット前の古い行を読み直して
+キャッシュに入れてしまうため。無効化と読み込みが並行した場合に古い行を入れないよう、
+読み込み開始時の世代（無効化の回数）が変わっていた場合はキャッシュしない。
+
+キャッシュはプロセスごとに保持するため、他のワーカーでの更新は TTL が経過するまで反映されない。
+そのためパスワードの照合（ログイン）には使わない（di/auth.py）。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.domain.entities.user import User
+from app.domain.repositories.pagination import Page
+from app.domain.repositories.user_repository import IAsyncUserRepository, IUserRepository
+from app.infrastructure.metrics.registry import REGISTRY, cache_metrics
+
+# キャッシュのキー（('id', ユーザーID) または ('login_id', ログインID)）
+CacheKey = tuple[str, int | str]
+
+
+@dataclass(frozen=True)
+class UserCacheStats:
+    """キャッシュの統計情報"""
+
+    hits: int
+    negative_hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    max_entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.negative_hits + self.misses
+        return (self.hits + self.negative_hits) / total if total else 0.0
+
+
+class UserEntityCache:
+    """
+    ユーザーエンティティのTTL + LRUキャッシュ
+
+    FastAPIの同期エンドポイントはスレッドプールで実行されるため、
+    内部状態はロックで保護する。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 30.0,
+        negative_ttl_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, tuple[float, User | None]] = OrderedDict()
+        # ユーザーID → キャッシュしているログインID（ログインIDの変更・削除時の無効化用）
+        self._login_ids: dict[int, str] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key: CacheKey) -> tuple[bool, User | None]:
+        """
+        キャッシュからユーザーを取得
+
+        Args:
+            key: キャッシュのキー
+
+        Returns:
+            tuple[bool, User | None]: (キャッシュにあったか, ユーザー（存在しない場合はNone）)
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return False, None
+            expires_at, user = entry
+            if expires_at <= now:
+                self._remove(key)
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            if user is None:
+                self._negative_hits += 1
+                return True, None
+            self._hits += 1
+        # 呼び出し側での変更がキャッシュに及ばないようコピーを返す
+        return True, user.model_copy()
+
+    def generation(self) -> int:
+        """現在の世代（読み込み開始時に取得し、put に渡す）"""
+        return self._generation
+
+    def put(self, key: CacheKey, user: User | None, generation: int) -> None:
+        """
+        DBから読み込んだ結果を登録
+
+        ユーザーが存在する場合はIDとログインIDの両方のキーで登録する。
+        読み込み中に無効化が行われていた場合（世代が異なる場合）は登録しない。
+
+        Args:
+            key: 読み込みに使用したキー
+            user: 読み込んだユーザー（存在しない場合はNone）
+            generation: 読み込み開始時の世代
+        """
+        if self.max_entries <= 0:
+            return
+        now = self._clock()
+        with self._lock:
+            if generation != self._generation:
+                return
+            if user is None:
+                self._set(key, now + self.negative_ttl_seconds, None)
+            else:
+                expires_at = now + self.ttl_seconds
+                self._set(('id', user.id), expires_at, user)
+                self._set(('login_id', user.login_id), expires_at, user)
+                self._login_ids[user.id] = user.login_id
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = next(iter(self._entries.items()))
+                self._remove(evicted_key)
+                self._evictions += 1
+
+    def invalidate_user(self, user_id: int | None, login_id: str | None = None) -> None:
+        """
+        ユーザーのエントリを削除（コミット後に呼び出す）
+
+        Args:
+            user_id: ユーザーID
+            login_id: 変更後・作成時のログインID（存在しない結果のキャッシュも削除する）
+        """
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            keys: list[CacheKey] = []
+            if user_id is not None:
+                keys.append(('id', user_id))
+                cached_login_id = self._login_ids.get(user_id)
+                if cached_login_id is not None:
+                    keys.append(('login_id', cached_login_id))
+            if login_id is not None:
+                keys.append(('login_id', login_id))
+            for key in keys:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """全てのエントリを削除"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._login_ids.clear()
+
+    def stats(self) -> UserCacheStats:
+        """統計情報を取得"""
+        with self._lock:
+            return UserCacheStats(
+                hits=self._hits,
+                negative_hits=self._negative_hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                invalidations=self._invalidations,
+                size=len(self._entries),
+                max_entries=self.max_entries,
+            )
+
+    def _set(self, key: CacheKey, expires_at: float, user: User | None) -> None:
+        self._entries[key] = (expires_at, user)
+        self._entries.move_to_end(key)
+
+    def _remove(self, key: CacheKey) -> None:
+        """エントリを削除（ロックを保持した状態で呼び出す）"""
+        entry = self._entries.pop(key, None)
+        if entry is None or entry[1] is None or key[0] != 'login_id':
+            return
+        user = entry[1]
+        if self._login_ids.get(user.id) == user.login_id:
+            del self._login_ids[user.id]
+
+
+class _PendingInvalidations:
+    """
+    トランザクション内で書き込んだユーザーを記録し、コミット後にキャッシュから削除する
+
+    書き込んだトランザクションの中ではキャッシュを使用しない（自身の書き込みを読めるように）。
+    ロールバックした場合は記録を破棄する（run_in_transaction の再実行では再度記録される）。
+    """
+
+    def __init__(self, session: Session, cache: UserEntityCache):
+        self._cache = cache
+        self._users: list[tuple[int | None, str | None]] = []
+        event.listen(session, 'after_commit', self._after_commit)
+        event.listen(session, 'after_rollback', self._after_rollback)
+
+    @property
+    def dirty(self) -> bool:
+        """コミット前の書き込みがあるか"""
+        return bool(self._users)
+
+    def add(self, user_id: int | None, login_id: str | None = None) -> None:
+        self._users.append((user_id, login_id))
+
+    def _after_commit(self, session: Session) -> None:
+        users, self._users = self._users, []
+        for user_id, login_id in users:
+            self._cache.invalidate_user(user_id, login_id)
+
+    def _after_rollback(self, session: Session) -> None:
+        self._users = []
+
+
+class CachedUserRepository(IUserRepository):
+    """
+    ユーザーリポジトリのキャッシュ付きデコレータ
+
+    使用例:
+        with SQLAlchemyUnitOfWork() as uow:
+            repository = CachedUserRepository(
+                UserRepositoryImpl(uow.session), uow.session, get_user_entity_cache()
+            )
+            user = repository.get_by_login_id('taro')
+    """
+
+    def __init__(self, inner: IUserRepository, session: Session, cache: UserEntityCache):
+        """
+        コンストラクタ
+
+        Args:
+            inner: キャッシュしないリポジトリ
+            session: inner が使用するセッション（コミット・ロールバックを検知する）
+            cache: プロセス共通のキャッシュ
+        """
+        self._inner = inner
+        self._cache = cache
+        self._pending = _PendingInvalidations(session, cache)
+
+    def get_by_login_id(self, login_id: str) -> User | None:
+        """ログインIDでユーザーを取得（キャッシュにない場合はDBから読み込んで登録）"""
+        return self._read_through(('login_id', login_id), self._inner.get_by_login_id)
+
+    def get_by_id(self, user_id: int) -> User | None:
+        """IDでユーザーを取得（キャッシュにない場合はDBから読み込んで登録）"""
+        return self._read_through(('id', user_id), self._inner.get_by_id)
+
+    def create(self, user: User) -> User:
+        """ユーザーを作成（存在しない結果のキャッシュをコミット後に削除）"""
+        created = self._inner.create(user)
+        self._pending.add(created.id, created.login_id)
+        return created
+
+    def update(self, user: User) -> User:
+        """ユーザーを更新（キャッシュはコミット後に削除）"""
+        updated = self._inner.update(user)
+        self._pending.add(updated.id, updated.login_id)
+        return updated
+
+    def update_password(
+        self, user_id: int, current_password: str, new_password: str
+    ) -> bool:
+        """パスワードだけを更新（キャッシュはコミット後に削除）"""
+        updated = self._inner.update_password(user_id, current_password, new_password)
+        if updated:
+            self._pending.add(user_id)
+        return updated
+
+    def delete(self, user_id: int) -> bool:
+        """ユーザーを削除（キャッシュはコミット後に削除）"""
+        deleted = self._inner.delete(user_id)
+        if deleted:
+            self._pending.add(user_id)
+        return deleted
+
+    def create_many(self, users: Sequence[User]) -> list[User]:
+        """複数のユーザーをまとめて作成（存在しない結果のキャッシュをコミット後に削除）"""
+        created = self._inner.create_many(users)
+        for user in created:
+            self._pending.add(user.id, user.login_id)
+        return created
+
+    def upsert_many(self, users: Sequence[User]) -> list[User]:
+        """複数のユーザーをまとめて作成・更新（キャッシュはコミット後に削除）"""
+        upserted = self._inner.upsert_many(users)
+        for user in upserted:
+            self._pending.add(user.id, user.login_id)
+        return upserted
+
+    def list_page(self, cursor: str | None = None, limit: int = 50) -> Page[User]:
+        """ユーザーをID順に1ページ分取得（一覧はキャッシュしない）"""
+        return self._inner.list_page(cursor, limit)
+
+    def _read_through(self, key: CacheKey, load: Callable) -> User | None:
+        if self._pending.dirty:
+            return load(key[1])
+        found, user = self._cache.get(key)
+        if found:
+            return user
+        generation = self._cache.generation()
+        user = load(key[1])
+        self._cache.put(key, user, generation)
+        return user
+
+
+class AsyncCachedUserRepository(IAsyncUserRepository):
+    """ユーザーリポジトリのキャッシュ付きデコレータ（AsyncSession版）"""
+
+    def __init__(
+        self, inner: IAsyncUserRepository, session: AsyncSession, cache: UserEntityCache
+    ):
+        """
+        コンストラクタ
+
+        Args:
+            inner: キャッシュしないリポジトリ
+            session: inner が使用する非同期セッション（コミット・ロールバックを検知する）
+            cache: プロセス共通のキャッシュ
+        """
+        self._inner = inner
+        self._cache = cache
+        self._pending = _PendingInvalidations(session.sync_session, cache)
+
+    async def get_by_login_id(self, login_id: str) -> User | None:
+        """ログインIDでユーザーを取得（キャッシュにない場合はDBから読み込んで登録）"""
+        return await self._read_through(
+            ('login_id', login_id), self._inner.get_by_login_id
+        )
+
+    async def get_by_id(self, user_id: int) -> User | None:
+        """IDでユーザーを取得（キャッシュにない場合はDBから読み込んで登録）"""
+        return await self._read_through(('id', user_id), self._inner.get_by_id)
+
+    async def create(self, user: User) -> User:
+        """ユーザーを作成（存在しない結果のキャッシュをコミット後に削除）"""
+        created = await self._inner.create(user)
+        self._pending.add(created.id, created.login_id)
+        return created
+
+    async def update(self, user: User) -> User:
+        """ユーザーを更新（キャッシュはコミット後に削除）"""
+        updated = await self._inner.update(user)
+        self._pending.add(updated.id, updated.login_id)
+        return updated
+
+    async def update_password(
+        self, user_id: int, current_password: str, new_password: str
+    ) -> bool:
+        """パスワードだけを更新（キャッシュはコミット後に削除）"""
+        updated = await self._inner.update_password(
+            user_id, current_password, new_password
+        )
+        if updated:
+            self._pending.add(user_id)
+        return updated
+
+    async def delete(self, user_id: int) -> bool:
+        """ユーザーを削除（キャッシュはコミット後に削除）"""
+        deleted = await self._inner.delete(user_id)
+        if deleted:
+            self._pending.add(user_id)
+        return deleted
+
+    async def create_many(self, users: Sequence[User]) -> list[User]:
+        """複数のユーザーをまとめて作成（存在しない結果のキャッシュをコミット後に削除）"""
+        created = await self._inner.create_many(users)
+        for user in created:
+            self._pending.add(user.id, user.login_id)
+        return created
+
+    async def upsert_many(self, users: Sequence[User]) -> list[User]:
+        """複数のユーザーをまとめて作成・更新（キャッシュはコミット後に削除）"""
+        upserted = await self._inner.upsert_many(users)
+        for user in upserted:
+            self._pending.add(user.id, user.login_id)
+        return upserted
+
+    async def list_page(self, cursor: str | None = None, limit: int = 50) -> Page[User]:
+        """ユーザーをID順に1ページ分取得（一覧はキャッシュしない）"""
+        return await self._inner.list_page(cursor, limit)
+
+    async def _read_through(self, key: CacheKey, load: Callable) -> User | None:
+        if self._pending.dirty:
+            return await load(key[1])
+        found, user = self._cache.get(key)
+        if found:
+            return user
+        generation = self._cache.generation()
+        user = await load(key[1])
+        self._cache.put(key, user, generation)
+        return user
+
+
+_user_cache: UserEntityCache | None = None
+_user_cache_lock = threading.Lock()
+
+
+def get_user_entity_cache() -> UserEntityCache | None:
+    """プロセス共通のユーザーキャッシュを取得（USER_CACHE_ENABLED=false の場合はNone）"""
+    global _user_cache
+    settings = get_settings()
+    if not settings.user_cache_enabled:
+        return None
+    if _user_cache is None:
+        with _user_cache_lock:
+            if _user_cache is None:
+                _user_cache = UserEntityCache(
+                    max_entries=settings.user_cache_max_entries,
+                    ttl_seconds=settings.user_cache_ttl_seconds,
+                    negative_ttl_seconds=settings.user_cache_negative_ttl_seconds,
+                )
+    return _user_cache
+
+
+def _collect_cache_metrics():
+    if _user_cache is None:
+        return []
+    stats = _user_cache.stats()
+    return cache_metrics(
+        'user_entity',
+        stats.hits + stats.negative_hits,
+        stats.misses,
+        stats.evictions,
+        stats.size,
+    )
+
+
+REGISTRY.register_collector(_collect_cache_metrics)
@@ -0,0 +1,288 @@
+"""キーセットページネーション
+
+OFFSET は読み飛ばす行もすべて走査するため、深いページほど遅くなる。
+ここでは並び順のキー（インデックスのある列の組。最後の列は一意であること）の値を
+カーソルとして受け渡し、`WHERE (キー) > (前のページの最後の値) ORDER BY キー LIMIT n` で
+インデックスを範囲検索する（何ページ目でも読む行数は n + 1 行）。
+
+- カーソルはキーの値と向き（次/前）を JSON にし、HMAC-SHA256 で署名した不透明な文字列
+  （改ざん、および別の一覧のカーソルの流用は InvalidCursorError）
+- 前のページは並び順を反転して取得し、結果を元の順序に戻す
+- キーの列はすべて NOT NULL であること（NULL の大小比較はできない）
+
+使用例:
+    paginator = KeysetPaginator((DrawingModel.updated_at.desc(), DrawingModel.id.desc()),
+                                scope='drawings')
+    page = self._keyset_page(select(DrawingModel), paginator, cursor, limit)
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import threading
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import ColumnElement, Select, and_, or_, tuple_
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from app.config import get_settings
+from app.domain.repositories.pagination import InvalidCursorError, Page
+
+logger = logging.getLogger(__name__)
+
+_NEXT = 'n'
+_PREV = 'p'
+_SIGNATURE_BYTES = 16
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    return str(value)  # Decimal・UUID など（読み込み時に列の型で戻す）
+
+
+class CursorSigner:
+    """カーソルの署名・検証"""
+
+    def __init__(self, secret: bytes):
+        self._secret = secret
+
+    def encode(self, scope: str, direction: str, values: Sequence[Any]) -> str:
+        """
+        カーソルを生成
+
+        Args:
+            scope: 一覧の識別子（別の一覧・条件のカーソルを受け付けないために署名に含める）
+            direction: 'n'（次のページ）または 'p'（前のページ）
+            values: 境界の行のキーの値
+        """
+        payload = json.dumps(
+            [direction, list(values)], separators=(',', ':'), default=_json_default
+        ).encode()
+        return f'{_b64encode(payload)}.{_b64encode(self._sign(scope, payload))}'
+
+    def decode(self, scope: str, cursor: str) -> tuple[str, list[Any]]:
+        """
+        カーソルを検証して向きとキーの値を取り出す
+
+        Raises:
+            InvalidCursorError: 署名・形式が不正な場合
+        """
+        try:
+            encoded_payload, encoded_signature = cursor.split('.')
+            payload = _b64decode(encoded_payload)
+            signature = _b64decode(encoded_signature)
+        except (ValueError, binascii.Error) as e:
+            raise InvalidCursorError('カーソルの形式が不正です') from e
+        if not hmac.compare_digest(signature, self._sign(scope, payload)):
+            raise InvalidCursorError('カーソルの署名が一致しません')
+
+        try:
+            direction, values = json.loads(payload)
+        except ValueError as e:
+            raise InvalidCursorError('カーソルの形式が不正です') from e
+        if direction not in (_NEXT, _PREV) or not isinstance(values, list):
+            raise InvalidCursorError('カーソルの形式が不正です')
+        return direction, values
+
+    def _sign(self, scope: str, payload: bytes) -> bytes:
+        message = scope.encode() + b'\x00' + payload
+        return hmac.new(self._secret, message, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+@dataclass(frozen=True, slots=True)
+class KeysetQuery:
+    """ページを取得する文と、結果からページを組み立てるための情報"""
+
+    statement: Select
+    direction: str
+    limit: int
+    has_cursor: bool
+
+
+class KeysetPaginator:
+    """
+    並び順のキーによるページネーション
+
+    Args:
+        keys: 並び順のキー（列、または列.desc()。最後は主キーなどの一意な列）
+        scope: 一覧の識別子（絞り込み条件がある場合は条件も含める）
+        signer: カーソルの署名（省略時はプロセス共通のもの）
+        max_limit: 1ページの件数の上限
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[ColumnElement | UnaryExpression],
+        scope: str,
+        signer: CursorSigner | None = None,
+        max_limit: int = 100,
+    ):
+        if not keys:
+            raise ValueError('並び順のキーを1つ以上指定してください')
+        self._keys = tuple(self._parse_key(key) for key in keys)
+        self.scope = scope
+        self._signer = signer
+        self.max_limit = max_limit
+
+    @property
+    def signer(self) -> CursorSigner:
+        return self._signer or get_cursor_signer()
+
+    def query(self, statement: Select, cursor: str | None, limit: int) -> KeysetQuery:
+        """
+        一覧の文にカーソルの条件・並び順・件数を加える
+
+        Args:
+            statement: 絞り込み条件まで指定した SELECT（ORDER BY / LIMIT は指定しない）
+            cursor: 前回のページのカーソル（最初のページはNone）
+            limit: 1ページの件数（max_limit を超える場合は max_limit）
+
+        Raises:
+            InvalidCursorError: カーソルが不正な場合
+        """
+        if limit < 1:
+            raise ValueError('limit は1以上を指定してください')
+        limit = min(limit, self.max_limit)
+
+        direction = _NEXT
+        if cursor is not None:
+            direction, values = self.signer.decode(self.scope, cursor)
+            statement = statement.where(
+                self._after(self._from_json(values), reverse=direction == _PREV)
+            )
+        reverse = direction == _PREV
+        statement = statement.order_by(
+            *(
+                column.desc() if descending != reverse else column.asc()
+                for column, descending in self._keys
+            )
+        ).limit(limit + 1)  # 1行多く読み、続きがあるかを判定する
+        return KeysetQuery(statement, direction, limit, cursor is not None)
+
+    def page(
+        self,
+        query: KeysetQuery,
+        rows: Sequence[Any],
+        key_of: Callable[[Any], Sequence[Any]] | None = None,
+    ) -> Page[Any]:
+        """
+        取得した行からページを組み立てる
+
+        Args:
+            query: query() の戻り値
+            rows: query.statement の結果（ORMオブジェクトまたはマッピング）
+            key_of: 行からキーの値を取り出す関数（省略時は列名の属性・要素）
+        """
+        key_of = key_of or self._key_of
+        items = list(rows[: query.limit])
+        has_more = len(rows) > query.limit
+        if query.direction == _PREV:
+            items.reverse()
+            has_before, has_after = has_more, query.has_cursor
+        else:
+            has_before, has_after = query.has_cursor, has_more
+        if not items:
+            return Page(items=[])
+
+        return Page(
+            items=items,
+            next_cursor=self._cursor(_NEXT, key_of(items[-1])) if has_after else None,
+            prev_cursor=self._cursor(_PREV, key_of(items[0])) if has_before else None,
+        )
+
+    def _cursor(self, direction: str, values: Sequence[Any]) -> str:
+        return self.signer.encode(self.scope, direction, values)
+
+    def _after(self, values: list[Any], reverse: bool) -> ColumnElement[bool]:
+        """並び順でカーソルの位置より後（reverse の場合は前）の行の条件"""
+        columns = [column for column, _ in self._keys]
+        directions = {descending for _, descending in self._keys}
+        if len(directions) == 1:
+            # 向きが揃っている場合は行値の比較（インデックスの範囲検索になる）
+            forward = directions.pop() == reverse
+            left = columns[0] if len(columns) == 1 else tuple_(*columns)
+            right = values[0] if len(values) == 1 else tuple(values)
+            return left > right if forward else left < right
+
+        # 向きが混在する場合は (a > x) OR (a = x AND b < y) ... に展開する
+        clauses = []
+        for i, (column, descending) in enumerate(self._keys):
+            forward = descending == reverse
+            compare = column > values[i] if forward else column < values[i]
+            clauses.append(and_(*(columns[j] == values[j] for j in range(i)), compare))
+        return or_(*clauses)
+
+    def _from_json(self, values: list[Any]) -> list[Any]:
+        if len(values) != len(self._keys):
+            raise InvalidCursorError('カーソルのキーの数が一致しません')
+        try:
+            return [
+                self._python_value(column, value)
+                for (column, _), value in zip(self._keys, values, strict=True)
+            ]
+        except (TypeError, ValueError) as e:
+            raise InvalidCursorError('カーソルのキーの値が不正です') from e
+
+    def _key_of(self, row: Any) -> tuple[Any, ...]:
+        if isinstance(row, Mapping):
+            return tuple(row[column.key] for column, _ in self._keys)
+        return tuple(getattr(row, column.key) for column, _ in self._keys)
+
+    @staticmethod
+    def _python_value(column: ColumnElement, value: Any) -> Any:
+        python_type = column.type.python_type
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if isinstance(value, python_type):
+            return value
+        return python_type(value)
+
+    @staticmethod
+    def _parse_key(key: ColumnElement | UnaryExpression) -> tuple[ColumnElement, bool]:
+        if isinstance(key, UnaryExpression):
+            if key.modifier is operators.desc_op:
+                return key.element, True
+            if key.modifier is operators.asc_op:
+                return key.element, False
+        return key, False
+
+
+_signer: CursorSigner | None = None
+_signer_lock = threading.Lock()
+
+
+def get_cursor_signer() -> CursorSigner:
+    """プロセス共通のカーソルの署名を取得（PAGINATION_CURSOR_SECRET）"""
+    global _signer
+    if _signer is None:
+        with _signer_lock:
+            if _signer is None:
+                secret = get_settings().pagination_cursor_secret
+                if not secret:
+                    logger.warning(
+                        'PAGINATION_CURSOR_SECRET が未設定のため、一時的な鍵で'
+                        'カーソルを署名します（他のプロセス・再起動後のカーソルは無効になります）'
+                    )
+                _signer = CursorSigner(
+                    secret.encode() if secret else secrets.token_bytes(32)
+                )
+    return _signer
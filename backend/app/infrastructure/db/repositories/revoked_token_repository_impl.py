@@ -0,0 +1,54 @@
+from collections.abc import Iterator
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.domain.repositories.revoked_token_repository import IRevokedTokenRepository
+from app.infrastructure.db.models.revoked_token_model import RevokedTokenModel
+
+
+class RevokedTokenRepositoryImpl(IRevokedTokenRepository):
+    """失効トークンリポジトリの実装"""
+
+    def __init__(self, session: Session):
+        """
+        コンストラクタ
+
+        Args:
+            session: SQLAlchemyのセッション
+        """
+        self.session = session
+
+    def add(self, jti: str, expires_at: datetime, revoked_at: datetime) -> None:
+        """失効したトークンを登録（登録済みの場合は何もしない）"""
+        if self.session.get(RevokedTokenModel, jti) is not None:
+            return
+        self.session.add(
+            RevokedTokenModel(jti=jti, expires_at=expires_at, revoked_at=revoked_at)
+        )
+        self.session.flush()
+
+    def exists(self, jti: str) -> bool:
+        """トークンが失効済みかを確認"""
+        stmt = select(RevokedTokenModel.jti).where(RevokedTokenModel.jti == jti)
+        return self.session.execute(stmt).first() is not None
+
+    def iter_active_jtis(self, now: datetime) -> Iterator[str]:
+        """有効期限内の失効トークンIDを列挙（大量件数でもメモリを使い切らないよう分割取得）"""
+        stmt = (
+            select(RevokedTokenModel.jti)
+            .where(RevokedTokenModel.expires_at > now)
+            .execution_options(yield_per=10000)
+        )
+        yield from self.session.scalars(stmt)
+
+    def list_revoked_since(self, since: datetime) -> list[str]:
+        """指定日時以降に失効したトークンIDを取得"""
+        stmt = select(RevokedTokenModel.jti).where(RevokedTokenModel.revoked_at >= since)
+        return list(self.session.scalars(stmt))
+
+    def delete_expired(self, now: datetime) -> int:
+        """有効期限を過ぎた失効トークンを削除"""
+        stmt = delete(RevokedTokenModel).where(RevokedTokenModel.expires_at <= now)
+        return self.session.execute(stmt).rowcount
@@ -1,21 +1,21 @@
-from sqlalchemy.orm import Session
+from collections.abc import Sequence
+
+from sqlalchemy import select
 
 from app.domain.entities.user import User
+from app.domain.repositories.pagination import Page
 from app.domain.repositories.user_repository import IUserRepository
 from app.infrastructure.db.models.user_model import UserModel
+from app.infrastructure.db.repositories.base_repository import BaseRepository
+from app.infrastructure.db.repositories.keyset_pagination import KeysetPaginator
 
 
-class UserRepositoryImpl(IUserRepository):
+class UserRepositoryImpl(BaseRepository[UserModel], IUserRepository):
     """ユーザーリポジトリの実装"""
 
-    def __init__(self, session: Session):
-        """
-        コンストラクタ
-
-        Args:
-            session: SQLAlchemyのセッション
-        """
-        self.session = session
+    model = UserModel
+    # 一覧はID順（主キーのインデックスを範囲検索する）
+    _paginator = KeysetPaginator((UserModel.id,), scope='users')
 
     def get_by_login_id(self, login_id: str) -> User | None:
         """
@@ -79,17 +79,32 @@ class UserRepositoryImpl(IUserRepository):
         Returns:
             User: 更新されたユーザーエンティティ
         """
-        user_model = self.session.query(UserModel).filter(UserModel.id == user.id).first()
-        if user_model is None:
+        # UPDATE ... RETURNING の1文で更新する（事前のSELECTは行わない）
+        row = self._update_by_pk(user.id, self._to_values(user))
+        if row is None:
             raise ValueError(f'User with id {user.id} not found')
+        return User(**row)
 
-        user_model.login_id = user.login_id
-        user_model.password = user.password
-        user_model.email = user.email
-        user_model.name = user.name
+    def update_password(
+        self, user_id: int, current_password: str, new_password: str
+    ) -> bool:
+        """
+        パスワード（ハッシュ）だけを更新（現在の値が current_password の場合のみ）
 
-        self.session.flush()
-        return self._to_entity(user_model)
+        Args:
+            user_id: ユーザーID
+            current_password: 読み込んだ時点のハッシュ
+            new_password: 新しいハッシュ
+
+        Returns:
+            bool: 更新した場合True（読み込んだ後に変更・削除されていた場合はFalse）
+        """
+        # 他の列は書き込まず、読み込んだ後の変更を上書きしないようハッシュを条件にする
+        row = self._update_returning(
+            (UserModel.id == user_id, UserModel.password == current_password),
+            {'password': new_password},
+        )
+        return row is not None
 
     def delete(self, user_id: int) -> bool:
         """
@@ -101,13 +116,56 @@ class UserRepositoryImpl(IUserRepository):
         Returns:
             bool: 削除成功の場合True
         """
-        user_model = self.session.query(UserModel).filter(UserModel.id == user_id).first()
-        if user_model is None:
-            return False
+        # DELETE ... RETURNING の1文で削除する（事前のSELECTは行わない）
+        return self._delete_by_pk(user_id)
+
+    def create_many(self, users: Sequence[User]) -> list[User]:
+        """
+        複数のユーザーをまとめて作成
+
+        Args:
+            users: ユーザーエンティティのリスト（idは無視される）
 
-        self.session.delete(user_model)
-        self.session.flush()
-        return True
+        Returns:
+            list[User]: 作成されたユーザーエンティティ（入力と同じ順序）
+        """
+        # 1件ずつflushせず、INSERT ... RETURNING でまとめて作成してIDを取得する
+        rows = self._insert_many_returning([self._to_values(user) for user in users])
+        return self._in_login_id_order(rows, [user.login_id for user in users])
+
+    def upsert_many(self, users: Sequence[User]) -> list[User]:
+        """
+        複数のユーザーをまとめて作成し、ログインIDが既存のユーザーは更新する
+
+        Args:
+            users: ユーザーエンティティのリスト（idは無視される。同じログインIDが
+                複数ある場合は後のものを採用する）
+
+        Returns:
+            list[User]: 作成・更新されたユーザーエンティティ（ログインIDの初出順）
+        """
+        # 1文の中で同じ行を2回更新できないため、ログインIDの重複は後のものを残す
+        values = {user.login_id: self._to_values(user) for user in users}
+        rows = self._upsert_many_returning(
+            list(values.values()),
+            index_elements=('login_id',),
+            update_columns=('password', 'email', 'name'),
+        )
+        return self._in_login_id_order(rows, list(values))
+
+    def list_page(self, cursor: str | None = None, limit: int = 50) -> Page[User]:
+        """
+        ユーザーをID順に1ページ分取得
+
+        Args:
+            cursor: 前回のページの next_cursor / prev_cursor（最初のページはNone）
+            limit: 1ページの件数
+
+        Returns:
+            Page[User]: ユーザーエンティティと前後のページのカーソル
+        """
+        page = self._keyset_page(select(UserModel), self._paginator, cursor, limit)
+        return page.map(self._to_entity)
 
     def _to_entity(self, user_model: UserModel) -> User:
         """
@@ -126,3 +184,34 @@ class UserRepositoryImpl(IUserRepository):
             email=user_model.email,
             name=user_model.name,
         )
+
+    def _to_values(self, user: User) -> dict:
+        """
+        エンティティを書き込む列の値に変換（idは含めない）
+
+        Args:
+            user: ユーザーエンティティ
+
+        Returns:
+            dict: 列名と値
+        """
+        return {
+            'login_id': user.login_id,
+            'password': user.password,
+            'email': user.email,
+            'name': user.name,
+        }
+
+    def _in_login_id_order(self, rows: list, login_ids: list[str]) -> list[User]:
+        """
+        RETURNING の行（順序不定）を指定したログインIDの順に並べてエンティティに変換
+
+        Args:
+            rows: 作成・更新された行
+            login_ids: 並べる順序（ログインID）
+
+        Returns:
+            list[User]: ユーザーエンティティ
+        """
+        by_login_id = {row['login_id']: row for row in rows}
+        return [User(**by_login_id[login_id]) for login_id in login_ids]
@@ -0,0 +1,99 @@
+"""トランザクションの再実行
+
+シリアライズ失敗やデッドロックで中断されたトランザクションは、ロールバック後に
+コミットだけを再試行しても成功しない（中断された変更は失われている）。
+ここではトランザクション全体を関数として受け取り、最初から再実行する方針を定める。
+
+- エラーの判定は例外メッセージではなくSQLSTATEで行う（psycopg2 / asyncpg 共通）
+- 待機時間は decorrelated jitter 付きの指数バックオフ（複数の処理が同時に再試行して
+  再び衝突するのを避ける）
+- 再試行回数と、失敗した試行・待機に費やした時間を呼び出し箇所ごとに記録する
+"""
+
+import random
+from dataclasses import dataclass
+
+from app.infrastructure.metrics.registry import REGISTRY
+
+# 再実行すれば成功する可能性があるSQLSTATE
+# lock_not_available（55P03）は lock_timeout（timeouts.py）で早く失敗させるためのエラーのため
+# 再実行しない（再実行するとロック待ちを繰り返し、503で返すまでプールの接続を使い続ける）
+RETRYABLE_SQLSTATES = {
+    '40001': 'serialization_failure',
+    '40P01': 'deadlock_detected',
+}
+
+TRANSACTION_RETRIES = REGISTRY.counter(
+    'db_transaction_retries_total', '再実行したトランザクションの回数'
+)
+TRANSACTION_RETRIES_EXHAUSTED = REGISTRY.counter(
+    'db_transaction_retries_exhausted_total',
+    '再実行の上限に達して失敗したトランザクション',
+)
+TRANSACTION_RETRY_WASTED_SECONDS = REGISTRY.counter(
+    'db_transaction_retry_wasted_seconds_total',
+    '失敗した試行と再実行までの待機に費やした時間',
+)
+
+
+def get_sqlstate(error: BaseException) -> str | None:
+    """
+    DBドライバーの例外からSQLSTATEを取得
+
+    SQLAlchemyの例外は元の例外（orig）を参照する。
+    psycopg2 は pgcode、SQLAlchemyのasyncpgアダプタは pgcode と sqlstate に保持している。
+    """
+    original = getattr(error, 'orig', None) or error
+    for attribute in ('pgcode', 'sqlstate'):
+        sqlstate = getattr(original, attribute, None)
+        if sqlstate:
+            return sqlstate
+    return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """トランザクション全体を再実行すべきエラーかを判定"""
+    return get_sqlstate(error) in RETRYABLE_SQLSTATES
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    再実行の方針
+
+    待機時間は decorrelated jitter:
+        delay = min(max_delay, uniform(base_delay, previous_delay * 3))
+    """
+
+    max_attempts: int = 5
+    base_delay: float = 0.05
+    max_delay: float = 2.0
+
+    def next_delay(self, previous_delay: float) -> float:
+        upper = max(self.base_delay, previous_delay * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))  # noqa: S311
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+def record_retry(call_site: str, error: BaseException, wasted_seconds: float) -> None:
+    """再実行を記録"""
+    sqlstate = get_sqlstate(error) or ''
+    TRANSACTION_RETRIES.inc(
+        call_site=call_site, reason=RETRYABLE_SQLSTATES.get(sqlstate, sqlstate)
+    )
+    TRANSACTION_RETRY_WASTED_SECONDS.inc(wasted_seconds, call_site=call_site)
+
+
+def record_exhausted(call_site: str, wasted_seconds: float) -> None:
+    """再実行の上限に達したことを記録"""
+    TRANSACTION_RETRIES_EXHAUSTED.inc(call_site=call_site)
+    TRANSACTION_RETRY_WASTED_SECONDS.inc(wasted_seconds, call_site=call_site)
+
+
+def call_site_of(fn) -> str:
+    """関数から呼び出し箇所の名前を求める（メトリクスのラベルに使う）"""
+    module = getattr(fn, '__module__', None) or ''
+    qualname = getattr(fn, '__qualname__', None) or repr(fn)
+    return f'{module}.{qualname}' if module else qualname
@@ -1,21 +1,359 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+"""DBエンジン・セッションの管理（エンジンとコネクションプールは最初に接続する時点で構築する）"""
 
-from app.config import get_settings
+import asyncio
+import os
+import threading
+import uuid
+from contextlib import AsyncExitStack, ExitStack
+from dataclasses import dataclass
 
-settings = get_settings()
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
-user = settings.postgres_user
-password = settings.postgres_password
-host = settings.postgres_host
-port = settings.postgres_port
-db_name = settings.postgres_db
+from app.config import Settings, get_settings
+from app.infrastructure.db.instrumentation import instrument_engine
+from app.infrastructure.db.pool_metrics import collect_pool_gauges, timed_pool_class
+from app.infrastructure.db.timeouts import DbTimeouts, connection_timeouts
+from app.infrastructure.metrics.registry import REGISTRY
 
-# データベースのURLを設定
-DATABASE_URI = f'postgresql+psycopg2://{user}:{password}@{host}:{port}/{db_name}'
 
-# エンジンの作成
-engine = create_engine(DATABASE_URI, pool_size=10, max_overflow=20, echo=False)
+@dataclass(frozen=True)
+class PoolSettings:
+    """1プロセスあたりのコネクションプール設定"""
 
-# セッションの作成
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+    pool_recycle: int
+    pool_pre_ping: bool
+
+
+def build_pool_settings(settings: Settings) -> PoolSettings:
+    """
+    Settingsからプロセスごとのプール設定を求める
+
+    DB_POOL_SIZE / DB_MAX_OVERFLOW が未指定（負の値）の場合は、
+    DB_MAX_CONNECTIONS をワーカー数（WEB_CONCURRENCY）で割った接続数を
+    常時保持する分（1/3）とオーバーフロー分（残り）に分ける
+    （全ワーカーの合計が DB_MAX_CONNECTIONS に収まるようにする）。
+    DB_PGBOUNCER_MODE=true の場合は PgBouncer が接続を多重化するため、
+    DB_PGBOUNCER_POOL_SIZE の小さなプール（0 の場合は NullPool）にする。
+    """
+    if settings.db_pgbouncer_mode:
+        # 接続の多重化は PgBouncer が行うため、プロセスでは保持しない（または少数のみ）
+        return PoolSettings(
+            pool_size=settings.db_pgbouncer_pool_size,
+            max_overflow=0,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_recycle=settings.db_pool_recycle_seconds,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+
+    workers = max(1, settings.web_concurrency)
+    per_worker = max(2, settings.db_max_connections // workers)
+
+    pool_size = settings.db_pool_size
+    if pool_size < 0:
+        pool_size = max(1, per_worker // 3)
+    max_overflow = settings.db_max_overflow
+    if max_overflow < 0:
+        max_overflow = max(0, per_worker - pool_size)
+
+    return PoolSettings(
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+
+def _database_uri(settings: Settings, driver: str, host: str | None = None) -> str:
+    user = settings.postgres_user
+    password = settings.postgres_password
+    host = host or settings.postgres_host
+    port = settings.postgres_port
+    db_name = settings.postgres_db
+    return f'postgresql+{driver}://{user}:{password}@{host}:{port}/{db_name}'
+
+
+def _unique_statement_name() -> str:
+    return f'__asyncpg_{uuid.uuid4().hex}__'
+
+
+class EngineRegistry:
+    """
+    同期・非同期エンジンの遅延構築と破棄を管理する
+
+    使用しない方のエンジン（例: 非同期のみ使用する構成での同期エンジン）は構築されない。
+    レジストリはアプリの lifespan で作成する。構築したエンジンにはSQLの計測
+    （instrumentation.py）を登録し、接続時に statement_timeout などの上限（timeouts.py）を
+    Settings の既定値で設定する。
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.pool_settings = build_pool_settings(settings)
+        self._engine: Engine | None = None
+        self._async_engine: AsyncEngine | None = None
+        self._replica_engine: Engine | None = None
+        self._session_factory: sessionmaker[Session] | None = None
+        self._replica_session_factory: sessionmaker[Session] | None = None
+        self._async_session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._lock = threading.Lock()
+
+    def _uses_null_pool(self) -> bool:
+        return self.settings.db_pgbouncer_mode and self.pool_settings.pool_size <= 0
+
+    def _pool_options(
+        self, engine_name: str, pool_class: type[QueuePool] = QueuePool
+    ) -> dict:
+        pool = self.pool_settings
+        if self._uses_null_pool():
+            return {'poolclass': NullPool, 'echo': False}
+        return {
+            'poolclass': timed_pool_class(pool_class, engine_name),
+            'pool_size': pool.pool_size,
+            'max_overflow': pool.max_overflow,
+            'pool_timeout': pool.pool_timeout,
+            'pool_recycle': pool.pool_recycle,
+            'pool_pre_ping': pool.pool_pre_ping,
+            'echo': False,
+        }
+
+    def _psycopg2_connect_args(self) -> dict:
+        connect_args = {'connect_timeout': self.settings.db_connect_timeout_seconds}
+        if options := self._connection_timeouts().libpq_options():
+            connect_args['options'] = options
+        return connect_args
+
+    def _asyncpg_connect_args(self) -> dict:
+        """
+        asyncpg の接続引数
+
+        PgBouncer（transaction pooling）経由の場合は、名前付きプリペアドステートメントの
+        キャッシュを無効にし、名前を一意にする（同じ名前の文が別のクライアントに
+        割り当てられたサーバーの接続に残るため）。
+        """
+        connect_args = {'timeout': self.settings.db_connect_timeout_seconds}
+        if server_settings := self._connection_timeouts().server_settings():
+            connect_args['server_settings'] = server_settings
+        if self.settings.db_pgbouncer_mode:
+            connect_args.update(
+                statement_cache_size=0,
+                prepared_statement_cache_size=0,
+                prepared_statement_name_func=_unique_statement_name,
+            )
+        return connect_args
+
+    def _connection_timeouts(self) -> DbTimeouts:
+        """接続時に設定する上限（PgBouncer 経由の場合は送らず、トランザクションごとに SET LOCAL で設定する）"""
+        return connection_timeouts(self.settings)
+
+    @property
+    def engine(self) -> Engine:
+        """同期エンジン（psycopg2）"""
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = create_engine(
+                        _database_uri(self.settings, 'psycopg2'),
+                        connect_args=self._psycopg2_connect_args(),
+                        **self._pool_options('primary'),
+                    )
+                    instrument_engine(self._engine, self.settings)
+        return self._engine
+
+    @property
+    def has_replica(self) -> bool:
+        """読み取り専用レプリカが設定されているか"""
+        return bool(self.settings.postgres_replica_host)
+
+    @property
+    def replica_engine(self) -> Engine | None:
+        """
+        読み取り専用レプリカの同期エンジン（POSTGRES_REPLICA_HOST が未設定の場合はNone）
+
+        プールの設定はプライマリと同じ（接続数はレプリカ側の上限として数える）。
+        """
+        if self._replica_engine is None and self.has_replica:
+            with self._lock:
+                if self._replica_engine is None:
+                    self._replica_engine = create_engine(
+                        _database_uri(
+                            self.settings, 'psycopg2', self.settings.postgres_replica_host
+                        ),
+                        connect_args=self._psycopg2_connect_args(),
+                        **self._pool_options('replica'),
+                    )
+                    instrument_engine(self._replica_engine, self.settings)
+        return self._replica_engine
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        """非同期エンジン（asyncpg）"""
+        if self._async_engine is None:
+            with self._lock:
+                if self._async_engine is None:
+                    self._async_engine = create_async_engine(
+                        _database_uri(self.settings, 'asyncpg'),
+                        connect_args=self._asyncpg_connect_args(),
+                        **self._pool_options('async', AsyncAdaptedQueuePool),
+                    )
+                    instrument_engine(self._async_engine.sync_engine, self.settings)
+        return self._async_engine
+
+    @property
+    def session_factory(self) -> sessionmaker[Session]:
+        """同期セッションのファクトリ"""
+        if self._session_factory is None:
+            self._session_factory = sessionmaker(
+                autocommit=False, autoflush=False, bind=self.engine
+            )
+        return self._session_factory
+
+    @property
+    def replica_session_factory(self) -> sessionmaker[Session] | None:
+        """読み取り専用レプリカのセッションのファクトリ（未設定の場合はNone）"""
+        if self._replica_session_factory is None and self.has_replica:
+            self._replica_session_factory = sessionmaker(
+                autocommit=False, autoflush=False, bind=self.replica_engine
+            )
+        return self._replica_session_factory
+
+    @property
+    def async_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """非同期セッションのファクトリ"""
+        if self._async_session_factory is None:
+            self._async_session_factory = async_sessionmaker(
+                bind=self.async_engine, autoflush=False, expire_on_commit=False
+            )
+        return self._async_session_factory
+
+    async def prewarm(self, connections: int) -> int:
+        """
+        コネクションプールに接続を確立しておく（起動時のウォームアップ）
+
+        最初のリクエストが接続の確立（TCP・TLS・認証）を待たないようにする。
+        使用する方のエンジン（DATABASE_ASYNC_ENABLED）とレプリカが対象。
+        常時保持する数（プールの pool_size）を超える分は返却時に閉じられるため、それ以下にする。
+
+        Returns:
+            int: エンジンごとに確立した接続数
+        """
+        connections = min(connections, self.pool_settings.pool_size)
+        if connections <= 0 or self._uses_null_pool():
+            return 0  # NullPool は接続を保持しない
+
+        if self.settings.database_async_enabled:
+            async with AsyncExitStack() as stack:
+                for _ in range(connections):
+                    await stack.enter_async_context(self.async_engine.connect())
+        else:
+            await asyncio.to_thread(_open_connections, self.engine, connections)
+        if self.has_replica:
+            await asyncio.to_thread(_open_connections, self.replica_engine, connections)
+        return connections
+
+    def built_engines(self) -> list[tuple[str, Engine]]:
+        """構築済みのエンジン（名前と同期エンジンの組。メトリクスの収集用）"""
+        engines = [
+            ('primary', self._engine),
+            ('replica', self._replica_engine),
+            ('async', self._async_engine.sync_engine if self._async_engine else None),
+        ]
+        return [(name, engine) for name, engine in engines if engine is not None]
+
+    async def dispose(self) -> None:
+        """構築済みのエンジンのコネクションプールを閉じる（アプリ終了時）"""
+        if self._engine is not None:
+            self._engine.dispose()
+        if self._replica_engine is not None:
+            self._replica_engine.dispose()
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+
+    def dispose_after_fork(self) -> None:
+        """
+        fork後の子プロセスで呼び出す
+
+        親プロセスから引き継いだ接続は閉じずに手放し（親の接続を壊さないため）、
+        子プロセスでは新しい接続を確立させる。
+        """
+        if self._engine is not None:
+            self._engine.dispose(close=False)
+        if self._replica_engine is not None:
+            self._replica_engine.dispose(close=False)
+        if self._async_engine is not None:
+            self._async_engine.sync_engine.dispose(close=False)
+
+
+def _open_connections(engine: Engine, connections: int) -> None:
+    """接続を同時に connections 本確立してプールに返す"""
+    with ExitStack() as stack:
+        for _ in range(connections):
+            stack.enter_context(engine.connect())
+
+
+_engine_registry: EngineRegistry | None = None
+_engine_registry_lock = threading.Lock()
+
+
+def get_engine_registry() -> EngineRegistry:
+    """プロセス共通のエンジンレジストリを取得（エンジン自体は使用時に構築される）"""
+    global _engine_registry
+    if _engine_registry is None:
+        with _engine_registry_lock:
+            if _engine_registry is None:
+                _engine_registry = EngineRegistry(get_settings())
+    return _engine_registry
+
+
+async def dispose_engine_registry() -> None:
+    """エンジンレジストリを破棄（アプリ終了時に呼び出す）"""
+    global _engine_registry
+    with _engine_registry_lock:
+        registry, _engine_registry = _engine_registry, None
+    if registry is not None:
+        await registry.dispose()
+
+
+def _dispose_in_child() -> None:
+    if _engine_registry is not None:
+        _engine_registry.dispose_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_in_child)
+
+
+def _collect_pool_metrics():
+    """プールの接続数と接続の取得にかかった時間をメトリクス（pool_metrics.py）として公開する"""
+    registry = _engine_registry
+    return collect_pool_gauges(registry.built_engines() if registry is not None else [])
+
+
+REGISTRY.register_collector(_collect_pool_metrics)
+
+
+# 以下はセッションファクトリとして使われてきた名前を維持している
+def SessionLocal() -> Session:
+    """同期セッションを生成"""
+    return get_engine_registry().session_factory()
+
+
+def ReplicaSessionLocal() -> Session:
+    """読み取り専用レプリカの同期セッションを生成（レプリカが設定されている場合のみ使用する）"""
+    return get_engine_registry().replica_session_factory()
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """非同期セッションを生成"""
+    return get_engine_registry().async_session_factory()
@@ -0,0 +1,230 @@
+"""SQLの実行時間の上限とリクエストの期限
+
+PostgreSQL の statement_timeout / lock_timeout / idle_in_transaction_session_timeout を
+Settings の既定値で接続ごとに設定し（接続時のオプション。トランザクションごとの往復はない）、
+次の場合だけトランザクションの開始時に SET LOCAL 相当（set_config(..., true)）で短くする。
+
+- リクエストの期限（ヘッダー・ルートの既定値）までの残り時間が既定値より短い
+- Unit of Work に個別の上限を指定した
+- PgBouncer（transaction pooling）経由の場合（接続時に設定できないため常に設定する）
+
+期限は ContextVar で保持するため、スレッドプール・非同期セッションのgreenletで実行される
+SQLにも引き継がれる。期限を過ぎてから新しいトランザクションを開始しようとした場合は
+DeadlineExceededError を送出し、DBに問い合わせない。
+"""
+
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from app.config import Settings, get_settings
+from app.infrastructure.db.retry import get_sqlstate
+from app.infrastructure.metrics.registry import REGISTRY
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection
+    from sqlalchemy.orm import Session
+
+DB_TIMEOUTS = REGISTRY.counter(
+    'db_timeouts_total', '実行時間・ロック待ち・リクエストの期限の上限で中断した処理'
+)
+
+# 上限で中断された場合のSQLSTATE
+TIMEOUT_SQLSTATES = {
+    '57014': 'statement_timeout',  # query_canceled
+    '55P03': 'lock_timeout',  # lock_not_available
+    '25P03': 'idle_in_transaction_timeout',  # idle_in_transaction_session_timeout
+}
+
+_SET_LOCAL_TIMEOUTS_SQL = (
+    "SELECT set_config('statement_timeout', :statement_timeout, true), "
+    "set_config('lock_timeout', :lock_timeout, true), "
+    "set_config('idle_in_transaction_session_timeout', :idle_timeout, true)"
+)
+
+
+class DeadlineExceededError(Exception):
+    """リクエストの期限を過ぎたため、トランザクションを開始しなかった"""
+
+
+@dataclass(frozen=True, slots=True)
+class DbTimeouts:
+    """トランザクションに設定する上限（ミリ秒。0は無制限）"""
+
+    statement_ms: int = 0
+    lock_ms: int = 0
+    idle_in_transaction_ms: int = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> 'DbTimeouts':
+        return cls(
+            statement_ms=settings.db_statement_timeout_ms,
+            lock_ms=settings.db_lock_timeout_ms,
+            idle_in_transaction_ms=settings.db_idle_in_transaction_timeout_ms,
+        )
+
+    def tightened(self, remaining_seconds: float) -> 'DbTimeouts':
+        """実行時間・ロック待ちの上限を残り時間以下にしたもの（最短1ms）"""
+        remaining_ms = max(1, int(remaining_seconds * 1000))
+        return replace(
+            self,
+            statement_ms=_min_timeout(self.statement_ms, remaining_ms),
+            lock_ms=_min_timeout(self.lock_ms, remaining_ms),
+        )
+
+    def server_settings(self) -> dict[str, str]:
+        """接続時に設定するサーバーのパラメータ（無制限のものは含めない）"""
+        values = {
+            'statement_timeout': self.statement_ms,
+            'lock_timeout': self.lock_ms,
+            'idle_in_transaction_session_timeout': self.idle_in_transaction_ms,
+        }
+        return {name: str(value) for name, value in values.items() if value > 0}
+
+    def libpq_options(self) -> str:
+        """psycopg2 の接続オプション（options）の形式"""
+        return ' '.join(
+            f'-c {name}={value}' for name, value in self.server_settings().items()
+        )
+
+
+def _min_timeout(timeout_ms: int, remaining_ms: int) -> int:
+    return remaining_ms if timeout_ms <= 0 else min(timeout_ms, remaining_ms)
+
+
+@lru_cache
+def default_timeouts() -> DbTimeouts:
+    """Settings の既定値"""
+    return DbTimeouts.from_settings(get_settings())
+
+
+def connection_timeouts(settings: Settings) -> DbTimeouts:
+    """
+    接続時に設定する上限
+
+    PgBouncer（transaction pooling）経由の場合は接続時のパラメータを送れず、
+    サーバーの接続も他のクライアントと共有するため設定しない（すべてトランザクションごとに設定する）。
+    """
+    if settings.db_pgbouncer_mode:
+        return DbTimeouts()
+    return DbTimeouts.from_settings(settings)
+
+
+@lru_cache
+def _default_connection_timeouts() -> DbTimeouts:
+    return connection_timeouts(get_settings())
+
+
+_deadline: ContextVar[float | None] = ContextVar('request_deadline', default=None)
+
+
+@contextmanager
+def deadline_scope(timeout_seconds: float | None) -> Iterator[None]:
+    """
+    このコンテキストの期限を timeout_seconds 後までに短くする（Noneの場合は変更しない）
+
+    すでに短い期限が設定されている場合はそちらを使う。
+    """
+    token = _deadline.set(_tightest(_deadline.get(), timeout_seconds))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def tighten_deadline(timeout_seconds: float) -> None:
+    """現在のコンテキスト（リクエスト）の期限を timeout_seconds 後までに短くする"""
+    _deadline.set(_tightest(_deadline.get(), timeout_seconds))
+
+
+def remaining_seconds() -> float | None:
+    """期限までの残り秒数（期限がない場合はNone。過ぎている場合は0以下）"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline() -> None:
+    """
+    期限を過ぎていないかを確認
+
+    Raises:
+        DeadlineExceededError: 期限を過ぎている場合
+    """
+    remaining = remaining_seconds()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceededError('リクエストの期限を過ぎました')
+
+
+def _tightest(deadline: float | None, timeout_seconds: float | None) -> float | None:
+    if timeout_seconds is None:
+        return deadline
+    candidate = time.monotonic() + timeout_seconds
+    return candidate if deadline is None else min(deadline, candidate)
+
+
+def effective_timeouts(
+    defaults: DbTimeouts, overrides: DbTimeouts | None, remaining: float | None
+) -> DbTimeouts:
+    """トランザクションに適用する上限（個別の指定 → 期限までの残り時間で短くする）"""
+    timeouts = overrides or defaults
+    if remaining is not None:
+        timeouts = timeouts.tightened(remaining)
+    return timeouts
+
+
+def timeout_reason(error: BaseException) -> str | None:
+    """上限・期限による中断の場合はその理由を返す（それ以外はNone）"""
+    if isinstance(error, DeadlineExceededError):
+        return 'deadline_exceeded'
+    # SQLAlchemy を読み込んでいない場合は、その例外でもない（起動時に読み込まないため）
+    sqlalchemy_exc = sys.modules.get('sqlalchemy.exc')
+    if sqlalchemy_exc is not None and isinstance(error, sqlalchemy_exc.TimeoutError):
+        return 'pool_timeout'
+    return TIMEOUT_SQLSTATES.get(get_sqlstate(error) or '')
+
+
+def record_timeout(reason: str) -> None:
+    """上限・期限による中断を記録"""
+    DB_TIMEOUTS.inc(reason=reason)
+
+
+def apply_transaction_timeouts(
+    session: 'Session', overrides: DbTimeouts | None = None
+) -> None:
+    """
+    セッションでトランザクションを開始するたびに上限を適用する
+
+    Args:
+        session: 同期セッション（AsyncSession の場合は sync_session）
+        overrides: Unit of Work 個別の上限（省略時は Settings の既定値）
+    """
+
+    from sqlalchemy import event, text
+
+    set_local_timeouts = text(_SET_LOCAL_TIMEOUTS_SQL)
+
+    def after_begin(session: 'Session', transaction, connection: 'Connection') -> None:
+        check_deadline()
+        if connection.dialect.name != 'postgresql':
+            return
+        timeouts = effective_timeouts(default_timeouts(), overrides, remaining_seconds())
+        if timeouts == _default_connection_timeouts():
+            return  # 接続時の設定のまま（追加の往復なし）
+        connection.execute(
+            set_local_timeouts,
+            {
+                'statement_timeout': str(timeouts.statement_ms),
+                'lock_timeout': str(timeouts.lock_ms),
+                'idle_timeout': str(timeouts.idle_in_transaction_ms),
+            },
+        )
+
+    event.listen(session, 'after_begin', after_begin)
+    if session.in_transaction():
+        # 接続先の確認などで開始済みのトランザクションにも適用する
+        after_begin(session, session.get_transaction(), session.connection())
@@ -1,17 +1,32 @@
 import logging
 import time
+from collections.abc import Callable
+from typing import TypeVar
 
-from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
 
 from app.application.interfaces.unit_of_work import IUnitOfWork
+from app.infrastructure.db.replica import ReadReplicaRouter, get_read_replica_router
+from app.infrastructure.db.retry import (
+    DEFAULT_RETRY_POLICY,
+    RetryPolicy,
+    call_site_of,
+    is_retryable,
+    record_exhausted,
+    record_retry,
+)
 from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.db.timeouts import (
+    DbTimeouts,
+    apply_transaction_timeouts,
+    check_deadline,
+    remaining_seconds,
+)
 
 logger = logging.getLogger(__name__)
 
-# デッドロックリトライ設定
-MAX_RETRIES = 3  # 最大リトライ回数
-RETRY_DELAY = 0.5  # リトライ間の待機時間（秒）
+T = TypeVar('T')
 
 
 class SQLAlchemyUnitOfWork(IUnitOfWork):
@@ -24,14 +39,63 @@ class SQLAlchemyUnitOfWork(IUnitOfWork):
             repository = UserRepository(uow.session)
             user = repository.create(new_user)
             uow.commit()
+
+        # シリアライズ失敗・デッドロック時にトランザクション全体を再実行する場合
+        with uow:
+            repository = UserRepository(uow.session)
+            user = uow.run_in_transaction(lambda _: repository.create(new_user))
+
+        # 読み取りのみの場合はレプリカで実行する（sticky_key のユーザーが直近に
+        # 書き込んでいる場合はプライマリ）
+        with SQLAlchemyUnitOfWork(read_only=True, sticky_key=str(user_id)) as uow:
+            user = UserRepository(uow.session).get_by_id(user_id)
+
+        # 集計など長くかかる処理は上限を個別に指定する
+        with SQLAlchemyUnitOfWork(timeouts=DbTimeouts(statement_ms=120_000)) as uow:
+            ...
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        sleep: Callable[[float], None] = time.sleep,
+        read_only: bool = False,
+        sticky_key: str | None = None,
+        router: ReadReplicaRouter | None = None,
+        timeouts: DbTimeouts | None = None,
+    ):
+        """
+        コンストラクタ
+
+        Args:
+            session_factory: セッションのファクトリ（read_only の場合は使用しない）
+            retry_policy: run_in_transaction の再実行の設定
+            sleep: 再実行までの待機に使う関数
+            read_only: 読み取りのみのトランザクションか（レプリカに振り分ける）
+            sticky_key: 書き込みを追跡するキー（ユーザーIDなど）。書き込みをコミットすると、
+                同じキーの読み取りは一定時間プライマリで実行される
+            router: 接続先ルーター（省略時はプロセス共通のルーター）
+            timeouts: このUoWのSQLの実行時間・ロック待ちの上限（省略時は Settings の既定値。
+                いずれの場合もリクエストの期限までの残り時間で短くする）
+        """
+        self._session_factory = session_factory
+        self._retry_policy = retry_policy
+        self._sleep = sleep
+        self._read_only = read_only
+        self._sticky_key = sticky_key
+        self._router = router
+        self._timeouts = timeouts
         self.session: Session = None
 
     def __enter__(self):
-        """セッションを開始"""
-        self.session = SessionLocal()
+        """セッションを開始（リクエストの期限を過ぎている場合は DeadlineExceededError）"""
+        check_deadline()
+        if self._read_only:
+            self.session = self._get_router().read_session(self._sticky_key)
+        else:
+            self.session = self._session_factory()
+        apply_transaction_timeouts(self.session, self._timeouts)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -47,34 +111,79 @@ class SQLAlchemyUnitOfWork(IUnitOfWork):
     def commit(self):
         """
         トランザクションをコミット
-        デッドロックが発生した場合は自動的にリトライ
+
+        失敗した場合はロールバックして例外を送出する。
+        再実行が必要な処理は run_in_transaction を使用する。
+        """
+        try:
+            self.session.commit()
+            logger.debug('トランザクションをコミットしました')
+            self._record_write()
+        except DBAPIError as e:
+            self.session.rollback()
+            logger.error(f'トランザクションエラー: {e}')
+            raise
+
+    def run_in_transaction(
+        self, fn: Callable[['SQLAlchemyUnitOfWork'], T], call_site: str | None = None
+    ) -> T:
+        """
+        fn を実行してコミットする。シリアライズ失敗・デッドロックの場合は
+        ロールバックして fn から再実行する
+
+        Args:
+            fn: トランザクション内で実行する処理（このUoWを受け取る）
+            call_site: メトリクスに記録する呼び出し箇所（省略時は fn の名前）
+
+        Returns:
+            fn の戻り値
         """
-        retries = 0
-        while retries < MAX_RETRIES:
+        call_site = call_site or call_site_of(fn)
+        policy = self._retry_policy
+        delay = policy.base_delay
+        attempt = 0
+
+        while True:
+            attempt += 1
+            started = time.perf_counter()
             try:
+                result = fn(self)
                 self.session.commit()
-                logger.debug('トランザクションをコミットしました')
-                return
-            except (OperationalError, IntegrityError) as e:
-                if self._is_deadlock_or_lock_timeout(e):
-                    retries += 1
-                    self.session.rollback()
-                    logger.warning(
-                        f'デッドロック検出。リトライ {retries}/{MAX_RETRIES}: {e}'
+                self._record_write()
+                return result
+            except DBAPIError as e:
+                self.session.rollback()
+                elapsed = time.perf_counter() - started
+                if not is_retryable(e):
+                    raise
+                if attempt >= policy.max_attempts:
+                    record_exhausted(call_site, elapsed)
+                    logger.error(
+                        f'トランザクションの再実行が上限({policy.max_attempts})に達しました: '
+                        f'{call_site}: {e}'
                     )
-                    # 指数バックオフでリトライ
-                    time.sleep(RETRY_DELAY * retries)
-                    continue
-                else:
-                    # デッドロック以外のエラーは即座に例外を送出
-                    self.session.rollback()
-                    logger.error(f'トランザクションエラー: {e}')
                     raise
 
-        # 最大リトライ回数を超えた場合
-        error_msg = f'最大リトライ回数({MAX_RETRIES})を超えました'
-        logger.error(error_msg)
-        raise Exception(error_msg)
+                delay = policy.next_delay(delay)
+                remaining = remaining_seconds()
+                if remaining is not None and remaining <= delay:
+                    # 待機するとリクエストの期限を過ぎるため、再実行しない
+                    record_exhausted(call_site, elapsed)
+                    raise
+                record_retry(call_site, e, elapsed + delay)
+                logger.warning(
+                    f'トランザクションを再実行します {attempt}/{policy.max_attempts} '
+                    f'({delay * 1000:.0f}ms後): {call_site}: {e}'
+                )
+                self._sleep(delay)
+
+    def _get_router(self) -> ReadReplicaRouter:
+        return self._router or get_read_replica_router()
+
+    def _record_write(self) -> None:
+        """書き込みのコミットを記録（read-your-writes のため）"""
+        if not self._read_only and self._sticky_key is not None:
+            self._get_router().record_write(self._sticky_key)
 
     def rollback(self):
         """トランザクションをロールバック"""
@@ -87,23 +196,3 @@ class SQLAlchemyUnitOfWork(IUnitOfWork):
         """
         self.session.flush()
         logger.debug('変更をフラッシュしました')
-
-    @staticmethod
-    def _is_deadlock_or_lock_timeout(e):
-        """
-        例外がデッドロックまたはロックタイムアウトかを判定
-
-        対応するエラー:
-        - PostgreSQL: deadlock detected
-        - PostgreSQL: could not serialize access
-        - MySQL: Deadlock found
-        - MySQL: Lock wait timeout exceeded
-        """
-        error_msg = str(e).lower()
-        deadlock_keywords = [
-            'deadlock',
-            'lock timeout',
-            'lock wait timeout',
-            'could not serialize access',
-        ]
-        return any(keyword in error_msg for keyword in deadlock_keywords)
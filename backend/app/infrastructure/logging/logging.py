@@ -1,19 +1,262 @@
+"""ロギングの設定
+
+リクエストを処理するスレッド（イベントループ・スレッドプール）ではレコードをキューに積むだけにし、
+整形と出力（標準出力・ファイル）はバックグラウンドの QueueListener のスレッドで行う。
+
+- 出力は JSON Lines（LOG_FORMAT=json）または従来の形式のテキスト
+- レベルは LOG_LEVEL（既定は INFO）
+- 呼び出し元（ファイル名・行番号・関数名）は LOG_CALLER_INFO=true の場合のみ取得する
+  （取得しない場合はログの呼び出しごとにスタックを辿らない）
+- ファイルはサイズ（LOG_FILE_MAX_BYTES）または時刻（LOG_FILE_ROTATE_WHEN）でローテーションする
+- LOG_SAMPLING で指定したロガー（とメッセージに含む文字列）の INFO 以下のレコードは
+  一部だけを出力する（例: uvicorn.access:/health=0.01 はヘルスチェックのアクセスログを100件に1件）
+
+fork した子プロセスではリスナーのスレッドが引き継がれないため、新しいキューとリスナーで
+出力を再開する（app/server.py のワーカー）。
+"""
+
+import atexit
+import itertools
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
+from datetime import UTC, datetime
 from pathlib import Path
 
+from app.config import Settings, get_settings
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+TEXT_FORMAT = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+# ファイル名・行番号・関数名まで表示して原因追跡を容易にする（LOG_CALLER_INFO=true）
+TEXT_FORMAT_WITH_CALLER = '%(asctime)s [%(levelname)s] %(name)s %(pathname)s:%(lineno)d %(funcName)s: %(message)s'
+
+# LogRecord の標準の属性（これ以外は extra として JSON に含める）
+# color_message は uvicorn がコンソールの色付け用に付ける extra
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord('', 0, '', 0, '', None, None).__dict__
+) | {'message', 'asctime', 'taskName', 'color_message'}
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """1レコードを1行の JSON にする"""
+
+    def __init__(self, caller_info: bool = False):
+        super().__init__()
+        self.caller_info = caller_info
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, UTC).isoformat(
+                timespec='milliseconds'
+            ),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+        }
+        if self.caller_info:
+            entry['caller'] = f'{record.pathname}:{record.lineno}'
+            entry['function'] = record.funcName
+        entry.update(
+            (key, value)
+            for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_')
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    キューに積む前に、メッセージと例外だけを文字列にする
+
+    標準の QueueHandler は積む前にメッセージを整形するが、出力の形式（JSON）での整形は
+    リスナーのスレッドで行うため、ここでは引数の埋め込みと例外の文字列化に留める
+    （引数が後から変更されても積んだ時点の内容を出力するため）。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _EXCEPTION_FORMATTER.formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """
+    指定したロガーの INFO 以下のレコードを一定の割合だけ通す
+
+    Args:
+        rules: (ロガー名, メッセージに含む文字列（空の場合は条件なし）, 残す割合) の列
+    """
+
+    def __init__(self, rules: list[tuple[str, str, float]]):
+        super().__init__()
+        self._rules = [
+            (logger_name, contains, max(1, round(1 / rate)) if rate > 0 else 0)
+            for logger_name, contains, rate in rules
+        ]
+        self._counters = [itertools.count() for _ in self._rules]
 
-def setup_logging():
-    log_dir = Path(__file__).resolve().parent.parent.parent / 'logs'
-    log_dir.mkdir(parents=True, exist_ok=True)
-    log_file_path = log_dir / 'app.log'
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        for (logger_name, contains, every), counter in zip(
+            self._rules, self._counters, strict=True
+        ):
+            if record.name != logger_name and not record.name.startswith(
+                logger_name + '.'
+            ):
+                continue
+            if contains and contains not in record.getMessage():
+                continue
+            # 残す割合が0の場合は出力しない。それ以外は every 件に1件（最初の1件は出力する）
+            return every > 0 and next(counter) % every == 0
+        return True
 
-    logging.basicConfig(
-        level=logging.DEBUG,
-        # ファイル名・行番号・関数名まで表示して原因追跡を容易にする
-        format='%(asctime)s [%(levelname)s] %(name)s %(pathname)s:%(lineno)d %(funcName)s: %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler(log_file_path),
-        ],
+
+def parse_sampling_rules(value: str) -> list[tuple[str, str, float]]:
+    """
+    LOG_SAMPLING の値を解析する
+
+    例: 'uvicorn.access:/health=0.01, app.infrastructure.db.instrumentation=0.1'
+
+    Raises:
+        ValueError: 形式が不正な場合
+    """
+    rules = []
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        target, separator, rate = item.rpartition('=')
+        if not separator or not target:
+            raise ValueError(f'LOG_SAMPLING の形式が不正です: {item}')
+        logger_name, _, contains = target.partition(':')
+        rate_value = float(rate)
+        if not 0 <= rate_value <= 1:
+            raise ValueError(f'LOG_SAMPLING の割合は0〜1で指定してください: {item}')
+        rules.append((logger_name.strip(), contains.strip(), rate_value))
+    return rules
+
+
+def _build_formatter(settings: Settings) -> logging.Formatter:
+    if settings.log_format == 'json':
+        return JsonFormatter(caller_info=settings.log_caller_info)
+    return logging.Formatter(
+        TEXT_FORMAT_WITH_CALLER if settings.log_caller_info else TEXT_FORMAT
+    )
+
+
+def _build_handlers(settings: Settings) -> list[logging.Handler]:
+    handlers: list[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if settings.log_file:
+        path = Path(settings.log_file)
+        if not path.is_absolute():
+            path = BACKEND_DIR / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if settings.log_file_rotate_when:
+            handlers.append(
+                logging.handlers.TimedRotatingFileHandler(
+                    path,
+                    when=settings.log_file_rotate_when,
+                    backupCount=settings.log_file_backup_count,
+                    encoding='utf-8',
+                    delay=True,
+                )
+            )
+        else:
+            handlers.append(
+                logging.handlers.RotatingFileHandler(
+                    path,
+                    maxBytes=settings.log_file_max_bytes,
+                    backupCount=settings.log_file_backup_count,
+                    encoding='utf-8',
+                    delay=True,
+                )
+            )
+    formatter = _build_formatter(settings)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+_queue_handler: _QueueHandler | None = None
+_listener: logging.handlers.QueueListener | None = None
+_lock = threading.Lock()
+
+
+def setup_logging(settings: Settings | None = None) -> None:
+    """
+    ロギングを設定する（プロセスで1回。アプリの起動時に呼び出す）
+
+    ルートロガーにすでにハンドラーがある場合（テストのログの捕捉など）は変更しない。
+    """
+    global _queue_handler, _listener
+    settings = settings or get_settings()
+    with _lock:
+        root = logging.getLogger()
+        if _listener is not None or root.handlers:
+            return
+
+        if not settings.log_caller_info:
+            # findCaller（スタックを辿る処理）を呼ばない（logging の最適化の設定）
+            logging._srcfile = None  # noqa: SLF001
+        handlers = _build_handlers(settings)
+        _queue_handler = _QueueHandler(queue.SimpleQueue())
+        if settings.log_sampling:
+            _queue_handler.addFilter(
+                SamplingFilter(parse_sampling_rules(settings.log_sampling))
+            )
+        _listener = logging.handlers.QueueListener(
+            _queue_handler.queue, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+        root.addHandler(_queue_handler)
+        root.setLevel(settings.log_level.upper())
+
+
+def shutdown_logging() -> None:
+    """キューに残っているレコードを出力してリスナーを停止する（プロセスの終了時）"""
+    global _queue_handler, _listener
+    with _lock:
+        listener, _listener = _listener, None
+        handler, _queue_handler = _queue_handler, None
+    if handler is not None:
+        logging.getLogger().removeHandler(handler)
+    if listener is not None:
+        listener.stop()
+        for output in listener.handlers:
+            output.close()
+
+
+def _restart_listener_in_child() -> None:
+    """fork した子プロセスで、新しいキューとリスナーで出力を再開する"""
+    global _listener
+    if _listener is None or _queue_handler is None:
+        return
+    handlers = _listener.handlers
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(
+        _queue_handler.queue, *handlers, respect_handler_level=True
     )
+    _listener.start()
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
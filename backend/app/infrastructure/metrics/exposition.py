@@ -0,0 +1,70 @@
+"""Prometheus のテキスト形式（0.0.4）への変換"""
+
+import math
+from collections.abc import Iterable
+
+from app.infrastructure.metrics.registry import Histogram, LabelValues, Metric
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', r'\\').replace('\n', r'\n')
+
+
+def _format_labels(key: LabelValues, extra: LabelValues = ()) -> str:
+    pairs = (*key, *extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape_label_value(v)}"' for k, v in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    if float(value).is_integer() and abs(value) < 2**53:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _histogram_lines(metric: Histogram) -> Iterable[str]:
+    bounds = [*(_format_value(bucket) for bucket in metric.buckets), '+Inf']
+    for key, counts in sorted(metric.samples()):
+        cumulative = 0.0
+        for bound, count in zip(bounds, counts[:-1], strict=True):
+            cumulative += count
+            labels = _format_labels(key, (('le', bound),))
+            yield f'{metric.name}_bucket{labels} {_format_value(cumulative)}'
+        labels = _format_labels(key)
+        yield f'{metric.name}_sum{labels} {_format_value(counts[-1])}'
+        yield f'{metric.name}_count{labels} {_format_value(cumulative)}'
+
+
+def render(metrics: Iterable[Metric]) -> str:
+    """
+    メトリクスをテキスト形式にする
+
+    同じ名前のメトリクス（複数のコレクターが返すもの）は1つの HELP / TYPE にまとめる。
+    """
+    families: dict[str, list[Metric]] = {}
+    for metric in metrics:
+        families.setdefault(metric.name, []).append(metric)
+
+    lines = []
+    for name, family in families.items():
+        first = family[0]
+        lines.append(f'# HELP {name} {_escape_help(first.documentation)}')
+        lines.append(f'# TYPE {name} {first.metric_type}')
+        for metric in family:
+            if isinstance(metric, Histogram):
+                lines.extend(_histogram_lines(metric))
+                continue
+            for key, value in sorted(metric.samples()):
+                lines.append(f'{name}{_format_labels(key)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,209 @@
+"""複数ワーカー（fork したプロセス）のメトリクスの集約
+
+メトリクスはプロセスごとに保持するため、/metrics に応答したワーカーの値だけでは
+タスク全体の値にならない。python -m app.server で起動した場合は、各ワーカーが
+共有ディレクトリに自分の値（スナップショット）を定期的に書き出し、/metrics では
+自分の現在値と他のワーカーのスナップショットを合算する。
+
+- カウンター・ヒストグラムはワーカーの値を合算する
+- ゲージ（プールの接続数など）は合算せず pid のラベルで分ける
+- 終了したワーカーのカウンター・ヒストグラムは親プロセス（mark_process_dead）が
+  archive.json に合算し、ワーカーが入れ替わってもカウンターが減らないようにする
+  （ゲージは破棄する）
+
+スナップショットの書き出しは一時ファイルからの置き換えで行い、読み込み中に
+書きかけのファイルを読まないようにする。終了したワーカーの合算と /metrics の読み込みは
+ロックファイルで排他する（合算の途中で二重に数えたり、数え漏らしたりしないため）。
+"""
+
+import fcntl
+import json
+import logging
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from app.infrastructure.metrics.registry import (
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    Metric,
+    MetricsRegistry,
+)
+
+logger = logging.getLogger(__name__)
+
+_ARCHIVE_FILE = 'archive.json'
+_LOCK_FILE = '.lock'
+
+_directory: Path | None = None
+_created_directory = False
+
+
+def configure(directory: str = '') -> Path:
+    """
+    スナップショットを書き出すディレクトリを設定する（親プロセスで fork の前に呼び出す）
+
+    前回の起動で残ったスナップショットは削除する。
+
+    Args:
+        directory: ディレクトリ（空の場合は一時ディレクトリを作成し、cleanup() で削除する）
+    """
+    global _directory, _created_directory
+    if directory:
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for stale in path.glob('*.json'):
+            stale.unlink()
+        _created_directory = False
+    else:
+        path = Path(tempfile.mkdtemp(prefix='app-metrics-'))
+        _created_directory = True
+    _directory = path
+    return path
+
+
+def cleanup() -> None:
+    """設定を解除する（configure() で作成した一時ディレクトリは削除する）"""
+    global _directory, _created_directory
+    directory, _directory = _directory, None
+    if directory is not None and _created_directory:
+        shutil.rmtree(directory, ignore_errors=True)
+    _created_directory = False
+
+
+def snapshot(metrics: list[Metric]) -> list[dict]:
+    """メトリクスを JSON に書き出せる形にする"""
+    entries = []
+    for metric in metrics:
+        entry = {
+            'name': metric.name,
+            'type': metric.metric_type,
+            'documentation': metric.documentation,
+            'samples': [[list(key), value] for key, value in metric.samples()],
+        }
+        if isinstance(metric, Histogram):
+            entry['buckets'] = list(metric.buckets)
+        entries.append(entry)
+    return entries
+
+
+def write_snapshot(registry: MetricsRegistry = REGISTRY) -> None:
+    """このプロセスの現在値を書き出す（ワーカーで定期的に、および終了時に呼び出す）"""
+    if _directory is None:
+        return
+    path = _directory / f'{os.getpid()}.json'
+    temporary = path.with_suffix('.tmp')
+    try:
+        temporary.write_text(json.dumps(snapshot(registry.collect())), encoding='utf-8')
+        os.replace(temporary, path)
+    except OSError as e:
+        logger.warning(f'メトリクスのスナップショットを書き出せませんでした: {e!r}')
+
+
+def mark_process_dead(pid: int) -> None:
+    """終了したワーカーのカウンター・ヒストグラムを archive.json に合算する（親プロセス）"""
+    if _directory is None:
+        return
+    path = _directory / f'{pid}.json'
+    with _locked(fcntl.LOCK_EX):
+        dead = _read(path)
+        if dead is None:
+            return
+        archive = _read(_directory / _ARCHIVE_FILE) or []
+        merged = _merge([(None, archive), (None, dead)], include_gauges=False)
+        temporary = _directory / f'{_ARCHIVE_FILE}.tmp'
+        temporary.write_text(json.dumps(snapshot(merged)), encoding='utf-8')
+        os.replace(temporary, _directory / _ARCHIVE_FILE)
+        path.unlink()
+
+
+def collect(registry: MetricsRegistry = REGISTRY) -> list[Metric]:
+    """
+    全ワーカーの値を合算したメトリクス（集約が無効の場合はこのプロセスの値）
+
+    このプロセスの値はスナップショットではなく現在値を使う。
+    """
+    if _directory is None:
+        return registry.collect()
+
+    own_pid = os.getpid()
+    sources: list[tuple[str | None, list[dict]]] = [
+        (str(own_pid), snapshot(registry.collect()))
+    ]
+    with _locked(fcntl.LOCK_SH):
+        for path in _directory.glob('*.json'):
+            if path.name == _ARCHIVE_FILE:
+                pid = None
+            elif path.stem.isdigit() and int(path.stem) != own_pid:
+                pid = path.stem
+            else:
+                continue
+            entries = _read(path)
+            if entries is not None:
+                sources.append((pid, entries))
+    return _merge(sources, include_gauges=True)
+
+
+@contextmanager
+def _locked(operation: int) -> Iterator[None]:
+    with open(_directory / _LOCK_FILE, 'a') as lock_file:
+        fcntl.flock(lock_file, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read(path: Path) -> list[dict] | None:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(
+            f'メトリクスのスナップショットを読み込めませんでした: {path}: {e!r}'
+        )
+        return None
+
+
+def _merge(
+    sources: list[tuple[str | None, list[dict]]], include_gauges: bool
+) -> list[Metric]:
+    """
+    スナップショットを合算する
+
+    Args:
+        sources: (pid（archive.json の場合はNone）, スナップショット) の列
+        include_gauges: ゲージを含めるか（含める場合は pid のラベルを加える）
+    """
+    merged: dict[str, Metric] = {}
+    for pid, entries in sources:
+        for entry in entries:
+            metric_type = entry['type']
+            if metric_type == 'gauge' and (not include_gauges or pid is None):
+                continue
+            metric = merged.get(entry['name'])
+            if metric is None:
+                metric = _new_metric(entry)
+                merged[entry['name']] = metric
+            elif metric.metric_type != metric_type:
+                continue
+            for key, value in entry['samples']:
+                labels = [tuple(pair) for pair in key]
+                if metric_type == 'gauge':
+                    labels.append(('pid', pid))
+                metric.merge_sample(tuple(sorted(labels)), value)
+    return list(merged.values())
+
+
+def _new_metric(entry: dict) -> Metric:
+    if entry['type'] == 'histogram':
+        return Histogram(entry['name'], entry['documentation'], entry['buckets'])
+    if entry['type'] == 'gauge':
+        return Gauge(entry['name'], entry['documentation'])
+    return Counter(entry['name'], entry['documentation'])
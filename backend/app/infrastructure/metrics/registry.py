@@ -0,0 +1,281 @@
+"""アプリケーション内のメトリクス
+
+ラベルごとの値を保持する軽量なカウンター・ゲージ・ヒストグラムと、それらをまとめるレジストリ。
+プールの使用数やキャッシュの統計など、値を持つ側から読み取るものは収集時に呼び出す
+コレクター（register_collector）で提供する。
+カウンター・ヒストグラムはスレッドごとに値を持ち、加算ではロックを使わない（収集時に合算する）。
+"""
+
+import logging
+import threading
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+LabelValues = tuple[tuple[str, str], ...]
+
+# レイテンシ（秒）のバケットの上限（+Inf は暗黙に含む）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def label_key(labels: dict[str, str]) -> LabelValues:
+    """ラベルの辞書を値の保持に使うキー（名前順の組）にする"""
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Metric:
+    """メトリクスの共通処理"""
+
+    metric_type = ''
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def value(self, **labels: str) -> float:
+        """指定したラベルの現在値を取得"""
+        raise NotImplementedError
+
+    def samples(self) -> Iterator[tuple[LabelValues, object]]:
+        """ラベルと値の組を列挙"""
+        raise NotImplementedError
+
+    def merge_sample(self, key: LabelValues, value) -> None:
+        """他のプロセスの値を取り込む"""
+        raise NotImplementedError
+
+
+class _ShardedMetric(Metric):
+    """
+    スレッドごとに値を保持するメトリクス（カウンター・ヒストグラム）
+
+    加算は呼び出したスレッドの辞書だけを更新し、ロックを使わない（リクエストを処理する
+    イベントループ・スレッドプールのスレッドが互いに待たない）。ロックは辞書の登録
+    （スレッドごとに1回）と収集時の合算でのみ使う。終了したスレッドの値は収集時に
+    まとめて残す。
+    """
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._local = threading.local()
+        self._shards: list[tuple[threading.Thread, dict]] = []
+        # 終了したスレッドの値と、他のプロセスから取り込んだ値
+        self._retired: dict = {}
+
+    def _shard(self) -> dict:
+        """このスレッドの値（最初の更新時に作成し、以降はロックを使わない）"""
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), values))
+            return values
+
+    def _add(self, total: dict, key: LabelValues, value) -> None:
+        raise NotImplementedError
+
+    def _merged(self) -> dict:
+        """全スレッドの値を合算したもの"""
+        with self._lock:
+            live = []
+            for thread, values in self._shards:
+                if thread.is_alive():
+                    live.append((thread, values))
+                else:
+                    for key, value in values.copy().items():
+                        self._add(self._retired, key, value)
+            self._shards = live
+            total: dict = {}
+            for key, value in self._retired.items():
+                self._add(total, key, value)
+            for _, values in live:
+                # 辞書のコピーは GIL の下で一度に行われ、更新中のスレッドと競合しない
+                for key, value in values.copy().items():
+                    self._add(total, key, value)
+        return total
+
+    def samples(self) -> Iterator[tuple[LabelValues, object]]:
+        yield from self._merged().items()
+
+    def merge_sample(self, key: LabelValues, value) -> None:
+        with self._lock:
+            self._add(self._retired, key, value)
+
+
+class Counter(_ShardedMetric):
+    """単調増加するカウンター"""
+
+    metric_type = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc_key(label_key(labels), amount)
+
+    def inc_key(self, key: LabelValues, amount: float = 1.0) -> None:
+        """ラベルを組み立て済みのキーで加算する（リクエストごとの記録用）"""
+        values = self._shard()
+        values[key] = values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._merged().get(label_key(labels), 0.0)
+
+    def _add(self, total: dict, key: LabelValues, value: float) -> None:
+        total[key] = total.get(key, 0.0) + value
+
+
+class Gauge(Metric):
+    """任意の値を設定できるゲージ（設定は辞書への代入のみのためロックを使わない）"""
+
+    metric_type = 'gauge'
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[label_key(labels)] = float(value)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(label_key(labels), 0.0)
+
+    def samples(self) -> Iterator[tuple[LabelValues, float]]:
+        yield from self._values.copy().items()
+
+    def merge_sample(self, key: LabelValues, value: float) -> None:
+        """他のプロセスの値を取り込む（ゲージは合算せず、呼び出し側でラベルを分ける）"""
+        self._values[key] = float(value)
+
+
+class Histogram(_ShardedMetric):
+    """
+    観測値の分布（バケットごとの件数・合計・件数）
+
+    ラベルごとに「バケットごとの件数 + 合計」の配列をスレッドごとの最初の観測時に確保し、
+    以降の観測はバケットの二分探索と配列の加算だけにする。
+    """
+
+    metric_type = 'histogram'
+
+    def __init__(
+        self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(float(bucket) for bucket in buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        self.observe_key(value, label_key(labels))
+
+    def observe_key(self, value: float, key: LabelValues) -> None:
+        """ラベルを組み立て済みのキーで観測する（リクエストごとの記録用）"""
+        index = bisect_left(self.buckets, value)
+        values = self._shard()
+        counts = values.get(key)
+        if counts is None:
+            # ラベル → [バケットごとの件数（+Inf の分を含む）..., 合計]
+            counts = values[key] = [0.0] * (len(self.buckets) + 2)
+        counts[index] += 1
+        counts[-1] += value
+
+    def value(self, **labels: str) -> float:
+        """指定したラベルの観測件数を取得"""
+        counts = self._merged().get(label_key(labels))
+        return sum(counts[:-1]) if counts else 0.0
+
+    def _add(self, total: dict, key: LabelValues, value: list[float]) -> None:
+        counts = total.get(key)
+        if counts is None:
+            total[key] = list(value)
+            return
+        for index, count in enumerate(value):
+            counts[index] += count
+
+
+Collector = Callable[[], Iterable[Metric]]
+
+
+class MetricsRegistry:
+    """メトリクスを名前で管理するレジストリ"""
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Collector] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(
+        self, metric_class: type[Metric], name: str, documentation: str, **options
+    ):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, documentation, **options)
+                self._metrics[name] = metric
+            elif not isinstance(metric, metric_class):
+                raise ValueError(
+                    f'Metric "{name}" is already registered as another type.'
+                )
+            return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        """カウンターを取得（未登録の場合は作成）"""
+        return self._get_or_create(Counter, name, documentation)
+
+    def gauge(self, name: str, documentation: str) -> Gauge:
+        """ゲージを取得（未登録の場合は作成）"""
+        return self._get_or_create(Gauge, name, documentation)
+
+    def histogram(
+        self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """ヒストグラムを取得（未登録の場合は作成）"""
+        return self._get_or_create(Histogram, name, documentation, buckets=buckets)
+
+    def register_collector(self, collector: Collector) -> None:
+        """
+        収集時に呼び出してメトリクスを返す関数を登録する
+
+        コレクターが返すメトリクスはレジストリには登録せず、収集のたびに作成する。
+        例外を送出したコレクターは（その回の収集では）無視する。
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> list[Metric]:
+        """登録済みのメトリクスとコレクターが返すメトリクスを取得"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                metrics.extend(collector())
+            except Exception:
+                logger.exception(f'メトリクスの収集に失敗しました: {collector!r}')
+        return metrics
+
+
+# プロセス共通のレジストリ
+REGISTRY = MetricsRegistry()
+
+
+def cache_metrics(
+    cache: str, hits: int, misses: int, evictions: int, size: int
+) -> list[Metric]:
+    """
+    キャッシュの統計情報をメトリクスにする（キャッシュのモジュールのコレクター用）
+
+    ヒット率は cache_hits_total / (cache_hits_total + cache_misses_total) で求められるが、
+    プロセスごとの現在値として cache_hit_ratio も返す。
+    """
+    hits_total = Counter('cache_hits_total', 'キャッシュのヒット数')
+    misses_total = Counter('cache_misses_total', 'キャッシュのミス数')
+    evictions_total = Counter('cache_evictions_total', '上限による追い出し数')
+    entries = Gauge('cache_entries', 'キャッシュのエントリ数')
+    hit_ratio = Gauge('cache_hit_ratio', 'キャッシュのヒット率（プロセスの起動から）')
+    hits_total.inc(hits, cache=cache)
+    misses_total.inc(misses, cache=cache)
+    evictions_total.inc(evictions, cache=cache)
+    entries.set(size, cache=cache)
+    lookups = hits + misses
+    hit_ratio.set(hits / lookups if lookups else 0.0, cache=cache)
+    return [hits_total, misses_total, evictions_total, entries, hit_ratio]
@@ -0,0 +1,71 @@
+"""プロファイルの保存先（件数に上限のあるディレクトリ）
+
+プロファイルは1ファイルずつ書き出し、上限を超えた分は古いものから削除する
+（サンプリングで常時有効にしてもディスクを使い続けないため）。
+書き出しは一時ファイルからの置き換えで行い、書きかけのファイルを読まないようにする。
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+
+class ProfileStore:
+    """
+    プロファイルのファイルを保存し、古いものを削除する
+
+    使用例:
+        store = ProfileStore('app/logs/profiles', max_files=50)
+        path = store.save('20260101T000000-1234-get-users.speedscope.json', text)
+    """
+
+    def __init__(self, directory: str | Path, max_files: int):
+        """
+        Args:
+            directory: 保存先（相対パスは backend からのパス）
+            max_files: 保存するファイル数の上限
+        """
+        path = Path(directory)
+        self.directory = path if path.is_absolute() else BACKEND_DIR / path
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def save(self, name: str, text: str) -> Path | None:
+        """
+        プロファイルを保存する（保存できなかった場合はNone）
+
+        Args:
+            name: ファイル名（並び順が古い順になる名前にすること）
+            text: プロファイルの内容
+        """
+        path = self.directory / name
+        temporary = self.directory / f'.{name}.tmp'
+        with self._lock:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                temporary.write_text(text, encoding='utf-8')
+                os.replace(temporary, path)
+            except OSError as e:
+                logger.warning(f'プロファイルを保存できませんでした: {path}: {e!r}')
+                return None
+            self._prune()
+        return path
+
+    def files(self) -> list[Path]:
+        """保存したプロファイル（古い順）"""
+        return sorted(
+            path for path in self.directory.glob('*') if not path.name.startswith('.')
+        )
+
+    def _prune(self) -> None:
+        files = self.files()
+        for path in files[: max(len(files) - self.max_files, 0)]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
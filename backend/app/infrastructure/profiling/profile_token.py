@@ -0,0 +1,46 @@
+"""プロファイルを要求するヘッダーの値（有効期限付きの署名）
+
+値は「有効期限（UNIX時刻）.HMAC-SHA256」。鍵を知っている管理者だけが発行でき、
+漏れた場合も有効期限までしか使えない（有効期限は発行時から max_ttl_seconds まで）。
+発行は scripts/profile_token.py で行う。
+"""
+
+import hashlib
+import hmac
+import time
+
+DEFAULT_MAX_TTL_SECONDS = 24 * 60 * 60
+
+
+def sign_profile_token(secret: str, expires: int) -> str:
+    """
+    ヘッダーの値を発行する
+
+    Args:
+        secret: 署名の鍵（PROFILING_SECRET）
+        expires: 有効期限（UNIX時刻）
+    """
+    return f'{expires}.{_signature(secret, str(expires))}'
+
+
+def verify_profile_token(
+    secret: str,
+    token: str,
+    now: float | None = None,
+    max_ttl_seconds: float = DEFAULT_MAX_TTL_SECONDS,
+) -> bool:
+    """ヘッダーの値の署名と有効期限を検証する（鍵が空の場合は常に無効）"""
+    if not secret:
+        return False
+    expires, _, signature = token.partition('.')
+    if not expires.isdigit() or not hmac.compare_digest(
+        signature.encode(), _signature(secret, expires).encode()
+    ):
+        return False
+    now = time.time() if now is None else now
+    return now <= int(expires) <= now + max_ttl_seconds
+
+
+def _signature(secret: str, expires: str) -> str:
+    message = f'profile:{expires}'.encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
@@ -0,0 +1,391 @@
+"""リクエスト単位のウォールクロックのサンプリングプロファイラ
+
+プロファイル対象のリクエストの間だけサンプリング用のスレッドを動かし、一定間隔で
+次のスタックを記録する（それ以外のリクエストには何もしない）。
+
+- イベントループ上で実行中の場合は、リクエストを処理するコルーチン（start() に渡した
+  フレーム）より内側のスタック
+- 待機中（await）の場合は、タスクのコルーチンの待ち先をたどったスタック。
+  スレッドプール（同期のエンドポイント・依存関係）で処理中の場合は、その先にスレッドの
+  スタックをつなげる。それ以外の待機（I/O など）は <await> とする
+
+スレッドプールのスレッドは install_threadpool_hook() で anyio.to_thread.run_sync
+（Starlette・FastAPI の run_in_threadpool が使う）を置き換え、プロファイル中のリクエストから
+呼び出された処理の間だけスレッドをプロファイルに登録して特定する。
+
+CPU時間ではなく経過時間（待機を含む）のため、遅いリクエストの時間の内訳をそのまま表す。
+エンジンのイベント（instrumentation.py）が記録したSQLは、実行中に取ったサンプルの末端に
+SQL のフレームとして加える（speedscope の形式では実行区間の一覧も出力する）。
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from types import FrameType
+
+import anyio.to_thread
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+# 実行中のリクエストのプロファイル（SQLのイベントの記録先。プロファイル対象外ではNone）
+ACTIVE_PROFILE: ContextVar['RequestProfile | None'] = ContextVar(
+    'active_profile', default=None
+)
+
+# (関数名, ファイル, 行番号)
+Frame = tuple[str, str, int]
+
+_WAITING = ('<await>', '', 0)
+_THREADPOOL = ('<threadpool>', '', 0)
+_MAX_DEPTH = 128
+_MAX_STATEMENT_LENGTH = 200
+
+
+@dataclass(slots=True)
+class SqlEvent:
+    """プロファイル中に実行したSQL"""
+
+    statement: str
+    thread_id: int
+    started: float
+    elapsed: float
+
+
+@dataclass(slots=True)
+class Sample:
+    """1回のサンプリングで記録したスタック（根から末端の順）"""
+
+    at: float
+    weight: float
+    thread_id: int
+    stack: tuple[Frame, ...]
+
+
+class RequestProfile:
+    """
+    1リクエストのプロファイル
+
+    使用例:
+        profile = RequestProfile('GET /users', interval_seconds=0.005, max_seconds=30)
+        token = ACTIVE_PROFILE.set(profile)
+        profile.start(sys._getframe())
+        try:
+            await app(scope, receive, send)
+        finally:
+            profile.stop()
+            ACTIVE_PROFILE.reset(token)
+    """
+
+    def __init__(self, label: str, interval_seconds: float, max_seconds: float):
+        self.label = label
+        self.interval_seconds = interval_seconds
+        self.max_seconds = max_seconds
+        self.samples: list[Sample] = []
+        self.sql_events: list[SqlEvent] = []
+        self.started = 0.0
+        self.finished = 0.0
+        self._anchor: FrameType | None = None
+        self._task: asyncio.Task | None = None
+        self._loop_thread_id = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        # このリクエストの処理を実行中のスレッドプールのスレッド（enter_worker_thread で登録する）
+        self._worker_threads: set[int] = set()
+
+    def start(self, anchor: FrameType) -> None:
+        """
+        サンプリングを開始する（イベントループ上で、リクエストを処理するタスクから呼び出す）
+
+        Args:
+            anchor: リクエストを処理するコルーチンのフレーム（これより内側を記録する）
+        """
+        self._anchor = anchor
+        self._task = asyncio.current_task()
+        self._loop_thread_id = threading.get_ident()
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name='request-profiler', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """サンプリングを終了する"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.finished = time.perf_counter()
+        self._anchor = None
+        self._task = None
+
+    def enter_worker_thread(self) -> None:
+        """呼び出したスレッド（スレッドプール）をこのリクエストの処理中として登録する"""
+        self._worker_threads.add(threading.get_ident())
+
+    def exit_worker_thread(self) -> None:
+        self._worker_threads.discard(threading.get_ident())
+
+    def record_sql(self, statement: str, elapsed: float) -> None:
+        """実行を終えたSQLを記録する（エンジンのイベントから呼び出す）"""
+        self.sql_events.append(
+            SqlEvent(
+                statement=statement,
+                thread_id=threading.get_ident(),
+                started=time.perf_counter() - elapsed,
+                elapsed=elapsed,
+            )
+        )
+
+    def stacks(self) -> list[tuple[tuple[Frame, ...], float]]:
+        """
+        サンプルごとの (スタック, 秒数)
+
+        SQLの実行中に取ったサンプル（同じスレッドで実行区間に含まれるもの）は、
+        末端にSQLのフレームを加える（待機中の <await> はSQLのフレームに置き換える）。
+        """
+        events: dict[int, list[SqlEvent]] = {}
+        for event in self.sql_events:
+            events.setdefault(event.thread_id, []).append(event)
+        stacks = []
+        for sample in self.samples:
+            stack = sample.stack
+            event = next(
+                (
+                    e
+                    for e in events.get(sample.thread_id, ())
+                    if e.started <= sample.at <= e.started + e.elapsed
+                ),
+                None,
+            )
+            if event is not None:
+                if stack and stack[-1] == _WAITING:
+                    stack = stack[:-1]
+                stack = (*stack, _sql_frame(event.statement))
+            stacks.append((stack, sample.weight))
+        return stacks
+
+    def to_collapsed(self) -> str:
+        """
+        collapsed stack 形式（1行に「根;...;末端 マイクロ秒」。flamegraph.pl などで描画できる）
+        """
+        totals: dict[str, float] = {}
+        for stack, weight in self.stacks():
+            line = ';'.join(_collapsed_name(frame) for frame in stack) or '<request>'
+            totals[line] = totals.get(line, 0.0) + weight
+        return ''.join(
+            f'{line} {round(seconds * 1_000_000)}\n' for line, seconds in totals.items()
+        )
+
+    def to_speedscope(self) -> str:
+        """
+        speedscope（https://www.speedscope.app/）の形式
+
+        サンプリングしたスタックのプロファイルと、SQLの実行区間のプロファイルを含める。
+        """
+        frames: list[dict] = []
+        indexes: dict[Frame, int] = {}
+
+        def index(frame: Frame) -> int:
+            if frame not in indexes:
+                indexes[frame] = len(frames)
+                name, file, line = frame
+                frames.append(
+                    {'name': name, 'file': file, 'line': line} if file else {'name': name}
+                )
+            return indexes[frame]
+
+        stacks = self.stacks()
+        duration = max(self.finished - self.started, 0.0)
+        profiles = [
+            {
+                'type': 'sampled',
+                'name': self.label,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': duration,
+                'samples': [[index(frame) for frame in stack] for stack, _ in stacks],
+                'weights': [weight for _, weight in stacks],
+            }
+        ]
+        if self.sql_events:
+            profiles.append(self._sql_profile(index, duration))
+        return json.dumps(
+            {
+                '$schema': 'https://www.speedscope.app/file-format-schema.json',
+                'name': self.label,
+                'exporter': 'app.infrastructure.profiling',
+                'shared': {'frames': frames},
+                'profiles': profiles,
+            },
+            ensure_ascii=False,
+        )
+
+    def _sql_profile(self, index, duration: float) -> dict:
+        """SQLの実行区間（重なる区間は表示できないため、先に始まったものだけを残す）"""
+        events = []
+        previous_end = 0.0
+        for event in sorted(self.sql_events, key=lambda e: e.started):
+            start = event.started - self.started
+            if start < previous_end:
+                continue
+            end = start + event.elapsed
+            frame = index(_sql_frame(event.statement))
+            events.append({'type': 'O', 'frame': frame, 'at': max(start, 0.0)})
+            events.append({'type': 'C', 'frame': frame, 'at': end})
+            previous_end = end
+        return {
+            'type': 'evented',
+            'name': f'{self.label} SQL',
+            'unit': 'seconds',
+            'startValue': 0,
+            'endValue': max(duration, previous_end),
+            'events': events,
+        }
+
+    def _run(self) -> None:
+        deadline = self.started + self.max_seconds
+        previous = self.started
+        while not self._stop.wait(self.interval_seconds):
+            now = time.perf_counter()
+            if now > deadline:
+                break
+            self._sample(now, now - previous)
+            previous = now
+
+    def _sample(self, now: float, elapsed: float) -> None:
+        frames = sys._current_frames()  # noqa: SLF001
+        own_thread_id = threading.get_ident()
+        task_stack, running = self._task_stack(frames.get(self._loop_thread_id))
+        stacks: list[tuple[int, tuple[Frame, ...]]] = []
+        if running:
+            stacks.append((self._loop_thread_id, task_stack))
+        for thread_id in list(self._worker_threads):
+            frame = frames.get(thread_id)
+            if frame is not None and thread_id != own_thread_id:
+                stacks.append((thread_id, task_stack + _worker_stack(frame)))
+        if not stacks:
+            stacks.append((self._loop_thread_id, (*task_stack, _WAITING)))
+
+        weight = elapsed / len(stacks)
+        self.samples.extend(
+            Sample(at=now, weight=weight, thread_id=thread_id, stack=stack)
+            for thread_id, stack in stacks
+        )
+
+    def _task_stack(self, loop_frame: FrameType | None) -> tuple[tuple[Frame, ...], bool]:
+        """
+        リクエストのタスクのスタック
+
+        Returns:
+            tuple: (スタック, イベントループ上で実行中か)
+        """
+        anchor = self._anchor
+        if anchor is None:
+            return (), False
+
+        inner: list[FrameType] = []
+        frame = loop_frame
+        while frame is not None and len(inner) < _MAX_DEPTH:
+            if frame is anchor:
+                return tuple(_frame_info(f) for f in reversed(inner)), True
+            inner.append(frame)
+            frame = frame.f_back
+
+        # 待機中: タスクのコルーチンから待ち先をたどり、anchor より内側を記録する
+        task = self._task
+        if task is None:
+            return (), False
+        chain = list(_awaited_frames(task.get_coro()))
+        for index, awaited in enumerate(chain):
+            if awaited is anchor:
+                return tuple(_frame_info(f) for f in chain[index + 1 :]), False
+        return (), False
+
+
+def _worker_stack(frame: FrameType) -> tuple[Frame, ...]:
+    """スレッドプールのスレッドのスタック（_run_tagged より内側）"""
+    inner: list[FrameType] = []
+    while frame is not None and len(inner) < _MAX_DEPTH:
+        if frame.f_code is _RUN_TAGGED_CODE:
+            break
+        inner.append(frame)
+        frame = frame.f_back
+    return (_THREADPOOL, *(_frame_info(f) for f in reversed(inner)))
+
+
+def _awaited_frames(coro) -> Iterator[FrameType]:
+    """コルーチンの待ち先を外側から順にたどったフレーム"""
+    depth = 0
+    while coro is not None and depth < _MAX_DEPTH:
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        if frame is None:
+            return
+        yield frame
+        coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+        depth += 1
+
+
+def _frame_info(frame: FrameType) -> Frame:
+    code = frame.f_code
+    return (code.co_qualname, _short_path(code.co_filename), code.co_firstlineno)
+
+
+def _short_path(filename: str) -> str:
+    """アプリのファイルは backend からの相対パス、ライブラリは site-packages からのパス"""
+    if filename.startswith(str(BACKEND_DIR)):
+        return str(Path(filename).relative_to(BACKEND_DIR))
+    _, separator, rest = filename.rpartition('site-packages/')
+    return rest if separator else filename
+
+
+def _sql_frame(statement: str) -> Frame:
+    return (f'SQL: {statement[:_MAX_STATEMENT_LENGTH]}', '', 0)
+
+
+def _collapsed_name(frame: Frame) -> str:
+    name, file, line = frame
+    label = f'{name} ({file}:{line})' if file else name
+    # ; はフレームの区切り、改行は行の区切りのため置き換える
+    return label.replace(';', ',').replace('\n', ' ')
+
+
+_original_run_sync: Callable | None = None
+_hook_lock = threading.Lock()
+
+
+def install_threadpool_hook() -> None:
+    """
+    anyio.to_thread.run_sync を、プロファイル中のリクエストから呼び出された場合に
+    実行するスレッドをプロファイルに登録する関数に置き換える（プロファイルを有効にした場合に
+    1回呼び出す。プロファイル対象外の呼び出しはそのまま元の関数に渡す）
+    """
+    global _original_run_sync
+    with _hook_lock:
+        if _original_run_sync is not None:
+            return
+        _original_run_sync = anyio.to_thread.run_sync
+        anyio.to_thread.run_sync = _run_sync
+
+
+async def _run_sync(func, *args, **kwargs):
+    profile = ACTIVE_PROFILE.get()
+    if profile is None:
+        return await _original_run_sync(func, *args, **kwargs)
+    return await _original_run_sync(_run_tagged, profile, func, *args, **kwargs)
+
+
+def _run_tagged(profile: RequestProfile, func, *args):
+    """スレッドプールのスレッドで、func の実行中だけスレッドをプロファイルに登録する"""
+    profile.enter_worker_thread()
+    try:
+        return func(*args)
+    finally:
+        profile.exit_worker_thread()
+
+
+_RUN_TAGGED_CODE = _run_tagged.__code__
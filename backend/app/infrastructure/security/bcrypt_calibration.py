@@ -0,0 +1,184 @@
+"""bcryptコストの調整
+
+実行環境のCPUで実際にハッシュを計算し、設定したレイテンシ予算に収まる
+最大のコスト（rounds）を選ぶ。選んだコストは pwd_context に反映され、
+それより低いコストのハッシュはログイン成功時に再ハッシュされる。
+
+計測はワーカーを fork する前の親プロセス（app.server）または
+scripts/calibrate_bcrypt.py で1回だけ行い、全ワーカーで同じコストを使う。
+"""
+
+import logging
+import os
+import statistics
+import time
+from dataclasses import dataclass, field
+
+import bcrypt
+from passlib.hash import bcrypt as bcrypt_handler
+
+from app.config import Settings, get_settings
+from app.infrastructure.metrics.registry import REGISTRY
+from app.infrastructure.security.password_hasher import pwd_context
+
+logger = logging.getLogger(__name__)
+
+# OWASPの推奨下限と、ログインが実用的な時間に収まる上限
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+DEFAULT_ROUNDS = 12
+
+BCRYPT_ROUNDS = REGISTRY.gauge('bcrypt_rounds', '現在のbcryptコスト')
+BCRYPT_HASH_SECONDS = REGISTRY.gauge(
+    'bcrypt_calibrated_hash_seconds', '調整時に計測した1回あたりのハッシュ時間'
+)
+
+
+@dataclass(frozen=True)
+class BcryptCalibration:
+    """調整結果"""
+
+    rounds: int
+    hash_ms: float
+    target_ms: float
+    measurements: dict[int, float] = field(default_factory=dict)
+
+
+def _measure_hash_ms(rounds: int, samples: int) -> float:
+    """指定コストでのハッシュ時間（ミリ秒、中央値）を計測"""
+    salt = bcrypt.gensalt(rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b'calibration-password', salt)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float,
+    min_rounds: int = MIN_ROUNDS,
+    max_rounds: int = MAX_ROUNDS,
+    samples: int = 3,
+) -> BcryptCalibration:
+    """
+    レイテンシ予算に収まる最大のbcryptコストを計測で求める
+
+    コストが1増えるとハッシュ時間は約2倍になるため、予算を超えた時点で計測を打ち切る。
+    最小コストでも予算を超える場合は最小コストを選ぶ（安全性を優先）。
+
+    Args:
+        target_ms: 1回のハッシュに許容する時間（ミリ秒）
+        min_rounds: 選択するコストの下限
+        max_rounds: 選択するコストの上限
+        samples: コストごとの計測回数
+
+    Returns:
+        BcryptCalibration: 調整結果
+    """
+    measurements: dict[int, float] = {}
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        hash_ms = _measure_hash_ms(rounds, samples)
+        measurements[rounds] = hash_ms
+        if hash_ms > target_ms:
+            break
+        chosen = rounds
+        # 次のコストは約2倍になるので、予算の1.5倍を超える見込みなら計測しない
+        if hash_ms * 2 > target_ms * 1.5:
+            break
+
+    return BcryptCalibration(
+        rounds=chosen,
+        hash_ms=measurements[chosen],
+        target_ms=target_ms,
+        measurements=measurements,
+    )
+
+
+def apply_bcrypt_rounds(rounds: int) -> None:
+    """bcryptコストを pwd_context に反映（以後のハッシュと needs_update の基準になる）"""
+    pwd_context.update(bcrypt__rounds=rounds)
+    BCRYPT_ROUNDS.set(rounds)
+
+
+def current_bcrypt_rounds() -> int:
+    """pwd_context に反映されている現在のbcryptコスト"""
+    return pwd_context.to_dict().get('bcrypt__rounds', DEFAULT_ROUNDS)
+
+
+def hash_rounds(hashed_password: str) -> int | None:
+    """bcryptハッシュのコスト（bcryptのハッシュでない場合はNone）"""
+    try:
+        return bcrypt_handler.from_string(hashed_password).rounds
+    except (TypeError, ValueError):
+        return None
+
+
+def is_weaker_than_current(hashed_password: str) -> bool:
+    """
+    ハッシュのコストが現在のbcryptコストより低いか
+
+    passlib の needs_update はコストが異なれば高い場合も True を返すため使わない
+    （プロセスごとにコストが異なる場合に再ハッシュが繰り返され、コストが下がるのを防ぐ）。
+    """
+    rounds = hash_rounds(hashed_password)
+    return rounds is not None and rounds < current_bcrypt_rounds()
+
+
+def configure_bcrypt_rounds(settings: Settings | None = None) -> int:
+    """
+    設定に従ってbcryptコストを適用する（アプリ起動時に呼び出す）
+
+    - BCRYPT_ROUNDS が指定されていればその値を使う
+    - いずれでもなければライブラリ既定のコスト（12）を使う
+
+    ワーカーごとに計測するとCPUの競合で結果がばらつき、プロセスごとにコストが異なるため、
+    ここでは計測しない（BCRYPT_CALIBRATE_ON_STARTUP は pin_calibrated_bcrypt_rounds() が
+    fork 前に計測して BCRYPT_ROUNDS に設定する）。
+
+    Returns:
+        int: 適用したコスト
+    """
+    settings = settings or get_settings()
+
+    if settings.bcrypt_rounds:
+        apply_bcrypt_rounds(settings.bcrypt_rounds)
+        logger.info(
+            f'bcryptコストを設定値で適用しました: rounds={settings.bcrypt_rounds}'
+        )
+        return settings.bcrypt_rounds
+
+    if settings.bcrypt_calibrate_on_startup:
+        logger.warning(
+            'BCRYPT_CALIBRATE_ON_STARTUP は python -m app.server での起動時のみ有効です。'
+            f'既定のbcryptコスト（{DEFAULT_ROUNDS}）を使います'
+        )
+    apply_bcrypt_rounds(DEFAULT_ROUNDS)
+    return DEFAULT_ROUNDS
+
+
+def pin_calibrated_bcrypt_rounds(settings: Settings) -> BcryptCalibration | None:
+    """
+    実行環境で計測したbcryptコストを BCRYPT_ROUNDS に設定する
+
+    ワーカーを fork する前の親プロセスで1回だけ呼び出し、全ワーカーが同じコストを使うようにする。
+    BCRYPT_ROUNDS が指定されている場合や BCRYPT_CALIBRATE_ON_STARTUP が無効な場合は計測しない。
+    呼び出し後は get_settings() のキャッシュを破棄して設定を読み直すこと。
+
+    Returns:
+        BcryptCalibration | None: 計測した場合はその結果
+    """
+    if settings.bcrypt_rounds or not settings.bcrypt_calibrate_on_startup:
+        return None
+
+    calibration = calibrate_bcrypt_rounds(settings.bcrypt_target_ms)
+    os.environ['BCRYPT_ROUNDS'] = str(calibration.rounds)
+    BCRYPT_HASH_SECONDS.set(calibration.hash_ms / 1000)
+    measurements = {r: round(ms, 1) for r, ms in calibration.measurements.items()}
+    logger.info(
+        f'bcryptコストを調整しました: rounds={calibration.rounds} '
+        f'hash_ms={calibration.hash_ms:.1f} target_ms={calibration.target_ms:.1f} '
+        f'measurements={measurements}'
+    )
+    return calibration
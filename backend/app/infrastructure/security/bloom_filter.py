@@ -0,0 +1,74 @@
+"""ブルームフィルタ
+
+偽陰性がなく、偽陽性率を容量から見積もれる集合。
+失効トークンの判定で、ほとんどのリクエストをDBに問い合わせずに通すために使う。
+"""
+
+import hashlib
+import math
+import threading
+
+
+def optimal_parameters(capacity: int, error_rate: float) -> tuple[int, int]:
+    """
+    想定件数と偽陽性率から、ビット数とハッシュ関数の数を求める
+
+    Args:
+        capacity: 想定する要素数
+        error_rate: 許容する偽陽性率
+
+    Returns:
+        tuple[int, int]: (ビット数, ハッシュ関数の数)
+    """
+    bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class BloomFilter:
+    """
+    ブルームフィルタ
+
+    ハッシュはBLAKE2bの128ビット出力を2つに分けた二重ハッシュで k 個の位置を求める。
+    追加はロックで保護し、判定はロックを取らない（ビットは立つだけで消えないため）。
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits, self.num_hashes = optimal_parameters(capacity, error_rate)
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        num_bits = self.num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str) -> None:
+        """要素を追加"""
+        positions = self._positions(item)
+        with self._lock:
+            bits = self._bits
+            for position in positions:
+                bits[position >> 3] |= 1 << (position & 7)
+            self._count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def __len__(self) -> int:
+        """追加した要素数（重複を含む）"""
+        return self._count
+
+    @property
+    def memory_bytes(self) -> int:
+        """ビット配列のサイズ（バイト）"""
+        return len(self._bits)
@@ -0,0 +1,153 @@
+"""JWT署名アルゴリズムの実装
+
+Settings.jwt_algorithm で選択する署名・検証の戦略。
+鍵の準備（prepare_*）は鍵リングの構築時に一度だけ行い、sign/verify には準備済みの鍵を渡す。
+
+- RS256: RSA-2048（python-jose）。検証は速いが署名が重い
+- ES256: ECDSA P-256（python-jose）。署名がRS256の約10倍速く、トークンも短い
+- EdDSA: Ed25519（PyJWT。python-joseは未対応）。署名はES256と同程度
+
+実測値は scripts/benchmarks/bench_jwt_algorithms.py で確認できる。
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+import jwt as pyjwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jose import JWTError, jwk
+from jose import jwt as jose_jwt
+
+
+class JWTAlgorithm(ABC):
+    """署名アルゴリズムのインターフェース"""
+
+    name: str
+    private_key_types: tuple[type, ...]
+    public_key_types: tuple[type, ...]
+
+    def _check_key_type(self, key_object, expected: tuple[type, ...]) -> None:
+        if not isinstance(key_object, expected):
+            raise ValueError(
+                f'Key type {type(key_object).__name__} cannot be used for {self.name}.'
+            )
+
+    @abstractmethod
+    def prepare_signing_key(self, private_key) -> Any:
+        """cryptographyの秘密鍵から署名用の鍵を準備"""
+        pass
+
+    @abstractmethod
+    def prepare_verifying_key(self, public_key) -> Any:
+        """cryptographyの公開鍵から検証用の鍵を準備"""
+        pass
+
+    @abstractmethod
+    def sign(self, claims: dict, signing_key: Any, headers: dict) -> str:
+        """クレームに署名してトークンを生成"""
+        pass
+
+    @abstractmethod
+    def verify(self, token: str, verifying_key: Any) -> dict:
+        """
+        トークンの署名と有効期限を検証してクレームを返す
+
+        Raises:
+            JWTError: 検証に失敗した場合
+        """
+        pass
+
+
+class JoseAlgorithm(JWTAlgorithm):
+    """python-joseを使用するアルゴリズム（RS256 / ES256）"""
+
+    def __init__(
+        self,
+        name: str,
+        private_key_types: tuple[type, ...],
+        public_key_types: tuple[type, ...],
+        curve: type | None = None,
+    ):
+        self.name = name
+        self.private_key_types = private_key_types
+        self.public_key_types = public_key_types
+        self.curve = curve
+
+    def _check_key_type(self, key_object, expected: tuple[type, ...]) -> None:
+        super()._check_key_type(key_object, expected)
+        if self.curve is not None and not isinstance(key_object.curve, self.curve):
+            raise ValueError(
+                f'Curve {key_object.curve.name} cannot be used for {self.name}.'
+            )
+
+    def prepare_signing_key(self, private_key):
+        self._check_key_type(private_key, self.private_key_types)
+        # python-joseはRSA秘密鍵オブジェクトを直接受け付けないため、PEMから一度だけ構築する
+        pem = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+        return jwk.construct(pem, self.name)
+
+    def prepare_verifying_key(self, public_key):
+        self._check_key_type(public_key, self.public_key_types)
+        return jwk.construct(public_key, self.name)
+
+    def sign(self, claims: dict, signing_key, headers: dict) -> str:
+        return jose_jwt.encode(claims, signing_key, algorithm=self.name, headers=headers)
+
+    def verify(self, token: str, verifying_key) -> dict:
+        return jose_jwt.decode(token, verifying_key, algorithms=[self.name])
+
+
+class EdDSAAlgorithm(JWTAlgorithm):
+    """Ed25519（PyJWTを使用）"""
+
+    name = 'EdDSA'
+    private_key_types = (ed25519.Ed25519PrivateKey,)
+    public_key_types = (ed25519.Ed25519PublicKey,)
+
+    def prepare_signing_key(self, private_key):
+        self._check_key_type(private_key, self.private_key_types)
+        return private_key
+
+    def prepare_verifying_key(self, public_key):
+        self._check_key_type(public_key, self.public_key_types)
+        return public_key
+
+    def sign(self, claims: dict, signing_key, headers: dict) -> str:
+        return pyjwt.encode(claims, signing_key, algorithm=self.name, headers=headers)
+
+    def verify(self, token: str, verifying_key) -> dict:
+        try:
+            return pyjwt.decode(token, verifying_key, algorithms=[self.name])
+        except pyjwt.PyJWTError as e:
+            # 呼び出し側の例外処理をpython-joseと揃える
+            raise JWTError(str(e)) from e
+
+
+JWT_ALGORITHMS: dict[str, JWTAlgorithm] = {
+    'RS256': JoseAlgorithm('RS256', (rsa.RSAPrivateKey,), (rsa.RSAPublicKey,)),
+    'ES256': JoseAlgorithm(
+        'ES256',
+        (ec.EllipticCurvePrivateKey,),
+        (ec.EllipticCurvePublicKey,),
+        curve=ec.SECP256R1,
+    ),
+    'EdDSA': EdDSAAlgorithm(),
+}
+
+
+def get_jwt_algorithm(name: str) -> JWTAlgorithm:
+    """
+    アルゴリズム名から実装を取得
+
+    Raises:
+        ValueError: 未対応のアルゴリズムの場合
+    """
+    algorithm = JWT_ALGORITHMS.get(name)
+    if algorithm is None:
+        raise ValueError(f'Unsupported JWT algorithm: {name}')
+    return algorithm
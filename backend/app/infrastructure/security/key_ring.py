@@ -0,0 +1,211 @@
+"""JWT署名・検証用の鍵リング
+
+PEMの解析はプロセス内で一度だけ行い、解析済みの鍵オブジェクトを kid ごとに保持する。
+トークン操作のたびに鍵を再解析するコストを避けるためのもの。
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+
+from app.config import Settings, get_settings
+from app.infrastructure.security.jwt_algorithms import get_jwt_algorithm
+from app.infrastructure.security.token_cache import get_verified_token_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class JWTKey:
+    """kid に紐づく解析済みの鍵"""
+
+    kid: str
+    algorithm: str
+    verifying_key: Any
+    signing_key: Any | None = None
+
+    def sign(self, claims: dict) -> str:
+        """クレームに署名してトークンを生成（ヘッダーに kid を含める）"""
+        return get_jwt_algorithm(self.algorithm).sign(
+            claims, self.signing_key, headers={'kid': self.kid}
+        )
+
+    def verify(self, token: str) -> dict:
+        """トークンを検証してクレームを返す"""
+        return get_jwt_algorithm(self.algorithm).verify(token, self.verifying_key)
+
+
+class JWTKeyRing:
+    """
+    解析済み鍵の集合
+
+    署名には active_kid の鍵を使い、検証はトークンヘッダーの kid で鍵を選択する。
+    インスタンスは不変で、鍵の入れ替えはリング全体の差し替えで行う。
+    """
+
+    def __init__(self, keys: dict[str, JWTKey], active_kid: str):
+        if active_kid not in keys:
+            raise ValueError(f'Active key "{active_kid}" is not in the key ring.')
+        if keys[active_kid].signing_key is None:
+            raise ValueError(f'Active key "{active_kid}" has no private key.')
+        self._keys = dict(keys)
+        self.active_kid = active_kid
+
+    @property
+    def kids(self) -> list[str]:
+        """登録されている kid の一覧"""
+        return list(self._keys)
+
+    def signing_key(self) -> JWTKey:
+        """署名に使う鍵を取得"""
+        return self._keys[self.active_kid]
+
+    def verification_key(self, kid: str | None) -> JWTKey | None:
+        """
+        検証に使う鍵を取得
+
+        Args:
+            kid: トークンヘッダーの kid（kid を持たない旧トークンの場合は None）
+
+        Returns:
+            JWTKey | None: 該当する鍵（存在しない場合はNone）
+        """
+        if kid is None:
+            return self._keys[self.active_kid]
+        return self._keys.get(kid)
+
+
+def _normalize_pem(pem: str) -> bytes:
+    """環境変数由来のPEM（改行が \\n でエスケープされたもの）をバイト列に変換"""
+    return pem.replace('\\n', '\n').encode('utf-8')
+
+
+def _derive_kid(public_key) -> str:
+    """公開鍵（SubjectPublicKeyInfo）のSHA-256から kid を導出"""
+    der = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return hashlib.sha256(der).hexdigest()[:16]
+
+
+def build_key_ring(
+    algorithm: str,
+    private_pem: str,
+    public_pem: str,
+    active_kid: str = '',
+    verification_keys: dict[str, str] | None = None,
+) -> JWTKeyRing:
+    """
+    PEM文字列から鍵リングを構築
+
+    Args:
+        algorithm: JWTアルゴリズム（RS256 / ES256 / EdDSA）
+        private_pem: 署名用の秘密鍵
+        public_pem: 署名鍵に対応する公開鍵
+        active_kid: 署名鍵の kid（空の場合は公開鍵から導出）
+        verification_keys: ローテーション中の追加の検証用公開鍵（kid -> PEM）
+
+    Returns:
+        JWTKeyRing: 鍵リング
+    """
+    strategy = get_jwt_algorithm(algorithm)
+    private_key = serialization.load_pem_private_key(
+        _normalize_pem(private_pem), password=None
+    )
+    public_key = serialization.load_pem_public_key(_normalize_pem(public_pem))
+    kid = active_kid or _derive_kid(public_key)
+
+    keys = {
+        kid: JWTKey(
+            kid=kid,
+            algorithm=algorithm,
+            verifying_key=strategy.prepare_verifying_key(public_key),
+            signing_key=strategy.prepare_signing_key(private_key),
+        )
+    }
+    for extra_kid, pem in (verification_keys or {}).items():
+        if extra_kid == kid:
+            continue
+        extra_key = serialization.load_pem_public_key(_normalize_pem(pem))
+        keys[extra_kid] = JWTKey(
+            kid=extra_kid,
+            algorithm=algorithm,
+            verifying_key=strategy.prepare_verifying_key(extra_key),
+        )
+
+    return JWTKeyRing(keys, active_kid=kid)
+
+
+def load_key_ring_from_settings(settings: Settings) -> JWTKeyRing:
+    """Settingsの内容から鍵リングを構築"""
+    algorithm = settings.jwt_algorithm
+    get_jwt_algorithm(algorithm)  # 未対応のアルゴリズムはここで弾く
+    if not settings.jwt_private_key:
+        raise ValueError(f'JWT_PRIVATE_KEY is required for {algorithm}.')
+    if not settings.jwt_public_key:
+        raise ValueError(f'JWT_PUBLIC_KEY is required for {algorithm}.')
+
+    verification_keys = (
+        json.loads(settings.jwt_verification_keys)
+        if settings.jwt_verification_keys
+        else None
+    )
+    return build_key_ring(
+        algorithm=algorithm,
+        private_pem=settings.jwt_private_key,
+        public_pem=settings.jwt_public_key,
+        active_kid=settings.jwt_key_id,
+        verification_keys=verification_keys,
+    )
+
+
+_key_ring: JWTKeyRing | None = None
+_key_ring_lock = threading.Lock()
+
+
+def get_key_ring() -> JWTKeyRing:
+    """プロセス共通の鍵リングを取得（初回のみ構築）"""
+    key_ring = _key_ring
+    if key_ring is not None:
+        return key_ring
+    with _key_ring_lock:
+        if _key_ring is None:
+            _set_key_ring(load_key_ring_from_settings(get_settings()))
+        return _key_ring
+
+
+def warm_up_key_ring() -> None:
+    """
+    鍵を解析し、署名・検証を一度実行する（起動時のウォームアップ）
+
+    鍵の解析と暗号ライブラリの初期化を最初のトークン操作ではなく起動時に済ませる。
+    """
+    key = get_key_ring().signing_key()
+    key.verify(key.sign({'warmup': True}))
+
+
+def reload_key_ring() -> JWTKeyRing:
+    """
+    設定を読み直して鍵リングを差し替える（鍵ローテーション用のフック）
+
+    新しいリングの構築に失敗した場合は例外を送出し、既存のリングを維持する。
+    外された鍵で検証済みのトークンが残らないよう、検証済みトークンのキャッシュも破棄する。
+    """
+    get_settings.cache_clear()
+    key_ring = load_key_ring_from_settings(get_settings())
+    with _key_ring_lock:
+        _set_key_ring(key_ring)
+    get_verified_token_cache().clear()
+    logger.info(f'JWT鍵リングを再読み込みしました: kids={key_ring.kids}')
+    return key_ring
+
+
+def _set_key_ring(key_ring: JWTKeyRing | None) -> None:
+    global _key_ring
+    _key_ring = key_ring
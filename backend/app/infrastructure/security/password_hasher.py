@@ -0,0 +1,129 @@
+"""パスワードハッシュ処理専用のスレッドプール
+
+bcryptは1回あたり数百ミリ秒のCPUを使うため、イベントループやリクエスト用の
+スレッドプールとは分離した専用の実行器で処理する。待ち行列の上限を超えた場合は
+処理を積まずに即座に503を返し、ログイン集中時にも他のエンドポイントを守る。
+"""
+
+import asyncio
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.config import get_settings
+from app.infrastructure.metrics.registry import REGISTRY, Gauge
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# bcryptのコストは起動時に configure_bcrypt_rounds() で設定・調整される
+pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+
+
+class PasswordHashExecutor:
+    """
+    上限付きのパスワードハッシュ実行器
+
+    使用例:
+        executor = PasswordHashExecutor(max_workers=2, max_pending=16)
+        ok = await executor.run(pwd_context.verify, plain, hashed)
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='password-hash'
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """実行中および待機中の処理数"""
+        return self._pending
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """
+        専用スレッドで処理を実行
+
+        Raises:
+            HTTPException: 待ち行列が上限に達している場合（503）
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                logger.warning(
+                    f'パスワードハッシュの待ち行列が上限({self.max_pending})に達しました'
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail='ただいま混み合っています。しばらくしてから再度お試しください',
+                    headers={'Retry-After': '1'},
+                )
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self) -> None:
+        """スレッドプールを停止"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_hash_executor: PasswordHashExecutor | None = None
+_hash_executor_lock = threading.Lock()
+
+
+def get_password_hash_executor() -> PasswordHashExecutor:
+    """プロセス共通のパスワードハッシュ実行器を取得"""
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_executor_lock:
+            if _hash_executor is None:
+                settings = get_settings()
+                _hash_executor = PasswordHashExecutor(
+                    max_workers=settings.password_hash_workers,
+                    max_pending=settings.password_hash_max_pending,
+                )
+    return _hash_executor
+
+
+def _collect_executor_metrics():
+    executor = _hash_executor
+    if executor is None:
+        return []
+    pending = executor.pending
+    queued = Gauge('threadpool_queued_tasks', 'スレッドプールの空きを待っている処理数')
+    busy = Gauge('threadpool_busy_threads', 'スレッドプールで実行中の処理数')
+    threads = Gauge('threadpool_max_threads', 'スレッドプールのスレッド数の上限')
+    queued.set(max(0, pending - executor.max_workers), pool='password_hash')
+    busy.set(min(pending, executor.max_workers), pool='password_hash')
+    threads.set(executor.max_workers, pool='password_hash')
+    return [queued, busy, threads]
+
+
+REGISTRY.register_collector(_collect_executor_metrics)
+
+
+# ウォームアップで使うコスト（bcryptの最小値。初期化が目的のため計算量は最小にする）
+_WARMUP_ROUNDS = 4
+
+
+async def warm_up_password_hasher() -> None:
+    """
+    専用スレッドとbcryptのバックエンドを初期化する（起動時のウォームアップ）
+
+    最小コストでハッシュを1回計算し、最初のログインでバックエンドの読み込みを待たないようにする。
+    """
+    handler = pwd_context.handler('bcrypt').using(rounds=_WARMUP_ROUNDS)
+    await get_password_hash_executor().run(handler.hash, 'warm-up')
@@ -0,0 +1,190 @@
+"""ログイン試行回数の制限
+
+/auth/login はbcryptを実行するため、誤ったパスワードを大量に送るだけでCPUを使い切れてしまう。
+クライアントIPとログインIDごとのトークンバケットで試行回数を制限し、
+超過したリクエストはパスワード検証の前に429で拒否する。
+
+バケットの保存先は RateLimitStore として差し替え可能にしている。
+現在はプロセス内の InMemoryRateLimitStore のみ（複数ワーカー間では共有されない）。
+"""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.application.interfaces.rate_limiter import ILoginRateLimiter
+from app.config import get_settings
+from app.infrastructure.metrics.registry import REGISTRY
+
+LOGIN_RATE_LIMITED = REGISTRY.counter(
+    'login_rate_limited_total', '試行回数の制限により拒否したログイン'
+)
+
+
+class RateLimitStore(ABC):
+    """トークンバケットの保存先のインターフェース"""
+
+    @abstractmethod
+    def consume(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """
+        バケットからトークンを1つ取り出す
+
+        Args:
+            key: バケットのキー
+            capacity: バケットの容量（連続で許可する回数）
+            refill_per_second: 1秒あたりの補充量
+
+        Returns:
+            float: 取り出せた場合は0、取り出せない場合は次のトークンが補充されるまでの秒数
+        """
+        pass
+
+
+class _Shard:
+    """ロックを共有するバケットの集合"""
+
+    __slots__ = ('lock', 'buckets')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> [残りトークン数, 最終更新時刻]（最近使われた順に末尾へ移動）
+        self.buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """
+    プロセス内のトークンバケット
+
+    キーのハッシュでシャードを選び、ロックはシャード単位で取る（ロックストライピング）。
+    各シャードは最終更新順に並んでおり、先頭から idle_seconds 以上使われていない
+    バケットと max_entries を超えた分を取り除くため、操作はいずれも償却O(1)で
+    メモリ使用量も上限を持つ。
+    """
+
+    def __init__(
+        self, shards: int = 64, max_entries: int = 100_000, idle_seconds: float = 60.0
+    ):
+        self.idle_seconds = idle_seconds
+        self._shards = [_Shard() for _ in range(shards)]
+        self._max_entries_per_shard = max(1, math.ceil(max_entries / shards))
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def consume(self, key: str, capacity: float, refill_per_second: float) -> float:
+        now = time.monotonic()
+        shard = self._shard(key)
+        with shard.lock:
+            buckets = shard.buckets
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = [capacity, now]
+                buckets[key] = bucket
+            else:
+                tokens = bucket[0] + (now - bucket[1]) * refill_per_second
+                bucket[0] = min(capacity, tokens)
+                bucket[1] = now
+                buckets.move_to_end(key)
+
+            self._evict(buckets, now)
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / refill_per_second
+
+    def _evict(self, buckets: OrderedDict[str, list[float]], now: float) -> None:
+        """使われていないバケットと上限を超えた分を古い順に削除"""
+        while len(buckets) > self._max_entries_per_shard:
+            buckets.popitem(last=False)
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if now - oldest[1] < self.idle_seconds:
+                break
+            buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        """保持しているバケット数"""
+        return sum(len(shard.buckets) for shard in self._shards)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """一定期間あたりの試行回数の上限"""
+
+    attempts: int
+    per_seconds: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.attempts / self.per_seconds
+
+
+class LoginRateLimiter(ILoginRateLimiter):
+    """
+    クライアントIPとログインIDの両方で試行回数を制限する
+
+    使用例:
+        limiter = LoginRateLimiter(
+            InMemoryRateLimitStore(),
+            ip_rule=RateLimitRule(30, 60),
+            login_id_rule=RateLimitRule(10, 60),
+        )
+        retry_after = limiter.check('203.0.113.1', 'admin')
+    """
+
+    def __init__(
+        self, store: RateLimitStore, ip_rule: RateLimitRule, login_id_rule: RateLimitRule
+    ):
+        self.store = store
+        self.ip_rule = ip_rule
+        self.login_id_rule = login_id_rule
+
+    def check(self, client_ip: str | None, login_id: str) -> float:
+        retry_after = 0.0
+        if client_ip:
+            retry_after = self._consume('ip', client_ip, self.ip_rule)
+        retry_after = max(
+            retry_after, self._consume('login_id', login_id, self.login_id_rule)
+        )
+        return retry_after
+
+    def _consume(self, scope: str, value: str, rule: RateLimitRule) -> float:
+        retry_after = self.store.consume(
+            f'login:{scope}:{value}', rule.attempts, rule.refill_per_second
+        )
+        if retry_after:
+            LOGIN_RATE_LIMITED.inc(scope=scope)
+        return retry_after
+
+
+_login_rate_limiter: LoginRateLimiter | None = None
+_login_rate_limiter_lock = threading.Lock()
+
+
+def get_login_rate_limiter() -> LoginRateLimiter | None:
+    """プロセス共通のログイン試行回数制限を取得（LOGIN_RATE_LIMIT_ENABLED=false の場合はNone）"""
+    global _login_rate_limiter
+    settings = get_settings()
+    if not settings.login_rate_limit_enabled:
+        return None
+    if _login_rate_limiter is None:
+        with _login_rate_limiter_lock:
+            if _login_rate_limiter is None:
+                window = settings.login_rate_limit_window_seconds
+                _login_rate_limiter = LoginRateLimiter(
+                    InMemoryRateLimitStore(
+                        shards=settings.login_rate_limit_shards,
+                        max_entries=settings.login_rate_limit_max_keys,
+                        # 期間以上使われていないバケットは満杯に戻っているため削除しても差がない
+                        idle_seconds=window,
+                    ),
+                    ip_rule=RateLimitRule(settings.login_rate_limit_ip_attempts, window),
+                    login_id_rule=RateLimitRule(
+                        settings.login_rate_limit_login_id_attempts, window
+                    ),
+                )
+    return _login_rate_limiter
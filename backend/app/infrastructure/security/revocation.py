@@ -0,0 +1,186 @@
+"""アクセストークンの失効リスト
+
+失効したトークンの jti はDB（revoked_tokens）に永続化し、各プロセスはその内容を
+ブルームフィルタとして保持する。フィルタに含まれない jti は失効していないことが確定するため、
+DBへの問い合わせはフィルタにヒットした場合（失効済みまたは偽陽性）に限られる。
+
+フィルタは起動時に再構築し、他のプロセスでの失効は一定間隔で差分を取り込んで同期する。
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from app.config import get_settings
+from app.domain.repositories.revoked_token_repository import IRevokedTokenRepository
+from app.infrastructure.security.bloom_filter import BloomFilter
+
+if TYPE_CHECKING:
+    from app.infrastructure.db.unit_of_work import SQLAlchemyUnitOfWork
+
+logger = logging.getLogger(__name__)
+
+# 差分同期時に取りこぼさないよう、前回同期時刻から遡る幅（プロセス間の時計のずれを吸収）
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class TokenRevocationList:
+    """
+    ブルームフィルタ付きの失効リスト
+
+    使用例:
+        revocation_list = TokenRevocationList(capacity=1_000_000)
+        revocation_list.rebuild()
+        revocation_list.revoke(jti, expires_at)
+        revocation_list.is_revoked(jti)
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float = 0.001,
+        sync_interval: float = 5.0,
+        uow_factory: Callable[[], 'SQLAlchemyUnitOfWork'] | None = None,
+        repository_factory: Callable[..., IRevokedTokenRepository] | None = None,
+    ):
+        # DBの層は失効リストを有効にした場合のみ読み込む（起動時間の短縮）
+        if uow_factory is None:
+            from app.infrastructure.db.unit_of_work import SQLAlchemyUnitOfWork
+
+            uow_factory = SQLAlchemyUnitOfWork
+        if repository_factory is None:
+            from app.infrastructure.db.repositories.revoked_token_repository_impl import (
+                RevokedTokenRepositoryImpl,
+            )
+
+            repository_factory = RevokedTokenRepositoryImpl
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._uow_factory = uow_factory
+        self._repository_factory = repository_factory
+        self._filter = BloomFilter(capacity, error_rate)
+        self._last_synced_at: datetime | None = None
+        self._next_sync = 0.0
+        self._sync_lock = threading.Lock()
+        self.store_lookups = 0
+
+    @property
+    def bloom_filter(self) -> BloomFilter:
+        return self._filter
+
+    def rebuild(self) -> int:
+        """
+        DBの内容からフィルタを作り直す（起動時に呼び出す）
+
+        Returns:
+            int: 読み込んだ失効トークンの件数
+        """
+        now = datetime.utcnow()
+        with self._uow_factory() as uow:
+            repository = self._repository_factory(uow.session)
+            deleted = repository.delete_expired(now)
+            uow.commit()
+
+            new_filter = BloomFilter(self.capacity, self.error_rate)
+            for jti in repository.iter_active_jtis(now):
+                new_filter.add(jti)
+
+        self._filter = new_filter
+        self._last_synced_at = now
+        self._next_sync = time.monotonic() + self.sync_interval
+        logger.info(
+            f'失効リストを再構築しました: tokens={len(new_filter)} '
+            f'expired_deleted={deleted} filter_bytes={new_filter.memory_bytes}'
+        )
+        if len(new_filter) > self.capacity:
+            logger.warning(
+                f'失効トークン数が想定容量({self.capacity})を超えています。'
+                '偽陽性率が上がるため TOKEN_REVOCATION_CAPACITY を見直してください'
+            )
+        return len(new_filter)
+
+    def sync(self) -> None:
+        """他のプロセスで失効したトークンを差分で取り込む"""
+        since = (self._last_synced_at or datetime.utcnow()) - SYNC_OVERLAP
+        now = datetime.utcnow()
+        with self._uow_factory() as uow:
+            jtis = self._repository_factory(uow.session).list_revoked_since(since)
+        for jti in jtis:
+            self._filter.add(jti)
+        self._last_synced_at = now
+
+    def _sync_if_due(self) -> None:
+        if time.monotonic() < self._next_sync:
+            return
+        # 同期は1スレッドのみが行い、他のスレッドは待たずに進む
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_sync = time.monotonic() + self.sync_interval
+            self.sync()
+        except Exception as e:
+            logger.error(f'失効リストの同期に失敗しました: {e}')
+        finally:
+            self._sync_lock.release()
+
+    def revoke(self, jti: str, expires_at: datetime) -> None:
+        """
+        トークンを失効させる（DBに永続化し、このプロセスのフィルタにも即座に反映）
+
+        Args:
+            jti: トークンID
+            expires_at: トークンの有効期限（UTC）
+        """
+        with self._uow_factory() as uow:
+            repository = self._repository_factory(uow.session)
+            uow.run_in_transaction(
+                lambda _: repository.add(
+                    jti, expires_at=expires_at, revoked_at=datetime.utcnow()
+                ),
+                call_site='revocation.revoke',
+            )
+        self._filter.add(jti)
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        トークンが失効しているかを判定
+
+        フィルタにヒットしない場合はDBに問い合わせない。
+        ヒットした場合のみDBで確定させ、DBに接続できない場合は失効扱いにする（fail closed）。
+        """
+        self._sync_if_due()
+        if jti not in self._filter:
+            return False
+
+        self.store_lookups += 1
+        try:
+            with self._uow_factory() as uow:
+                return self._repository_factory(uow.session).exists(jti)
+        except Exception as e:
+            logger.error(f'失効リストの確認に失敗しました: {e}')
+            return True
+
+
+_revocation_list: TokenRevocationList | None = None
+_revocation_list_lock = threading.Lock()
+
+
+def get_token_revocation_list() -> TokenRevocationList | None:
+    """プロセス共通の失効リストを取得（TOKEN_REVOCATION_ENABLED=false の場合はNone）"""
+    global _revocation_list
+    settings = get_settings()
+    if not settings.token_revocation_enabled:
+        return None
+    if _revocation_list is None:
+        with _revocation_list_lock:
+            if _revocation_list is None:
+                _revocation_list = TokenRevocationList(
+                    capacity=settings.token_revocation_capacity,
+                    error_rate=settings.token_revocation_error_rate,
+                    sync_interval=settings.token_revocation_sync_interval_seconds,
+                )
+    return _revocation_list
@@ -1,12 +1,20 @@
+import uuid
 from datetime import datetime, timedelta
 
 from fastapi import HTTPException, Request, status
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from pydantic import BaseModel, Field
 
 from app.application.interfaces.security_service import ISecurityService
 from app.config import get_settings
+from app.infrastructure.security.bcrypt_calibration import is_weaker_than_current
+from app.infrastructure.security.key_ring import get_key_ring
+from app.infrastructure.security.password_hasher import (
+    get_password_hash_executor,
+    pwd_context,
+)
+from app.infrastructure.security.revocation import get_token_revocation_list
+from app.infrastructure.security.token_cache import get_verified_token_cache
 
 
 class User(BaseModel):
@@ -15,9 +23,6 @@ class User(BaseModel):
     id: int = Field(..., description='ユーザーID')
 
 
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
-
-
 class SecurityServiceImpl(ISecurityService):
     """セキュリティサービスの実装"""
 
@@ -30,44 +35,56 @@ class SecurityServiceImpl(ISecurityService):
         else:
             expire = datetime.utcnow() + timedelta(days=7)
 
-        to_encode = {'user_id': user_id, 'exp': expire}
-        settings = get_settings()
-        algorithm = settings.jwt_algorithm
+        # jti は失効リストでトークンを識別するために付与する
+        to_encode = {'user_id': user_id, 'exp': expire, 'jti': uuid.uuid4().hex}
 
-        if algorithm == 'RS256':
-            private_key, _ = _load_rsa_keys()
-            encoded_jwt = jwt.encode(to_encode, private_key, algorithm=algorithm)
-        else:
-            raise ValueError(f'Unsupported JWT algorithm: {algorithm}')
+        encoded_jwt = get_key_ring().signing_key().sign(to_encode)
 
         if isinstance(encoded_jwt, bytes):
             return encoded_jwt.decode('utf-8')
         return encoded_jwt
 
+    def revoke_access_token(self, access_token: str) -> None:
+        """
+        アクセストークンを失効させる
+
+        検証済みキャッシュから即座に削除し、失効リストが有効な場合は
+        jti を永続化して他のプロセスでも有効期限まで拒否されるようにする。
+        """
+        get_verified_token_cache().revoke(access_token)
+
+        revocation_list = get_token_revocation_list()
+        if revocation_list is None:
+            return
+        try:
+            payload = _verify_token(access_token)
+        except JWTError:
+            return
+        if payload is None or not payload.get('jti') or not payload.get('exp'):
+            return
+        revocation_list.revoke(
+            payload['jti'], expires_at=datetime.utcfromtimestamp(payload['exp'])
+        )
+
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """パスワードを検証"""
         return pwd_context.verify(plain_password, hashed_password)
 
+    async def verify_password_async(
+        self, plain_password: str, hashed_password: str
+    ) -> bool:
+        """パスワードを検証（bcryptは専用スレッドプールで実行）"""
+        return await get_password_hash_executor().run(
+            pwd_context.verify, plain_password, hashed_password
+        )
 
-def _load_rsa_keys() -> tuple:
-    """RSA鍵ペアを環境変数から読み込み"""
-    settings = get_settings()
-
-    if settings.jwt_algorithm != 'RS256':
-        return None, None
-
-    jwt_private_key = settings.jwt_private_key
-    if not jwt_private_key:
-        raise ValueError('JWT_PRIVATE_KEY is required for RS256.')
-
-    jwt_public_key = settings.jwt_public_key
-    if not jwt_public_key:
-        raise ValueError('JWT_PUBLIC_KEY is required for RS256.')
-
-    private_key = jwt_private_key.replace('\\n', '\n').encode('utf-8')
-    public_key = jwt_public_key.replace('\\n', '\n').encode('utf-8')
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """ハッシュのbcryptコストが現在の設定より低いかを判定（高いコストのハッシュは下げない）"""
+        return is_weaker_than_current(hashed_password)
 
-    return private_key, public_key
+    async def hash_password_async(self, plain_password: str) -> str:
+        """パスワードをハッシュ化（bcryptは専用スレッドプールで実行）"""
+        return await get_password_hash_executor().run(pwd_context.hash, plain_password)
 
 
 def get_current_user_from_cookie(request: Request) -> User:
@@ -92,18 +109,61 @@ def get_current_user_from_cookie(request: Request) -> User:
         headers={'WWW-Authenticate': 'Bearer'},
     )
 
-    try:
-        algorithm = settings.jwt_algorithm
-
-        if algorithm == 'RS256':
-            _, public_key = _load_rsa_keys()
-            payload = jwt.decode(token, public_key, algorithms=[algorithm])
-        else:
-            raise ValueError(f'Unsupported JWT algorithm: {algorithm}')
-
-        user_id: int = payload.get('user_id')
-        if user_id is None:
-            raise credentials_exception
-        return User(id=user_id)
-    except JWTError as e:
-        raise credentials_exception from e
+    payload = authenticate_access_token(token)
+    if payload is None:
+        raise credentials_exception
+
+    user_id: int = payload.get('user_id')
+    if user_id is None:
+        raise credentials_exception
+    return User(id=user_id)
+
+
+def authenticate_access_token(token: str) -> dict | None:
+    """
+    アクセストークンを検証してクレームを返す
+
+    検証済みのトークンはキャッシュから返し、署名検証を省略する。
+    失効リストが有効な場合は、キャッシュにヒットしたトークンも失効していないかを確認する。
+
+    Args:
+        token: アクセストークン
+
+    Returns:
+        dict | None: 検証済みのクレーム（検証に失敗した場合はNone）
+    """
+    token_cache = get_verified_token_cache()
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            payload = _verify_token(token)
+        except JWTError:
+            return None
+        if payload is None:
+            return None
+        token_cache.put(token, payload)
+
+    if _is_revoked(payload):
+        return None
+    return payload
+
+
+def _is_revoked(payload: dict) -> bool:
+    """クレームの jti が失効リストに登録されているかを判定"""
+    revocation_list = get_token_revocation_list()
+    if revocation_list is None:
+        return False
+    jti = payload.get('jti')
+    if not jti:
+        return False
+    return revocation_list.is_revoked(jti)
+
+
+def _verify_token(token: str) -> dict | None:
+    """トークンの署名と有効期限を検証してクレームを返す（未知のkidの場合はNone）"""
+    # ヘッダーのkidで解析済みの検証鍵を選択する（PEMの再解析は行わない）
+    kid = jwt.get_unverified_header(token).get('kid')
+    key = get_key_ring().verification_key(kid)
+    if key is None:
+        return None
+    return key.verify(token)
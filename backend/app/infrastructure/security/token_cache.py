@@ -0,0 +1,157 @@
+"""検証済みトークンのキャッシュ
+
+同じCookieのトークンを繰り返し検証しないよう、検証済みのクレームを
+トークンのダイジェストをキーに保持する。エントリはトークンの exp で失効し、
+上限を超えた場合はLRUで追い出す。
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.config import get_settings
+from app.infrastructure.metrics.registry import REGISTRY, cache_metrics
+
+
+@dataclass(frozen=True)
+class TokenCacheStats:
+    """キャッシュの統計情報"""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class VerifiedTokenCache:
+    """
+    検証済みトークンのLRUキャッシュ
+
+    FastAPIの同期エンドポイントはスレッドプールで実行されるため、
+    内部状態はロックで保護する。
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token: str) -> dict | None:
+        """
+        検証済みのクレームを取得
+
+        Args:
+            token: アクセストークン
+
+        Returns:
+            dict | None: クレーム（未登録または期限切れの場合はNone）
+        """
+        digest = self._digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, claims = entry
+            if expires_at <= now:
+                del self._entries[digest]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self._hits += 1
+            return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        """
+        検証済みのクレームを登録（exp を持たないトークンはキャッシュしない）
+
+        Args:
+            token: アクセストークン
+            claims: 検証済みのクレーム
+        """
+        expires_at = claims.get('exp')
+        if self.max_entries <= 0 or not isinstance(expires_at, int | float):
+            return
+        if expires_at <= time.time():
+            return
+
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest] = (float(expires_at), claims)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def revoke(self, token: str) -> bool:
+        """
+        トークンのエントリを即座に削除
+
+        Args:
+            token: アクセストークン
+
+        Returns:
+            bool: エントリが存在した場合True
+        """
+        with self._lock:
+            return self._entries.pop(self._digest(token), None) is not None
+
+    def clear(self) -> None:
+        """全てのエントリを削除（鍵の差し替え時など）"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> TokenCacheStats:
+        """統計情報を取得"""
+        with self._lock:
+            return TokenCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+                max_entries=self.max_entries,
+            )
+
+
+_token_cache: VerifiedTokenCache | None = None
+_token_cache_lock = threading.Lock()
+
+
+def get_verified_token_cache() -> VerifiedTokenCache:
+    """プロセス共通の検証済みトークンキャッシュを取得"""
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = VerifiedTokenCache(
+                    max_entries=get_settings().jwt_verified_token_cache_size
+                )
+    return _token_cache
+
+
+def _collect_cache_metrics():
+    if _token_cache is None:
+        return []
+    stats = _token_cache.stats()
+    return cache_metrics(
+        'verified_token', stats.hits, stats.misses, stats.evictions, stats.size
+    )
+
+
+REGISTRY.register_collector(_collect_cache_metrics)
@@ -1,27 +1,81 @@
 import os
+from contextlib import asynccontextmanager
 
-import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 
+from app.config import get_settings
+from app.domain.repositories.pagination import InvalidCursorError
 from app.infrastructure.logging.logging import setup_logging
+from app.infrastructure.security.bcrypt_calibration import configure_bcrypt_rounds
+from app.infrastructure.security.revocation import get_token_revocation_list
 from app.presentation.api.auth_api import router as auth_router
+from app.presentation.api.auth_verify_api import verify_auth_status
+from app.presentation.api.metrics_api import metrics
+from app.presentation.middleware.deadline_middleware import DeadlineMiddleware
+from app.presentation.middleware.metrics_middleware import MetricsMiddleware
+from app.presentation.middleware.profiling_middleware import ProfilingMiddleware
+from app.presentation.middleware.query_stats_middleware import QueryStatsMiddleware
+from app.presentation.warmup import is_ready, run_warmup, set_ready
 
-# ロギングの設定を初期化
-setup_logging()
+# 起動時間を短くするため、インポート時には副作用のある処理（ロギングの設定・ディレクトリの作成）を
+# 行わず、使用する構成でのみ必要なモジュール（DBの層・uvicorn など）は使用時に読み込む。
+# 起動時間は scripts/benchmarks/bench_startup.py で計測する。
 
 # 環境変数から環境を取得（デフォルトはdevelopment）
 ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """アプリケーションの起動・終了処理"""
+    from app.infrastructure.db.session import dispose_engine_registry, get_engine_registry
+
+    # ロギングの設定を初期化
+    setup_logging()
+    # DBエンジンのレジストリ（エンジン・プールは最初の接続時に構築される）
+    get_engine_registry()
+    # bcryptコストの適用（計測する場合は app.server が fork 前に BCRYPT_ROUNDS に設定する）
+    configure_bcrypt_rounds()
+    # 失効リストのブルームフィルタをDBの内容から構築
+    revocation_list = get_token_revocation_list()
+    if revocation_list is not None:
+        revocation_list.rebuild()
+    # 接続・鍵・bcrypt・主要なルートを初期化してからリクエストを受け付ける
+    settings = get_settings()
+    if settings.warmup_enabled:
+        await run_warmup(app, settings)
+    set_ready(True)
+    yield
+    set_ready(False)
+    # コネクションプールを閉じる
+    await dispose_engine_registry()
+
+
 # FastAPI アプリケーションのインスタンスを作成
 # 本番環境ではドキュメントを無効化しましょう
 app = FastAPI(
+    lifespan=lifespan,
     docs_url='/docs' if ENVIRONMENT != 'production' else None,
     redoc_url='/redoc' if ENVIRONMENT != 'production' else None,
     openapi_url='/openapi.json' if ENVIRONMENT != 'production' else None,
 )
 
+# リクエストごとのSQLのクエリ数・DB時間（Server-Timing ヘッダー）とN+1の警告
+settings = get_settings()
+if settings.db_query_instrumentation_enabled:
+    app.add_middleware(
+        QueryStatsMiddleware, n_plus_one_threshold=settings.db_n_plus_one_threshold
+    )
+
+# リクエストの期限（SQLの上限を期限までの残り時間に短くする）と、上限による中断の503/504
+app.add_middleware(
+    DeadlineMiddleware,
+    header=settings.request_timeout_header,
+    default_timeout_seconds=settings.request_default_timeout_ms / 1000 or None,
+)
+
 allowed_origins = [
     'http://localhost:3000',
     'http://127.0.0.1:3000',
@@ -47,29 +101,82 @@ app.add_middleware(
     ],  # 例: クライアントに公開したいヘッダー
 )
 
+# 指定したリクエストだけのプロファイル（鍵も割合も設定しない場合は組み込まない。
+# 後から追加したミドルウェアほど外側になるため MetricsMiddleware より先に追加する）
+if settings.profiling_secret or settings.profiling_sample_rate > 0:
+    from app.infrastructure.profiling.profile_store import ProfileStore
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=ProfileStore(
+            settings.profiling_dir, max_files=settings.profiling_max_files
+        ),
+        secret=settings.profiling_secret,
+        header=settings.profiling_header,
+        sample_rate=settings.profiling_sample_rate,
+        interval_seconds=settings.profiling_interval_ms / 1000,
+        max_seconds=settings.profiling_max_seconds,
+        max_concurrent=settings.profiling_max_concurrent,
+        output_format=settings.profiling_format,
+    )
+
+# ルートごとのリクエスト数・処理時間（最も外側で、他のミドルウェアの処理も含めて計測する）
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+
+# 一覧のカーソルが不正（改ざん・別の一覧のカーソル）な場合は400を返す
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST, content={'detail': str(exc)}
+    )
+
+
 # API ルーターをアプリケーションに含める
 app.include_router(auth_router)
 
+# フロントエンドMiddleware用の軽量な認証確認（DI・Pydanticを経由しない）
+app.add_route(
+    '/auth/verify', verify_auth_status, methods=['GET'], include_in_schema=False
+)
+
+# Prometheus 形式のメトリクス（ALB 経由・METRICS_ALLOW_IPS 以外の接続元には404。タスク内・VPC内から収集する）
+if settings.metrics_enabled:
+    app.add_route('/metrics', metrics, methods=['GET'], include_in_schema=False)
+
 
 # ヘルスチェックエンドポイント（ALB/ECS用）
 @app.get('/health')
 async def health_check():
-    """ヘルスチェック用エンドポイント"""
+    """ヘルスチェック用エンドポイント（ウォームアップ前・終了処理中は503）"""
+    if not is_ready():
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={'status': 'not_ready'},
+        )
     return {'status': 'healthy'}
 
 
 # static ディレクトリが存在する場合のみマウント
 static_dir = 'app/static'
 if os.path.exists(static_dir):
+    from fastapi.staticfiles import StaticFiles
+
     app.mount('/static', StaticFiles(directory=static_dir), name='static')
 
 # アプリケーションのエントリポイント
 if __name__ == '__main__':
+    import uvicorn
+
     # ファイルアップロード用のフォルダが存在しない場合は作成
     upload_folder = os.getenv('UPLOAD_FOLDER', 'uploads')
     if not os.path.exists(upload_folder):
         os.makedirs(upload_folder)
         print(f'Created upload folder: {upload_folder}')  # フォルダ作成のログを追加
 
+    # 開発用（本番は python -m app.server。reload にはインポート文字列が必要）
     print('FastAPI app starting on http://0.0.0.0:8000')
-    uvicorn.run(app, host='0.0.0.0', port=8000, reload=True)
+    uvicorn.run(
+        'app.main:app', host='0.0.0.0', port=8000, reload=ENVIRONMENT == 'development'
+    )
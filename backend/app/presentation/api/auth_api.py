@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Request, Response, status
 
 from app.application.schemas.auth_schemas import LoginInputDTO
 from app.application.use_cases.auth_usecase import AuthUsecase
@@ -18,14 +18,20 @@ router = APIRouter(prefix='/auth', tags=['認証'])
 
 
 @router.post('/login', response_model=LoginResponse, status_code=status.HTTP_200_OK)
-def login(
+async def login(
     request: LoginRequest,
     response: Response,
+    http_request: Request,
     auth_usecase: AuthUsecase = Depends(get_auth_usecase),
 ) -> LoginResponse:
-    input_dto = LoginInputDTO(login_id=request.login_id, password=request.password)
+    input_dto = LoginInputDTO(
+        login_id=request.login_id,
+        password=request.password,
+        client_ip=http_request.client.host if http_request.client else None,
+    )
 
-    output_dto = auth_usecase.login(input_dto)
+    # パスワード検証はイベントループ外（専用スレッドプール）で実行される
+    output_dto = await auth_usecase.login(input_dto)
 
     # Cookieにアクセストークンを設定
     response.set_cookie(
@@ -47,12 +53,13 @@ def login(
 
 @router.post('/logout', response_model=LogoutResponse, status_code=status.HTTP_200_OK)
 def logout(
+    request: Request,
     response: Response,
     current_user: User = Depends(get_current_user_from_cookie),
     auth_usecase: AuthUsecase = Depends(get_auth_usecase),
 ) -> LogoutResponse:
     """ログアウトエンドポイント"""
-    output_dto = auth_usecase.logout()
+    output_dto = auth_usecase.logout(access_token=request.cookies.get('access_token'))
 
     # Cookieを削除
     response.delete_cookie(key='access_token')
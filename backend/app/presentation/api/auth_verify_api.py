@@ -0,0 +1,54 @@
+"""認証状態の高速確認エンドポイント
+
+フロントエンドのMiddlewareがページ遷移のたびに呼び出すため、
+依存性注入やPydanticモデルの構築を行わないStarletteのルートとして実装する。
+レスポンスの形式は GET /auth/status と同じ。
+
+トークンの検証（キャッシュにない場合のRSAの検証、失効リストのDBの参照・同期）は
+イベントループを止めないよう、同期の関数としてスレッドプールで実行する。
+"""
+
+import time
+
+from fastapi import Request, Response, status
+
+from app.config import get_settings
+from app.infrastructure.security.security_service_impl import (
+    authenticate_access_token,
+)
+
+_UNAUTHORIZED_BODY = b'{"detail":"Not authenticated"}'
+_UNAUTHORIZED_HEADERS = {'Cache-Control': 'no-store', 'WWW-Authenticate': 'Bearer'}
+
+
+def _authenticated_response(user_id: int, max_age: int) -> Response:
+    return Response(
+        content=b'{"is_authenticated":true,"user_id":%d}' % user_id,
+        media_type='application/json',
+        headers={'Cache-Control': f'private, max-age={max_age}'},
+    )
+
+
+def verify_auth_status(request: Request) -> Response:
+    """認証状態確認エンドポイント（GET /auth/verify。スレッドプールで実行される）"""
+    settings = get_settings()
+
+    # 認証が無効の場合はダミーユーザー
+    if not settings.enable_auth:
+        return _authenticated_response(0, 0)
+
+    token = request.cookies.get('access_token')
+    claims = authenticate_access_token(token) if token else None
+    user_id = claims.get('user_id') if claims else None
+    if not isinstance(user_id, int):
+        return Response(
+            content=_UNAUTHORIZED_BODY,
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            media_type='application/json',
+            headers=_UNAUTHORIZED_HEADERS,
+        )
+
+    # トークンの有効期限を超えてキャッシュされないようにする
+    remaining = int(claims.get('exp', 0) - time.time())
+    max_age = max(0, min(remaining, settings.auth_status_max_age_seconds))
+    return _authenticated_response(user_id, max_age)
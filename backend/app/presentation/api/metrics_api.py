@@ -0,0 +1,42 @@
+"""メトリクスのエンドポイント（Prometheus のテキスト形式）
+
+python -m app.server で複数ワーカーを起動した場合は、全ワーカーの値を合算して返す
+（app/infrastructure/metrics/multiprocess.py）。
+収集ではプールなどの値をイベントループ上で読み取るため、依存性注入を使わない
+Starletteのルートとして実装する。
+
+ALB 経由のリクエスト（X-Forwarded-For 付き）と、METRICS_ALLOW_IPS 以外の接続元には
+404 を返す（タスク内・VPC内の Prometheus からのみ収集する）。
+"""
+
+from functools import lru_cache
+
+from fastapi import Request, Response, status
+
+from app.config import get_settings
+from app.infrastructure.metrics import multiprocess
+from app.infrastructure.metrics.exposition import CONTENT_TYPE, render
+from app.presentation.middleware.proxy_headers_middleware import (
+    is_address_in,
+    parse_trusted_networks,
+)
+
+
+@lru_cache
+def _allowed_networks(value: str):
+    return parse_trusted_networks(value)
+
+
+def _is_internal(request: Request) -> bool:
+    """ALB を経由しない、許可した接続元からのリクエストか"""
+    if 'x-forwarded-for' in request.headers or request.client is None:
+        return False
+    networks, allow_all = _allowed_networks(get_settings().metrics_allow_ips)
+    return allow_all or is_address_in(request.client.host, networks)
+
+
+async def metrics(request: Request) -> Response:
+    """メトリクスエンドポイント（GET /metrics）"""
+    if not _is_internal(request):
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+    return Response(content=render(multiprocess.collect()), media_type=CONTENT_TYPE)
@@ -0,0 +1,125 @@
+"""リクエストの期限とDBの上限による中断の応答
+
+リクエストヘッダー（既定は X-Request-Timeout-Ms。残り時間のミリ秒）と Settings の既定値から
+リクエストの期限を決め、その間に実行するトランザクションの statement_timeout /
+lock_timeout を期限までの残り時間以下にする（app/infrastructure/db/timeouts.py）。
+ルートごとの既定値は route_deadline の依存関係で指定する。
+
+上限・期限で中断された処理は500ではなく次のステータスで応答する。
+
+- 504: SQLの実行時間の上限（statement_timeout）・リクエストの期限を過ぎた
+- 503（Retry-After付き）: ロック待ちの上限・接続の取得待ちの上限・トランザクション内の待機の上限
+"""
+
+import logging
+import math
+from collections.abc import Awaitable, Callable
+
+from starlette import status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.db.timeouts import (
+    deadline_scope,
+    record_timeout,
+    tighten_deadline,
+    timeout_reason,
+)
+
+logger = logging.getLogger(__name__)
+
+# 504で応答する中断の理由（それ以外は503）
+_GATEWAY_TIMEOUT_REASONS = frozenset({'statement_timeout', 'deadline_exceeded'})
+_RETRY_AFTER_SECONDS = '1'
+
+
+class DeadlineMiddleware:
+    """
+    リクエストの期限を設定し、上限・期限による中断を503/504で応答する
+
+    使用例:
+        app.add_middleware(
+            DeadlineMiddleware, header='X-Request-Timeout-Ms', default_timeout_seconds=10
+        )
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        header: str = 'X-Request-Timeout-Ms',
+        default_timeout_seconds: float | None = None,
+    ):
+        self.app = app
+        self.header = header.lower()
+        self.default_timeout_seconds = default_timeout_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking_start(message: Message) -> None:
+            nonlocal response_started
+            if message['type'] == 'http.response.start':
+                response_started = True
+            await send(message)
+
+        with deadline_scope(self._timeout_seconds(scope)):
+            try:
+                await self.app(scope, receive, send_tracking_start)
+            except Exception as e:
+                reason = timeout_reason(e)
+                if reason is None or response_started:
+                    raise
+                record_timeout(reason)
+                logger.warning(
+                    f'上限・期限により中断しました [{scope["method"]} {scope["path"]}] '
+                    f'{reason}: {e}'
+                )
+                await self._timeout_response(reason)(scope, receive, send)
+
+    def _timeout_seconds(self, scope: Scope) -> float | None:
+        """ヘッダーの残り時間と既定値の短い方（どちらもない場合はNone）"""
+        timeout = self.default_timeout_seconds
+        value = Headers(scope=scope).get(self.header)
+        if value is None:
+            return timeout
+        try:
+            requested = float(value) / 1000
+        except ValueError:
+            return timeout
+        # inf・nan は残り時間として扱えない（DBの上限のミリ秒に変換できない）
+        if not math.isfinite(requested) or requested <= 0:
+            return timeout
+        return requested if timeout is None else min(timeout, requested)
+
+    @staticmethod
+    def _timeout_response(reason: str) -> JSONResponse:
+        if reason in _GATEWAY_TIMEOUT_REASONS:
+            return JSONResponse(
+                {'detail': '処理が時間内に完了しませんでした'},
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            )
+        return JSONResponse(
+            {'detail': 'ただいま混み合っています。しばらくしてから再度お試しください'},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': _RETRY_AFTER_SECONDS},
+        )
+
+
+def route_deadline(timeout_seconds: float) -> Callable[[], Awaitable[None]]:
+    """
+    ルートの期限（ヘッダー・Settings の既定値より短い場合に適用）
+
+    使用例:
+        @router.get('/drawings', dependencies=[Depends(route_deadline(5))])
+    """
+
+    async def apply_route_deadline() -> None:
+        # async の依存関係はリクエストのタスクで実行されるため、ルートの処理に引き継がれる
+        tighten_deadline(timeout_seconds)
+
+    return apply_route_deadline
@@ -0,0 +1,131 @@
+"""リクエストのメトリクスを記録するミドルウェア
+
+ルート（パスのテンプレート。/users/{user_id} など）・メソッド・ステータスごとの
+リクエスト数と処理時間（レスポンスの送信完了まで）を記録する。
+ラベルの種類が増え続けないよう、どのルートにも一致しなかったリクエストは <unmatched>、
+標準以外のメソッドは OTHER にまとめる。起動時のウォームアップ（warmup.py）のリクエストは記録しない。
+
+リクエストごとの処理はラベルのキーの辞書引き（組み合わせごとに1回だけ組み立てる）と
+カウンター・ヒストグラムの加算だけにする。処理中のリクエスト数はイベントループの
+スレッドでのみ更新するためロックを使わない。
+"""
+
+import time
+
+import anyio.to_thread
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.metrics.registry import REGISTRY, Gauge, LabelValues, label_key
+from app.presentation.warmup import WARMUP_SCOPE_KEY
+
+REQUESTS = REGISTRY.counter('http_requests_total', 'HTTPリクエスト数')
+REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_duration_seconds',
+    'HTTPリクエストの処理時間（レスポンスの送信完了まで）',
+)
+
+UNMATCHED_ROUTE = '<unmatched>'
+_METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'})
+
+_in_progress = 0
+
+
+class MetricsMiddleware:
+    """
+    ルートごとのリクエスト数・処理時間を記録する
+
+    使用例:
+        app.add_middleware(MetricsMiddleware)
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # (メソッド, ルート, ステータス) → (リクエスト数のキー, 処理時間のキー)
+        self._keys: dict[tuple[str, str, int], tuple[LabelValues, LabelValues]] = {}
+        # ルートのオブジェクトを scope に設定しないルート（Starlette の Route・Mount）の
+        # エンドポイント → パス
+        self._endpoint_paths: dict[object, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        global _in_progress
+        # 起動時のウォームアップのリクエストは実際のトラフィックとして数えない
+        if scope['type'] != 'http' or scope.get(WARMUP_SCOPE_KEY):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        _in_progress += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _in_progress -= 1
+            elapsed = time.perf_counter() - started
+            requests_key, seconds_key = self._label_keys(scope, status_code)
+            REQUESTS.inc_key(requests_key)
+            REQUEST_SECONDS.observe_key(elapsed, seconds_key)
+
+    def _label_keys(
+        self, scope: Scope, status_code: int
+    ) -> tuple[LabelValues, LabelValues]:
+        method = scope['method'] if scope['method'] in _METHODS else 'OTHER'
+        route = self._route_template(scope)
+        keys = self._keys.get((method, route, status_code))
+        if keys is None:
+            keys = (
+                label_key({'method': method, 'route': route, 'status': status_code}),
+                label_key({'method': method, 'route': route}),
+            )
+            self._keys[(method, route, status_code)] = keys
+        return keys
+
+    def _route_template(self, scope: Scope) -> str:
+        """一致したルートのパスのテンプレート（ルーティングで scope に設定された値から求める）"""
+        route = scope.get('route')
+        if route is not None:
+            return route.path
+        endpoint = scope.get('endpoint')
+        router = scope.get('router')
+        if endpoint is None or router is None:
+            return UNMATCHED_ROUTE
+        path = self._endpoint_paths.get(endpoint)
+        if path is None:
+            path = next(
+                (
+                    candidate.path
+                    for candidate in router.routes
+                    if getattr(candidate, 'endpoint', None) is endpoint
+                    or getattr(candidate, 'app', None) is endpoint
+                ),
+                UNMATCHED_ROUTE,
+            )
+            self._endpoint_paths[endpoint] = path
+        return path
+
+
+def _collect_runtime_metrics():
+    in_progress = Gauge('http_requests_in_progress', '処理中のHTTPリクエスト数')
+    in_progress.set(_in_progress)
+    metrics = [in_progress]
+    try:
+        # 同期のエンドポイント・依存関係を実行するスレッドプール（イベントループ上でのみ取得できる）
+        statistics = anyio.to_thread.current_default_thread_limiter().statistics()
+    except RuntimeError:
+        return metrics
+    queued = Gauge('threadpool_queued_tasks', 'スレッドプールの空きを待っている処理数')
+    busy = Gauge('threadpool_busy_threads', 'スレッドプールで実行中の処理数')
+    threads = Gauge('threadpool_max_threads', 'スレッドプールのスレッド数の上限')
+    queued.set(statistics.tasks_waiting, pool='default')
+    busy.set(statistics.borrowed_tokens, pool='default')
+    threads.set(statistics.total_tokens, pool='default')
+    return [*metrics, queued, busy, threads]
+
+
+REGISTRY.register_collector(_collect_runtime_metrics)
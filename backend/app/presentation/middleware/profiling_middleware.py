@@ -0,0 +1,150 @@
+"""リクエスト単位のプロファイルのミドルウェア
+
+次のリクエストだけをプロファイルし、結果を1リクエスト1ファイルで保存する。
+
+- 署名したヘッダー（X-Profile: scripts/profile_token.py で発行した値）を付けたリクエスト
+- 設定した割合（PROFILING_SAMPLE_RATE）でサンプリングしたリクエスト
+
+それ以外のリクエストはヘッダーの確認だけで素通しする（鍵も割合も設定しない場合は
+main.py でミドルウェア自体を組み込まない）。プロファイルしたリクエストには
+保存するファイル名を X-Profile-Id ヘッダーで返す。
+"""
+
+import itertools
+import logging
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+import anyio
+import anyio.to_thread
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.metrics.registry import REGISTRY
+from app.infrastructure.profiling.profile_store import ProfileStore
+from app.infrastructure.profiling.profile_token import verify_profile_token
+from app.infrastructure.profiling.request_profiler import (
+    ACTIVE_PROFILE,
+    RequestProfile,
+    install_threadpool_hook,
+)
+from app.presentation.warmup import WARMUP_SCOPE_KEY
+
+logger = logging.getLogger(__name__)
+
+PROFILED_REQUESTS = REGISTRY.counter(
+    'http_profiled_requests_total', 'プロファイルしたリクエスト数'
+)
+
+PROFILE_ID_HEADER = 'X-Profile-Id'
+_FORMATS = {'speedscope': '.speedscope.json', 'collapsed': '.collapsed.txt'}
+_UNSAFE_NAME = re.compile(r'[^A-Za-z0-9]+')
+
+
+class ProfilingMiddleware:
+    """
+    指定したリクエストをプロファイルする
+
+    使用例:
+        app.add_middleware(
+            ProfilingMiddleware,
+            store=ProfileStore('app/logs/profiles', max_files=50),
+            secret=settings.profiling_secret,
+        )
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        secret: str = '',
+        header: str = 'X-Profile',
+        sample_rate: float = 0.0,
+        interval_seconds: float = 0.005,
+        max_seconds: float = 30.0,
+        max_concurrent: int = 1,
+        output_format: str = 'speedscope',
+    ):
+        if output_format not in _FORMATS:
+            raise ValueError(f'プロファイルの形式が不正です: {output_format}')
+        self.app = app
+        self.store = store
+        self.secret = secret
+        self.header = header.lower().encode('latin-1')
+        self.sample_rate = sample_rate
+        self.interval_seconds = interval_seconds
+        self.max_seconds = max_seconds
+        self.max_concurrent = max_concurrent
+        self.output_format = output_format
+        # 実行中のプロファイル数（イベントループのスレッドでのみ更新するためロックを使わない）
+        self._active = 0
+        self._sequence = itertools.count()
+        # 同期のエンドポイント・依存関係を実行するスレッドを、プロファイル中のリクエストに対応付ける
+        install_threadpool_hook()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # 起動時のウォームアップのリクエストはプロファイルしない（PROFILING_SAMPLE_RATE の対象外）
+        if (
+            scope['type'] != 'http'
+            or scope.get(WARMUP_SCOPE_KEY)
+            or self._active >= self.max_concurrent
+            or not self._requested(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        label = f'{scope["method"]} {scope["path"]}'
+        name = self._file_name(scope)
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, name)
+            await send(message)
+
+        profile = RequestProfile(label, self.interval_seconds, self.max_seconds)
+        self._active += 1
+        token = ACTIVE_PROFILE.set(profile)
+        profile.start(sys._getframe())  # noqa: SLF001
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stop()
+            ACTIVE_PROFILE.reset(token)
+            self._active -= 1
+            PROFILED_REQUESTS.inc()
+            # 整形・書き出しはスレッドで行う（リクエストが中断された場合も保存する）
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(self._save, profile, name)
+
+    def _requested(self, scope: Scope) -> bool:
+        if self.secret:
+            for key, value in scope['headers']:
+                if key == self.header:
+                    return verify_profile_token(self.secret, value.decode('latin-1'))
+        return self.sample_rate > 0 and random.random() < self.sample_rate  # noqa: S311
+
+    def _file_name(self, scope: Scope) -> str:
+        """保存するファイル名（時刻順に並ぶ名前。ワーカー間で重ならないよう pid を含める）"""
+        timestamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime())
+        path = _UNSAFE_NAME.sub('-', scope['path']).strip('-')[:60] or 'root'
+        return (
+            f'{timestamp}-{os.getpid()}-{next(self._sequence):04d}-'
+            f'{scope["method"].lower()}-{path}{_FORMATS[self.output_format]}'
+        )
+
+    def _save(self, profile: RequestProfile, name: str) -> Path | None:
+        if self.output_format == 'collapsed':
+            text = profile.to_collapsed()
+        else:
+            text = profile.to_speedscope()
+        path = self.store.save(name, text)
+        if path is not None:
+            logger.info(
+                f'プロファイルを保存しました [{profile.label}] '
+                f'{(profile.finished - profile.started) * 1000:.1f}ms: {path}'
+            )
+        return path
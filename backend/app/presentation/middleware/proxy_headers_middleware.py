@@ -0,0 +1,91 @@
+"""信頼するプロキシ（ALB）の X-Forwarded-For / X-Forwarded-Proto の反映
+
+接続元が信頼するアドレス（FORWARDED_ALLOW_IPS。IPアドレスまたはCIDR）の場合だけ、
+X-Forwarded-For を右から順にたどり、信頼するアドレス以外の最初のアドレスをクライアントとする。
+左端の値はクライアントが自由に設定できるため使わない（ログインの試行回数の制限を
+ヘッダーの付け替えで回避されないようにする）。
+
+uvicorn 0.27 の proxy_headers は個別のIPアドレスしか指定できず、ALB のアドレスは
+変わるため、サブネット（CIDR）で指定できるようにこのミドルウェアを使う。
+"""
+
+import ipaddress
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+_Network = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+def parse_trusted_networks(value: str) -> tuple[list[_Network], bool]:
+    """
+    FORWARDED_ALLOW_IPS（カンマ区切り）を解析する
+
+    Returns:
+        tuple: (信頼するネットワーク, すべての接続元を信頼するか（* を含む場合）)
+
+    Raises:
+        ValueError: アドレスの形式が不正な場合
+    """
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    if '*' in items:
+        return [], True
+    return [ipaddress.ip_network(item, strict=False) for item in items], False
+
+
+def is_address_in(host: str, networks: list[_Network]) -> bool:
+    """host（IPアドレス）がいずれかのネットワークに含まれるか（IPアドレスでない場合はFalse）"""
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
+class ProxyHeadersMiddleware:
+    """
+    信頼するプロキシからのリクエストに X-Forwarded-* を反映する
+
+    使用例:
+        app = ProxyHeadersMiddleware(app, trusted='127.0.0.1,10.0.0.0/16')
+    """
+
+    def __init__(self, app: ASGIApp, trusted: str = '127.0.0.1'):
+        self.app = app
+        self.networks, self.trust_all = parse_trusted_networks(trusted)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] in ('http', 'websocket'):
+            client = scope.get('client')
+            if client is not None and self._is_trusted(client[0]):
+                self._apply_headers(scope)
+        await self.app(scope, receive, send)
+
+    def _apply_headers(self, scope: Scope) -> None:
+        headers = dict(scope['headers'])
+        forwarded_proto = headers.get(b'x-forwarded-proto')
+        if forwarded_proto is not None:
+            proto = forwarded_proto.decode('latin-1').strip().lower()
+            if scope['type'] == 'websocket':
+                scope['scheme'] = 'wss' if proto == 'https' else 'ws'
+            elif proto in ('http', 'https'):
+                scope['scheme'] = proto
+        forwarded_for = headers.get(b'x-forwarded-for')
+        if forwarded_for is not None:
+            host = self._client_host(forwarded_for.decode('latin-1'))
+            if host is not None:
+                scope['client'] = (host, 0)
+
+    def _client_host(self, forwarded_for: str) -> str | None:
+        """信頼するアドレス以外の最も右のアドレス（* の場合は直前のプロキシが付加した右端）"""
+        hosts = [host.strip() for host in forwarded_for.split(',') if host.strip()]
+        if not hosts:
+            return None
+        if self.trust_all:
+            return hosts[-1]
+        for host in reversed(hosts):
+            if not self._is_trusted(host):
+                return host
+        return hosts[0]
+
+    def _is_trusted(self, host: str) -> bool:
+        return self.trust_all or is_address_in(host, self.networks)
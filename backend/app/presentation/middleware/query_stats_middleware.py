@@ -0,0 +1,72 @@
+"""リクエストごとのSQL集計ミドルウェア
+
+リクエストの処理中に実行したSQLのクエリ数・DB時間を Server-Timing ヘッダーで返し、
+同じSQLを閾値を超えて繰り返したリクエスト（N+1 の疑い）を警告する。
+BaseHTTPMiddleware を経由しないASGIミドルウェアとして実装し、リクエストごとの負荷を抑える。
+"""
+
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.db.instrumentation import (
+    RequestQueryStats,
+    track_request_queries,
+)
+from app.infrastructure.metrics.registry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+QUERIES = REGISTRY.counter('db_queries_total', 'リクエストの処理中に実行したSQL')
+QUERY_SECONDS = REGISTRY.counter(
+    'db_query_seconds_total', 'リクエストの処理中にSQLの実行に費やした時間'
+)
+N_PLUS_ONE_REQUESTS = REGISTRY.counter(
+    'db_n_plus_one_requests_total', '同じSQLを閾値を超えて繰り返したリクエスト'
+)
+
+
+class QueryStatsMiddleware:
+    """
+    SQLの集計をリクエストに対応付ける
+
+    使用例:
+        app.add_middleware(QueryStatsMiddleware, n_plus_one_threshold=10)
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 10):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        label = f'{scope["method"]} {scope["path"]}'
+        with track_request_queries(label) as stats:
+
+            async def send_with_server_timing(message: Message) -> None:
+                # レスポンス開始までに実行したSQLを返す
+                if message['type'] == 'http.response.start':
+                    headers = MutableHeaders(scope=message)
+                    headers.append('Server-Timing', stats.server_timing())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_server_timing)
+            finally:
+                QUERIES.inc(stats.count)
+                QUERY_SECONDS.inc(stats.total_seconds)
+                self._warn_repeated_statements(stats)
+
+    def _warn_repeated_statements(self, stats: RequestQueryStats) -> None:
+        repeated = stats.repeated(self.n_plus_one_threshold)
+        if not repeated:
+            return
+        N_PLUS_ONE_REQUESTS.inc()
+        for statement, count in repeated:
+            logger.warning(
+                f'N+1の可能性: [{stats.label}] 同じSQLを{count}回実行しました: {statement}'
+            )
@@ -0,0 +1,55 @@
+from collections.abc import Callable
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel, Field
+
+from app.domain.repositories.pagination import Page
+
+T = TypeVar('T')
+
+
+class PageParams(BaseModel):
+    """一覧取得のクエリパラメータ（Annotated[PageParams, Query()] で受け取る）"""
+
+    cursor: str | None = Field(
+        None, max_length=1024, description='前回のレスポンスの next_cursor / prev_cursor'
+    )
+    limit: int = Field(50, ge=1, le=100, description='1ページの件数')
+
+
+class PageInfo(BaseModel):
+    """前後のページの情報"""
+
+    next_cursor: str | None = Field(None, description='次のページのカーソル')
+    prev_cursor: str | None = Field(None, description='前のページのカーソル')
+    has_next: bool = Field(..., description='次のページがあるかどうか')
+    has_prev: bool = Field(..., description='前のページがあるかどうか')
+
+
+class PaginatedResponse(BaseModel, Generic[T]):
+    """一覧レスポンス（response_model=PaginatedResponse[XxxResponse] として使う）"""
+
+    items: list[T] = Field(..., description='このページの要素')
+    page_info: PageInfo = Field(..., description='前後のページの情報')
+
+    @classmethod
+    def from_page(
+        cls, page: Page[Any], convert: Callable[[Any], T] | None = None
+    ) -> 'PaginatedResponse[T]':
+        """
+        リポジトリのページからレスポンスを生成
+
+        Args:
+            page: リポジトリの list_page などの戻り値
+            convert: 要素をレスポンスのモデルに変換する関数（省略時はそのまま）
+        """
+        items = [convert(item) for item in page.items] if convert else page.items
+        return cls(
+            items=items,
+            page_info=PageInfo(
+                next_cursor=page.next_cursor,
+                prev_cursor=page.prev_cursor,
+                has_next=page.has_next,
+                has_prev=page.has_prev,
+            ),
+        )
@@ -0,0 +1,141 @@
+"""起動時のウォームアップとレディネス
+
+ワーカーの起動直後は、コネクションプールの接続・JWTの鍵の解析・bcryptのバックエンド・
+ルートごとの依存関係やスキーマの検証処理が、それぞれ最初のリクエストで初期化される。
+アプリの lifespan でこれらを先に実行し、完了してからレディ（/health が200）にする。
+
+uvicorn は lifespan の起動処理が終わってから待ち受けを始めるため、ウォームアップ中の
+ワーカーにはリクエストが届かない（app/server.py の共有ソケットでも同様）。
+各手順の失敗はログに残して次に進み（DBに接続できない場合も起動は止めない）、
+WARMUP_TIMEOUT_SECONDS を超えた場合は残りを打ち切る。
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from starlette.types import ASGIApp, Message
+
+from app.config import Settings
+from app.infrastructure.security.key_ring import warm_up_key_ring
+from app.infrastructure.security.password_hasher import warm_up_password_hasher
+
+logger = logging.getLogger(__name__)
+
+# 起動時に実行するルート（DB・bcrypt・レート制限に触れない応答になるリクエスト）
+WARMUP_REQUESTS: tuple[tuple[str, str, bytes], ...] = (
+    ('GET', '/auth/verify', b''),
+    ('GET', '/auth/status', b''),
+    ('POST', '/auth/login', b'{}'),  # リクエストの検証エラー（422）まで
+)
+
+# ウォームアップのリクエストの scope に設定するキー（クライアントからは設定できない。
+# メトリクスなどで実際のリクエストと区別する）
+WARMUP_SCOPE_KEY = 'app.warmup'
+
+_ready = False
+
+
+def is_ready() -> bool:
+    """リクエストを受け付けられる状態か（ウォームアップ済みで、終了処理に入っていない）"""
+    return _ready
+
+
+def set_ready(ready: bool) -> None:
+    global _ready
+    _ready = ready
+
+
+async def run_warmup(app: ASGIApp, settings: Settings) -> dict[str, float]:
+    """
+    ウォームアップを実行する
+
+    Returns:
+        dict[str, float]: 完了した手順ごとの所要時間（ミリ秒）
+    """
+    steps: list[tuple[str, Callable[[], Awaitable[object]]]] = [
+        ('db', lambda: _prewarm_db(settings)),
+        ('jwt_keys', lambda: asyncio.to_thread(warm_up_key_ring)),
+        ('bcrypt', warm_up_password_hasher),
+        ('routes', lambda: _exercise_routes(app)),
+    ]
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    try:
+        async with asyncio.timeout(settings.warmup_timeout_seconds):
+            for name, step in steps:
+                step_started = time.perf_counter()
+                try:
+                    await step()
+                except Exception as e:
+                    logger.warning(f'ウォームアップの手順を省略しました [{name}]: {e!r}')
+                    continue
+                timings[name] = (time.perf_counter() - step_started) * 1000
+    except TimeoutError:
+        logger.warning(
+            f'ウォームアップが{settings.warmup_timeout_seconds:.0f}秒以内に完了しなかったため'
+            '打ち切りました'
+        )
+
+    total_ms = (time.perf_counter() - started) * 1000
+    details = ', '.join(f'{name}={ms:.0f}ms' for name, ms in timings.items())
+    logger.info(f'ウォームアップが完了しました ({total_ms:.0f}ms: {details})')
+    return timings
+
+
+async def _prewarm_db(settings: Settings) -> None:
+    from app.infrastructure.db.session import get_engine_registry
+
+    registry = get_engine_registry()
+    connections = settings.warmup_db_connections
+    if connections < 0:
+        connections = registry.pool_settings.pool_size
+    await registry.prewarm(connections)
+
+
+async def _exercise_routes(app: ASGIApp) -> None:
+    for method, path, body in WARMUP_REQUESTS:
+        await _request(app, method, path, body)
+
+
+async def _request(app: ASGIApp, method: str, path: str, body: bytes = b'') -> int:
+    """アプリをプロセス内で呼び出し、ステータスコードを返す（応答の本文は捨てる）"""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': b'',
+        'headers': [
+            (b'host', b'localhost'),
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+        WARMUP_SCOPE_KEY: True,
+    }
+    pending = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    response_complete = asyncio.Event()
+    status_code = 0
+
+    async def receive() -> Message:
+        if pending:
+            return pending.pop()
+        await response_complete.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message: Message) -> None:
+        nonlocal status_code
+        if message['type'] == 'http.response.start':
+            status_code = message['status']
+        elif message['type'] == 'http.response.body' and not message.get('more_body'):
+            response_complete.set()
+
+    await app(scope, receive, send)
+    return status_code
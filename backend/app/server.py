@@ -0,0 +1,400 @@
+"""本番用の起動（python -m app.server）
+
+親プロセスでアプリを読み込んでから（preload）、ワーカー（uvicorn）を fork する。
+
+- ワーカー数は WEB_CONCURRENCY（0以下の場合はタスクに割り当てられたCPU数。
+  cgroup の CPU クォータを考慮する）。決めた数を WEB_CONCURRENCY に設定してから
+  アプリを読み込むため、コネクションプールの分割（session.py）にも反映される
+- fork の前に gc.freeze() で読み込み済みのオブジェクトをGCの対象から外し、
+  参照カウント以外の書き込み（GCの走査）でコピーオンライトのページが複製されるのを防ぐ
+- ワーカーは SERVER_MAX_REQUESTS（+ 乱数）件のリクエスト、または RSS が SERVER_MAX_RSS_MB を
+  超えた時点で処理中のリクエストを終えてから終了し、親が新しいワーカーを起動する
+- メトリクスは各ワーカーが共有ディレクトリに定期的に書き出し、/metrics で全ワーカー分を
+  合算する（終了したワーカーのカウンターは親が合算して残す。app/infrastructure/metrics/multiprocess.py）
+- BCRYPT_CALIBRATE_ON_STARTUP が有効な場合は fork の前に1回だけbcryptコストを計測し、
+  BCRYPT_ROUNDS として全ワーカーに同じ値を使わせる（ワーカーごとに計測すると値がばらつく）
+- ログは標準出力のみに出力する（LOG_FILE は使わない。ワーカーごとのローテーションで
+  同じファイルのレコードが失われないようにするため）
+- X-Forwarded-For / X-Forwarded-Proto は FORWARDED_ALLOW_IPS（ALB のサブネット）からの
+  接続の場合だけ反映する（ログインの試行回数の制限はクライアントのアドレスで数えるため、
+  制限が有効で FORWARDED_ALLOW_IPS が未設定の場合は起動時にエラーを記録する）
+- SIGTERM（ECSのタスク停止）を受けた場合は、ALB の登録解除が反映されるまで
+  SERVER_DRAIN_DELAY_SECONDS の間は受け付けを続け、その後ワーカーを停止して処理中のリクエストを
+  SERVER_GRACEFUL_TIMEOUT_SECONDS まで待つ（それでも終わらないワーカーは強制終了する）
+  SIGINT（Ctrl+C）の場合は待たずに停止する
+
+開発時は従来どおり uvicorn app.main:app --reload を使う。
+"""
+
+import argparse
+import gc
+import importlib
+import logging
+import math
+import os
+import random
+import resource
+import signal
+import socket
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.infrastructure.logging.logging import setup_logging, shutdown_logging
+from app.infrastructure.metrics import multiprocess
+
+logger = logging.getLogger(__name__)
+
+_CGROUP_V2_CPU_MAX = Path('/sys/fs/cgroup/cpu.max')
+_CGROUP_V1_QUOTA = Path('/sys/fs/cgroup/cpu/cpu.cfs_quota_us')
+_CGROUP_V1_PERIOD = Path('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+
+# app.main のインポート時には読み込まず使用時に読み込むモジュール。fork 前に読み込み、
+# 各ワーカーで読み込み直さない（ページも共有される）ようにする
+PRELOAD_MODULES = (
+    'app.infrastructure.db.session',
+    'app.infrastructure.db.unit_of_work',
+    'app.infrastructure.db.async_unit_of_work',
+    'app.infrastructure.db.repositories.user_repository_impl',
+    'app.infrastructure.db.repositories.async_user_repository_impl',
+    'app.infrastructure.db.repositories.cached_user_repository',
+    'app.infrastructure.db.repositories.revoked_token_repository_impl',
+)
+
+# 起動直後に異常終了したワーカーを再起動するまでの待ち時間（再起動の繰り返しを防ぐ）
+_CRASH_WINDOW_SECONDS = 5.0
+_CRASH_BACKOFF_SECONDS = 1.0
+# ワーカーが終了したかを確認する間隔
+_SUPERVISE_INTERVAL_SECONDS = 0.2
+# RSS を確認する間隔（uvicorn の on_tick は0.1秒ごと）
+_RSS_CHECK_TICKS = 50
+# メトリクスを書き出す間隔
+_METRICS_SNAPSHOT_TICKS = 10
+
+
+def available_cpus(
+    cpu_max: Path = _CGROUP_V2_CPU_MAX,
+    cfs_quota: Path = _CGROUP_V1_QUOTA,
+    cfs_period: Path = _CGROUP_V1_PERIOD,
+) -> int:
+    """
+    このプロセスが使用できるCPU数
+
+    ECS（Fargate含む）ではタスクのCPUは cgroup のクォータで制限されるため、
+    os.cpu_count()（ホストのCPU数）ではなくクォータから求める。
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else None
+    cpus = cpus or os.cpu_count() or 1
+
+    quota = period = None
+    try:
+        quota_text, period_text = cpu_max.read_text().split()
+        if quota_text != 'max':
+            quota, period = int(quota_text), int(period_text)
+    except (OSError, ValueError):
+        try:
+            quota, period = int(cfs_quota.read_text()), int(cfs_period.read_text())
+        except (OSError, ValueError):
+            pass
+    if quota is not None and period and quota > 0:
+        cpus = min(cpus, math.ceil(quota / period))
+    return max(1, cpus)
+
+
+def resolve_workers(web_concurrency: int) -> int:
+    """ワーカー数（0以下の場合は使用できるCPU数）"""
+    return web_concurrency if web_concurrency > 0 else available_cpus()
+
+
+def check_forwarded_allow_ips(settings) -> bool:
+    """
+    ログインの試行回数の制限（クライアントのアドレスごと）に必要なプロキシの設定を確認する
+
+    FORWARDED_ALLOW_IPS が未設定（既定の 127.0.0.1）のまま ALB の背後で動かすと、
+    接続元は常に ALB のアドレスになり、全ユーザーが1つのバケットを共有する
+    （サイト全体で LOGIN_RATE_LIMIT_IP_ATTEMPTS 回/期間しかログインできない）。
+
+    Returns:
+        bool: 設定に問題がない場合True（問題がある場合はエラーを記録する）
+    """
+    if (
+        not settings.login_rate_limit_enabled
+        or 'forwarded_allow_ips' in settings.model_fields_set
+    ):
+        return True
+    logger.error(
+        'LOGIN_RATE_LIMIT_ENABLED=true ですが FORWARDED_ALLOW_IPS が未設定です。'
+        'ALB などのプロキシの背後では全ユーザーがプロキシのアドレスで数えられるため、'
+        'FORWARDED_ALLOW_IPS にプロキシのサブネットを指定してください'
+        '（直接公開する場合は 127.0.0.1 を明示的に指定してください）'
+    )
+    return False
+
+
+def current_rss_bytes() -> int:
+    """このプロセスの現在の RSS（/proc がない環境では最大 RSS）"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Linux の ru_maxrss は KB 単位
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@dataclass(frozen=True)
+class LauncherOptions:
+    """起動の設定"""
+
+    host: str
+    port: int
+    workers: int
+    max_requests: int
+    max_requests_jitter: int
+    max_rss_mb: float
+    drain_delay_seconds: float
+    graceful_timeout_seconds: float
+    keepalive_seconds: int
+    access_log: bool = True
+
+    def worker_max_requests(self) -> int | None:
+        """ワーカーごとのリクエスト数の上限（全ワーカーが同時に再起動しないよう乱数を加える）"""
+        if self.max_requests <= 0:
+            return None
+        jitter = random.randint(0, self.max_requests_jitter)  # noqa: S311
+        return self.max_requests + jitter
+
+
+def _build_server(app, options: LauncherOptions):
+    """ワーカーで実行する uvicorn のサーバー"""
+    import uvicorn
+
+    max_rss_bytes = int(options.max_rss_mb * 1024 * 1024)
+
+    class WorkerServer(uvicorn.Server):
+        async def on_tick(self, counter: int) -> bool:
+            if (
+                max_rss_bytes > 0
+                and counter % _RSS_CHECK_TICKS == 0
+                and not self.should_exit
+                and (rss := current_rss_bytes()) > max_rss_bytes
+            ):
+                logger.warning(
+                    f'ワーカー(pid={os.getpid()})のRSSが上限を超えたため再起動します: '
+                    f'{rss / 1024 / 1024:.0f}MB > {options.max_rss_mb:.0f}MB'
+                )
+                self.should_exit = True
+            if counter % _METRICS_SNAPSHOT_TICKS == 0:
+                multiprocess.write_snapshot()
+            return await super().on_tick(counter)
+
+    config = uvicorn.Config(
+        app,
+        # X-Forwarded-* は main() で組み込む ProxyHeadersMiddleware で反映する（CIDRで指定するため）
+        proxy_headers=False,
+        # ALB のアイドルタイムアウト（既定60秒）より長くし、ALB が再利用する接続を先に閉じない
+        timeout_keep_alive=options.keepalive_seconds,
+        timeout_graceful_shutdown=options.graceful_timeout_seconds,
+        limit_max_requests=options.worker_max_requests(),
+        # uvicorn のロガーも含めてアプリの logging 設定（キュー・JSON・サンプリング）を使う
+        log_config=None,
+        access_log=options.access_log,
+    )
+    return WorkerServer(config)
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Launcher:
+    """ワーカーの起動・監視・停止を行う親プロセス"""
+
+    def __init__(self, app, options: LauncherOptions):
+        self.app = app
+        self.options = options
+        self.workers: dict[int, float] = {}  # pid → 起動時刻
+        self._stop_signal: int | None = None
+        self._sock: socket.socket | None = None
+
+    def run(self) -> int:
+        self._sock = _bind_socket(self.options.host, self.options.port)
+        logger.info(
+            f'{self.options.workers}ワーカーで起動します '
+            f'(http://{self.options.host}:{self.options.port}, pid={os.getpid()})'
+        )
+        signal.signal(signal.SIGTERM, self._on_stop_signal)
+        signal.signal(signal.SIGINT, self._on_stop_signal)
+
+        # 読み込み済みのオブジェクトをGCの対象から外し、fork後もページを共有させる
+        gc.collect()
+        gc.freeze()
+
+        for _ in range(self.options.workers):
+            self._spawn()
+        while self._stop_signal is None:
+            self._reap(respawn=True)
+            time.sleep(_SUPERVISE_INTERVAL_SECONDS)
+
+        self._shutdown()
+        return 0
+
+    def _on_stop_signal(self, signum, frame) -> None:
+        if self._stop_signal is None:
+            self._stop_signal = signum
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            os._exit(self._run_worker())
+        self.workers[pid] = time.monotonic()
+
+    def _run_worker(self) -> int:
+        """子プロセス: uvicorn を実行して終了コードを返す"""
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        try:
+            server = _build_server(self.app, self.options)
+            server.run(sockets=[self._sock])
+            return 0 if server.started else 3
+        except BaseException:
+            logger.exception(f'ワーカー(pid={os.getpid()})が異常終了しました')
+            return 1
+        finally:
+            # 最後の値を書き出し、親が終了後に合算する
+            multiprocess.write_snapshot()
+            # os._exit では atexit が実行されないため、キューに残っているログをここで出力する
+            shutdown_logging()
+
+    def _reap(self, respawn: bool) -> None:
+        """終了したワーカーを回収し、必要であれば新しいワーカーを起動する"""
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            started_at = self.workers.pop(pid, None)
+            if started_at is None:
+                continue
+            multiprocess.mark_process_dead(pid)
+            exit_code = os.waitstatus_to_exitcode(status)
+            if not respawn or self._stop_signal is not None:
+                continue
+            if exit_code != 0:
+                logger.warning(f'ワーカー(pid={pid})が終了しました(code={exit_code})')
+                if time.monotonic() - started_at < _CRASH_WINDOW_SECONDS:
+                    time.sleep(_CRASH_BACKOFF_SECONDS)
+            else:
+                logger.info(f'ワーカー(pid={pid})を再起動します')
+            self._spawn()
+
+    def _shutdown(self) -> None:
+        if self._stop_signal == signal.SIGTERM and self.options.drain_delay_seconds > 0:
+            # ALB の登録解除が反映されるまで、受け付けを続ける
+            logger.info(
+                f'SIGTERMを受信しました。{self.options.drain_delay_seconds:.0f}秒後に'
+                'ワーカーを停止します'
+            )
+            deadline = time.monotonic() + self.options.drain_delay_seconds
+            while time.monotonic() < deadline:
+                self._reap(respawn=False)
+                time.sleep(_SUPERVISE_INTERVAL_SECONDS)
+
+        for pid in list(self.workers):
+            _signal(pid, signal.SIGTERM)
+        # uvicorn が処理中のリクエストを待つ時間に、終了処理（lifespan）の分の余裕を加える
+        deadline = time.monotonic() + self.options.graceful_timeout_seconds + 5
+        while self.workers and time.monotonic() < deadline:
+            self._reap(respawn=False)
+            time.sleep(_SUPERVISE_INTERVAL_SECONDS)
+        for pid in list(self.workers):
+            logger.warning(f'ワーカー(pid={pid})が終了しないため強制終了します')
+            _signal(pid, signal.SIGKILL)
+        while self.workers:
+            self._reap(respawn=False)
+            time.sleep(_SUPERVISE_INTERVAL_SECONDS)
+        if self._sock is not None:
+            self._sock.close()
+        logger.info('停止しました')
+
+
+def _signal(pid: int, signum: int) -> None:
+    try:
+        os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def main(argv: list[str] | None = None) -> int:
+    from app.config import get_settings
+
+    settings = get_settings()
+    # ワーカーが同じファイルをそれぞれの契機でローテーションするとレコードが失われ・混ざるため、
+    # LOG_FILE は使わず標準出力のみに出力する（ECS では標準出力をログドライバーで収集する）
+    setup_logging(settings.model_copy(update={'log_file': ''}))
+    parser = argparse.ArgumentParser(description='本番用の起動（preload + fork）')
+    parser.add_argument('--host', default=settings.server_host)
+    parser.add_argument('--port', type=int, default=settings.server_port)
+    parser.add_argument('--workers', type=int, default=settings.web_concurrency)
+    args = parser.parse_args(argv)
+
+    # コネクションプールの分割にワーカー数を反映させてからアプリを読み込む
+    workers = resolve_workers(args.workers)
+    os.environ['WEB_CONCURRENCY'] = str(workers)
+    # bcryptコストは fork 前に1回だけ計測し、BCRYPT_ROUNDS として全ワーカーで同じ値を使う
+    from app.infrastructure.security.bcrypt_calibration import (
+        pin_calibrated_bcrypt_rounds,
+    )
+
+    pin_calibrated_bcrypt_rounds(settings)
+    get_settings.cache_clear()
+    settings = get_settings()
+
+    from app.infrastructure.db.repositories.keyset_pagination import get_cursor_signer
+    from app.main import app
+
+    for module in PRELOAD_MODULES:
+        importlib.import_module(module)
+    # 鍵が未設定の場合の一時的な鍵を fork 前に生成し、全ワーカーで共有する
+    get_cursor_signer()
+
+    if settings.metrics_enabled:
+        multiprocess.configure(settings.metrics_multiprocess_dir)
+
+    from app.presentation.middleware.proxy_headers_middleware import (
+        ProxyHeadersMiddleware,
+    )
+
+    # X-Forwarded-For は信頼するプロキシ（ALB のサブネット）から受けた場合だけ反映する
+    app = ProxyHeadersMiddleware(app, trusted=settings.forwarded_allow_ips)
+    check_forwarded_allow_ips(settings)
+
+    options = LauncherOptions(
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        max_requests=settings.server_max_requests,
+        max_requests_jitter=settings.server_max_requests_jitter,
+        max_rss_mb=settings.server_max_rss_mb,
+        drain_delay_seconds=settings.server_drain_delay_seconds,
+        graceful_timeout_seconds=settings.server_graceful_timeout_seconds,
+        keepalive_seconds=settings.server_keepalive_seconds,
+        access_log=settings.server_access_log,
+    )
+    try:
+        return Launcher(app, options).run()
+    finally:
+        multiprocess.cleanup()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
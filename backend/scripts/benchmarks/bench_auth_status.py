@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+認証状態確認エンドポイントのスループット比較
+
+フロントエンドのMiddlewareが呼び出す認証確認について、
+GET /auth/status（DI + Pydantic）と GET /auth/verify（軽量ルート）の
+リクエスト/秒をプロセス内（ASGI直接呼び出し）で計測します。
+
+使用方法:
+    python scripts/benchmarks/bench_auth_status.py [--requests 5000] [--concurrency 32]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(backend_dir))
+
+
+def _configure_environment() -> None:
+    """ベンチマーク用の鍵と設定を環境変数に用意（認証は有効）"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    os.environ['JWT_ALGORITHM'] = 'RS256'
+    os.environ['JWT_PRIVATE_KEY'] = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode('utf-8')
+    os.environ['JWT_PUBLIC_KEY'] = (
+        private_key.public_key()
+        .public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode('utf-8')
+    )
+    os.environ['ENABLE_AUTH'] = 'true'
+    for name in ('POSTGRES_USER', 'POSTGRES_PASSWORD', 'POSTGRES_DB'):
+        os.environ.setdefault(name, 'bench')
+
+
+async def _measure(client, path: str, cookie: str, requests: int, concurrency: int):
+    headers = {'Cookie': f'access_token={cookie}'}
+    queue = iter(range(requests))
+
+    async def worker():
+        for _ in queue:
+            response = await client.get(path, headers=headers)
+            assert response.status_code == 200, response.text
+
+    await client.get(path, headers=headers)  # ウォームアップ
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return requests / elapsed
+
+
+async def run(requests: int, concurrency: int) -> None:
+    _configure_environment()
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        login = await client.post(
+            '/auth/login', json={'login_id': 'admin', 'password': 'pass'}
+        )
+        token = login.json()['access_token']
+
+        print(f'{requests} requests, concurrency {concurrency}')
+        results = {}
+        for path in ('/auth/status', '/auth/verify'):
+            results[path] = await _measure(client, path, token, requests, concurrency)
+            print(f'  GET {path:<14} {results[path]:10,.0f} req/s')
+        print(f'  speedup: {results["/auth/verify"] / results["/auth/status"]:.2f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency))
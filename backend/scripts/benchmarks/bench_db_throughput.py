@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+同期セッションと非同期セッションのスループット比較
+
+DB認証のログインと同じ「UoWを開始してログインIDでユーザーを取得する」処理を、
+指定した並行数で繰り返し実行します。
+
+- sync : 同期セッションを run_in_threadpool で実行（FastAPIの同期依存関係と同じ。
+         スレッドプールの上限は既定で40）
+- async: AsyncSession をイベントループ上で直接実行
+
+クエリの待ち時間を再現するため、各処理で pg_sleep を挟みます（--query-delay-ms）。
+接続先は .env の POSTGRES_* です（docker compose up -d db で起動したローカルのPostgres）。
+
+使用方法:
+    python scripts/benchmarks/bench_db_throughput.py [--concurrency 200] [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(backend_dir))
+
+from app.infrastructure.db.async_unit_of_work import (  # noqa: E402
+    AsyncSQLAlchemyUnitOfWork,
+)
+from app.infrastructure.db.repositories.async_user_repository_impl import (  # noqa: E402
+    AsyncUserRepositoryImpl,
+)
+from app.infrastructure.db.repositories.user_repository_impl import (  # noqa: E402
+    UserRepositoryImpl,
+)
+from app.infrastructure.db.session import dispose_engine_registry  # noqa: E402
+from app.infrastructure.db.unit_of_work import SQLAlchemyUnitOfWork  # noqa: E402
+
+SLEEP_SQL = text('SELECT pg_sleep(:seconds)')
+
+
+def _sync_request(login_id: str, delay: float) -> None:
+    with SQLAlchemyUnitOfWork() as uow:
+        uow.session.execute(SLEEP_SQL, {'seconds': delay})
+        UserRepositoryImpl(uow.session).get_by_login_id(login_id)
+
+
+async def _async_request(login_id: str, delay: float) -> None:
+    async with AsyncSQLAlchemyUnitOfWork() as uow:
+        await uow.session.execute(SLEEP_SQL, {'seconds': delay})
+        await AsyncUserRepositoryImpl(uow.session).get_by_login_id(login_id)
+
+
+async def _run(label: str, request, concurrency: int, total: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await request()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await request()  # ウォームアップ（接続の確立）
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f'  {label:<6} {total / elapsed:10.1f} req/s   '
+        f'p50 {statistics.median(latencies):8.1f} ms   p99 {p99:8.1f} ms'
+    )
+
+
+async def main(concurrency: int, total: int, delay_ms: float, login_id: str) -> None:
+    delay = delay_ms / 1000
+    print(
+        f'DB throughput (concurrency={concurrency}, requests={total}, '
+        f'query delay={delay_ms}ms)'
+    )
+    await _run(
+        'sync',
+        lambda: run_in_threadpool(_sync_request, login_id, delay),
+        concurrency,
+        total,
+    )
+    await _run('async', lambda: _async_request(login_id, delay), concurrency, total)
+
+    await dispose_engine_registry()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--query-delay-ms', type=float, default=5.0)
+    parser.add_argument('--login-id', default='admin')
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.requests, args.query_delay_ms, args.login_id))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+JWTアルゴリズム別の署名・検証スループット比較
+
+JWT_ALGORITHM の選択材料として、RS256 / ES256 / EdDSA の
+署名（ログイン時）と検証（保護されたリクエストごと）の処理速度を計測します。
+
+使用方法:
+    python scripts/benchmarks/bench_jwt_algorithms.py [--seconds 1.0]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(backend_dir))
+
+from app.infrastructure.security.jwt_algorithms import JWT_ALGORITHMS  # noqa: E402
+from app.infrastructure.security.key_ring import build_key_ring  # noqa: E402
+from scripts.generate_rsa_keys import _generate_private_key  # noqa: E402
+
+
+def _pem_pair(algorithm: str) -> tuple[str, str]:
+    private_key = _generate_private_key(algorithm)
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode('utf-8')
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode('utf-8')
+    )
+    return private_pem, public_pem
+
+
+def _ops_per_second(fn, seconds: float) -> float:
+    fn()  # ウォームアップ
+    count = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        fn()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def run(seconds: float) -> None:
+    claims = {'user_id': 1, 'exp': int(time.time()) + 3600}
+    print(f'{"algorithm":<8} {"sign ops/s":>12} {"verify ops/s":>14} {"token bytes":>12}')
+    for algorithm in JWT_ALGORITHMS:
+        key_ring = build_key_ring(algorithm, *_pem_pair(algorithm))
+        key = key_ring.signing_key()
+        token = key.sign(claims)
+
+        sign_ops = _ops_per_second(lambda key=key: key.sign(claims), seconds)
+        verify_ops = _ops_per_second(
+            lambda key=key, token=token: key.verify(token), seconds
+        )
+        print(f'{algorithm:<8} {sign_ops:>12,.0f} {verify_ops:>14,.0f} {len(token):>12}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=1.0, help='各計測の時間（秒）')
+    args = parser.parse_args()
+    run(args.seconds)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+ロギングの設定によるリクエストのレイテンシの比較
+
+1リクエストで数行のログを出力するルートを、プロセス内（ASGI直接呼び出し）で呼び出し、
+次の2つの設定でレイテンシ（p50・p99）を計測します。
+
+- legacy: 従来の設定（DEBUG・呼び出し元の取得あり・リクエストの処理中に整形して
+  標準出力とファイルへ同期的に書き込む）
+- queue: app.infrastructure.logging の設定（INFO・JSON・QueueHandler でキューに積み、
+  整形と書き込みはリスナーのスレッド）
+
+出力先は一時ディレクトリのファイルです（標準出力の代わりのファイルを含む）。
+連続してリクエストを送る（CPUを使い切る）場合、queue はリスナーのスレッドとGILを
+取り合うため p99 が伸びます。実運用に近い負荷は --interval-ms で確認してください。
+
+使用方法:
+    python scripts/benchmarks/bench_logging.py [--requests 5000] [--lines 5]
+        [--interval-ms 0]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(backend_dir))
+
+for name in ('POSTGRES_USER', 'POSTGRES_PASSWORD', 'POSTGRES_DB'):
+    os.environ.setdefault(name, 'bench')
+
+from app.config import get_settings  # noqa: E402
+from app.infrastructure.logging.logging import (  # noqa: E402
+    TEXT_FORMAT_WITH_CALLER,
+    setup_logging,
+    shutdown_logging,
+)
+
+logger = logging.getLogger('app.bench')
+
+
+def _build_app(lines: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/work')
+    async def work():
+        logger.debug('リクエストの詳細 lines=%d', lines)
+        for i in range(lines):
+            logger.info('処理中 step=%d user_id=%d', i, 42, extra={'path': '/work'})
+        return {'ok': True}
+
+    return app
+
+
+def _configure_legacy(directory: Path) -> list[logging.Handler]:
+    stdout = (directory / 'legacy-stdout.log').open('w', encoding='utf-8')
+    handlers = [
+        logging.StreamHandler(stdout),
+        logging.FileHandler(directory / 'legacy.log', encoding='utf-8'),
+    ]
+    logging.basicConfig(
+        level=logging.DEBUG, format=TEXT_FORMAT_WITH_CALLER, handlers=handlers, force=True
+    )
+    return handlers
+
+
+def _configure_queue(directory: Path, stdout) -> None:
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    # 標準出力のハンドラーは作成時の sys.stdout に書き込む
+    with contextlib.redirect_stdout(stdout):
+        setup_logging(
+            get_settings().model_copy(update={'log_file': str(directory / 'queue.log')})
+        )
+
+
+async def _measure(app: FastAPI, requests: int, interval: float) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        for _ in range(100):  # ウォームアップ
+            await client.get('/work')
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = await client.get('/work')
+            samples.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200
+            if interval:
+                await asyncio.sleep(interval)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    quantiles = statistics.quantiles(samples, n=100)
+    print(
+        f'{label:8s} p50 {quantiles[49]:.3f}ms  p99 {quantiles[98]:.3f}ms  '
+        f'平均 {statistics.fmean(samples):.3f}ms'
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='ロギングの設定によるレイテンシの比較')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument(
+        '--lines', type=int, default=5, help='1リクエストで出力するログの行数'
+    )
+    parser.add_argument(
+        '--interval-ms',
+        type=float,
+        default=0,
+        help='リクエストの間隔（0は連続。CPUを使い切らない負荷での計測に指定する）',
+    )
+    args = parser.parse_args()
+    interval = args.interval_ms / 1000
+
+    app = _build_app(args.lines)
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+
+        _configure_legacy(directory)
+        legacy = asyncio.run(_measure(app, args.requests, interval))
+
+        with (directory / 'queue-stdout.log').open('w', encoding='utf-8') as stdout:
+            _configure_queue(directory, stdout)
+            queued = asyncio.run(_measure(app, args.requests, interval))
+            shutdown_logging()
+
+        print(f'{args.requests}リクエスト（1リクエストあたり{args.lines}行のログ）')
+        _report('legacy', legacy)
+        _report('queue', queued)
+        ratio = statistics.median(legacy) / statistics.median(queued)
+        print(f'p50 の比: {ratio:.2f}倍')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
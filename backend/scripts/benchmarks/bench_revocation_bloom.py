@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+失効リスト用ブルームフィルタのベンチマーク
+
+指定件数の失効トークンを登録したフィルタについて、
+実測の偽陽性率（= 失効していないトークンがDB確認に回る割合）、
+ビット配列のメモリ量、1回あたりの判定コストを計測します。
+
+使用方法:
+    python scripts/benchmarks/bench_revocation_bloom.py [--revoked 1000000] [--probes 200000]
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(backend_dir))
+
+from app.infrastructure.security.bloom_filter import BloomFilter  # noqa: E402
+
+
+def run(revoked: int, probes: int, error_rate: float) -> None:
+    bloom = BloomFilter(capacity=revoked, error_rate=error_rate)
+
+    start = time.perf_counter()
+    for _ in range(revoked):
+        bloom.add(uuid.uuid4().hex)
+    build_seconds = time.perf_counter() - start
+
+    active = [uuid.uuid4().hex for _ in range(probes)]
+    start = time.perf_counter()
+    false_positives = sum(jti in bloom for jti in active)
+    lookup_us = (time.perf_counter() - start) / probes * 1_000_000
+
+    print(f'Bloom filter ({revoked:,} revoked tokens, target p={error_rate})')
+    print(f'  bits / hashes          {bloom.num_bits:,} / {bloom.num_hashes}')
+    print(f'  memory                 {bloom.memory_bytes / 1024 / 1024:.2f} MiB')
+    print(f'  build                  {build_seconds:.2f} s')
+    print(f'  lookup                 {lookup_us:.2f} us/check')
+    print(
+        f'  false positive rate    {false_positives / probes:.5f} '
+        f'({false_positives:,} of {probes:,} active tokens would query the DB)'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--revoked', type=int, default=1_000_000)
+    parser.add_argument('--probes', type=int, default=200_000)
+    parser.add_argument('--error-rate', type=float, default=0.001)
+    args = parser.parse_args()
+    run(args.revoked, args.probes, args.error_rate)
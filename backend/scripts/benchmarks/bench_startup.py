@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+起動時間のベンチマーク（インポート時間と最初の応答までの時間）
+
+次の3つを計測し、予算を超えた場合は終了コード1で終了します（CIで退行を検出する用途）。
+
+1. `python -X importtime -c "import app.main"` の app.main の累積時間（--runs 回の中央値）
+2. `import app.main` の時点で読み込まれてはいけないモジュール（使用時に読み込むもの）
+3. uvicorn を起動してから /health が200を返すまでの時間（lifespan のウォームアップを含む）
+
+DBに接続できない環境ではウォームアップのDBの手順は失敗して省略されます
+（接続の確立にかかる時間は含まれません）。
+
+使用方法:
+    python scripts/benchmarks/bench_startup.py [--runs 5] [--import-budget-ms 800]
+        [--first-response-budget-ms 4000] [--top 15]
+"""
+
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import Counter
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parents[2]
+
+# import app.main の時点では読み込まない（使用する構成でのみ読み込む）モジュール
+LAZY_MODULES = (
+    'sqlalchemy',
+    'asyncpg',
+    'psycopg2',
+    'uvicorn',
+    'starlette.staticfiles',
+)
+
+_IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(  # noqa: S603
+        [sys.executable, *args],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def measure_import(runs: int) -> tuple[list[float], Counter]:
+    """
+    app.main のインポート時間（ミリ秒）と、パッケージごとの自己時間（最後の回）
+
+    Returns:
+        tuple: (回ごとの累積時間, トップレベルのパッケージごとの自己時間（ミリ秒）)
+    """
+    samples = []
+    by_package: Counter = Counter()
+    for _ in range(runs):
+        stderr = _run_python('-X', 'importtime', '-c', 'import app.main').stderr
+        by_package = Counter()
+        for line in stderr.splitlines():
+            match = _IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+            self_us, cumulative_us, _, module = match.groups()
+            by_package[module.split('.')[0]] += int(self_us) / 1000
+            if module == 'app.main':
+                samples.append(int(cumulative_us) / 1000)
+    return samples, by_package
+
+
+def eagerly_loaded(modules: tuple[str, ...]) -> list[str]:
+    """import app.main の時点で読み込まれているモジュール"""
+    code = (
+        'import sys, app.main; '
+        f'print(",".join(m for m in {modules!r} if m in sys.modules))'
+    )
+    output = _run_python('-c', code).stdout.strip()
+    return [module for module in output.split(',') if module]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_response(timeout: float = 60) -> float:
+    """uvicorn を起動してから /health が200を返すまでの時間（ミリ秒）"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(  # noqa: S603
+        [
+            sys.executable,
+            '-m',
+            'uvicorn',
+            'app.main:app',
+            '--host',
+            '127.0.0.1',
+            '--port',
+            str(port),
+            '--log-level',
+            'warning',
+        ],
+        cwd=backend_dir,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError('uvicorn が起動前に終了しました')
+            try:
+                with urllib.request.urlopen(
+                    f'http://127.0.0.1:{port}/health', timeout=1
+                ) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f'{timeout:.0f}秒以内に /health が200を返しませんでした')
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='起動時間のベンチマーク')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--import-budget-ms', type=float, default=800)
+    parser.add_argument('--first-response-budget-ms', type=float, default=4000)
+    parser.add_argument('--top', type=int, default=15, help='表示するパッケージの数')
+    args = parser.parse_args()
+
+    failures = []
+
+    samples, by_package = measure_import(args.runs)
+    import_ms = statistics.median(samples)
+    print(f'import app.main: 中央値 {import_ms:.0f}ms (最小 {min(samples):.0f}ms)')
+    print('  パッケージごとの自己時間:')
+    for package, ms in by_package.most_common(args.top):
+        print(f'    {ms:8.1f}ms  {package}')
+    if import_ms > args.import_budget_ms:
+        failures.append(
+            f'インポート時間 {import_ms:.0f}ms > {args.import_budget_ms:.0f}ms'
+        )
+
+    eager = eagerly_loaded(LAZY_MODULES)
+    print(f'インポート時に読み込まれた遅延対象のモジュール: {", ".join(eager) or "なし"}')
+    if eager:
+        failures.append(f'インポート時に読み込まれています: {", ".join(eager)}')
+
+    first_response = [measure_first_response() for _ in range(args.runs)]
+    first_response_ms = statistics.median(first_response)
+    print(
+        f'最初の応答（/health が200）まで: 中央値 {first_response_ms:.0f}ms '
+        f'(最小 {min(first_response):.0f}ms)'
+    )
+    if first_response_ms > args.first_response_budget_ms:
+        failures.append(
+            f'最初の応答までの時間 {first_response_ms:.0f}ms > '
+            f'{args.first_response_budget_ms:.0f}ms'
+        )
+
+    if failures:
+        print('\n予算を超えました:')
+        for failure in failures:
+            print(f'  - {failure}')
+        return 1
+    print('\n予算内です')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+bcryptコスト調整スクリプト
+
+実行環境（ECSタスクと同じCPU割り当てのコンテナで実行してください）で
+bcryptのハッシュ時間を計測し、レイテンシ予算に収まる最大のコストを表示します。
+
+使用方法:
+    python scripts/calibrate_bcrypt.py [--target-ms 250]
+
+結果の BCRYPT_ROUNDS を環境変数に設定すると、起動時の計測を省略できます。
+複数のタスク・ワーカーで同じコストを使うため、本番では計測結果を BCRYPT_ROUNDS に固定してください。
+より低いコストの既存のハッシュはログイン成功時に新しいコストへ再ハッシュされます。
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.infrastructure.security.bcrypt_calibration import (  # noqa: E402
+    MAX_ROUNDS,
+    MIN_ROUNDS,
+    calibrate_bcrypt_rounds,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='bcryptコストを実行環境で調整します')
+    parser.add_argument(
+        '--target-ms', type=float, default=250.0, help='1回のハッシュに許容する時間'
+    )
+    parser.add_argument('--min-rounds', type=int, default=MIN_ROUNDS)
+    parser.add_argument('--max-rounds', type=int, default=MAX_ROUNDS)
+    args = parser.parse_args()
+
+    calibration = calibrate_bcrypt_rounds(
+        args.target_ms, min_rounds=args.min_rounds, max_rounds=args.max_rounds
+    )
+
+    print(f'目標: {calibration.target_ms:.0f} ms / hash')
+    for rounds, hash_ms in calibration.measurements.items():
+        marker = ' <-' if rounds == calibration.rounds else ''
+        print(f'  rounds={rounds:<3} {hash_ms:8.1f} ms{marker}')
+    print()
+    print(f'BCRYPT_ROUNDS={calibration.rounds}')
+
+
+if __name__ == '__main__':
+    main()
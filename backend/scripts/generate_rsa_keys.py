@@ -1,7 +1,9 @@
 """
-RSA鍵ペア生成スクリプト（JWT RS256専用）
+JWT署名用の鍵ペア生成スクリプト
 
-JWT署名用のRSA-2048ビット鍵ペアを生成します。
+JWT署名用の鍵ペアを生成します（既定はRSA-2048ビット / RS256）。
+--algorithm を指定すると ES256（ECDSA P-256）や EdDSA（Ed25519）の鍵を生成できます。
+いずれもRS256より署名が高速です（scripts/benchmarks/bench_jwt_algorithms.py で比較できます）。
 HS256（32文字の対称鍵）からRS256（2048ビットRSA）への移行により、
 セキュリティが大幅に向上します。
 
@@ -10,7 +12,7 @@ HS256（32文字の対称鍵）からRS256（2048ビットRSA）への移行に
 - RS256: 2048ビットRSA鍵 → 現代の計算能力でも解読不可能
 
 使用方法:
-    python backend/scripts/generate_rsa_keys.py
+    python backend/scripts/generate_rsa_keys.py [--algorithm RS256|ES256|EdDSA]
     または
     make generate-rsa-keys
 
@@ -24,20 +26,32 @@ HS256（32文字の対称鍵）からRS256（2048ビットRSA）への移行に
     - 本番環境では別の方法で鍵を管理することを推奨します
 """
 
+import argparse
 import os
 
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
 
 
-def generate_rsa_keys():
-    """RSA-2048ビット鍵ペアを生成してPEM形式で保存"""
+def _generate_private_key(algorithm: str):
+    """アルゴリズムに対応する秘密鍵を生成"""
+    if algorithm == 'RS256':
+        return rsa.generate_private_key(
+            public_exponent=65537, key_size=2048, backend=default_backend()
+        )
+    if algorithm == 'ES256':
+        return ec.generate_private_key(ec.SECP256R1(), backend=default_backend())
+    if algorithm == 'EdDSA':
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f'Unsupported JWT algorithm: {algorithm}')
+
+
+def generate_rsa_keys(algorithm: str = 'RS256'):
+    """JWT署名用の鍵ペア（既定はRSA-2048ビット）を生成してPEM形式で保存"""
 
     # 秘密鍵を生成
-    private_key = rsa.generate_private_key(
-        public_exponent=65537, key_size=2048, backend=default_backend()
-    )
+    private_key = _generate_private_key(algorithm)
 
     # 公開鍵を取得
     public_key = private_key.public_key()
@@ -69,7 +83,7 @@ def generate_rsa_keys():
     with open(public_key_path, 'wb') as f:
         f.write(public_pem)
 
-    print('✓ RSA鍵ペアを生成しました')
+    print(f'✓ {algorithm}用の鍵ペアを生成しました')
     print(f'  秘密鍵: {private_key_path}')
     print(f'  公開鍵: {public_key_path}')
     print()
@@ -83,9 +97,18 @@ def generate_rsa_keys():
     print(f'     export JWT_PUBLIC_KEY=$(cat {public_key_path})')
     print()
     print('  4. .envファイルに設定する場合（改行を\\nに変換）:')
+    print(f'     JWT_ALGORITHM={algorithm}')
     print('     JWT_PRIVATE_KEY=<改行を\\nに変換した秘密鍵>')
     print('     JWT_PUBLIC_KEY=<改行を\\nに変換した公開鍵>')
 
 
 if __name__ == '__main__':
-    generate_rsa_keys()
+    parser = argparse.ArgumentParser(description='JWT署名用の鍵ペアを生成します')
+    parser.add_argument(
+        '--algorithm',
+        choices=['RS256', 'ES256', 'EdDSA'],
+        default='RS256',
+        help='JWT_ALGORITHM に設定するアルゴリズム（既定: RS256）',
+    )
+    args = parser.parse_args()
+    generate_rsa_keys(args.algorithm)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+ユーザーCSV一括取り込みスクリプト
+
+CSVを一定件数（--chunk-size）ずつ読み込み、パスワードをプロセスプールで並列に
+bcryptハッシュ化して、チャンクごとに1文の INSERT ... RETURNING で書き込みます
+（--upsert の場合は ON CONFLICT (login_id) DO UPDATE）。
+メモリに保持するのは書き込み中のチャンクとハッシュ化中の次のチャンクだけなので、
+ファイルサイズによらず一定です。
+
+CSVの形式（1行目はヘッダー。email, name は省略可）:
+    login_id,password,email,name
+    taro,plain-password,taro@example.com,山田太郎
+
+使用方法:
+    python scripts/import_users.py users.csv [--upsert] [--chunk-size 1000] [--workers 8]
+
+接続先とbcryptコストはアプリと同じ設定（環境変数 / .env）から読み込みます。
+チャンクごとにコミットするため、途中で失敗した場合はそれまでのチャンクは取り込み済みです。
+--upsert を指定すると、同じファイルで再実行しても結果は変わりません。
+"""
+
+import argparse
+import asyncio
+import csv
+import functools
+import itertools
+import os
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import TextIO
+
+from sqlalchemy.exc import IntegrityError
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.config import get_settings  # noqa: E402
+from app.domain.entities.user import User  # noqa: E402
+from app.infrastructure.db.repositories.user_repository_impl import (  # noqa: E402
+    UserRepositoryImpl,
+)
+from app.infrastructure.db.session import dispose_engine_registry  # noqa: E402
+from app.infrastructure.db.unit_of_work import SQLAlchemyUnitOfWork  # noqa: E402
+from app.infrastructure.security.bcrypt_calibration import (  # noqa: E402
+    apply_bcrypt_rounds,
+    configure_bcrypt_rounds,
+)
+from app.infrastructure.security.password_hasher import pwd_context  # noqa: E402
+
+REQUIRED_COLUMNS = ('login_id', 'password')
+
+
+def _init_worker(rounds: int) -> None:
+    """ワーカープロセスのbcryptコストを親プロセスと揃える"""
+    apply_bcrypt_rounds(rounds)
+
+
+def _hash_password(plain_password: str) -> str:
+    return pwd_context.hash(plain_password)
+
+
+def read_rows(file: TextIO) -> Iterator[dict[str, str]]:
+    """CSVを1行ずつ読み込む（必須列・必須値がない場合は終了する）"""
+    reader = csv.DictReader(file)
+    missing = [
+        column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])
+    ]
+    if missing:
+        raise SystemExit(f'CSVに必須の列がありません: {", ".join(missing)}')
+    for row in reader:
+        if not row.get('login_id') or not row.get('password'):
+            raise SystemExit(f'{reader.line_num}行目: login_id と password は必須です')
+        yield row
+
+
+def chunked(rows: Iterable[dict[str, str]], size: int) -> Iterator[list[dict[str, str]]]:
+    """size 件ずつのリストに分ける"""
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _to_users(chunk: list[dict[str, str]], hashed_passwords: Iterable[str]) -> list[User]:
+    return [
+        User(
+            id=0,
+            login_id=row['login_id'],
+            password=hashed_password,
+            email=row.get('email') or None,
+            name=row.get('name') or None,
+        )
+        for row, hashed_password in zip(chunk, hashed_passwords, strict=True)
+    ]
+
+
+def hashed_chunks(
+    chunks: Iterable[list[dict[str, str]]], executor: Executor, workers: int
+) -> Iterator[list[User]]:
+    """
+    チャンクごとにパスワードをハッシュ化してユーザーエンティティのリストを返す
+
+    次のチャンクのハッシュ化を投入してから前のチャンクを返すため、
+    呼び出し側がDBに書き込んでいる間も次のチャンクのハッシュ化が進む。
+    """
+    pending = None
+    for chunk in chunks:
+        hashed_passwords = executor.map(
+            _hash_password,
+            [row['password'] for row in chunk],
+            chunksize=max(1, len(chunk) // (workers * 4)),
+        )
+        if pending is not None:
+            yield _to_users(*pending)
+        pending = (chunk, hashed_passwords)
+    if pending is not None:
+        yield _to_users(*pending)
+
+
+def _write_chunk(uow: SQLAlchemyUnitOfWork, users: list[User], upsert: bool) -> None:
+    repository = UserRepositoryImpl(uow.session)
+    if upsert:
+        repository.upsert_many(users)
+    else:
+        repository.create_many(users)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ユーザーをCSVから一括で取り込みます')
+    parser.add_argument('csv_path', type=Path, help='取り込むCSVファイル')
+    parser.add_argument(
+        '--upsert', action='store_true', help='既存のログインIDのユーザーを更新する'
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=1000, help='1回の書き込みでまとめる件数'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=None, help='ハッシュ化のプロセス数（既定: CPU数）'
+    )
+    args = parser.parse_args()
+
+    rounds = configure_bcrypt_rounds(get_settings())
+    workers = args.workers or os.cpu_count() or 1
+    call_site = 'import_users.upsert_many' if args.upsert else 'import_users.create_many'
+    print(
+        f'{args.csv_path} を取り込みます '
+        f'(chunk_size={args.chunk_size}, workers={workers}, bcrypt_rounds={rounds})'
+    )
+
+    imported = 0
+    started = time.perf_counter()
+    try:
+        with (
+            args.csv_path.open(newline='', encoding='utf-8-sig') as file,
+            ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(rounds,)
+            ) as executor,
+            SQLAlchemyUnitOfWork() as uow,
+        ):
+            chunks = chunked(read_rows(file), args.chunk_size)
+            for users in hashed_chunks(chunks, executor, workers):
+                uow.run_in_transaction(
+                    functools.partial(_write_chunk, users=users, upsert=args.upsert),
+                    call_site=call_site,
+                )
+                imported += len(users)
+                elapsed = time.perf_counter() - started
+                print(
+                    f'  {imported} 件 ({imported / elapsed:.0f} 件/秒)', file=sys.stderr
+                )
+    except IntegrityError as e:
+        raise SystemExit(
+            f'ログインIDが重複しています（既存ユーザーを更新する場合は --upsert を指定）: '
+            f'{e.orig}\n{imported} 件まで取り込み済みです'
+        ) from e
+    finally:
+        asyncio.run(dispose_engine_registry())
+
+    elapsed = time.perf_counter() - started
+    print(f'{imported} 件を {elapsed:.1f} 秒で取り込みました')
+
+
+if __name__ == '__main__':
+    main()
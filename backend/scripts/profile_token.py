@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+プロファイルを要求するヘッダーの値の発行スクリプト
+
+PROFILING_SECRET で署名した有効期限付きの値を表示します。
+この値をヘッダーに付けたリクエストだけがプロファイルされ、結果は
+PROFILING_DIR（既定は app/logs/profiles）に保存されます。
+
+使用方法:
+    python scripts/profile_token.py [--ttl 3600] [--secret ...]
+
+    curl -H "X-Profile: <表示された値>" -i http://localhost:8000/...
+    # レスポンスの X-Profile-Id が保存したファイル名です（speedscope で開けます）
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.infrastructure.profiling.profile_token import (  # noqa: E402
+    DEFAULT_MAX_TTL_SECONDS,
+    sign_profile_token,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='プロファイルを要求するヘッダーの値を発行します'
+    )
+    parser.add_argument(
+        '--ttl', type=int, default=3600, help='有効期間（秒。最大は24時間）'
+    )
+    parser.add_argument(
+        '--secret', default='', help='署名の鍵（省略時は設定の PROFILING_SECRET）'
+    )
+    args = parser.parse_args()
+
+    secret = args.secret
+    if not secret:
+        from app.config import get_settings
+
+        secret = get_settings().profiling_secret
+    if not secret:
+        parser.error('PROFILING_SECRET が設定されていません')
+    if not 0 < args.ttl <= DEFAULT_MAX_TTL_SECONDS:
+        parser.error(f'--ttl は 1〜{DEFAULT_MAX_TTL_SECONDS} 秒で指定してください')
+
+    print(sign_profile_token(secret, int(time.time()) + args.ttl))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,13 @@
 """AuthUsecaseのテスト"""
 
 
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 from fastapi import HTTPException
 
+from app.application.interfaces.rate_limiter import ILoginRateLimiter
+from app.application.interfaces.unit_of_work import IAsyncUnitOfWork, IUnitOfWork
 from app.application.schemas.auth_schemas import (
     LoginInputDTO,
     LoginOutputDTO,
@@ -11,12 +15,14 @@ from app.application.schemas.auth_schemas import (
     StatusOutputDTO,
 )
 from app.application.use_cases.auth_usecase import AuthUsecase
+from app.domain.entities.user import User
+from app.domain.repositories.user_repository import IAsyncUserRepository
 
 
 class TestAuthUsecase:
     """AuthUsecaseのテストクラス"""
 
-    def test_login_success(self, mock_security_service):
+    async def test_login_success(self, mock_security_service):
         """ログイン成功のテスト"""
         # モックの設定
         mock_security_service.create_access_token.return_value = 'test_token_12345'
@@ -28,7 +34,7 @@ class TestAuthUsecase:
         input_dto = LoginInputDTO(login_id='admin', password='pass')
 
         # テスト実行
-        result = usecase.login(input_dto)
+        result = await usecase.login(input_dto)
 
         # 検証
         assert isinstance(result, LoginOutputDTO)
@@ -38,7 +44,7 @@ class TestAuthUsecase:
         # モックが正しく呼ばれたか確認
         mock_security_service.create_access_token.assert_called_once_with(user_id=1)
 
-    def test_login_failure_wrong_login_id(self, mock_security_service):
+    async def test_login_failure_wrong_login_id(self, mock_security_service):
         """ログイン失敗のテスト（間違ったログインID）"""
         # Usecaseのインスタンス作成
         usecase = AuthUsecase(security_service=mock_security_service)
@@ -48,7 +54,7 @@ class TestAuthUsecase:
 
         # テスト実行
         with pytest.raises(HTTPException) as exc_info:
-            usecase.login(input_dto)
+            await usecase.login(input_dto)
 
         # 検証
         assert exc_info.value.status_code == 401
@@ -57,7 +63,7 @@ class TestAuthUsecase:
         # トークンは生成されないはず
         mock_security_service.create_access_token.assert_not_called()
 
-    def test_login_failure_wrong_password(self, mock_security_service):
+    async def test_login_failure_wrong_password(self, mock_security_service):
         """ログイン失敗のテスト（間違ったパスワード）"""
         # Usecaseのインスタンス作成
         usecase = AuthUsecase(security_service=mock_security_service)
@@ -67,7 +73,7 @@ class TestAuthUsecase:
 
         # テスト実行
         with pytest.raises(HTTPException) as exc_info:
-            usecase.login(input_dto)
+            await usecase.login(input_dto)
 
         # 検証
         assert exc_info.value.status_code == 401
@@ -76,7 +82,7 @@ class TestAuthUsecase:
         # トークンは生成されないはず
         mock_security_service.create_access_token.assert_not_called()
 
-    def test_login_failure_both_wrong(self, mock_security_service):
+    async def test_login_failure_both_wrong(self, mock_security_service):
         """ログイン失敗のテスト（両方間違っている）"""
         # Usecaseのインスタンス作成
         usecase = AuthUsecase(security_service=mock_security_service)
@@ -86,7 +92,7 @@ class TestAuthUsecase:
 
         # テスト実行
         with pytest.raises(HTTPException) as exc_info:
-            usecase.login(input_dto)
+            await usecase.login(input_dto)
 
         # 検証
         assert exc_info.value.status_code == 401
@@ -103,6 +109,17 @@ class TestAuthUsecase:
         assert isinstance(result, LogoutOutputDTO)
         assert result.message == 'ログアウトしました'
 
+    def test_logout_revokes_access_token(self, mock_security_service):
+        """ログアウト時にアクセストークンを失効させる"""
+        usecase = AuthUsecase(security_service=mock_security_service)
+
+        result = usecase.logout(access_token='test_token_12345')
+
+        assert result.message == 'ログアウトしました'
+        mock_security_service.revoke_access_token.assert_called_once_with(
+            'test_token_12345'
+        )
+
     def test_get_auth_status(self, mock_security_service):
         """認証状態取得のテスト"""
         # Usecaseのインスタンス作成
@@ -117,7 +134,7 @@ class TestAuthUsecase:
         assert result.is_authenticated is True
         assert result.user_id == user_id
 
-    def test_login_with_custom_token(self, mock_security_service):
+    async def test_login_with_custom_token(self, mock_security_service):
         """カスタムトークンでのログインテスト"""
         # モックの設定（異なるトークン）
         custom_token = 'custom_jwt_token_xyz'
@@ -130,8 +147,215 @@ class TestAuthUsecase:
         input_dto = LoginInputDTO(login_id='admin', password='pass')
 
         # テスト実行
-        result = usecase.login(input_dto)
+        result = await usecase.login(input_dto)
 
         # 検証
         assert result.access_token == custom_token
         assert result.user_id == 1
+
+
+class TestAuthUsecaseWithRepository:
+    """DB認証を使用するAuthUsecaseのテストクラス"""
+
+    @pytest.fixture
+    def stored_user(self):
+        return User(id=10, login_id='taro', password='hashed_password')
+
+    async def test_login_success(
+        self, mock_security_service, mock_user_repository, stored_user
+    ):
+        """正しいパスワードでログインできる（検証は非同期版を使用）"""
+        mock_user_repository.get_by_login_id.return_value = stored_user
+        mock_security_service.verify_password_async.return_value = True
+        mock_security_service.needs_rehash.return_value = False
+        mock_security_service.create_access_token.return_value = 'db_token'
+        usecase = AuthUsecase(
+            security_service=mock_security_service,
+            user_repository=mock_user_repository,
+        )
+
+        result = await usecase.login(LoginInputDTO(login_id='taro', password='secret'))
+
+        assert result.access_token == 'db_token'
+        assert result.user_id == 10
+        mock_security_service.verify_password_async.assert_awaited_once_with(
+            'secret', 'hashed_password'
+        )
+        mock_security_service.verify_password.assert_not_called()
+        mock_user_repository.update_password.assert_not_called()
+
+    async def test_login_rehashes_outdated_password(
+        self, mock_security_service, mock_user_repository, stored_user
+    ):
+        """コストが古いハッシュはログイン成功時に再ハッシュして保存する"""
+        mock_user_repository.get_by_login_id.return_value = stored_user
+        mock_security_service.verify_password_async.return_value = True
+        mock_security_service.needs_rehash.return_value = True
+        mock_security_service.hash_password_async.return_value = 'new_hash'
+        mock_security_service.create_access_token.return_value = 'db_token'
+        mock_unit_of_work = MagicMock(spec=IUnitOfWork)
+        mock_unit_of_work.run_in_transaction.side_effect = (
+            lambda fn, call_site=None: fn(mock_unit_of_work)
+        )
+        usecase = AuthUsecase(
+            security_service=mock_security_service,
+            user_repository=mock_user_repository,
+            unit_of_work=mock_unit_of_work,
+        )
+
+        await usecase.login(LoginInputDTO(login_id='taro', password='secret'))
+
+        mock_security_service.hash_password_async.assert_awaited_once_with('secret')
+        # 他の列は書き込まず、読み込んだ時点のハッシュを条件にパスワードだけを更新する
+        mock_user_repository.update_password.assert_called_once_with(
+            10, 'hashed_password', 'new_hash'
+        )
+        mock_user_repository.update.assert_not_called()
+        mock_unit_of_work.run_in_transaction.assert_called_once()
+
+    async def test_login_ends_read_transaction_before_password_check(
+        self, mock_security_service, mock_user_repository, stored_user
+    ):
+        """bcryptの検証の前に読み取りのトランザクションを終え、接続を保持しない"""
+        mock_user_repository.get_by_login_id.return_value = stored_user
+        mock_unit_of_work = MagicMock(spec=IUnitOfWork)
+
+        async def verify_password_async(plain_password, hashed_password):
+            mock_unit_of_work.rollback.assert_called_once()
+            return True
+
+        mock_security_service.verify_password_async.side_effect = verify_password_async
+        mock_security_service.needs_rehash.return_value = False
+        mock_security_service.create_access_token.return_value = 'db_token'
+        usecase = AuthUsecase(
+            security_service=mock_security_service,
+            user_repository=mock_user_repository,
+            unit_of_work=mock_unit_of_work,
+        )
+
+        await usecase.login(LoginInputDTO(login_id='taro', password='secret'))
+
+        mock_security_service.verify_password_async.assert_awaited_once()
+
+    async def test_login_skips_rehash_when_password_changed(
+        self, mock_security_service, mock_user_repository, stored_user
+    ):
+        """再ハッシュの間にパスワードが変更されていた場合は保存せずにログインを続ける"""
+        mock_user_repository.get_by_login_id.return_value = stored_user
+        mock_user_repository.update_password.return_value = False
+        mock_security_service.verify_password_async.return_value = True
+        mock_security_service.needs_rehash.return_value = True
+        mock_security_service.hash_password_async.return_value = 'new_hash'
+        mock_security_service.create_access_token.return_value = 'db_token'
+        usecase = AuthUsecase(
+            security_service=mock_security_service,
+            user_repository=mock_user_repository,
+        )
+
+        result = await usecase.login(LoginInputDTO(login_id='taro', password='secret'))
+
+        assert result.access_token == 'db_token'
+        mock_user_repository.update_password.assert_called_once()
+
+    async def test_login_succeeds_when_rehash_fails(
+        self, mock_security_service, mock_user_repository, stored_user
+    ):
+        """再ハッシュの保存に失敗してもログインは成功する"""
+        mock_user_repository.get_by_login_id.return_value = stored_user
+        mock_user_repository.update_password.side_effect = RuntimeError('db down')
+        mock_security_service.verify_password_async.return_value = True
+        mock_security_service.needs_rehash.return_value = True
+        mock_security_service.create_access_token.return_value = 'db_token'
+        usecase = AuthUsecase(
+            security_service=mock_security_service,
+            user_repository=mock_user_repository,
+        )
+
+        result = await usecase.login(LoginInputDTO(login_id='taro', password='secret'))
+
+        assert result.access_token == 'db_token'
+
+    async def test_login_unknown_user(self, mock_security_service, mock_user_repository):
+        """存在しないユーザーの場合はハッシュ検証を行わず401"""
+        mock_user_repository.get_by_login_id.return_value = None
+        usecase = AuthUsecase(
+            security_service=mock_security_service,
+            user_repository=mock_user_repository,
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await usecase.login(LoginInputDTO(login_id='nobody', password='secret'))
+
+        assert exc_info.value.status_code == 401
+        mock_security_service.verify_password_async.assert_not_awaited()
+
+    async def test_login_wrong_password(
+        self, mock_security_service, mock_user_repository, stored_user
+    ):
+        """パスワードが一致しない場合は401"""
+        mock_user_repository.get_by_login_id.return_value = stored_user
+        mock_security_service.verify_password_async.return_value = False
+        usecase = AuthUsecase(
+            security_service=mock_security_service,
+            user_repository=mock_user_repository,
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await usecase.login(LoginInputDTO(login_id='taro', password='wrong'))
+
+        assert exc_info.value.status_code == 401
+        mock_security_service.create_access_token.assert_not_called()
+
+    async def test_login_rate_limited_before_password_check(
+        self, mock_security_service, mock_user_repository
+    ):
+        """試行回数の上限を超えた場合はユーザー取得・パスワード検証の前に429"""
+        rate_limiter = MagicMock(spec=ILoginRateLimiter)
+        rate_limiter.check.return_value = 2.5
+        usecase = AuthUsecase(
+            security_service=mock_security_service,
+            user_repository=mock_user_repository,
+            rate_limiter=rate_limiter,
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await usecase.login(
+                LoginInputDTO(login_id='taro', password='wrong', client_ip='203.0.113.1')
+            )
+
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers['Retry-After'] == '3'
+        rate_limiter.check.assert_called_once_with('203.0.113.1', 'taro')
+        mock_user_repository.get_by_login_id.assert_not_called()
+        mock_security_service.verify_password_async.assert_not_awaited()
+
+    async def test_login_with_async_repository(self, mock_security_service, stored_user):
+        """非同期版のリポジトリ・UoWはスレッドプールを使わずにawaitする"""
+        async_repository = AsyncMock(spec=IAsyncUserRepository)
+        async_repository.get_by_login_id.return_value = stored_user
+        async_unit_of_work = AsyncMock(spec=IAsyncUnitOfWork)
+
+        async def run_in_transaction(fn, call_site=None):
+            return await fn(async_unit_of_work)
+
+        async_unit_of_work.run_in_transaction.side_effect = run_in_transaction
+        mock_security_service.verify_password_async.return_value = True
+        mock_security_service.needs_rehash.return_value = True
+        mock_security_service.hash_password_async.return_value = 'new_hash'
+        mock_security_service.create_access_token.return_value = 'db_token'
+        usecase = AuthUsecase(
+            security_service=mock_security_service,
+            user_repository=async_repository,
+            unit_of_work=async_unit_of_work,
+        )
+
+        result = await usecase.login(LoginInputDTO(login_id='taro', password='secret'))
+
+        assert result.user_id == 10
+        async_repository.get_by_login_id.assert_awaited_once_with('taro')
+        # 読み取りのトランザクションは検証の前に終え、再ハッシュは新しいトランザクションで保存する
+        async_unit_of_work.rollback.assert_awaited_once()
+        async_repository.update_password.assert_awaited_once_with(
+            10, 'hashed_password', 'new_hash'
+        )
+        async_unit_of_work.run_in_transaction.assert_awaited_once()
@@ -32,6 +32,11 @@ class TestUserRepositoryInterface:
         assert hasattr(IUserRepository, 'update')
         assert callable(IUserRepository.update)
 
+    def test_has_update_password_method(self):
+        """update_passwordメソッドが定義されている"""
+        assert hasattr(IUserRepository, 'update_password')
+        assert callable(IUserRepository.update_password)
+
     def test_has_delete_method(self):
         """deleteメソッドが定義されている"""
         assert hasattr(IUserRepository, 'delete')
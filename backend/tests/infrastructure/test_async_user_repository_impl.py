@@ -0,0 +1,155 @@
+"""AsyncUserRepositoryImpl・AsyncSQLAlchemyUnitOfWorkのテスト"""
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.domain.entities.user import User
+from app.infrastructure.db.async_unit_of_work import AsyncSQLAlchemyUnitOfWork
+from app.infrastructure.db.models.base import Base
+from app.infrastructure.db.repositories.async_user_repository_impl import (
+    AsyncUserRepositoryImpl,
+)
+from app.infrastructure.db.retry import RetryPolicy
+
+
+class _DeadlockError(Exception):
+    sqlstate = '40P01'
+
+
+@pytest.fixture
+async def async_session_factory():
+    """テスト用の非同期セッション（SQLiteインメモリ）"""
+    engine = create_async_engine(
+        'sqlite+aiosqlite:///:memory:', poolclass=StaticPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    await engine.dispose()
+
+
+def _new_user(login_id: str = 'taro') -> User:
+    return User(id=0, login_id=login_id, password='hashed_password', name='Taro')
+
+
+class TestAsyncUserRepositoryImpl:
+    """AsyncUserRepositoryImplのテストクラス"""
+
+    async def test_create_and_get(self, async_session_factory):
+        """作成したユーザーをログインID・IDで取得できる"""
+        async with AsyncSQLAlchemyUnitOfWork(async_session_factory) as uow:
+            repository = AsyncUserRepositoryImpl(uow.session)
+            created = await repository.create(_new_user())
+            await uow.commit()
+
+        async with AsyncSQLAlchemyUnitOfWork(async_session_factory) as uow:
+            repository = AsyncUserRepositoryImpl(uow.session)
+            by_login_id = await repository.get_by_login_id('taro')
+            by_id = await repository.get_by_id(created.id)
+
+        assert by_login_id.id == created.id
+        assert by_id.login_id == 'taro'
+
+    async def test_get_non_existing_user(self, async_session_factory):
+        """存在しないユーザーの場合はNone"""
+        async with AsyncSQLAlchemyUnitOfWork(async_session_factory) as uow:
+            repository = AsyncUserRepositoryImpl(uow.session)
+
+            assert await repository.get_by_login_id('nobody') is None
+            assert await repository.get_by_id(999) is None
+
+    async def test_update_and_delete(self, async_session_factory):
+        """ユーザーを更新・削除できる"""
+        async with AsyncSQLAlchemyUnitOfWork(async_session_factory) as uow:
+            repository = AsyncUserRepositoryImpl(uow.session)
+            created = await repository.create(_new_user())
+
+            updated = await repository.update(
+                created.model_copy(update={'password': 'new_hash'})
+            )
+            assert updated.password == 'new_hash'
+
+            assert await repository.delete(created.id) is True
+            assert await repository.delete(created.id) is False
+
+    async def test_update_password_only_when_unchanged(self, async_session_factory):
+        """パスワードは読み込んだ時点のハッシュのままの場合だけ更新する"""
+        async with AsyncSQLAlchemyUnitOfWork(async_session_factory) as uow:
+            repository = AsyncUserRepositoryImpl(uow.session)
+            created = await repository.create(_new_user())
+
+            assert (
+                await repository.update_password(created.id, 'hashed_password', 'new')
+            ) is True
+            assert (
+                await repository.update_password(created.id, 'hashed_password', 'x')
+            ) is False
+            assert (await repository.get_by_id(created.id)).password == 'new'
+
+    async def test_update_non_existing_user_raises(self, async_session_factory):
+        """存在しないユーザーの更新はValueError"""
+        async with AsyncSQLAlchemyUnitOfWork(async_session_factory) as uow:
+            repository = AsyncUserRepositoryImpl(uow.session)
+
+            with pytest.raises(ValueError):
+                await repository.update(_new_user().model_copy(update={'id': 999}))
+
+    async def test_create_many_and_upsert_many(self, async_session_factory):
+        """まとめて作成・upsertできる"""
+        async with AsyncSQLAlchemyUnitOfWork(async_session_factory) as uow:
+            repository = AsyncUserRepositoryImpl(uow.session)
+            created = await repository.create_many(
+                [_new_user('bulk-1'), _new_user('bulk-2')]
+            )
+            upserted = await repository.upsert_many(
+                [
+                    _new_user('bulk-2').model_copy(update={'password': 'new_hash'}),
+                    _new_user('bulk-3'),
+                ]
+            )
+
+        assert [user.login_id for user in created] == ['bulk-1', 'bulk-2']
+        assert upserted[0].id == created[1].id
+        assert upserted[0].password == 'new_hash'
+        assert upserted[1].login_id == 'bulk-3'
+
+
+class TestAsyncSQLAlchemyUnitOfWork:
+    """AsyncSQLAlchemyUnitOfWorkのテストクラス"""
+
+    async def test_exception_rolls_back(self, async_session_factory):
+        """例外が発生した場合はコミットされない"""
+        with pytest.raises(RuntimeError):
+            async with AsyncSQLAlchemyUnitOfWork(async_session_factory) as uow:
+                await AsyncUserRepositoryImpl(uow.session).create(_new_user('jiro'))
+                raise RuntimeError('boom')
+
+        async with AsyncSQLAlchemyUnitOfWork(async_session_factory) as uow:
+            assert await AsyncUserRepositoryImpl(uow.session).get_by_login_id('jiro') is None
+
+    async def test_run_in_transaction_replays_on_deadlock(self, async_session_factory):
+        """デッドロック時はトランザクション全体を再実行してコミットする"""
+        calls = []
+
+        async def create_user(uow):
+            calls.append(1)
+            user = await AsyncUserRepositoryImpl(uow.session).create(
+                _new_user(f'saburo-{len(calls)}')
+            )
+            if len(calls) == 1:
+                raise OperationalError('INSERT ...', {}, _DeadlockError())
+            return user
+
+        uow = AsyncSQLAlchemyUnitOfWork(
+            async_session_factory, retry_policy=RetryPolicy(base_delay=0.001)
+        )
+        async with uow:
+            await uow.run_in_transaction(create_user)
+
+        assert len(calls) == 2
+        async with AsyncSQLAlchemyUnitOfWork(async_session_factory) as uow:
+            repository = AsyncUserRepositoryImpl(uow.session)
+            assert await repository.get_by_login_id('saburo-1') is None
+            assert await repository.get_by_login_id('saburo-2') is not None
@@ -0,0 +1,139 @@
+"""bcryptコスト調整のテスト"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from app.config import get_settings
+from app.infrastructure.security import bcrypt_calibration
+from app.infrastructure.security.bcrypt_calibration import (
+    BCRYPT_ROUNDS,
+    calibrate_bcrypt_rounds,
+    configure_bcrypt_rounds,
+    current_bcrypt_rounds,
+    hash_rounds,
+    is_weaker_than_current,
+    pin_calibrated_bcrypt_rounds,
+)
+from app.infrastructure.security.password_hasher import pwd_context
+
+
+def _fake_timings(base_ms: float):
+    """rounds=10 で base_ms、以降コストが1増えるごとに2倍になる計測結果"""
+    return lambda rounds, samples: base_ms * 2 ** (rounds - 10)
+
+
+@pytest.fixture(autouse=True)
+def restore_default_rounds():
+    yield
+    bcrypt_calibration.apply_bcrypt_rounds(bcrypt_calibration.DEFAULT_ROUNDS)
+
+
+class TestCalibrateBcryptRounds:
+    """calibrate_bcrypt_roundsのテストクラス"""
+
+    def test_picks_highest_rounds_within_budget(self):
+        """予算に収まる最大のコストを選ぶ"""
+        with patch.object(bcrypt_calibration, '_measure_hash_ms', _fake_timings(40)):
+            result = calibrate_bcrypt_rounds(target_ms=200)
+
+        # 10:40ms, 11:80ms, 12:160ms, 13:320ms
+        assert result.rounds == 12
+        assert result.hash_ms == 160
+        assert 14 not in result.measurements
+
+    def test_falls_back_to_min_rounds_on_slow_cpu(self):
+        """最小コストでも予算を超える場合は最小コストを選ぶ"""
+        with patch.object(bcrypt_calibration, '_measure_hash_ms', _fake_timings(500)):
+            result = calibrate_bcrypt_rounds(target_ms=200)
+
+        assert result.rounds == 10
+
+    def test_respects_max_rounds(self):
+        """上限を超えるコストは選ばない"""
+        with patch.object(bcrypt_calibration, '_measure_hash_ms', _fake_timings(0.1)):
+            result = calibrate_bcrypt_rounds(target_ms=10_000, max_rounds=13)
+
+        assert result.rounds == 13
+
+
+class TestConfigureBcryptRounds:
+    """configure_bcrypt_roundsのテストクラス"""
+
+    def test_explicit_rounds_are_applied(self):
+        """BCRYPT_ROUNDSの指定が優先され、needs_updateの基準になる"""
+        old_hash = pwd_context.hash('secret', rounds=4)
+        settings = get_settings().model_copy(update={'bcrypt_rounds': 5})
+
+        assert configure_bcrypt_rounds(settings) == 5
+
+        assert BCRYPT_ROUNDS.value() == 5
+        assert current_bcrypt_rounds() == 5
+        assert pwd_context.needs_update(old_hash) is True
+        assert pwd_context.needs_update(pwd_context.hash('secret')) is False
+
+    def test_does_not_measure_in_worker(self):
+        """起動時の調整が有効でもワーカー（lifespan）では計測せず既定値を使う"""
+        settings = get_settings().model_copy(
+            update={'bcrypt_rounds': 0, 'bcrypt_calibrate_on_startup': True}
+        )
+
+        with patch.object(bcrypt_calibration, '_measure_hash_ms') as measure:
+            rounds = configure_bcrypt_rounds(settings)
+
+        measure.assert_not_called()
+        assert rounds == bcrypt_calibration.DEFAULT_ROUNDS
+
+
+class TestPinCalibratedBcryptRounds:
+    """pin_calibrated_bcrypt_roundsのテストクラス"""
+
+    def test_calibration_is_pinned_to_env(self):
+        """計測結果を BCRYPT_ROUNDS に設定し、fork 後のワーカーが同じ値を使う"""
+        settings = get_settings().model_copy(
+            update={
+                'bcrypt_rounds': 0,
+                'bcrypt_calibrate_on_startup': True,
+                'bcrypt_target_ms': 100,
+            }
+        )
+
+        with (
+            patch.dict(os.environ),
+            patch.object(bcrypt_calibration, '_measure_hash_ms', _fake_timings(30)),
+        ):
+            calibration = pin_calibrated_bcrypt_rounds(settings)
+            pinned = os.environ['BCRYPT_ROUNDS']
+
+        assert calibration.rounds == 11
+        assert pinned == '11'
+
+    def test_explicit_rounds_are_not_measured(self):
+        """BCRYPT_ROUNDS が指定されている場合は計測しない"""
+        settings = get_settings().model_copy(
+            update={'bcrypt_rounds': 12, 'bcrypt_calibrate_on_startup': True}
+        )
+
+        with patch.object(bcrypt_calibration, '_measure_hash_ms') as measure:
+            assert pin_calibrated_bcrypt_rounds(settings) is None
+
+        measure.assert_not_called()
+
+
+class TestIsWeakerThanCurrent:
+    """is_weaker_than_currentのテストクラス"""
+
+    def test_only_lower_rounds_are_weaker(self):
+        """現在のコストより低いハッシュだけを再ハッシュの対象にする（高いコストは下げない）"""
+        bcrypt_calibration.apply_bcrypt_rounds(5)
+
+        assert is_weaker_than_current(pwd_context.hash('secret', rounds=4)) is True
+        assert is_weaker_than_current(pwd_context.hash('secret', rounds=5)) is False
+        assert is_weaker_than_current(pwd_context.hash('secret', rounds=6)) is False
+
+    def test_hash_rounds(self):
+        """bcryptハッシュのコストを読み取る（bcryptでない場合はNone）"""
+        assert hash_rounds(pwd_context.hash('secret', rounds=4)) == 4
+        assert hash_rounds('not-a-hash') is None
+        assert is_weaker_than_current('not-a-hash') is False
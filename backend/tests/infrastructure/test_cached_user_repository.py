@@ -0,0 +1,204 @@
+"""ユーザーリポジトリのキャッシュのテスト"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.domain.entities.user import User
+from app.domain.repositories.user_repository import IUserRepository
+from app.infrastructure.db.repositories.cached_user_repository import (
+    CachedUserRepository,
+    UserEntityCache,
+)
+from app.infrastructure.db.repositories.user_repository_impl import UserRepositoryImpl
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _user(user_id: int = 1, login_id: str = 'taro') -> User:
+    return User(id=user_id, login_id=login_id, password='hashed_password')
+
+
+@pytest.fixture
+def clock():
+    return _FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return UserEntityCache(
+        max_entries=100, ttl_seconds=30, negative_ttl_seconds=5, clock=clock
+    )
+
+
+@pytest.fixture
+def session_factory(test_db_engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=test_db_engine)
+
+
+class TestUserEntityCache:
+    """UserEntityCacheのテストクラス"""
+
+    def test_user_is_cached_by_id_and_login_id(self, cache):
+        """ユーザーはIDとログインIDの両方のキーで登録される"""
+        cache.put(('id', 1), _user(), cache.generation())
+
+        assert cache.get(('id', 1)) == (True, _user())
+        assert cache.get(('login_id', 'taro')) == (True, _user())
+        assert cache.stats().hits == 2
+
+    def test_entries_expire_after_ttl(self, cache, clock):
+        """TTLを過ぎたエントリは返さない（存在しない結果はより短いTTL）"""
+        cache.put(('id', 1), _user(), cache.generation())
+        cache.put(('login_id', 'nobody'), None, cache.generation())
+
+        clock.now += 10
+        assert cache.get(('login_id', 'nobody')) == (False, None)
+        assert cache.get(('id', 1))[0] is True
+
+        clock.now += 30
+        assert cache.get(('id', 1)) == (False, None)
+
+    def test_least_recently_used_entry_is_evicted(self, clock):
+        """上限を超えた場合は最も使われていないエントリを追い出す"""
+        cache = UserEntityCache(max_entries=4, clock=clock)
+        cache.put(('id', 1), _user(1, 'taro'), cache.generation())
+        cache.put(('id', 2), _user(2, 'jiro'), cache.generation())
+        cache.get(('id', 1))
+        cache.get(('login_id', 'taro'))
+
+        cache.put(('id', 3), _user(3, 'saburo'), cache.generation())
+
+        assert cache.get(('id', 2))[0] is False
+        assert cache.get(('id', 1))[0] is True
+        assert cache.stats().evictions == 2
+
+    def test_put_is_skipped_when_invalidated_during_load(self, cache):
+        """読み込み中に無効化された場合は古い結果を登録しない"""
+        generation = cache.generation()
+        cache.invalidate_user(1, 'taro')
+        cache.put(('id', 1), _user(), generation)
+
+        assert cache.get(('id', 1)) == (False, None)
+
+    def test_invalidate_removes_previous_login_id(self, cache):
+        """ログインIDを変更した場合は変更前のログインIDのエントリも削除する"""
+        cache.put(('id', 1), _user(1, 'taro'), cache.generation())
+
+        cache.invalidate_user(1, 'taro_new')
+
+        assert cache.get(('login_id', 'taro')) == (False, None)
+        assert cache.get(('id', 1)) == (False, None)
+
+    def test_returned_user_is_a_copy(self, cache):
+        """取得したエンティティを変更してもキャッシュには影響しない"""
+        cache.put(('id', 1), _user(), cache.generation())
+
+        _, user = cache.get(('id', 1))
+        user.password = 'changed'
+
+        assert cache.get(('id', 1))[1].password == 'hashed_password'
+
+
+class TestCachedUserRepository:
+    """CachedUserRepositoryのテストクラス"""
+
+    def test_reads_are_served_from_cache(self, cache, db_session):
+        """2回目以降の取得はDBを参照しない（存在しない結果もキャッシュする）"""
+        inner = MagicMock(spec=IUserRepository)
+        inner.get_by_login_id.side_effect = lambda login_id: (
+            _user() if login_id == 'taro' else None
+        )
+        repository = CachedUserRepository(inner, db_session, cache)
+
+        assert repository.get_by_login_id('taro').id == 1
+        assert repository.get_by_login_id('taro').id == 1
+        assert repository.get_by_id(1).login_id == 'taro'
+        assert repository.get_by_login_id('nobody') is None
+        assert repository.get_by_login_id('nobody') is None
+
+        assert inner.get_by_login_id.call_count == 2
+        inner.get_by_id.assert_not_called()
+        assert cache.stats().negative_hits == 1
+
+    def test_update_invalidates_after_commit(self, cache, session_factory):
+        """更新したユーザーのキャッシュはコミット後に削除される"""
+        with session_factory() as session:
+            user = UserRepositoryImpl(session).create(
+                User(id=0, login_id='cached_update', password='old')
+            )
+            session.commit()
+
+        with session_factory() as reader_session:
+            reader = CachedUserRepository(
+                UserRepositoryImpl(reader_session), reader_session, cache
+            )
+            assert reader.get_by_id(user.id).password == 'old'
+
+            with session_factory() as writer_session:
+                writer = CachedUserRepository(
+                    UserRepositoryImpl(writer_session), writer_session, cache
+                )
+                writer.update(user.model_copy(update={'password': 'new'}))
+
+                # 書き込んだトランザクション内では自身の書き込みを読む
+                assert writer.get_by_id(user.id).password == 'new'
+                # コミット前は他のトランザクションにはキャッシュ（コミット済みの値）を返す
+                assert reader.get_by_id(user.id).password == 'old'
+
+                writer_session.commit()
+
+            reader_session.rollback()
+            assert reader.get_by_id(user.id).password == 'new'
+
+    def test_update_password_invalidates_after_commit(self, cache, session_factory):
+        """パスワードを更新したユーザーのキャッシュはコミット後に削除される"""
+        with session_factory() as session:
+            user = UserRepositoryImpl(session).create(
+                User(id=0, login_id='cached_password', password='old')
+            )
+            session.commit()
+
+        with session_factory() as session:
+            repository = CachedUserRepository(UserRepositoryImpl(session), session, cache)
+            assert repository.get_by_login_id('cached_password').password == 'old'
+
+            assert repository.update_password(user.id, 'old', 'new') is True
+            session.commit()
+
+            assert cache.get(('login_id', 'cached_password')) == (False, None)
+            assert repository.get_by_login_id('cached_password').password == 'new'
+
+    def test_rollback_discards_invalidation(self, cache, session_factory):
+        """ロールバックした書き込みではキャッシュを削除しない"""
+        with session_factory() as session:
+            repository = CachedUserRepository(UserRepositoryImpl(session), session, cache)
+            user = repository.create(
+                User(id=0, login_id='cached_rollback', password='old')
+            )
+            session.commit()
+            assert repository.get_by_id(user.id).password == 'old'
+
+            repository.update(user.model_copy(update={'password': 'new'}))
+            session.rollback()
+            session.commit()
+
+        assert cache.get(('id', user.id))[1].password == 'old'
+
+    def test_create_invalidates_negative_entry(self, cache, session_factory):
+        """作成したユーザーは、存在しない結果のキャッシュに隠れない"""
+        with session_factory() as session:
+            repository = CachedUserRepository(UserRepositoryImpl(session), session, cache)
+            assert repository.get_by_login_id('cached_create') is None
+
+            repository.create(User(id=0, login_id='cached_create', password='hashed'))
+            session.commit()
+
+            assert repository.get_by_login_id('cached_create') is not None
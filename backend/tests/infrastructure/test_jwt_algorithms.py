@@ -0,0 +1,88 @@
+"""JWTアルゴリズム実装のテスト"""
+
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jose import JWTError, jwt
+
+from app.infrastructure.security.jwt_algorithms import get_jwt_algorithm
+from app.infrastructure.security.key_ring import build_key_ring
+
+
+def _pem_pair(private_key) -> tuple[str, str]:
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode('utf-8')
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode('utf-8')
+    )
+    return private_pem, public_pem
+
+
+KEY_FACTORIES = {
+    'RS256': lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    'ES256': lambda: ec.generate_private_key(ec.SECP256R1()),
+    'EdDSA': ed25519.Ed25519PrivateKey.generate,
+}
+
+
+class TestJWTAlgorithms:
+    """JWTアルゴリズム実装のテストクラス"""
+
+    @pytest.mark.parametrize('algorithm', ['RS256', 'ES256', 'EdDSA'])
+    def test_sign_and_verify(self, algorithm):
+        """各アルゴリズムで署名・検証できる"""
+        key_ring = build_key_ring(algorithm, *_pem_pair(KEY_FACTORIES[algorithm]()))
+        key = key_ring.signing_key()
+
+        token = key.sign({'user_id': 5, 'exp': int(time.time()) + 60})
+
+        header = jwt.get_unverified_header(token)
+        assert header['alg'] == algorithm
+        assert header['kid'] == key.kid
+        assert key_ring.verification_key(key.kid).verify(token)['user_id'] == 5
+
+    @pytest.mark.parametrize('algorithm', ['RS256', 'ES256', 'EdDSA'])
+    def test_expired_token_raises_jwt_error(self, algorithm):
+        """期限切れのトークンはJWTErrorになる（アルゴリズムによらず同じ例外）"""
+        key_ring = build_key_ring(algorithm, *_pem_pair(KEY_FACTORIES[algorithm]()))
+        key = key_ring.signing_key()
+        token = key.sign({'user_id': 5, 'exp': int(time.time()) - 10})
+
+        with pytest.raises(JWTError):
+            key.verify(token)
+
+    def test_eddsa_rejects_token_signed_by_other_key(self):
+        """別の鍵で署名されたトークンは検証に失敗する"""
+        signer = build_key_ring('EdDSA', *_pem_pair(ed25519.Ed25519PrivateKey.generate()))
+        verifier = build_key_ring(
+            'EdDSA', *_pem_pair(ed25519.Ed25519PrivateKey.generate())
+        )
+        token = signer.signing_key().sign({'user_id': 1, 'exp': int(time.time()) + 60})
+
+        with pytest.raises(JWTError):
+            verifier.verification_key(None).verify(token)
+
+    def test_key_type_mismatch_is_rejected(self):
+        """アルゴリズムに合わない鍵は鍵リング構築時にエラーになる"""
+        with pytest.raises(ValueError):
+            build_key_ring('ES256', *_pem_pair(ed25519.Ed25519PrivateKey.generate()))
+
+    def test_es256_requires_p256_curve(self):
+        """ES256にはP-256以外の曲線を使えない"""
+        with pytest.raises(ValueError):
+            build_key_ring('ES256', *_pem_pair(ec.generate_private_key(ec.SECP384R1())))
+
+    def test_unsupported_algorithm(self):
+        """未対応のアルゴリズムはValueError"""
+        with pytest.raises(ValueError):
+            get_jwt_algorithm('HS256')
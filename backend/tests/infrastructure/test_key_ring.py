@@ -0,0 +1,151 @@
+"""JWTKeyRingのテスト"""
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+
+from app.config import get_settings
+from app.infrastructure.security import key_ring as key_ring_module
+from app.infrastructure.security.key_ring import (
+    build_key_ring,
+    load_key_ring_from_settings,
+    warm_up_key_ring,
+)
+from app.infrastructure.security.security_service_impl import SecurityServiceImpl
+
+
+def _generate_pem_pair() -> tuple[str, str]:
+    """テスト用のRSA鍵ペアをPEM文字列で生成"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode('utf-8')
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode('utf-8')
+    )
+    return private_pem, public_pem
+
+
+@pytest.fixture(scope='module')
+def current_pem_pair():
+    return _generate_pem_pair()
+
+
+@pytest.fixture(scope='module')
+def previous_pem_pair():
+    return _generate_pem_pair()
+
+
+class TestJWTKeyRing:
+    """JWTKeyRingのテストクラス"""
+
+    def test_sign_and_verify_with_active_key(self, current_pem_pair):
+        """アクティブな鍵で署名したトークンを検証できる"""
+        private_pem, public_pem = current_pem_pair
+        key_ring = build_key_ring('RS256', private_pem, public_pem, active_kid='k1')
+
+        key = key_ring.signing_key()
+        token = jwt.encode(
+            {'user_id': 1}, key.signing_key, algorithm='RS256', headers={'kid': key.kid}
+        )
+
+        assert jwt.get_unverified_header(token)['kid'] == 'k1'
+        verifying = key_ring.verification_key('k1')
+        assert jwt.decode(token, verifying.verifying_key, algorithms=['RS256']) == {
+            'user_id': 1
+        }
+
+    def test_escaped_newlines_are_accepted(self, current_pem_pair):
+        """環境変数形式（\\n エスケープ）のPEMを読み込める"""
+        private_pem, public_pem = current_pem_pair
+        key_ring = build_key_ring(
+            'RS256', private_pem.replace('\n', '\\n'), public_pem.replace('\n', '\\n')
+        )
+
+        assert key_ring.signing_key().signing_key is not None
+
+    def test_kid_is_derived_from_public_key(self, current_pem_pair):
+        """kid未指定の場合は公開鍵から安定したkidを導出する"""
+        private_pem, public_pem = current_pem_pair
+
+        first = build_key_ring('RS256', private_pem, public_pem)
+        second = build_key_ring('RS256', private_pem, public_pem)
+
+        assert first.active_kid == second.active_kid
+        assert len(first.active_kid) == 16
+
+    def test_rotated_key_still_verifies(self, current_pem_pair, previous_pem_pair):
+        """ローテーション前の鍵で署名されたトークンをkidで検証できる"""
+        old_private, old_public = previous_pem_pair
+        old_ring = build_key_ring('RS256', old_private, old_public, active_kid='old')
+        old_key = old_ring.signing_key()
+        token = jwt.encode(
+            {'user_id': 2}, old_key.signing_key, algorithm='RS256', headers={'kid': 'old'}
+        )
+
+        private_pem, public_pem = current_pem_pair
+        key_ring = build_key_ring(
+            'RS256',
+            private_pem,
+            public_pem,
+            active_kid='new',
+            verification_keys={'old': old_public},
+        )
+
+        assert key_ring.active_kid == 'new'
+        assert sorted(key_ring.kids) == ['new', 'old']
+        key = key_ring.verification_key('old')
+        assert key.signing_key is None
+        assert jwt.decode(token, key.verifying_key, algorithms=['RS256'])['user_id'] == 2
+
+    def test_unknown_kid_returns_none(self, current_pem_pair):
+        """未登録のkidの場合はNoneを返す"""
+        private_pem, public_pem = current_pem_pair
+        key_ring = build_key_ring('RS256', private_pem, public_pem, active_kid='k1')
+
+        assert key_ring.verification_key('unknown') is None
+
+    def test_missing_kid_falls_back_to_active_key(self, current_pem_pair):
+        """kidを持たない旧トークンはアクティブな鍵で検証する"""
+        private_pem, public_pem = current_pem_pair
+        key_ring = build_key_ring('RS256', private_pem, public_pem, active_kid='k1')
+
+        assert key_ring.verification_key(None).kid == 'k1'
+
+
+
+def test_access_token_verifies_with_settings_key_ring():
+    """アクセストークンは設定の鍵から構築した鍵リング（ヘッダーの kid の鍵）で検証できる"""
+    token = SecurityServiceImpl().create_access_token(user_id=789)
+    key_ring = load_key_ring_from_settings(get_settings())
+
+    key = key_ring.verification_key(jwt.get_unverified_header(token)['kid'])
+    decoded = key.verify(token)
+
+    assert decoded['user_id'] == 789
+    assert 'exp' in decoded
+
+
+def test_warm_up_key_ring_signs_and_verifies(current_pem_pair, monkeypatch):
+    """ウォームアップでは鍵リングを構築し、有効な鍵で署名・検証を一度実行する"""
+    private_pem, public_pem = current_pem_pair
+    key_ring = build_key_ring('RS256', private_pem, public_pem)
+    monkeypatch.setattr(key_ring_module, 'get_key_ring', lambda: key_ring)
+    verified = []
+    monkeypatch.setattr(
+        key_ring_module.JWTKey,
+        'verify',
+        lambda self, token: verified.append(jwt.get_unverified_claims(token)),
+    )
+
+    warm_up_key_ring()
+
+    assert verified == [{'warmup': True}]
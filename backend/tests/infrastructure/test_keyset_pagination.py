@@ -0,0 +1,128 @@
+"""キーセットページネーションのテスト"""
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.domain.repositories.pagination import InvalidCursorError
+from app.infrastructure.db.models.base import Base
+from app.infrastructure.db.models.user_model import UserModel
+from app.infrastructure.db.repositories.keyset_pagination import (
+    CursorSigner,
+    KeysetPaginator,
+)
+
+NAMES = ['b', 'a', 'c', 'a', 'b', 'c', 'a', 'b']
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            UserModel(login_id=f'user-{i}', password='x', name=name)
+            for i, name in enumerate(NAMES)
+        )
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def signer():
+    return CursorSigner(b'test-secret')
+
+
+def _fetch(session, paginator, cursor, limit):
+    query = paginator.query(select(UserModel), cursor, limit)
+    return paginator.page(query, session.scalars(query.statement).all())
+
+
+def _walk_forward(session, paginator, limit):
+    pages = [_fetch(session, paginator, None, limit)]
+    while pages[-1].next_cursor:
+        pages.append(_fetch(session, paginator, pages[-1].next_cursor, limit))
+    return pages
+
+
+def _ids(page):
+    return [model.id for model in page.items]
+
+
+class TestKeysetPaginator:
+    """KeysetPaginatorのテストクラス"""
+
+    def test_pages_forward_through_all_rows(self, session, signer):
+        """次のページのカーソルをたどると全件をキーの順に1回ずつ取得する"""
+        paginator = KeysetPaginator((UserModel.id,), scope='users', signer=signer)
+
+        pages = _walk_forward(session, paginator, limit=3)
+
+        assert [len(page.items) for page in pages] == [3, 3, 2]
+        assert sum((_ids(page) for page in pages), []) == list(range(1, 9))
+        assert pages[0].prev_cursor is None
+        assert pages[1].has_prev
+        assert pages[-1].next_cursor is None
+
+    def test_prev_cursor_returns_previous_page(self, session, signer):
+        """前のページのカーソルで、前のページを同じ順序で取得する"""
+        paginator = KeysetPaginator((UserModel.id,), scope='users', signer=signer)
+        pages = _walk_forward(session, paginator, limit=3)
+
+        back = _fetch(session, paginator, pages[2].prev_cursor, 3)
+        first = _fetch(session, paginator, back.prev_cursor, 3)
+
+        assert _ids(back) == _ids(pages[1])
+        assert back.has_next
+        assert _ids(first) == _ids(pages[0])
+        assert first.prev_cursor is None
+        assert _ids(_fetch(session, paginator, first.next_cursor, 3)) == _ids(pages[1])
+
+    def test_mixed_directions(self, session, signer):
+        """降順・昇順が混在するキーでも重複・欠落なく取得する"""
+        paginator = KeysetPaginator(
+            (UserModel.name.desc(), UserModel.id), scope='users:name', signer=signer
+        )
+
+        pages = _walk_forward(session, paginator, limit=3)
+        back = _fetch(session, paginator, pages[1].prev_cursor, 3)
+
+        expected = sorted(range(1, 9), key=lambda i: (-ord(NAMES[i - 1]), i))
+        assert sum((_ids(page) for page in pages), []) == expected
+        assert _ids(back) == _ids(pages[0])
+
+    def test_limit_is_capped(self, session, signer):
+        """件数は max_limit を超えない"""
+        paginator = KeysetPaginator(
+            (UserModel.id,), scope='users', signer=signer, max_limit=5
+        )
+
+        assert len(_fetch(session, paginator, None, 100).items) == 5
+        with pytest.raises(ValueError):
+            _fetch(session, paginator, None, 0)
+
+    @pytest.mark.parametrize(
+        'tamper',
+        [
+            lambda cursor: cursor[:-2] + ('AA' if cursor[-2:] != 'AA' else 'BB'),
+            lambda cursor: 'W1sibiIsWzk5OV1dXQ.' + cursor.split('.')[1],
+            lambda cursor: 'not-a-cursor',
+        ],
+    )
+    def test_tampered_cursor_is_rejected(self, session, signer, tamper):
+        """改ざん・形式の誤りのあるカーソルは InvalidCursorError"""
+        paginator = KeysetPaginator((UserModel.id,), scope='users', signer=signer)
+        cursor = _fetch(session, paginator, None, 3).next_cursor
+
+        with pytest.raises(InvalidCursorError):
+            _fetch(session, paginator, tamper(cursor), 3)
+
+    def test_cursor_of_another_listing_is_rejected(self, session, signer):
+        """別の一覧（scope）のカーソルは受け付けない"""
+        users = KeysetPaginator((UserModel.id,), scope='users', signer=signer)
+        others = KeysetPaginator((UserModel.id,), scope='others', signer=signer)
+        cursor = _fetch(session, users, None, 3).next_cursor
+
+        with pytest.raises(InvalidCursorError):
+            _fetch(session, others, cursor, 3)
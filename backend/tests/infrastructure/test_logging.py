@@ -0,0 +1,225 @@
+"""ロギングの設定のテスト"""
+
+import json
+import logging
+import sys
+
+import pytest
+
+from app.config import get_settings
+from app.infrastructure.logging import logging as app_logging
+from app.infrastructure.logging.logging import (
+    JsonFormatter,
+    SamplingFilter,
+    parse_sampling_rules,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+def _settings(**overrides):
+    return get_settings().model_copy(update=overrides)
+
+
+def _record(
+    name='app.test', level=logging.INFO, msg='hello %s', args=('world',), **extra
+):
+    record = logging.LogRecord(name, level, __file__, 10, msg, args, None, func='handler')
+    record.__dict__.update(extra)
+    return record
+
+
+class TestJsonFormatter:
+    """JsonFormatterのテスト"""
+
+    def test_formats_one_json_line(self):
+        line = JsonFormatter().format(_record(user_id=1))
+
+        entry = json.loads(line)
+        assert '\n' not in line
+        assert entry['level'] == 'INFO'
+        assert entry['logger'] == 'app.test'
+        assert entry['message'] == 'hello world'
+        assert entry['user_id'] == 1
+        assert 'caller' not in entry
+
+    def test_caller_info(self):
+        entry = json.loads(JsonFormatter(caller_info=True).format(_record()))
+
+        assert entry['caller'] == f'{__file__}:10'
+        assert entry['function'] == 'handler'
+
+    def test_exception(self):
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            record = logging.LogRecord(
+                'app.test', logging.ERROR, __file__, 1, 'failed', None, sys.exc_info()
+            )
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert 'ValueError: boom' in entry['exception']
+
+    def test_uvicorn_color_message_is_excluded(self):
+        entry = json.loads(JsonFormatter().format(_record(color_message='\x1b[1mhi')))
+
+        assert 'color_message' not in entry
+
+
+class TestQueueHandlerPrepare:
+    """キューに積むレコードの準備のテスト"""
+
+    def test_message_is_rendered_before_enqueue(self):
+        args = ['before']
+        record = _record(msg='value=%s', args=(args,))
+        prepared = app_logging._QueueHandler(None).prepare(record)
+        args.append('after')
+
+        assert prepared.getMessage() == "value=['before']"
+        assert prepared.args is None
+
+    def test_exception_is_stringified(self):
+        try:
+            raise RuntimeError('boom')
+        except RuntimeError:
+            record = logging.LogRecord(
+                'app.test', logging.ERROR, __file__, 1, 'failed', None, sys.exc_info()
+            )
+
+        prepared = app_logging._QueueHandler(None).prepare(record)
+
+        assert prepared.exc_info is None
+        assert 'RuntimeError: boom' in prepared.exc_text
+
+
+class TestSamplingFilter:
+    """SamplingFilterのテスト"""
+
+    def test_keeps_one_in_n(self):
+        sampling = SamplingFilter([('uvicorn.access', '/health', 0.1)])
+
+        kept = [
+            sampling.filter(_record('uvicorn.access', msg='GET /health 200', args=()))
+            for _ in range(30)
+        ]
+
+        assert sum(kept) == 3
+        assert kept[0] is True
+
+    def test_other_messages_and_loggers_pass(self):
+        sampling = SamplingFilter([('uvicorn.access', '/health', 0)])
+
+        assert not sampling.filter(_record('uvicorn.access', msg='GET /health', args=()))
+        assert sampling.filter(_record('uvicorn.access', msg='GET /auth/me', args=()))
+        assert sampling.filter(_record('app.test', msg='GET /health', args=()))
+
+    def test_child_logger_matches(self):
+        sampling = SamplingFilter([('app.infrastructure', '', 0)])
+
+        assert not sampling.filter(_record('app.infrastructure.db.instrumentation'))
+        assert sampling.filter(_record('app.infrastructure_other'))
+
+    def test_warnings_are_never_sampled(self):
+        sampling = SamplingFilter([('app.test', '', 0)])
+
+        assert sampling.filter(_record(level=logging.WARNING))
+
+
+class TestParseSamplingRules:
+    """parse_sampling_rulesのテスト"""
+
+    def test_parses_rules(self):
+        rules = parse_sampling_rules(
+            'uvicorn.access:/health=0.01, app.infrastructure.db.instrumentation=0.1'
+        )
+
+        assert rules == [
+            ('uvicorn.access', '/health', 0.01),
+            ('app.infrastructure.db.instrumentation', '', 0.1),
+        ]
+
+    def test_empty(self):
+        assert parse_sampling_rules('') == []
+
+    @pytest.mark.parametrize('value', ['uvicorn.access', '=0.5', 'app=2', 'app=abc'])
+    def test_invalid(self, value):
+        with pytest.raises(ValueError):
+            parse_sampling_rules(value)
+
+
+class TestSetupLogging:
+    """setup_loggingのテスト"""
+
+    @pytest.fixture
+    def setup_on_bare_root(self):
+        """
+        ルートロガーのハンドラー（pytest の捕捉）を外してから setup_logging を呼び出す
+
+        pytest は実行の段階ごとにハンドラーを付け外しするため、テストの本体で外す
+        """
+        root = logging.getLogger()
+        level, srcfile = root.level, logging._srcfile
+
+        def setup(settings):
+            root.handlers.clear()
+            setup_logging(settings)
+            return root
+
+        yield setup
+        shutdown_logging()
+        root.setLevel(level)
+        logging._srcfile = srcfile
+
+    def test_writes_json_lines_through_queue(self, setup_on_bare_root, tmp_path):
+        log_file = tmp_path / 'app.log'
+        root = setup_on_bare_root(
+            _settings(log_file=str(log_file), log_level='INFO', log_sampling='')
+        )
+
+        logging.getLogger('app.test').debug('hidden')
+        logging.getLogger('app.test').info('request %s', 'done', extra={'path': '/x'})
+        shutdown_logging()
+
+        entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert [entry['message'] for entry in entries] == ['request done']
+        assert entries[0]['path'] == '/x'
+        assert root.handlers == []
+
+    def test_caller_info_disabled_skips_find_caller(self, setup_on_bare_root, tmp_path):
+        setup_on_bare_root(
+            _settings(log_file=str(tmp_path / 'app.log'), log_caller_info=False)
+        )
+
+        assert logging._srcfile is None
+
+    def test_does_not_replace_existing_handlers(self, tmp_path):
+        """テストのログの捕捉などのハンドラーがある場合は変更しない"""
+        root = logging.getLogger()
+        handler = logging.NullHandler()
+        root.addHandler(handler)
+        try:
+            setup_logging(_settings(log_file=str(tmp_path / 'app.log')))
+
+            assert app_logging._listener is None
+            assert not (tmp_path / 'app.log').exists()
+        finally:
+            root.removeHandler(handler)
+
+    def test_rotates_by_size(self, setup_on_bare_root, tmp_path):
+        log_file = tmp_path / 'app.log'
+        setup_on_bare_root(
+            _settings(
+                log_file=str(log_file), log_file_max_bytes=200, log_file_backup_count=2
+            )
+        )
+
+        for i in range(20):
+            logging.getLogger('app.test').warning('line %d', i)
+        shutdown_logging()
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            'app.log',
+            'app.log.1',
+            'app.log.2',
+        ]
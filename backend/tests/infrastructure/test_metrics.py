@@ -0,0 +1,290 @@
+"""メトリクス（レジストリ・テキスト形式・複数ワーカーの集約・プール）のテスト"""
+
+import json
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.infrastructure.db.pool_metrics import (
+    POOL_WAIT_SECONDS,
+    collect_pool_gauges,
+    timed_pool_class,
+)
+from app.infrastructure.metrics import multiprocess
+from app.infrastructure.metrics.exposition import render
+from app.infrastructure.metrics.registry import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    cache_metrics,
+)
+
+
+class TestHistogram:
+    """Histogramのテスト"""
+
+    def test_observations_fall_into_buckets(self):
+        histogram = Histogram('latency_seconds', '処理時間', buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, route='/a')
+
+        [(key, counts)] = list(histogram.samples())
+        assert key == (('route', '/a'),)
+        # 0.1以下・1.0以下・+Inf・合計
+        assert counts == [2, 1, 1, pytest.approx(3.65)]
+        assert histogram.value(route='/a') == 4
+
+
+class TestRegistry:
+    """MetricsRegistryのテスト"""
+
+    def test_collector_metrics_are_included(self):
+        registry = MetricsRegistry()
+        registry.counter('requests_total', 'リクエスト数').inc()
+
+        def collector():
+            gauge = Gauge('pool_size', 'プール')
+            gauge.set(3)
+            return [gauge]
+
+        registry.register_collector(collector)
+
+        assert [metric.name for metric in registry.collect()] == [
+            'requests_total',
+            'pool_size',
+        ]
+
+    def test_failing_collector_is_skipped(self):
+        registry = MetricsRegistry()
+        registry.counter('requests_total', 'リクエスト数')
+
+        def broken():
+            raise RuntimeError('boom')
+
+        registry.register_collector(broken)
+
+        assert [metric.name for metric in registry.collect()] == ['requests_total']
+
+    def test_histogram_type_conflict(self):
+        registry = MetricsRegistry()
+        registry.counter('duplicated', '')
+
+        with pytest.raises(ValueError):
+            registry.histogram('duplicated', '')
+
+
+class TestRender:
+    """Prometheus のテキスト形式のテスト"""
+
+    def test_counter_and_gauge(self):
+        counter = Counter('requests_total', 'リクエスト数')
+        counter.inc(route='/a', status='200')
+        counter.inc(2, route='/a', status='200')
+        gauge = Gauge('pool_size', 'プールの接続数')
+        gauge.set(1.5)
+
+        assert render([counter, gauge]) == (
+            '# HELP requests_total リクエスト数\n'
+            '# TYPE requests_total counter\n'
+            'requests_total{route="/a",status="200"} 3\n'
+            '# HELP pool_size プールの接続数\n'
+            '# TYPE pool_size gauge\n'
+            'pool_size 1.5\n'
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram('latency_seconds', '処理時間', buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+
+        lines = render([histogram]).splitlines()
+
+        assert lines[2:] == [
+            'latency_seconds_bucket{le="0.1"} 1',
+            'latency_seconds_bucket{le="1"} 2',
+            'latency_seconds_bucket{le="+Inf"} 2',
+            'latency_seconds_sum 0.55',
+            'latency_seconds_count 2',
+        ]
+
+    def test_label_values_are_escaped(self):
+        counter = Counter('errors_total', '')
+        counter.inc(message='a "b"\\\n')
+
+        assert 'errors_total{message="a \\"b\\"\\\\\\n"} 1' in render([counter])
+
+    def test_same_name_is_one_family(self):
+        metrics = [
+            *cache_metrics('token', hits=3, misses=1, evictions=0, size=2),
+            *cache_metrics('user', hits=0, misses=0, evictions=0, size=0),
+        ]
+
+        text = render(metrics)
+
+        assert text.count('# TYPE cache_hits_total counter') == 1
+        assert 'cache_hits_total{cache="token"} 3' in text
+        assert 'cache_hit_ratio{cache="token"} 0.75' in text
+        assert 'cache_hit_ratio{cache="user"} 0' in text
+
+
+def _worker_registry(requests: float, in_progress: float) -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.counter('requests_total', 'リクエスト数').inc(requests, route='/a')
+    registry.gauge('in_progress', '処理中').set(in_progress)
+    registry.histogram('latency_seconds', '処理時間', buckets=(1.0,)).observe(0.5)
+    return registry
+
+
+def _by_name(metrics):
+    return {metric.name: metric for metric in metrics}
+
+
+class TestMultiprocess:
+    """複数ワーカーの集約のテスト"""
+
+    @pytest.fixture
+    def metrics_dir(self, tmp_path):
+        directory = multiprocess.configure(str(tmp_path))
+        yield directory
+        multiprocess.cleanup()
+
+    def _write_worker(self, directory, pid, registry):
+        (directory / f'{pid}.json').write_text(
+            json.dumps(multiprocess.snapshot(registry.collect()))
+        )
+
+    def test_disabled_returns_own_values(self):
+        registry = _worker_registry(requests=2, in_progress=1)
+
+        metrics = _by_name(multiprocess.collect(registry))
+
+        assert metrics['requests_total'].value(route='/a') == 2
+
+    def test_counters_are_summed_and_gauges_are_per_pid(self, metrics_dir, monkeypatch):
+        monkeypatch.setattr(multiprocess.os, 'getpid', lambda: 100)
+        self._write_worker(metrics_dir, 200, _worker_registry(requests=5, in_progress=3))
+
+        metrics = _by_name(multiprocess.collect(_worker_registry(2, 1)))
+
+        assert metrics['requests_total'].value(route='/a') == 7
+        assert metrics['latency_seconds'].value() == 2
+        assert metrics['in_progress'].value(pid='100') == 1
+        assert metrics['in_progress'].value(pid='200') == 3
+
+    def test_own_snapshot_file_is_ignored(self, metrics_dir, monkeypatch):
+        """自分の値は現在値を使い、書き出したスナップショットと二重に数えない"""
+        monkeypatch.setattr(multiprocess.os, 'getpid', lambda: 100)
+        registry = _worker_registry(requests=2, in_progress=0)
+        multiprocess.write_snapshot(registry)
+
+        metrics = _by_name(multiprocess.collect(registry))
+
+        assert (metrics_dir / '100.json').exists()
+        assert metrics['requests_total'].value(route='/a') == 2
+
+    def test_dead_worker_counters_are_kept(self, metrics_dir, monkeypatch):
+        monkeypatch.setattr(multiprocess.os, 'getpid', lambda: 100)
+        self._write_worker(metrics_dir, 200, _worker_registry(requests=5, in_progress=3))
+        self._write_worker(metrics_dir, 300, _worker_registry(requests=1, in_progress=1))
+
+        multiprocess.mark_process_dead(200)
+        multiprocess.mark_process_dead(300)
+        metrics = _by_name(multiprocess.collect(_worker_registry(2, 1)))
+
+        assert not (metrics_dir / '200.json').exists()
+        assert metrics['requests_total'].value(route='/a') == 8
+        assert metrics['latency_seconds'].value() == 3
+        assert metrics['in_progress'].value(pid='200') == 0
+        assert list(metrics['in_progress'].samples()) == [((('pid', '100'),), 1.0)]
+
+    def test_configure_removes_stale_snapshots(self, tmp_path):
+        (tmp_path / '123.json').write_text('[]')
+
+        multiprocess.configure(str(tmp_path))
+        multiprocess.cleanup()
+
+        assert list(tmp_path.glob('*.json')) == []
+        assert tmp_path.exists()
+
+    def test_temporary_directory_is_removed(self):
+        directory = multiprocess.configure()
+
+        multiprocess.cleanup()
+
+        assert not directory.exists()
+
+
+class TestPoolMetrics:
+    """コネクションプールのメトリクスのテスト"""
+
+    def test_checkout_wait_and_gauges(self, tmp_path):
+        engine = create_engine(
+            f'sqlite:///{tmp_path / "pool.db"}',
+            poolclass=timed_pool_class(QueuePool, 'test'),
+            pool_size=2,
+            max_overflow=1,
+        )
+        waits_before = POOL_WAIT_SECONDS.value(engine='test')
+
+        with engine.connect():
+            gauges = _by_name(collect_pool_gauges([('test', engine)]))
+
+        assert POOL_WAIT_SECONDS.value(engine='test') == waits_before + 1
+        assert gauges['db_pool_checked_out'].value(engine='test') == 1
+        assert gauges['db_pool_size'].value(engine='test') == 2
+        assert gauges['db_pool_overflow'].value(engine='test') == 0
+        engine.dispose()
+
+    def test_pool_class_survives_dispose(self, tmp_path):
+        engine = create_engine(
+            f'sqlite:///{tmp_path / "pool.db"}',
+            poolclass=timed_pool_class(QueuePool, 'x'),
+        )
+
+        engine.dispose()
+
+        assert type(engine.pool).__name__ == 'TimedQueuePool'
+
+    def test_null_pool_is_skipped(self):
+        engine = create_engine('sqlite://', poolclass=NullPool)
+
+        gauges = collect_pool_gauges([('test', engine)])
+
+        assert all(list(gauge.samples()) == [] for gauge in gauges)
+
+
+class TestConcurrentUpdates:
+    """スレッドごとに保持する値の合算のテスト"""
+
+    def test_concurrent_increments_are_not_lost(self):
+        counter = Counter('requests_total', '')
+        histogram = Histogram('latency_seconds', '', buckets=(1.0,))
+
+        def work():
+            for _ in range(10_000):
+                counter.inc(route='/a')
+                histogram.observe(0.5, route='/a')
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counter.value(route='/a') == 80_000
+        assert histogram.value(route='/a') == 80_000
+
+    def test_values_of_finished_threads_are_kept(self):
+        counter = Counter('requests_total', '')
+        thread = threading.Thread(target=counter.inc, kwargs={'route': '/a'})
+        thread.start()
+        thread.join()
+
+        counter.inc(route='/a')
+
+        assert counter.value(route='/a') == 2
+        assert list(counter.samples()) == [((('route', '/a'),), 2.0)]
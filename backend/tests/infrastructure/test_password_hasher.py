@@ -0,0 +1,70 @@
+"""PasswordHashExecutorのテスト"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.infrastructure.security.password_hasher import (
+    PasswordHashExecutor,
+    pwd_context,
+    warm_up_password_hasher,
+)
+
+
+class TestPasswordHashExecutor:
+    """PasswordHashExecutorのテストクラス"""
+
+    async def test_runs_outside_event_loop_thread(self):
+        """処理はイベントループとは別のスレッドで実行される"""
+        executor = PasswordHashExecutor(max_workers=1, max_pending=4)
+        loop_thread = threading.current_thread().name
+
+        thread_name = await executor.run(lambda: threading.current_thread().name)
+
+        assert thread_name != loop_thread
+        assert thread_name.startswith('password-hash')
+        assert executor.pending == 0
+        executor.shutdown()
+
+    async def test_rejects_with_503_when_queue_is_full(self):
+        """待ち行列が上限に達した場合は即座に503を返す"""
+        executor = PasswordHashExecutor(max_workers=1, max_pending=1)
+        release = threading.Event()
+        blocked = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await executor.run(lambda: True)
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers['Retry-After'] == '1'
+
+        release.set()
+        assert await blocked is True
+        assert executor.pending == 0
+        executor.shutdown()
+
+    async def test_exception_releases_slot(self):
+        """処理が例外を送出しても枠は解放される"""
+        executor = PasswordHashExecutor(max_workers=1, max_pending=1)
+
+        def fail():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+
+        assert executor.pending == 0
+        assert await executor.run(lambda: 1) == 1
+        executor.shutdown()
+
+
+async def test_warm_up_does_not_change_configured_rounds():
+    """ウォームアップは最小コストで計算し、pwd_context のコストは変更しない"""
+    before = pwd_context.to_dict()
+
+    await warm_up_password_hasher()
+
+    assert pwd_context.to_dict() == before
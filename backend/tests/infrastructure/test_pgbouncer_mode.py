@@ -0,0 +1,145 @@
+"""PgBouncer（transaction pooling）互換モードのテスト
+
+結合テストは PgBouncer 経由で PostgreSQL に接続できる場合のみ実行する
+（make test-pgbouncer。PGBOUNCER_HOST / PGBOUNCER_PORT で接続先を指定する）。
+"""
+
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.config import get_settings
+from app.infrastructure.db.async_unit_of_work import AsyncSQLAlchemyUnitOfWork
+from app.infrastructure.db.session import EngineRegistry, build_pool_settings
+from app.infrastructure.db.timeouts import (
+    DbTimeouts,
+    connection_timeouts,
+    timeout_reason,
+)
+from app.infrastructure.db.unit_of_work import SQLAlchemyUnitOfWork
+
+PGBOUNCER_HOST = os.getenv('PGBOUNCER_HOST')
+PGBOUNCER_PORT = int(os.getenv('PGBOUNCER_PORT', '6432'))
+
+requires_pgbouncer = pytest.mark.skipif(
+    not PGBOUNCER_HOST, reason='PGBOUNCER_HOST が設定されていない（make test-pgbouncer）'
+)
+
+
+def _settings(**overrides):
+    values = {'db_pgbouncer_mode': True, 'db_statement_timeout_ms': 1234}
+    values.update(overrides)
+    return get_settings().model_copy(update=values)
+
+
+class TestPgBouncerModeConfiguration:
+    """PgBouncer互換モードのエンジン設定のテストクラス"""
+
+    def test_null_pool_by_default(self):
+        """既定ではプロセスで接続を保持しない（NullPool）"""
+        registry = EngineRegistry(_settings())
+
+        assert isinstance(registry.engine.pool, NullPool)
+
+    def test_small_pool(self):
+        """DB_PGBOUNCER_POOL_SIZE を指定した場合はその数だけ保持する（オーバーフローなし）"""
+        settings = _settings(db_pgbouncer_pool_size=2, db_max_connections=300)
+        pool = build_pool_settings(settings)
+        registry = EngineRegistry(settings)
+
+        assert (pool.pool_size, pool.max_overflow) == (2, 0)
+        assert isinstance(registry.engine.pool, QueuePool)
+        assert registry.engine.pool.size() == 2
+
+    def test_no_startup_parameters(self):
+        """接続時のパラメータ（options / server_settings）を送らない"""
+        registry = EngineRegistry(_settings())
+
+        assert 'options' not in registry._psycopg2_connect_args()
+        assert 'server_settings' not in registry._asyncpg_connect_args()
+        assert connection_timeouts(registry.settings) == DbTimeouts()
+
+    def test_asyncpg_prepared_statements_are_not_cached(self):
+        """asyncpg のプリペアドステートメントはキャッシュせず、名前を一意にする"""
+        connect_args = EngineRegistry(_settings())._asyncpg_connect_args()
+        name_func = connect_args['prepared_statement_name_func']
+
+        assert connect_args['statement_cache_size'] == 0
+        assert connect_args['prepared_statement_cache_size'] == 0
+        assert name_func() != name_func()
+
+    def test_direct_connection_keeps_startup_parameters(self):
+        """PgBouncerを使わない場合は接続時に上限を設定する（従来どおり）"""
+        registry = EngineRegistry(_settings(db_pgbouncer_mode=False))
+
+        assert '-c statement_timeout=1234' in registry._psycopg2_connect_args()['options']
+        assert 'prepared_statement_name_func' not in registry._asyncpg_connect_args()
+
+
+@pytest.fixture
+def pgbouncer_registry():
+    registry = EngineRegistry(
+        _settings(postgres_host=PGBOUNCER_HOST, postgres_port=PGBOUNCER_PORT)
+    )
+    yield registry
+    asyncio.run(registry.dispose())
+
+
+@requires_pgbouncer
+class TestThroughPgBouncer:
+    """PgBouncer経由の結合テストクラス"""
+
+    def test_timeouts_are_set_per_transaction(self, pgbouncer_registry, monkeypatch):
+        """上限はトランザクション内だけに設定され、サーバーの接続に残らない"""
+        monkeypatch.setattr(
+            'app.infrastructure.db.timeouts.default_timeouts',
+            lambda: DbTimeouts.from_settings(pgbouncer_registry.settings),
+        )
+        monkeypatch.setattr(
+            'app.infrastructure.db.timeouts._default_connection_timeouts',
+            lambda: DbTimeouts(),
+        )
+        show = text("SELECT current_setting('statement_timeout')")
+
+        for _ in range(3):
+            with SQLAlchemyUnitOfWork(pgbouncer_registry.session_factory) as uow:
+                assert uow.session.scalar(show) == '1234ms'
+                uow.commit()
+
+        with pgbouncer_registry.engine.connect() as conn:
+            assert conn.scalar(show) == '0'
+
+    def test_statement_timeout_cancels_query(self, pgbouncer_registry):
+        """トランザクションごとの上限で実行中のSQLが中断される"""
+        uow = SQLAlchemyUnitOfWork(
+            pgbouncer_registry.session_factory, timeouts=DbTimeouts(statement_ms=100)
+        )
+
+        with uow, pytest.raises(OperationalError) as exc_info:
+            uow.session.execute(text('SELECT pg_sleep(1)'))
+
+        assert timeout_reason(exc_info.value) == 'statement_timeout'
+
+    def test_asyncpg_statements_across_server_connections(self, pgbouncer_registry):
+        """同じ文を並行して繰り返してもプリペアドステートメントの名前が衝突しない"""
+
+        async def run_queries():
+            async with AsyncSQLAlchemyUnitOfWork(
+                pgbouncer_registry.async_session_factory
+            ) as uow:
+                for value in range(5):
+                    result = await uow.session.execute(
+                        text('SELECT CAST(:value AS integer)'), {'value': value}
+                    )
+                    assert result.scalar() == value
+                await uow.commit()
+
+        async def main():
+            await asyncio.gather(*(run_queries() for _ in range(20)))
+            await pgbouncer_registry.async_engine.dispose()
+
+        asyncio.run(main())
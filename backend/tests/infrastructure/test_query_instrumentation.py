@@ -0,0 +1,117 @@
+"""SQLの計測のテスト"""
+
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.infrastructure.db.instrumentation import (
+    QueryInstrumentation,
+    normalize_statement,
+    track_request_queries,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    QueryInstrumentation(slow_query_seconds=60).attach(engine)
+    yield engine
+    engine.dispose()
+
+
+class TestNormalizeStatement:
+    """normalize_statementのテストクラス"""
+
+    def test_parameters_and_literals_are_replaced(self):
+        """バインドパラメータ・リテラルの違いは同じ文として扱う"""
+        assert normalize_statement(
+            "SELECT * FROM users WHERE id = %(id_1)s AND name = 'taro' LIMIT 10"
+        ) == normalize_statement(
+            'SELECT *\n  FROM users WHERE id = $1 AND name = :name LIMIT 20'
+        )
+
+    def test_in_lists_and_multi_row_values_are_collapsed(self):
+        """INのリスト・複数行のVALUESは件数によらず同じ文になる"""
+        assert (
+            normalize_statement('SELECT id FROM users WHERE id IN (?, ?, ?)')
+            == 'SELECT id FROM users WHERE id IN (...)'
+        )
+        assert (
+            normalize_statement('INSERT INTO users (a, b) VALUES (?, ?), (?, ?)')
+            == 'INSERT INTO users (a, b) VALUES (...)'
+        )
+
+    def test_identifiers_with_digits_are_kept(self):
+        """識別子に含まれる数字は置き換えない"""
+        assert normalize_statement('SELECT users_1.id FROM users AS users_1') == (
+            'SELECT users_1.id FROM users AS users_1'
+        )
+
+
+class TestQueryInstrumentation:
+    """QueryInstrumentationのテストクラス"""
+
+    def test_queries_are_counted_per_request(self, engine):
+        """コンテキスト内で実行したSQLの回数・時間・文ごとの回数を集計する"""
+        with track_request_queries('GET /users') as stats, engine.connect() as conn:
+            for user_id in range(3):
+                conn.execute(text('SELECT :id'), {'id': user_id})
+            conn.execute(text('SELECT 1, 2'))
+
+        assert stats.count == 4
+        assert stats.total_seconds > 0
+        assert stats.repeated(2) == [('SELECT ?', 3)]
+        assert stats.repeated(3) == []
+        assert stats.server_timing().endswith('desc="4 queries"')
+
+    def test_queries_outside_request_are_not_counted(self, engine):
+        """コンテキストの外で実行したSQLは集計しない"""
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+        with track_request_queries() as stats:
+            pass
+
+        assert stats.count == 0
+
+    def test_slow_queries_are_logged(self, caplog):
+        """閾値より遅いSQLは正規化した文をログに出力する"""
+        engine = create_engine('sqlite://')
+        QueryInstrumentation(slow_query_seconds=0).attach(engine)
+
+        with (
+            caplog.at_level(logging.WARNING, 'app.infrastructure.db.instrumentation'),
+            engine.connect() as conn,
+        ):
+            conn.execute(text("SELECT 'secret-value'"))
+
+        assert "SELECT ?" in caplog.text
+        assert 'secret-value' not in caplog.text
+
+    def test_failed_queries_are_recorded(self, caplog):
+        """失敗した文も実行時間を記録し、開始時刻を接続に残さない"""
+        engine = create_engine('sqlite://')
+        QueryInstrumentation(slow_query_seconds=0).attach(engine)
+
+        with (
+            caplog.at_level(logging.WARNING, 'app.infrastructure.db.instrumentation'),
+            track_request_queries('GET /missing') as stats,
+            engine.connect() as conn,
+        ):
+            with pytest.raises(OperationalError):
+                conn.execute(text('SELECT * FROM missing_table WHERE id = 1'))
+            conn.rollback()
+            conn.execute(text('SELECT 1'))
+
+            assert 'query_started_at' not in conn.info
+
+        assert stats.count == 2
+        assert stats.statements == {
+            'SELECT * FROM missing_table WHERE id = ?': 1,
+            'SELECT ?': 1,
+        }
+        assert (
+            '遅いSQL（失敗）' in caplog.text
+            and 'SELECT * FROM missing_table WHERE id = ?' in caplog.text
+        )
@@ -0,0 +1,79 @@
+"""ログイン試行回数制限のテスト"""
+
+import time
+
+from app.infrastructure.security.rate_limiter import (
+    InMemoryRateLimitStore,
+    LoginRateLimiter,
+    RateLimitRule,
+)
+
+
+class TestInMemoryRateLimitStore:
+    """InMemoryRateLimitStoreのテストクラス"""
+
+    def test_allows_up_to_capacity_then_rejects(self):
+        """容量分までは許可し、超過分は補充までの秒数を返す"""
+        store = InMemoryRateLimitStore(shards=4)
+
+        results = [store.consume('key', capacity=3, refill_per_second=1) for _ in range(4)]
+
+        assert results[:3] == [0.0, 0.0, 0.0]
+        assert 0 < results[3] <= 1
+
+    def test_tokens_are_refilled_over_time(self):
+        """時間の経過に応じてトークンが補充される"""
+        store = InMemoryRateLimitStore(shards=4)
+        store.consume('key', capacity=1, refill_per_second=20)
+        assert store.consume('key', capacity=1, refill_per_second=20) > 0
+
+        time.sleep(0.06)
+
+        assert store.consume('key', capacity=1, refill_per_second=20) == 0.0
+
+    def test_idle_buckets_are_evicted(self):
+        """一定時間使われていないバケットは削除される"""
+        store = InMemoryRateLimitStore(shards=1, idle_seconds=0.05)
+        store.consume('old', capacity=1, refill_per_second=1)
+
+        time.sleep(0.06)
+        store.consume('new', capacity=1, refill_per_second=1)
+
+        assert len(store) == 1
+
+    def test_number_of_buckets_is_bounded(self):
+        """バケット数は上限を超えない"""
+        store = InMemoryRateLimitStore(shards=4, max_entries=40)
+
+        for i in range(1000):
+            store.consume(f'key-{i}', capacity=1, refill_per_second=1)
+
+        assert len(store) <= 40
+
+
+class TestLoginRateLimiter:
+    """LoginRateLimiterのテストクラス"""
+
+    def _limiter(self) -> LoginRateLimiter:
+        return LoginRateLimiter(
+            InMemoryRateLimitStore(shards=4),
+            ip_rule=RateLimitRule(attempts=5, per_seconds=60),
+            login_id_rule=RateLimitRule(attempts=2, per_seconds=60),
+        )
+
+    def test_login_id_limit_applies_across_ips(self):
+        """同じログインIDへの試行はIPが異なっても制限される"""
+        limiter = self._limiter()
+
+        assert limiter.check('198.51.100.1', 'admin') == 0
+        assert limiter.check('198.51.100.2', 'admin') == 0
+        assert limiter.check('198.51.100.3', 'admin') > 0
+
+    def test_ip_limit_applies_across_login_ids(self):
+        """同じIPからの試行はログインIDが異なっても制限される"""
+        limiter = self._limiter()
+
+        results = [limiter.check('198.51.100.1', f'user-{i}') for i in range(6)]
+
+        assert results[:5] == [0] * 5
+        assert results[5] > 0
@@ -0,0 +1,162 @@
+"""読み取り専用レプリカへの振り分けのテスト
+
+プライマリとレプリカの代わりに2つのSQLiteファイルを使い、
+どちらで読み取ったかをそれぞれに登録したユーザーで判別する。
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.domain.entities.user import User
+from app.infrastructure.db.models.base import Base
+from app.infrastructure.db.replica import READ_SESSIONS, ReadReplicaRouter
+from app.infrastructure.db.repositories.user_repository_impl import UserRepositoryImpl
+from app.infrastructure.db.session import EngineRegistry
+from app.infrastructure.db.unit_of_work import SQLAlchemyUnitOfWork
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _database(path, marker: str) -> sessionmaker:
+    engine = create_engine(f'sqlite:///{path}')
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as session:
+        UserRepositoryImpl(session).create(User(id=0, login_id=marker, password='x'))
+        session.commit()
+    return factory
+
+
+def _served_by(uow: SQLAlchemyUnitOfWork) -> str:
+    repository = UserRepositoryImpl(uow.session)
+    return 'replica' if repository.get_by_login_id('on-replica') else 'primary'
+
+
+@pytest.fixture
+def clock():
+    return _FakeClock()
+
+
+@pytest.fixture
+def primary(tmp_path):
+    return _database(tmp_path / 'primary.db', 'on-primary')
+
+
+@pytest.fixture
+def router(tmp_path, primary, clock):
+    replica = _database(tmp_path / 'replica.db', 'on-replica')
+    return ReadReplicaRouter(
+        primary, replica, read_your_writes_seconds=5, retry_seconds=30, clock=clock
+    )
+
+
+class TestReadReplicaRouting:
+    """SQLAlchemyUnitOfWorkの読み取り専用モードのテストクラス"""
+
+    def test_read_only_uses_replica_and_writes_use_primary(self, primary, router):
+        """読み取り専用はレプリカ、それ以外はプライマリで実行する"""
+        with SQLAlchemyUnitOfWork(read_only=True, router=router) as uow:
+            assert _served_by(uow) == 'replica'
+
+        with SQLAlchemyUnitOfWork(primary, router=router) as uow:
+            assert _served_by(uow) == 'primary'
+
+    def test_read_your_writes_sticks_to_primary(self, primary, router, clock):
+        """書き込んだユーザーの読み取りは一定時間プライマリで実行する"""
+        with SQLAlchemyUnitOfWork(primary, sticky_key='user-1', router=router) as uow:
+            UserRepositoryImpl(uow.session).create(
+                User(id=0, login_id='written', password='x')
+            )
+            uow.commit()
+
+        with SQLAlchemyUnitOfWork(
+            read_only=True, sticky_key='user-1', router=router
+        ) as uow:
+            assert _served_by(uow) == 'primary'
+            assert UserRepositoryImpl(uow.session).get_by_login_id('written') is not None
+        with SQLAlchemyUnitOfWork(
+            read_only=True, sticky_key='user-2', router=router
+        ) as uow:
+            assert _served_by(uow) == 'replica'
+
+        clock.now += 6
+        with SQLAlchemyUnitOfWork(
+            read_only=True, sticky_key='user-1', router=router
+        ) as uow:
+            assert _served_by(uow) == 'replica'
+
+    def test_falls_back_to_primary_when_replica_is_unavailable(
+        self, tmp_path, primary, clock
+    ):
+        """レプリカに接続できない場合はプライマリで読み、一定時間は接続を試みない"""
+        broken_engine = create_engine(f'sqlite:///{tmp_path}/missing/replica.db')
+        attempts = []
+
+        def replica_factory():
+            attempts.append(1)
+            return sessionmaker(bind=broken_engine)()
+
+        router = ReadReplicaRouter(
+            primary, replica_factory, retry_seconds=30, clock=clock
+        )
+        fallbacks = READ_SESSIONS.value(target='primary', reason='replica_unavailable')
+
+        for _ in range(2):
+            with SQLAlchemyUnitOfWork(read_only=True, router=router) as uow:
+                assert _served_by(uow) == 'primary'
+
+        assert len(attempts) == 1
+        assert (
+            READ_SESSIONS.value(target='primary', reason='replica_unavailable')
+            == fallbacks + 2
+        )
+
+        clock.now += 31
+        with SQLAlchemyUnitOfWork(read_only=True, router=router) as uow:
+            assert _served_by(uow) == 'primary'
+        assert len(attempts) == 2
+
+    def test_without_replica_reads_use_primary(self, primary):
+        """レプリカが設定されていない場合はプライマリで読む"""
+        router = ReadReplicaRouter(primary, None)
+
+        with SQLAlchemyUnitOfWork(read_only=True, router=router) as uow:
+            assert _served_by(uow) == 'primary'
+
+    def test_tracked_writers_are_bounded(self, primary, router):
+        """追跡する書き込みの数は上限を超えない"""
+        router.max_tracked_writers = 3
+
+        for i in range(10):
+            router.record_write(f'user-{i}')
+
+        assert len(router._recent_writes) == 3
+        assert router.is_sticky('user-9')
+        assert not router.is_sticky('user-0')
+
+
+class TestReplicaEngine:
+    """EngineRegistryのレプリカ設定のテストクラス"""
+
+    def test_replica_engine_is_built_only_when_configured(self):
+        """POSTGRES_REPLICA_HOST を指定した場合のみレプリカのエンジンを構築する"""
+        settings = get_settings()
+        registry = EngineRegistry(
+            settings.model_copy(update={'postgres_replica_host': ''})
+        )
+        assert registry.replica_engine is None
+        assert registry.replica_session_factory is None
+
+        registry = EngineRegistry(
+            settings.model_copy(update={'postgres_replica_host': 'reader.example'})
+        )
+        assert registry.replica_engine.url.host == 'reader.example'
+        assert registry.replica_engine.url.host != registry.engine.url.host
@@ -0,0 +1,243 @@
+"""リクエスト単位のプロファイラ（サンプリング・出力形式・保存先・ヘッダーの署名）のテスト"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+
+import anyio.to_thread
+import pytest
+
+from app.infrastructure.profiling.profile_store import ProfileStore
+from app.infrastructure.profiling.profile_token import (
+    sign_profile_token,
+    verify_profile_token,
+)
+from app.infrastructure.profiling.request_profiler import (
+    ACTIVE_PROFILE,
+    RequestProfile,
+    Sample,
+    SqlEvent,
+    install_threadpool_hook,
+)
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _names(profile: RequestProfile) -> set[str]:
+    return {frame[0] for stack, _ in profile.stacks() for frame in stack}
+
+
+async def _profile(handler) -> RequestProfile:
+    """handler の実行をプロファイルする（ProfilingMiddleware と同じ手順）"""
+    profile = RequestProfile('test', interval_seconds=0.002, max_seconds=10)
+    token = ACTIVE_PROFILE.set(profile)
+    profile.start(sys._getframe())  # noqa: SLF001
+    try:
+        await handler()
+    finally:
+        profile.stop()
+        ACTIVE_PROFILE.reset(token)
+    return profile
+
+
+class TestRequestProfile:
+    """RequestProfileのテスト"""
+
+    def test_running_on_event_loop(self):
+        async def handler():
+            _busy(0.05)
+
+        profile = asyncio.run(_profile(handler))
+
+        assert '_busy' in _names(profile)
+        assert sum(weight for _, weight in profile.stacks()) > 0.03
+
+    def test_awaiting_is_attributed_to_the_awaiting_coroutine(self):
+        async def waiting_handler():
+            await asyncio.sleep(0.05)
+
+        profile = asyncio.run(_profile(waiting_handler))
+
+        [stack] = {stack for stack, _ in profile.stacks()}
+        assert [frame[0].rpartition('.')[2] for frame in stack] == [
+            'waiting_handler',
+            'sleep',
+            '<await>',
+        ]
+
+    def test_threadpool_of_the_request(self):
+        install_threadpool_hook()
+
+        async def handler():
+            await anyio.to_thread.run_sync(_busy, 0.05)
+
+        async def other_request():
+            # プロファイル対象外のリクエストのスレッドは記録しない
+            await anyio.to_thread.run_sync(time.sleep, 0.05)
+
+        async def main():
+            async with anyio.create_task_group() as group:
+                group.start_soon(other_request)
+                return await _profile(handler)
+
+        profile = asyncio.run(main())
+
+        names = _names(profile)
+        assert {'<threadpool>', '_busy'} <= names
+        assert 'sleep' not in names
+
+    def test_starlette_threadpool_is_tagged(self):
+        """
+        Starlette・FastAPI の run_in_threadpool が anyio.to_thread.run_sync を経由し、
+        実行中のスレッドがプロファイルに登録される（ライブラリの更新で経路が変わった場合に検出する）
+        """
+        from starlette.concurrency import run_in_threadpool
+
+        install_threadpool_hook()
+        profile = RequestProfile('test', interval_seconds=1, max_seconds=10)
+        tagged = []
+
+        def work():
+            tagged.append(threading.get_ident() in profile._worker_threads)  # noqa: SLF001
+
+        async def main():
+            token = ACTIVE_PROFILE.set(profile)
+            try:
+                await run_in_threadpool(work)
+            finally:
+                ACTIVE_PROFILE.reset(token)
+            # プロファイル対象外の呼び出しは登録しない
+            await run_in_threadpool(work)
+
+        asyncio.run(main())
+
+        assert tagged == [True, False]
+        assert profile._worker_threads == set()  # noqa: SLF001
+
+    def test_sql_frame_replaces_waiting_leaf(self):
+        profile = RequestProfile('test', interval_seconds=0.005, max_seconds=10)
+        profile.samples = [
+            Sample(
+                at=1.0,
+                weight=0.005,
+                thread_id=1,
+                stack=(('a', 'x.py', 1), ('<await>', '', 0)),
+            ),
+            Sample(
+                at=2.0,
+                weight=0.005,
+                thread_id=1,
+                stack=(('a', 'x.py', 1), ('<await>', '', 0)),
+            ),
+        ]
+        profile.sql_events = [
+            SqlEvent(statement='SELECT ?', thread_id=1, started=0.99, elapsed=0.02),
+            SqlEvent(statement='SELECT ?', thread_id=2, started=1.99, elapsed=0.02),
+        ]
+
+        assert [stack for stack, _ in profile.stacks()] == [
+            (('a', 'x.py', 1), ('SQL: SELECT ?', '', 0)),
+            (('a', 'x.py', 1), ('<await>', '', 0)),
+        ]
+
+
+class TestOutputFormats:
+    """出力形式のテスト"""
+
+    def _profile(self) -> RequestProfile:
+        profile = RequestProfile('GET /items', interval_seconds=0.005, max_seconds=10)
+        profile.started, profile.finished = 10.0, 10.1
+        root = ('handler', 'app/x.py', 3)
+        profile.samples = [
+            Sample(
+                at=10.01, weight=0.005, thread_id=1, stack=(root, ('f;g', 'app/x.py', 9))
+            ),
+            Sample(
+                at=10.02, weight=0.005, thread_id=1, stack=(root, ('f;g', 'app/x.py', 9))
+            ),
+            Sample(at=10.05, weight=0.01, thread_id=1, stack=(root, ('<await>', '', 0))),
+        ]
+        profile.sql_events = [
+            SqlEvent(statement='SELECT ?', thread_id=1, started=10.04, elapsed=0.02),
+            # 重なる区間は speedscope の実行区間に含めない
+            SqlEvent(statement='UPDATE t', thread_id=2, started=10.05, elapsed=0.01),
+        ]
+        return profile
+
+    def test_collapsed(self):
+        assert self._profile().to_collapsed() == (
+            'handler (app/x.py:3);f,g (app/x.py:9) 10000\n'
+            'handler (app/x.py:3);SQL: SELECT ? 10000\n'
+        )
+
+    def test_speedscope(self):
+        document = json.loads(self._profile().to_speedscope())
+
+        frames = [frame['name'] for frame in document['shared']['frames']]
+        sampled, evented = document['profiles']
+        assert sampled['type'] == 'sampled'
+        assert sampled['endValue'] == pytest.approx(0.1)
+        assert [[frames[i] for i in stack] for stack in sampled['samples']][-1] == [
+            'handler',
+            'SQL: SELECT ?',
+        ]
+        assert sampled['weights'] == [0.005, 0.005, 0.01]
+        assert evented['type'] == 'evented'
+        assert [
+            (event['type'], frames[event['frame']]) for event in evented['events']
+        ] == [
+            ('O', 'SQL: SELECT ?'),
+            ('C', 'SQL: SELECT ?'),
+        ]
+
+
+class TestProfileStore:
+    """ProfileStoreのテスト"""
+
+    def test_oldest_files_are_removed(self, tmp_path):
+        store = ProfileStore(tmp_path / 'profiles', max_files=2)
+
+        for index in range(4):
+            store.save(f'{index}.json', str(index))
+
+        assert [path.name for path in store.files()] == ['2.json', '3.json']
+
+    def test_relative_directory_is_under_backend(self):
+        store = ProfileStore('app/logs/profiles', max_files=1)
+
+        assert store.directory.is_absolute()
+        assert store.directory.parts[-3:] == ('app', 'logs', 'profiles')
+
+
+class TestProfileToken:
+    """ヘッダーの値の署名のテスト"""
+
+    def test_valid_token(self):
+        token = sign_profile_token('secret', 2000)
+
+        assert verify_profile_token('secret', token, now=1000)
+
+    def test_wrong_secret_or_tampered(self):
+        token = sign_profile_token('secret', 2000)
+
+        assert not verify_profile_token('other', token, now=1000)
+        assert not verify_profile_token('secret', '3000' + token[4:], now=1000)
+        assert not verify_profile_token('secret', 'garbage', now=1000)
+        assert not verify_profile_token('secret', '2000.ｘ', now=1000)
+
+    def test_expired_or_too_long(self):
+        assert not verify_profile_token(
+            'secret', sign_profile_token('secret', 999), now=1000
+        )
+        assert not verify_profile_token(
+            'secret', sign_profile_token('secret', 1000 + 2 * 24 * 60 * 60), now=1000
+        )
+
+    def test_empty_secret_is_always_invalid(self):
+        assert not verify_profile_token('', sign_profile_token('', 2000), now=1000)
@@ -0,0 +1,145 @@
+"""トークン失効リストのテスト"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.orm import sessionmaker
+
+from app.infrastructure.db.models.revoked_token_model import RevokedTokenModel
+from app.infrastructure.db.repositories.revoked_token_repository_impl import (
+    RevokedTokenRepositoryImpl,
+)
+from app.infrastructure.db.unit_of_work import SQLAlchemyUnitOfWork
+from app.infrastructure.security import security_service_impl
+from app.infrastructure.security.bloom_filter import BloomFilter, optimal_parameters
+from app.infrastructure.security.revocation import TokenRevocationList
+from app.infrastructure.security.security_service_impl import SecurityServiceImpl
+
+
+class TestBloomFilter:
+    """BloomFilterのテストクラス"""
+
+    def test_optimal_parameters(self):
+        """偽陽性率0.1%では1要素あたり約14.4ビット・ハッシュ10個になる"""
+        bits, hashes = optimal_parameters(1000, 0.001)
+
+        assert 14_000 <= bits <= 14_500
+        assert hashes == 10
+
+    def test_added_items_are_always_contained(self):
+        """追加した要素は必ず含まれる（偽陰性がない）"""
+        bloom = BloomFilter(capacity=1000)
+        items = [f'jti-{i}' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+        assert len(bloom) == 1000
+
+    def test_false_positive_rate_is_close_to_target(self):
+        """容量内であれば偽陽性率は目標値の数倍以内に収まる"""
+        bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+        for i in range(10_000):
+            bloom.add(f'revoked-{i}')
+
+        false_positives = sum(f'active-{i}' in bloom for i in range(10_000))
+
+        assert false_positives / 10_000 < 0.03
+
+
+@pytest.fixture
+def revocation_list(test_db_engine):
+    """SQLiteに接続した失効リスト"""
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=test_db_engine)
+    revocation_list = TokenRevocationList(
+        capacity=1000,
+        sync_interval=3600,
+        uow_factory=lambda: SQLAlchemyUnitOfWork(session_factory),
+    )
+    yield revocation_list
+    with session_factory() as session:
+        session.execute(delete(RevokedTokenModel))
+        session.commit()
+
+
+def _expires_in(seconds: int) -> datetime:
+    return datetime.utcnow() + timedelta(seconds=seconds)
+
+
+class TestTokenRevocationList:
+    """TokenRevocationListのテストクラス"""
+
+    def test_revoked_token_is_detected(self, revocation_list):
+        """失効させたトークンは失効済みと判定される"""
+        revocation_list.revoke('jti-1', expires_at=_expires_in(60))
+
+        assert revocation_list.is_revoked('jti-1') is True
+        assert revocation_list.is_revoked('jti-2') is False
+
+    def test_filter_miss_does_not_query_store(self, revocation_list):
+        """フィルタに含まれない jti はDBに問い合わせない"""
+        revocation_list.is_revoked('never-revoked')
+
+        assert revocation_list.store_lookups == 0
+
+    def test_rebuild_loads_active_and_purges_expired(self, revocation_list, db_session):
+        """再構築時に期限切れの行を削除し、有効な jti だけをフィルタに読み込む"""
+        repository = RevokedTokenRepositoryImpl(db_session)
+        repository.add('active', expires_at=_expires_in(60), revoked_at=datetime.utcnow())
+        repository.add(
+            'expired', expires_at=_expires_in(-60), revoked_at=datetime.utcnow()
+        )
+        db_session.commit()
+
+        loaded = revocation_list.rebuild()
+
+        assert loaded == 1
+        assert 'active' in revocation_list.bloom_filter
+        assert revocation_list.is_revoked('active') is True
+        assert repository.exists('expired') is False
+
+    def test_sync_picks_up_revocations_from_other_processes(
+        self, revocation_list, db_session
+    ):
+        """他のプロセスで失効したトークンを差分同期で取り込む"""
+        revocation_list.rebuild()
+        RevokedTokenRepositoryImpl(db_session).add(
+            'other-process', expires_at=_expires_in(60), revoked_at=datetime.utcnow()
+        )
+        db_session.commit()
+
+        assert 'other-process' not in revocation_list.bloom_filter
+        revocation_list.sync()
+        assert revocation_list.is_revoked('other-process') is True
+
+    def test_store_error_fails_closed(self, revocation_list):
+        """フィルタにヒットした後にDBへ接続できない場合は失効扱いにする"""
+        revocation_list.bloom_filter.add('jti-1')
+        revocation_list._uow_factory = MagicMock(side_effect=RuntimeError('db down'))
+
+        assert revocation_list.is_revoked('jti-1') is True
+
+
+class TestSecurityServiceRevocation:
+    """SecurityServiceImplと失効リストの連携テスト"""
+
+    def test_revoked_token_is_rejected_even_if_cached(
+        self, revocation_list, monkeypatch
+    ):
+        """失効したトークンは検証済みキャッシュにあっても拒否される"""
+        monkeypatch.setattr(
+            security_service_impl, 'get_token_revocation_list', lambda: revocation_list
+        )
+        service = SecurityServiceImpl()
+        token = service.create_access_token(user_id=1)
+
+        payload = security_service_impl.authenticate_access_token(token)
+        assert payload['user_id'] == 1
+        assert payload['jti']
+
+        service.revoke_access_token(token)
+
+        assert security_service_impl.authenticate_access_token(token) is None
+        assert revocation_list.is_revoked(payload['jti']) is True
@@ -3,13 +3,8 @@
 from datetime import timedelta
 
 import pytest
-from jose import jwt
 
-from app.config import get_settings
-from app.infrastructure.security.security_service_impl import (
-    SecurityServiceImpl,
-    _load_rsa_keys,
-)
+from app.infrastructure.security.security_service_impl import SecurityServiceImpl
 
 
 class TestSecurityServiceImpl:
@@ -41,25 +36,6 @@ class TestSecurityServiceImpl:
         assert isinstance(token, str)
         assert len(token) > 0
 
-    def test_create_access_token_decode(self, security_service):
-        """生成したトークンをデコードして内容を確認"""
-        user_id = 789
-
-        # トークン生成
-        token = security_service.create_access_token(user_id=user_id)
-
-        # 公開鍵を取得してデコード
-        settings = get_settings()
-
-        # RS256で署名されたトークンをデコード
-        _, public_key = _load_rsa_keys()
-
-        decoded = jwt.decode(token, public_key, algorithms=[settings.jwt_algorithm])
-
-        # デコードされたペイロードを確認
-        assert decoded['user_id'] == user_id
-        assert 'exp' in decoded
-
     @pytest.mark.skip(reason='passlib 1.7.4とbcrypt 4.x系の互換性の問題。統合テストで確認')
     def test_verify_password_correct(self, security_service):
         """正しいパスワードの検証"""
@@ -0,0 +1,94 @@
+"""DBエンジンレジストリのテスト"""
+
+from app.config import get_settings
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.infrastructure.db.session import (
+    EngineRegistry,
+    _open_connections,
+    build_pool_settings,
+)
+
+
+def _settings(**overrides):
+    return get_settings().model_copy(update=overrides)
+
+
+class TestBuildPoolSettings:
+    """build_pool_settingsのテストクラス"""
+
+    def test_default_matches_single_worker_budget(self):
+        """既定値では1ワーカーで pool_size=10, max_overflow=20"""
+        pool = build_pool_settings(_settings(web_concurrency=1, db_max_connections=30))
+
+        assert pool.pool_size == 10
+        assert pool.max_overflow == 20
+
+    def test_budget_is_split_across_workers(self):
+        """ワーカー数で割った接続数がプロセスごとの上限になる"""
+        pool = build_pool_settings(_settings(web_concurrency=4, db_max_connections=40))
+
+        assert pool.pool_size + pool.max_overflow == 10
+        assert pool.pool_size == 3
+
+    def test_explicit_values_take_precedence(self):
+        """DB_POOL_SIZE / DB_MAX_OVERFLOW を指定した場合はその値を使う"""
+        pool = build_pool_settings(_settings(db_pool_size=5, db_max_overflow=0))
+
+        assert pool.pool_size == 5
+        assert pool.max_overflow == 0
+
+
+class TestEngineRegistry:
+    """EngineRegistryのテストクラス"""
+
+    async def test_engines_are_built_lazily_and_disposed(self):
+        """エンジンは最初に参照した時点で構築され、disposeで閉じられる"""
+        registry = EngineRegistry(_settings(db_pool_size=2, db_max_overflow=1))
+        assert registry._engine is None
+        assert registry._async_engine is None
+
+        engine = registry.engine
+        assert engine.pool.size() == 2
+        assert registry.engine is engine
+        assert registry._async_engine is None
+
+        await registry.dispose()
+
+    async def test_prewarm_opens_pool_connections(self, monkeypatch):
+        """prewarm はプールの常時保持数まで接続を確立してプールに返す"""
+        registry = EngineRegistry(_settings(db_pool_size=2, db_max_overflow=1))
+        opened = []
+        monkeypatch.setattr(
+            'app.infrastructure.db.session._open_connections',
+            lambda engine, connections: opened.append((engine, connections)),
+        )
+
+        assert await registry.prewarm(5) == 2
+        assert opened == [(registry.engine, 2)]
+        assert await registry.prewarm(0) == 0
+
+        await registry.dispose()
+
+    async def test_prewarm_is_skipped_for_null_pool(self):
+        """PgBouncer 経由で NullPool の場合は接続を保持しないため確立しない"""
+        registry = EngineRegistry(
+            _settings(db_pgbouncer_mode=True, db_pgbouncer_pool_size=0)
+        )
+
+        assert await registry.prewarm(5) == 0
+        assert registry._engine is None
+
+
+def test_open_connections_fills_pool(tmp_path):
+    """_open_connections で確立した接続はプールに残る"""
+    engine = create_engine(
+        f'sqlite:///{tmp_path / "pool.db"}', poolclass=QueuePool, pool_size=3
+    )
+
+    _open_connections(engine, 3)
+
+    assert engine.pool.checkedin() == 3
+    assert engine.pool.checkedout() == 0
+    engine.dispose()
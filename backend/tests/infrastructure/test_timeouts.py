@@ -0,0 +1,148 @@
+"""SQLの実行時間の上限とリクエストの期限のテスト"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.infrastructure.db.retry import RetryPolicy
+from app.infrastructure.db.session import EngineRegistry
+from app.infrastructure.db.timeouts import (
+    DbTimeouts,
+    DeadlineExceededError,
+    deadline_scope,
+    effective_timeouts,
+    remaining_seconds,
+    timeout_reason,
+)
+from app.infrastructure.db.unit_of_work import SQLAlchemyUnitOfWork
+
+
+class _DriverError(Exception):
+    """psycopg2の例外と同じく pgcode を持つ例外"""
+
+    def __init__(self, pgcode: str):
+        super().__init__(f'sqlstate {pgcode}')
+        self.pgcode = pgcode
+
+
+def _db_error(sqlstate: str) -> OperationalError:
+    return OperationalError('SELECT ...', {}, _DriverError(sqlstate))
+
+
+@pytest.fixture
+def session_factory(test_db_engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=test_db_engine)
+
+
+class TestDbTimeouts:
+    """DbTimeoutsのテストクラス"""
+
+    def test_connect_options_omit_unlimited(self):
+        """無制限（0）の上限は接続時のオプションに含めない"""
+        timeouts = DbTimeouts(statement_ms=30000, lock_ms=0, idle_in_transaction_ms=60000)
+
+        assert timeouts.server_settings() == {
+            'statement_timeout': '30000',
+            'idle_in_transaction_session_timeout': '60000',
+        }
+        assert timeouts.libpq_options() == (
+            '-c statement_timeout=30000 -c idle_in_transaction_session_timeout=60000'
+        )
+
+    def test_engine_connects_with_settings_defaults(self):
+        """エンジンの接続時に Settings の既定値を設定する"""
+        settings = get_settings().model_copy(
+            update={'db_statement_timeout_ms': 1500, 'db_lock_timeout_ms': 0}
+        )
+        registry = EngineRegistry(settings)
+
+        options = registry._psycopg2_connect_args()['options']
+        server_settings = registry._asyncpg_connect_args()['server_settings']
+
+        assert '-c statement_timeout=1500' in options
+        assert 'lock_timeout' not in options
+        assert server_settings['statement_timeout'] == '1500'
+
+    def test_remaining_time_tightens_statement_and_lock_timeouts(self):
+        """期限までの残り時間が短い場合は実行時間・ロック待ちの上限を短くする"""
+        defaults = DbTimeouts(statement_ms=30000, lock_ms=0, idle_in_transaction_ms=60000)
+
+        assert effective_timeouts(defaults, None, None) == defaults
+        assert effective_timeouts(defaults, None, 2.5) == DbTimeouts(2500, 2500, 60000)
+        assert effective_timeouts(defaults, None, 100) == DbTimeouts(30000, 100000, 60000)
+        assert effective_timeouts(defaults, DbTimeouts(statement_ms=500), 2.5) == (
+            DbTimeouts(500, 2500, 0)
+        )
+
+
+class TestDeadline:
+    """リクエストの期限のテストクラス"""
+
+    def test_nested_scope_cannot_extend_deadline(self):
+        """内側のスコープで期限を延ばすことはできず、抜けると元に戻る"""
+        assert remaining_seconds() is None
+
+        with deadline_scope(1):
+            with deadline_scope(60):
+                assert remaining_seconds() <= 1
+            with deadline_scope(None):
+                assert remaining_seconds() <= 1
+
+        assert remaining_seconds() is None
+
+    def test_unit_of_work_is_not_started_after_deadline(self, session_factory):
+        """期限を過ぎている場合はセッションを開始しない"""
+        with deadline_scope(0), pytest.raises(DeadlineExceededError):
+            SQLAlchemyUnitOfWork(session_factory).__enter__()
+
+    def test_transaction_is_not_begun_after_deadline(self, session_factory):
+        """期限を過ぎてから新しいトランザクションを開始しない"""
+        with deadline_scope(60), SQLAlchemyUnitOfWork(session_factory) as uow:
+            uow.session.execute(text('SELECT 1'))
+            uow.commit()
+
+            with deadline_scope(0), pytest.raises(DeadlineExceededError):
+                uow.session.execute(text('SELECT 1'))
+
+    def test_retry_stops_at_deadline(self, session_factory):
+        """待機すると期限を過ぎる場合は再実行しない"""
+        sleeps = []
+        uow = SQLAlchemyUnitOfWork(
+            session_factory,
+            retry_policy=RetryPolicy(max_attempts=5, base_delay=1.0),
+            sleep=sleeps.append,
+        )
+        attempts = []
+
+        def fn(_):
+            attempts.append(1)
+            raise _db_error('40001')
+
+        with uow, deadline_scope(0.5), pytest.raises(OperationalError):
+            uow.run_in_transaction(fn)
+
+        assert len(attempts) == 1
+        assert sleeps == []
+
+
+class TestTimeoutReason:
+    """timeout_reasonのテストクラス"""
+
+    @pytest.mark.parametrize(
+        ('error', 'reason'),
+        [
+            (_db_error('57014'), 'statement_timeout'),
+            (_db_error('55P03'), 'lock_timeout'),
+            (_db_error('25P03'), 'idle_in_transaction_timeout'),
+            (PoolTimeoutError('QueuePool limit reached'), 'pool_timeout'),
+            (DeadlineExceededError(), 'deadline_exceeded'),
+            (_db_error('23505'), None),
+            (ValueError(), None),
+        ],
+    )
+    def test_reason(self, error, reason):
+        """上限・期限による中断のみ理由を返す"""
+        assert timeout_reason(error) == reason
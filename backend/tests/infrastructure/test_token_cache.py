@@ -0,0 +1,122 @@
+"""VerifiedTokenCacheのテスト"""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.config import get_settings
+from app.infrastructure.security import security_service_impl
+from app.infrastructure.security.security_service_impl import (
+    SecurityServiceImpl,
+    get_current_user_from_cookie,
+)
+from app.infrastructure.security.token_cache import VerifiedTokenCache
+
+
+def _claims(user_id: int, ttl: float = 60) -> dict:
+    return {'user_id': user_id, 'exp': int(time.time() + ttl)}
+
+
+class TestVerifiedTokenCache:
+    """VerifiedTokenCacheのテストクラス"""
+
+    def test_hit_and_miss_are_counted(self):
+        """ヒット・ミスの回数が記録される"""
+        cache = VerifiedTokenCache(max_entries=10)
+
+        assert cache.get('token') is None
+        cache.put('token', _claims(1))
+        assert cache.get('token')['user_id'] == 1
+
+        stats = cache.stats()
+        assert stats.hits == 1
+        assert stats.misses == 1
+        assert stats.size == 1
+        assert stats.hit_rate == 0.5
+
+    def test_expired_entry_is_dropped(self):
+        """expを過ぎたエントリはミスとして扱われる"""
+        cache = VerifiedTokenCache(max_entries=10)
+        cache.put('token', {'user_id': 1, 'exp': time.time() + 0.05})
+
+        time.sleep(0.1)
+
+        assert cache.get('token') is None
+        assert cache.stats().size == 0
+
+    def test_token_without_exp_is_not_cached(self):
+        """expを持たないトークンはキャッシュしない"""
+        cache = VerifiedTokenCache(max_entries=10)
+        cache.put('token', {'user_id': 1})
+
+        assert cache.stats().size == 0
+
+    def test_lru_eviction(self):
+        """上限を超えた場合は最も古く参照されたエントリを追い出す"""
+        cache = VerifiedTokenCache(max_entries=2)
+        cache.put('a', _claims(1))
+        cache.put('b', _claims(2))
+        cache.get('a')  # aを最近参照に更新
+        cache.put('c', _claims(3))
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('c') is not None
+        assert cache.stats().evictions == 1
+
+    def test_revoke_drops_entry(self):
+        """失効させたトークンは即座にキャッシュから消える"""
+        cache = VerifiedTokenCache(max_entries=10)
+        cache.put('token', _claims(1))
+
+        assert cache.revoke('token') is True
+        assert cache.get('token') is None
+        assert cache.revoke('token') is False
+
+    def test_disabled_when_max_entries_is_zero(self):
+        """上限0の場合はキャッシュしない"""
+        cache = VerifiedTokenCache(max_entries=0)
+        cache.put('token', _claims(1))
+
+        assert cache.get('token') is None
+
+
+class TestGetCurrentUserFromCookieCache:
+    """get_current_user_from_cookieのキャッシュ利用のテスト"""
+
+    @pytest.fixture
+    def token_cache(self, monkeypatch):
+        settings = get_settings().model_copy(update={'enable_auth': True})
+        cache = VerifiedTokenCache(max_entries=10)
+        monkeypatch.setattr(security_service_impl, 'get_settings', lambda: settings)
+        monkeypatch.setattr(
+            security_service_impl, 'get_verified_token_cache', lambda: cache
+        )
+        return cache
+
+    def test_hit_skips_signature_verification(self, token_cache, monkeypatch):
+        """キャッシュヒット時は署名検証を行わない"""
+        token = SecurityServiceImpl().create_access_token(user_id=42)
+        request = MagicMock()
+        request.cookies = {'access_token': token}
+
+        assert get_current_user_from_cookie(request).id == 42
+
+        verify = MagicMock(side_effect=AssertionError('should not verify'))
+        monkeypatch.setattr(security_service_impl, '_verify_token', verify)
+
+        assert get_current_user_from_cookie(request).id == 42
+        assert token_cache.stats().hits == 1
+
+    def test_revoke_access_token_drops_cache_entry(self, token_cache):
+        """ログアウト時の失効でキャッシュから削除される"""
+        service = SecurityServiceImpl()
+        token = service.create_access_token(user_id=7)
+        request = MagicMock()
+        request.cookies = {'access_token': token}
+        get_current_user_from_cookie(request)
+
+        service.revoke_access_token(token)
+
+        assert token_cache.stats().size == 0
@@ -0,0 +1,137 @@
+"""トランザクションの再実行（run_in_transaction）のテスト"""
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.domain.entities.user import User
+from app.infrastructure.db.repositories.user_repository_impl import UserRepositoryImpl
+from app.infrastructure.db.retry import (
+    TRANSACTION_RETRIES,
+    TRANSACTION_RETRIES_EXHAUSTED,
+    RetryPolicy,
+    get_sqlstate,
+    is_retryable,
+)
+from app.infrastructure.db.unit_of_work import SQLAlchemyUnitOfWork
+
+
+class _DriverError(Exception):
+    """psycopg2の例外と同じく pgcode を持つ例外"""
+
+    def __init__(self, pgcode: str):
+        super().__init__(f'sqlstate {pgcode}')
+        self.pgcode = pgcode
+
+
+def _db_error(sqlstate: str) -> OperationalError:
+    return OperationalError('UPDATE users ...', {}, _DriverError(sqlstate))
+
+
+@pytest.fixture
+def uow_factory(test_db_engine):
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=test_db_engine)
+    sleeps: list[float] = []
+
+    def factory(max_attempts: int = 3) -> SQLAlchemyUnitOfWork:
+        return SQLAlchemyUnitOfWork(
+            session_factory,
+            retry_policy=RetryPolicy(max_attempts=max_attempts, base_delay=0.01),
+            sleep=sleeps.append,
+        )
+
+    factory.sleeps = sleeps
+    return factory
+
+
+class TestRetryClassification:
+    """SQLSTATEによる判定のテストクラス"""
+
+    def test_sqlstate_is_read_from_driver_error(self):
+        """SQLAlchemyの例外から元の例外のSQLSTATEを取得する"""
+        assert get_sqlstate(_db_error('40P01')) == '40P01'
+
+    def test_only_serialization_and_deadlock_errors_are_retryable(self):
+        """シリアライズ失敗・デッドロックのみ再実行する"""
+        assert is_retryable(_db_error('40001'))
+        assert is_retryable(_db_error('40P01'))
+        assert not is_retryable(_db_error('55P03'))  # lock_timeout は即座に503で返す
+        assert not is_retryable(_db_error('23505'))  # unique_violation
+        assert not is_retryable(OperationalError('SELECT 1', {}, Exception('deadlock')))
+
+    def test_decorrelated_jitter_is_bounded(self):
+        """待機時間は base_delay 以上、前回の3倍と max_delay 以下"""
+        policy = RetryPolicy(base_delay=0.05, max_delay=1.0)
+        delay = policy.base_delay
+        for _ in range(50):
+            previous, delay = delay, policy.next_delay(delay)
+            assert policy.base_delay <= delay <= min(1.0, previous * 3)
+
+
+class TestRunInTransaction:
+    """SQLAlchemyUnitOfWork.run_in_transactionのテストクラス"""
+
+    def test_whole_transaction_is_replayed(self, uow_factory):
+        """再実行時は fn を最初から実行し直し、最後の結果がコミットされる"""
+        calls = []
+
+        def create_user(uow):
+            calls.append(1)
+            user = UserRepositoryImpl(uow.session).create(
+                User(id=0, login_id=f'retry-{len(calls)}', password='hashed')
+            )
+            if len(calls) == 1:
+                raise _db_error('40001')
+            return user
+
+        retries_before = TRANSACTION_RETRIES.value(
+            call_site='test.create_user', reason='serialization_failure'
+        )
+        with uow_factory() as uow:
+            user = uow.run_in_transaction(create_user, call_site='test.create_user')
+
+        assert len(calls) == 2
+        assert len(uow_factory.sleeps) == 1
+        assert (
+            TRANSACTION_RETRIES.value(
+                call_site='test.create_user', reason='serialization_failure'
+            )
+            == retries_before + 1
+        )
+        with uow_factory() as uow:
+            repository = UserRepositoryImpl(uow.session)
+            assert repository.get_by_login_id('retry-1') is None
+            assert repository.get_by_login_id('retry-2').id == user.id
+
+    def test_non_retryable_error_is_raised_immediately(self, uow_factory):
+        """再実行対象外のエラーはそのまま送出する"""
+        calls = []
+
+        def fail(uow):
+            calls.append(1)
+            raise _db_error('23505')
+
+        with uow_factory() as uow, pytest.raises(OperationalError):
+            uow.run_in_transaction(fail)
+
+        assert len(calls) == 1
+        assert uow_factory.sleeps == []
+
+    def test_gives_up_after_max_attempts(self, uow_factory):
+        """上限回数まで再実行して失敗した場合は例外を送出する"""
+        calls = []
+
+        def always_deadlock(uow):
+            calls.append(1)
+            raise _db_error('40P01')
+
+        exhausted_before = TRANSACTION_RETRIES_EXHAUSTED.value(call_site='test.deadlock')
+        with uow_factory(max_attempts=3) as uow, pytest.raises(OperationalError):
+            uow.run_in_transaction(always_deadlock, call_site='test.deadlock')
+
+        assert len(calls) == 3
+        assert len(uow_factory.sleeps) == 2
+        assert (
+            TRANSACTION_RETRIES_EXHAUSTED.value(call_site='test.deadlock')
+            == exhausted_before + 1
+        )
@@ -1,5 +1,7 @@
 """UserRepositoryImplのテスト"""
 
+import pytest
+from sqlalchemy import event
 
 from app.domain.entities.user import User
 from app.infrastructure.db.repositories.user_repository_impl import UserRepositoryImpl
@@ -105,6 +107,39 @@ class TestUserRepositoryImpl:
         assert result.email == 'updated@example.com'
         assert result.name == 'Updated User'
 
+    def test_update_password_only_when_unchanged(self, db_session):
+        """パスワードは読み込んだ時点のハッシュのままの場合だけ更新し、他の列は書き込まない"""
+        from app.infrastructure.db.models.user_model import UserModel
+
+        user_model = UserModel(
+            login_id='test_user_password', password='old_hash', name='Before'
+        )
+        db_session.add(user_model)
+        db_session.commit()
+        user_id = user_model.id
+
+        repository = UserRepositoryImpl(session=db_session)
+        # 読み込んだ後に他の処理が名前を変更していても上書きしない
+        repository.update(
+            User(
+                id=user_id,
+                login_id='test_user_password',
+                password='old_hash',
+                name='After',
+            )
+        )
+
+        assert repository.update_password(user_id, 'old_hash', 'new_hash') is True
+        # 他の処理がパスワードを変更した後の古いハッシュでは更新しない
+        assert repository.update_password(user_id, 'old_hash', 'stale_hash') is False
+        assert repository.update_password(999999, 'new_hash', 'x') is False
+
+        # 1文での更新はアイデンティティマップに反映されないため読み直す
+        db_session.expire_all()
+        user = repository.get_by_id(user_id)
+        assert user.password == 'new_hash'
+        assert user.name == 'After'
+
     def test_delete_user(self, db_session):
         """ユーザーを削除"""
         from app.infrastructure.db.models.user_model import UserModel
@@ -127,3 +162,117 @@ class TestUserRepositoryImpl:
         # 削除されたことを確認
         user = repository.get_by_id(user_id)
         assert user is None
+
+    def test_update_issues_single_statement(self, db_session, test_db_engine):
+        """更新は UPDATE ... RETURNING の1文で行う（事前のSELECTを発行しない）"""
+        from app.infrastructure.db.models.user_model import UserModel
+
+        user_model = UserModel(login_id='test_user_single', password='hashed_password')
+        db_session.add(user_model)
+        db_session.commit()
+        user_id = user_model.id
+        db_session.expire_all()
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(test_db_engine, 'before_cursor_execute', record)
+        try:
+            result = UserRepositoryImpl(session=db_session).update(
+                User(id=user_id, login_id='test_user_single', password='rehashed')
+            )
+        finally:
+            event.remove(test_db_engine, 'before_cursor_execute', record)
+
+        assert result.password == 'rehashed'
+        assert len(statements) == 1
+        assert statements[0].startswith('UPDATE users')
+        assert 'RETURNING' in statements[0]
+
+    def test_update_non_existing_user_raises(self, db_session):
+        """存在しないユーザーの更新はValueError"""
+        repository = UserRepositoryImpl(session=db_session)
+
+        with pytest.raises(ValueError):
+            repository.update(User(id=99999, login_id='nobody', password='x'))
+
+    def test_delete_non_existing_user(self, db_session):
+        """存在しないユーザーの削除はFalse"""
+        repository = UserRepositoryImpl(session=db_session)
+
+        assert repository.delete(99999) is False
+
+    def test_create_many_returns_users_in_input_order(self, db_session, test_db_engine):
+        """まとめて作成したユーザーはIDが採番され、入力と同じ順序で返る"""
+        users = [
+            User(id=0, login_id=f'bulk_user_{i}', password='hashed', name=f'User {i}')
+            for i in range(5)
+        ]
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(test_db_engine, 'before_cursor_execute', record)
+        try:
+            created = UserRepositoryImpl(session=db_session).create_many(users)
+        finally:
+            event.remove(test_db_engine, 'before_cursor_execute', record)
+
+        assert [user.login_id for user in created] == [user.login_id for user in users]
+        assert all(user.id > 0 for user in created)
+        assert len({user.id for user in created}) == 5
+        assert len(statements) == 1
+        assert statements[0].startswith('INSERT INTO users')
+
+    def test_create_many_empty(self, db_session):
+        """空のリストの場合はSQLを発行せず空のリストを返す"""
+        assert UserRepositoryImpl(session=db_session).create_many([]) == []
+
+    def test_upsert_many_updates_existing_login_ids(self, db_session):
+        """既存のログインIDは更新し（IDは変わらない）、新しいログインIDは作成する"""
+        repository = UserRepositoryImpl(session=db_session)
+        existing = repository.create(
+            User(id=0, login_id='upsert_existing', password='old', name='Old')
+        )
+
+        result = repository.upsert_many(
+            [
+                User(id=0, login_id='upsert_existing', password='new', name='New'),
+                User(id=0, login_id='upsert_new', password='hashed'),
+                # 同じログインIDが複数ある場合は後のものを採用
+                User(id=0, login_id='upsert_new', password='hashed_2'),
+            ]
+        )
+
+        by_login_id = {user.login_id: user for user in result}
+        assert len(result) == 2
+        assert by_login_id['upsert_existing'].id == existing.id
+        assert by_login_id['upsert_existing'].password == 'new'
+        assert by_login_id['upsert_existing'].name == 'New'
+        assert by_login_id['upsert_new'].password == 'hashed_2'
+        assert repository.get_by_login_id('upsert_existing').password == 'new'
+
+    def test_list_page(self, db_session):
+        """ユーザーをID順にページ単位で取得する"""
+        repository = UserRepositoryImpl(session=db_session)
+        created = repository.create_many(
+            [User(id=0, login_id=f'list_page_{i}', password='hashed') for i in range(3)]
+        )
+
+        first = repository.list_page(limit=2)
+        assert all(isinstance(user, User) for user in first.items)
+        assert first.prev_cursor is None
+
+        ids = []
+        page = first
+        while True:
+            ids.extend(user.id for user in page.items)
+            if not page.has_next:
+                break
+            page = repository.list_page(page.next_cursor, limit=2)
+
+        assert ids == sorted(ids)
+        assert [user.id for user in created] == ids[-3:]
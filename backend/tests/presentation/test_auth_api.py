@@ -1,5 +1,6 @@
 """Auth APIエンドポイントのテスト"""
 
+import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 
@@ -170,3 +171,31 @@ class TestAuthAPI:
 
         # access_tokenが空でないことを確認
         assert len(data['access_token']) > 0
+
+
+class TestAuthUsecaseDependency:
+    """get_auth_usecaseのテストクラス"""
+
+    @pytest.fixture
+    def database_settings(self, monkeypatch):
+        from app.config import get_settings
+
+        monkeypatch.setenv('AUTH_USER_SOURCE', 'database')
+        monkeypatch.setenv('USER_CACHE_ENABLED', 'true')
+        get_settings.cache_clear()
+        yield
+        get_settings.cache_clear()
+
+    async def test_login_does_not_use_user_cache(self, database_settings):
+        """キャッシュが有効でもパスワードの照合に使うユーザーはDBから読む"""
+        from app.di.auth import get_auth_usecase
+        from app.infrastructure.db.repositories.user_repository_impl import (
+            UserRepositoryImpl,
+        )
+
+        dependency = get_auth_usecase()
+        usecase = await anext(dependency)
+        try:
+            assert type(usecase.user_repository) is UserRepositoryImpl
+        finally:
+            await dependency.aclose()
@@ -0,0 +1,89 @@
+"""GET /auth/verify のテスト"""
+
+import asyncio
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.presentation.api import auth_verify_api
+
+
+@pytest.fixture
+def enable_auth(monkeypatch):
+    """このテストのみ認証を有効化"""
+    settings = get_settings().model_copy(update={'enable_auth': True})
+    monkeypatch.setattr(auth_verify_api, 'get_settings', lambda: settings)
+    return settings
+
+
+class TestAuthVerifyAPI:
+    """GET /auth/verify のテストクラス"""
+
+    def test_valid_token(self, test_client: TestClient, enable_auth):
+        """有効なトークンの場合はユーザーIDを返し、private キャッシュを許可する"""
+        login_response = test_client.post(
+            '/auth/login', json={'login_id': 'admin', 'password': 'pass'}
+        )
+        token = login_response.json()['access_token']
+
+        response = test_client.get(
+            '/auth/verify', headers={'Cookie': f'access_token={token}'}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'is_authenticated': True, 'user_id': 1}
+        cache_control = response.headers['cache-control']
+        assert cache_control.startswith('private, max-age=')
+        max_age = int(cache_control.split('=')[1])
+        assert 0 < max_age <= enable_auth.auth_status_max_age_seconds
+
+    def test_invalid_token(self, test_client: TestClient, enable_auth):
+        """不正なトークンの場合は401でキャッシュさせない"""
+        response = test_client.get(
+            '/auth/verify', headers={'Cookie': 'access_token=invalid.token.value'}
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.headers['cache-control'] == 'no-store'
+
+    def test_token_is_verified_off_the_event_loop(
+        self, test_client: TestClient, enable_auth, monkeypatch
+    ):
+        """トークンの検証（RSA・失効リストのDB参照）はイベントループ上で実行しない"""
+        on_event_loop = []
+
+        def authenticate(token):
+            try:
+                asyncio.get_running_loop()
+                on_event_loop.append(True)
+            except RuntimeError:
+                on_event_loop.append(False)
+            return None
+
+        monkeypatch.setattr(auth_verify_api, 'authenticate_access_token', authenticate)
+
+        test_client.get('/auth/verify', headers={'Cookie': 'access_token=a.b.c'})
+
+        assert on_event_loop == [False]
+
+    def test_missing_token(self, test_client: TestClient, enable_auth):
+        """トークンがない場合は401"""
+        test_client.cookies.clear()
+        response = test_client.get('/auth/verify')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_auth_disabled(self, test_client: TestClient):
+        """認証が無効の場合はダミーユーザーで成功する"""
+        response = test_client.get('/auth/verify')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'is_authenticated': True, 'user_id': 0}
+
+    def test_not_in_openapi_schema(self, test_client: TestClient):
+        """内部用のエンドポイントはOpenAPIに含めない"""
+        response = test_client.get('/openapi.json')
+
+        assert '/auth/verify' not in response.json()['paths']
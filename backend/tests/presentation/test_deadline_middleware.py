@@ -0,0 +1,104 @@
+"""リクエストの期限のミドルウェアのテスト"""
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from app.infrastructure.db.timeouts import remaining_seconds
+from app.presentation.middleware.deadline_middleware import (
+    DeadlineMiddleware,
+    route_deadline,
+)
+
+
+class _DriverError(Exception):
+    def __init__(self, pgcode: str):
+        super().__init__(f'sqlstate {pgcode}')
+        self.pgcode = pgcode
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(DeadlineMiddleware, default_timeout_seconds=10)
+
+    @app.get('/remaining')
+    def remaining():
+        # 同期エンドポイント（スレッドプールで実行される）
+        return {'remaining': remaining_seconds()}
+
+    @app.get('/short', dependencies=[Depends(route_deadline(0.5))])
+    async def short():
+        return {'remaining': remaining_seconds()}
+
+    @app.get('/error/{sqlstate}')
+    def error(sqlstate: str):
+        raise OperationalError('SELECT ...', {}, _DriverError(sqlstate))
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class TestDeadlineMiddleware:
+    """DeadlineMiddlewareのテストクラス"""
+
+    def test_default_deadline(self, client):
+        """ヘッダーがない場合は既定値を期限にする"""
+        remaining = client.get('/remaining').json()['remaining']
+
+        assert 9 < remaining <= 10
+
+    def test_header_tightens_deadline(self, client):
+        """ヘッダーの残り時間が短い場合はそちらを期限にする（既定値より長くはならない）"""
+        short = client.get('/remaining', headers={'X-Request-Timeout-Ms': '1500'})
+        long = client.get('/remaining', headers={'X-Request-Timeout-Ms': '60000'})
+        invalid = client.get('/remaining', headers={'X-Request-Timeout-Ms': 'soon'})
+
+        assert 1 < short.json()['remaining'] <= 1.5
+        assert 9 < long.json()['remaining'] <= 10
+        assert 9 < invalid.json()['remaining'] <= 10
+
+    @pytest.mark.parametrize('value', ['inf', '-inf', 'nan', 'NaN', '0', '-5'])
+    def test_non_finite_or_non_positive_header_is_ignored(self, client, value):
+        """inf・nan・0以下の値は無視して既定値を期限にする"""
+        response = client.get('/remaining', headers={'X-Request-Timeout-Ms': value})
+
+        assert 9 < response.json()['remaining'] <= 10
+
+    @pytest.mark.parametrize('value', ['inf', 'nan'])
+    def test_non_finite_header_without_default(self, value):
+        """既定値がない場合も inf・nan を期限にしない（DBの上限に変換できないため）"""
+        app = FastAPI()
+        app.add_middleware(DeadlineMiddleware)
+
+        @app.get('/remaining')
+        def remaining():
+            return {'remaining': remaining_seconds()}
+
+        response = TestClient(app).get(
+            '/remaining', headers={'X-Request-Timeout-Ms': value}
+        )
+
+        assert response.json() == {'remaining': None}
+
+    def test_route_deadline(self, client):
+        """ルートの既定値が短い場合はそちらを期限にする"""
+        assert client.get('/short').json()['remaining'] <= 0.5
+
+    def test_statement_timeout_is_gateway_timeout(self, client):
+        """SQLの実行時間の上限で中断された場合は504"""
+        response = client.get('/error/57014')
+
+        assert response.status_code == 504
+        assert 'detail' in response.json()
+
+    def test_lock_timeout_is_service_unavailable(self, client):
+        """ロック待ちの上限で中断された場合は503（Retry-After付き）"""
+        response = client.get('/error/55P03')
+
+        assert response.status_code == 503
+        assert response.headers['retry-after'] == '1'
+
+    def test_other_database_errors_are_not_mapped(self, client):
+        """上限・期限以外のDBのエラーは従来どおり500"""
+        assert client.get('/error/23505').status_code == 500
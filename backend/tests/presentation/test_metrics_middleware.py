@@ -0,0 +1,166 @@
+"""リクエストのメトリクスとメトリクスのエンドポイントのテスト"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.presentation import warmup
+from app.presentation.api import metrics_api
+from app.presentation.middleware.metrics_middleware import (
+    REQUEST_SECONDS,
+    REQUESTS,
+    UNMATCHED_ROUTE,
+    MetricsMiddleware,
+)
+
+
+@pytest.fixture
+def metrics_app():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get('/metrics-test/items/{item_id}')
+    async def get_item(item_id: int):
+        return {'id': item_id}
+
+    @app.get('/metrics-test/ping')
+    async def ping():
+        return {}
+
+    @app.get('/metrics-test/error')
+    async def error():
+        raise RuntimeError('boom')
+
+    async def plain(request: Request) -> Response:
+        return Response(b'ok')
+
+    app.add_route('/metrics-test/plain', plain, methods=['GET'])
+    return app
+
+
+@pytest.fixture
+def client(metrics_app):
+    with TestClient(metrics_app, raise_server_exceptions=False) as client:
+        yield client
+
+
+def _requests(route: str, status: str, method: str = 'GET') -> float:
+    return REQUESTS.value(method=method, route=route, status=status)
+
+
+class TestMetricsMiddleware:
+    """MetricsMiddlewareのテスト"""
+
+    def test_records_route_template(self, client):
+        route = '/metrics-test/items/{item_id}'
+        before = _requests(route, '200')
+        observed_before = REQUEST_SECONDS.value(method='GET', route=route)
+
+        client.get('/metrics-test/items/1')
+        client.get('/metrics-test/items/2')
+
+        assert _requests(route, '200') == before + 2
+        assert REQUEST_SECONDS.value(method='GET', route=route) == observed_before + 2
+
+    def test_validation_error_status(self, client):
+        route = '/metrics-test/items/{item_id}'
+        before = _requests(route, '422')
+
+        client.get('/metrics-test/items/abc')
+
+        assert _requests(route, '422') == before + 1
+
+    def test_starlette_route(self, client):
+        before = _requests('/metrics-test/plain', '200')
+
+        client.get('/metrics-test/plain')
+
+        assert _requests('/metrics-test/plain', '200') == before + 1
+
+    def test_unmatched_paths_share_one_label(self, client):
+        before = _requests(UNMATCHED_ROUTE, '404')
+
+        client.get('/metrics-test/unknown/1')
+        client.get('/metrics-test/unknown/2')
+
+        assert _requests(UNMATCHED_ROUTE, '404') == before + 2
+
+    def test_unhandled_exception_is_500(self, client):
+        before = _requests('/metrics-test/error', '500')
+
+        client.get('/metrics-test/error')
+
+        assert _requests('/metrics-test/error', '500') == before + 1
+
+    def test_non_standard_method_is_other(self, client):
+        before = _requests(UNMATCHED_ROUTE, '404', method='OTHER')
+
+        client.request('PROPFIND', '/metrics-test/unknown')
+
+        assert _requests(UNMATCHED_ROUTE, '404', method='OTHER') == before + 1
+
+
+    def test_warmup_requests_are_not_counted(self, metrics_app, client):
+        before = _requests('/metrics-test/ping', '200')
+
+        asyncio.run(warmup._request(metrics_app, 'GET', '/metrics-test/ping'))
+        client.get('/metrics-test/ping')
+
+        assert _requests('/metrics-test/ping', '200') == before + 1
+
+
+@pytest.fixture
+def allow_all_metrics_clients(monkeypatch):
+    """TestClient の接続元（testclient）からの /metrics を許可する"""
+    settings = get_settings().model_copy(update={'metrics_allow_ips': '*'})
+    monkeypatch.setattr(metrics_api, 'get_settings', lambda: settings)
+
+
+def _call_metrics(client_host: str, headers: list[tuple[bytes, bytes]] = ()) -> int:
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/metrics',
+        'headers': list(headers),
+        'client': (client_host, 50000),
+    }
+    response = asyncio.run(metrics_api.metrics(Request(scope)))
+    return response.status_code
+
+
+class TestMetricsAccess:
+    """/metrics の接続元の制限のテスト"""
+
+    def test_internal_client_is_allowed(self):
+        assert _call_metrics('10.0.1.5') == 200
+        assert _call_metrics('127.0.0.1') == 200
+
+    def test_public_client_is_rejected(self):
+        assert _call_metrics('203.0.113.9') == 404
+
+    def test_requests_through_alb_are_rejected(self):
+        """ALB 経由（X-Forwarded-For 付き）は接続元が内部のアドレスでも拒否する"""
+        headers = [(b'x-forwarded-for', b'203.0.113.9')]
+
+        assert _call_metrics('10.0.1.5', headers) == 404
+
+
+def test_metrics_endpoint(allow_all_metrics_clients):
+    from app.main import app
+
+    client = TestClient(app)
+    client.get('/auth/verify')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'text/plain; version=0.0.4; charset=utf-8'
+    assert '# TYPE http_requests_total counter' in response.text
+    assert 'http_requests_total{method="GET",route="/auth/verify",status="200"}' in (
+        response.text
+    )
+    assert 'http_request_duration_seconds_bucket{' in response.text
+    assert 'threadpool_max_threads{pool="default"}' in response.text
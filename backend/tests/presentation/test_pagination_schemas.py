@@ -0,0 +1,61 @@
+"""一覧レスポンスのスキーマのテスト"""
+
+from typing import Annotated
+
+import pytest
+from fastapi import FastAPI, Query
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.domain.repositories.pagination import InvalidCursorError, Page
+from app.main import invalid_cursor_handler
+from app.presentation.schemas.pagination_schemas import PageParams, PaginatedResponse
+
+
+class _Item(BaseModel):
+    id: int
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_exception_handler(InvalidCursorError, invalid_cursor_handler)
+
+    @app.get('/items', response_model=PaginatedResponse[_Item])
+    def list_items(params: Annotated[PageParams, Query()]):
+        if params.cursor == 'broken':
+            raise InvalidCursorError('カーソルの署名が一致しません')
+        page = Page(items=list(range(params.limit)), next_cursor='next-cursor')
+        return PaginatedResponse.from_page(page, lambda i: _Item(id=i))
+
+    return TestClient(app)
+
+
+class TestPaginatedResponse:
+    """PaginatedResponseのテストクラス"""
+
+    def test_envelope(self, client):
+        """要素と前後のページの情報を返す"""
+        response = client.get('/items', params={'limit': 2})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            'items': [{'id': 0}, {'id': 1}],
+            'page_info': {
+                'next_cursor': 'next-cursor',
+                'prev_cursor': None,
+                'has_next': True,
+                'has_prev': False,
+            },
+        }
+
+    def test_limit_is_validated(self, client):
+        """件数は1〜100"""
+        assert client.get('/items', params={'limit': 0}).status_code == 422
+        assert client.get('/items', params={'limit': 101}).status_code == 422
+
+    def test_invalid_cursor_is_bad_request(self, client):
+        """不正なカーソルは400"""
+        response = client.get('/items', params={'cursor': 'broken'})
+
+        assert response.status_code == 400
@@ -0,0 +1,109 @@
+"""リクエスト単位のプロファイルのミドルウェアのテスト"""
+
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.infrastructure.db.instrumentation import QueryInstrumentation
+from app.infrastructure.profiling.profile_store import ProfileStore
+from app.infrastructure.profiling.profile_token import sign_profile_token
+from app.presentation import warmup
+from app.presentation.middleware.profiling_middleware import (
+    PROFILE_ID_HEADER,
+    PROFILED_REQUESTS,
+    ProfilingMiddleware,
+)
+
+SECRET = 'profiling-secret'
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _make_client(tmp_path, **options) -> TestClient:
+    engine = create_engine(
+        'sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False}
+    )
+    QueryInstrumentation(slow_query_seconds=60).attach(engine)
+
+    app = FastAPI()
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=ProfileStore(tmp_path, max_files=10),
+        interval_seconds=0.002,
+        **options,
+    )
+
+    @app.get('/items')
+    def list_items():
+        # 同期エンドポイント（スレッドプールで実行される）
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+        _busy(0.03)
+        return {}
+
+    return TestClient(app)
+
+
+def _valid_header() -> dict[str, str]:
+    return {'X-Profile': sign_profile_token(SECRET, int(time.time()) + 60)}
+
+
+class TestProfilingMiddleware:
+    """ProfilingMiddlewareのテスト"""
+
+    def test_signed_header_saves_profile(self, tmp_path):
+        client = _make_client(tmp_path, secret=SECRET)
+
+        response = client.get('/items', headers=_valid_header())
+
+        profile_id = response.headers[PROFILE_ID_HEADER]
+        assert profile_id.endswith('-get-items.speedscope.json')
+        document = json.loads((tmp_path / profile_id).read_text())
+        frames = [frame['name'] for frame in document['shared']['frames']]
+        assert document['name'] == 'GET /items'
+        assert {'<threadpool>', '_busy', 'SQL: SELECT ?'} <= set(frames)
+
+    def test_invalid_or_missing_header_is_not_profiled(self, tmp_path):
+        client = _make_client(tmp_path, secret=SECRET)
+
+        responses = [
+            client.get(
+                '/items', headers={'X-Profile': sign_profile_token('other', 2**40)}
+            ),
+            client.get('/items'),
+        ]
+
+        assert all(PROFILE_ID_HEADER not in response.headers for response in responses)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_sample_rate(self, tmp_path):
+        client = _make_client(tmp_path, sample_rate=1.0, output_format='collapsed')
+
+        response = client.get('/items')
+
+        profile_id = response.headers[PROFILE_ID_HEADER]
+        assert profile_id.endswith('.collapsed.txt')
+        assert '_busy' in (tmp_path / profile_id).read_text()
+
+    def test_warmup_requests_are_not_profiled(self, tmp_path):
+        client = _make_client(tmp_path, sample_rate=1.0)
+        before = PROFILED_REQUESTS.value()
+
+        asyncio.run(warmup._request(client.app, 'GET', '/items'))
+
+        assert list(tmp_path.iterdir()) == []
+        assert PROFILED_REQUESTS.value() == before
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            ProfilingMiddleware(None, ProfileStore(tmp_path, 1), output_format='pprof')
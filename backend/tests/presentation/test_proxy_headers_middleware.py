@@ -0,0 +1,69 @@
+"""X-Forwarded-* の反映（ProxyHeadersMiddleware）のテスト"""
+
+import asyncio
+
+import pytest
+
+from app.presentation.middleware.proxy_headers_middleware import (
+    ProxyHeadersMiddleware,
+    parse_trusted_networks,
+)
+
+
+def _forwarded(trusted: str, peer: str, forwarded_for: str, proto: str = 'https'):
+    """ミドルウェアを通した後の (client のアドレス, scheme)"""
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen['client'] = scope['client'][0]
+        seen['scheme'] = scope['scheme']
+
+    scope = {
+        'type': 'http',
+        'scheme': 'http',
+        'client': (peer, 12345),
+        'headers': [
+            (b'x-forwarded-for', forwarded_for.encode()),
+            (b'x-forwarded-proto', proto.encode()),
+        ],
+    }
+    asyncio.run(ProxyHeadersMiddleware(app, trusted=trusted)(scope, None, None))
+    return seen['client'], seen['scheme']
+
+
+class TestProxyHeadersMiddleware:
+    """ProxyHeadersMiddlewareのテスト"""
+
+    def test_untrusted_peer_is_ignored(self):
+        assert _forwarded('127.0.0.1', '203.0.113.9', '198.51.100.1') == (
+            '203.0.113.9',
+            'http',
+        )
+
+    def test_trusted_cidr(self):
+        assert _forwarded('10.0.0.0/16', '10.0.3.7', '198.51.100.1') == (
+            '198.51.100.1',
+            'https',
+        )
+
+    def test_spoofed_leftmost_entry_is_not_used(self):
+        """クライアントが付けた X-Forwarded-For の左端ではなく、ALB が付加した値を使う"""
+        client, _ = _forwarded('10.0.0.0/16', '10.0.3.7', '1.2.3.4, 198.51.100.1')
+
+        assert client == '198.51.100.1'
+
+    def test_chained_trusted_proxies_are_skipped(self):
+        client, _ = _forwarded(
+            '10.0.0.0/16', '10.0.3.7', '1.2.3.4, 198.51.100.1, 10.0.9.9'
+        )
+
+        assert client == '198.51.100.1'
+
+    def test_wildcard_uses_rightmost_entry(self):
+        client, _ = _forwarded('*', '203.0.113.9', '1.2.3.4, 198.51.100.1')
+
+        assert client == '198.51.100.1'
+
+    def test_invalid_setting(self):
+        with pytest.raises(ValueError):
+            parse_trusted_networks('10.0.0.0/16, alb')
@@ -0,0 +1,68 @@
+"""リクエストごとのSQL集計ミドルウェアのテスト"""
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.infrastructure.db.instrumentation import QueryInstrumentation
+from app.presentation.middleware.query_stats_middleware import QueryStatsMiddleware
+
+
+@pytest.fixture
+def client():
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    QueryInstrumentation(slow_query_seconds=60).attach(engine)
+
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, n_plus_one_threshold=3)
+
+    @app.get('/items')
+    def list_items(n: int = 1):
+        # 同期エンドポイント（スレッドプールで実行される）
+        with engine.connect() as conn:
+            for item_id in range(n):
+                conn.execute(text('SELECT :id'), {'id': item_id})
+        return {'n': n}
+
+    @app.get('/async-items')
+    async def list_items_async():
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+        return {}
+
+    with TestClient(app) as client:
+        yield client
+    engine.dispose()
+
+
+class TestQueryStatsMiddleware:
+    """QueryStatsMiddlewareのテストクラス"""
+
+    def test_server_timing_header(self, client):
+        """実行したSQLの回数と時間を Server-Timing ヘッダーで返す"""
+        response = client.get('/items', params={'n': 2})
+
+        server_timing = response.headers['server-timing']
+        assert server_timing.startswith('db;dur=')
+        assert server_timing.endswith('desc="2 queries"')
+
+    def test_async_endpoint_is_counted(self, client):
+        """async def のエンドポイントのSQLも集計する"""
+        response = client.get('/async-items')
+
+        assert response.headers['server-timing'].endswith('desc="1 queries"')
+
+    def test_repeated_statement_is_warned(self, client, caplog):
+        """同じSQLを閾値を超えて実行したリクエストを警告する"""
+        logger_name = 'app.presentation.middleware.query_stats_middleware'
+        with caplog.at_level(logging.WARNING, logger_name):
+            client.get('/items', params={'n': 3})
+            assert 'N+1' not in caplog.text
+
+            client.get('/items', params={'n': 4})
+
+        assert 'N+1の可能性: [GET /items] 同じSQLを4回実行しました: SELECT ?' in caplog.text
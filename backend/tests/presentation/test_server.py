@@ -0,0 +1,197 @@
+"""本番用の起動（app/server.py）のテスト"""
+
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from app import server
+from app.config import Settings
+from app.server import (
+    LauncherOptions,
+    available_cpus,
+    check_forwarded_allow_ips,
+    resolve_workers,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def _options(**overrides) -> LauncherOptions:
+    values = {
+        'host': '127.0.0.1',
+        'port': 0,
+        'workers': 1,
+        'max_requests': 0,
+        'max_requests_jitter': 0,
+        'max_rss_mb': 0,
+        'drain_delay_seconds': 0,
+        'graceful_timeout_seconds': 5,
+        'keepalive_seconds': 75,
+    }
+    values.update(overrides)
+    return LauncherOptions(**values)
+
+
+class TestAvailableCpus:
+    """CPU数（cgroup のクォータ）のテスト"""
+
+    def test_cgroup_v2_quota(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(os, 'sched_getaffinity', lambda pid: set(range(8)))
+        cpu_max = tmp_path / 'cpu.max'
+        cpu_max.write_text('150000 100000\n')
+
+        assert available_cpus(cpu_max=cpu_max) == 2
+
+    def test_cgroup_v2_unlimited(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(os, 'sched_getaffinity', lambda pid: set(range(4)))
+        cpu_max = tmp_path / 'cpu.max'
+        cpu_max.write_text('max 100000\n')
+
+        assert available_cpus(cpu_max=cpu_max) == 4
+
+    def test_cgroup_v1_quota(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(os, 'sched_getaffinity', lambda pid: set(range(8)))
+        quota = tmp_path / 'cpu.cfs_quota_us'
+        period = tmp_path / 'cpu.cfs_period_us'
+        quota.write_text('300000\n')
+        period.write_text('100000\n')
+
+        cpus = available_cpus(
+            cpu_max=tmp_path / 'missing', cfs_quota=quota, cfs_period=period
+        )
+
+        assert cpus == 3
+
+    def test_quota_does_not_exceed_affinity(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(os, 'sched_getaffinity', lambda pid: {0})
+        cpu_max = tmp_path / 'cpu.max'
+        cpu_max.write_text('400000 100000\n')
+
+        assert available_cpus(cpu_max=cpu_max) == 1
+
+    def test_resolve_workers(self, monkeypatch):
+        monkeypatch.setattr(server, 'available_cpus', lambda: 3)
+
+        assert resolve_workers(2) == 2
+        assert resolve_workers(0) == 3
+
+
+class TestCheckForwardedAllowIps:
+    """check_forwarded_allow_ipsのテストクラス"""
+
+    def test_error_when_rate_limit_uses_default_proxy_settings(
+        self, monkeypatch, caplog
+    ):
+        """試行回数の制限が有効で FORWARDED_ALLOW_IPS が未設定の場合はエラーを記録する"""
+        monkeypatch.delenv('FORWARDED_ALLOW_IPS', raising=False)
+        settings = Settings(_env_file=None, login_rate_limit_enabled=True)
+
+        assert check_forwarded_allow_ips(settings) is False
+        assert 'FORWARDED_ALLOW_IPS' in caplog.text
+
+    def test_configured_or_disabled(self):
+        """FORWARDED_ALLOW_IPS を指定した場合・制限が無効の場合は問題なし"""
+        assert check_forwarded_allow_ips(
+            Settings(_env_file=None, forwarded_allow_ips='10.0.0.0/16')
+        )
+        assert check_forwarded_allow_ips(
+            Settings(_env_file=None, login_rate_limit_enabled=False)
+        )
+
+
+class TestWorkerRecycling:
+    """ワーカーの入れ替えのテスト"""
+
+    def test_max_requests_with_jitter(self):
+        options = _options(max_requests=1000, max_requests_jitter=50)
+
+        limits = {options.worker_max_requests() for _ in range(200)}
+
+        assert all(1000 <= limit <= 1050 for limit in limits)
+        assert len(limits) > 1
+
+    def test_max_requests_disabled(self):
+        assert _options(max_requests=0).worker_max_requests() is None
+
+    def test_exits_when_rss_exceeds_limit(self, monkeypatch):
+        monkeypatch.setattr(server, 'current_rss_bytes', lambda: 300 * 1024 * 1024)
+        worker = server._build_server(object(), _options(max_rss_mb=256))
+        worker.server_state.total_requests = 0
+
+        asyncio.run(worker.on_tick(server._RSS_CHECK_TICKS))
+
+        assert worker.should_exit is True
+
+    def test_keeps_running_under_rss_limit(self, monkeypatch):
+        monkeypatch.setattr(server, 'current_rss_bytes', lambda: 100 * 1024 * 1024)
+        worker = server._build_server(object(), _options(max_rss_mb=256))
+        worker.server_state.total_requests = 0
+
+        asyncio.run(worker.on_tick(server._RSS_CHECK_TICKS))
+
+        assert worker.should_exit is False
+
+    def test_current_rss_bytes(self):
+        assert server.current_rss_bytes() > 0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_healthy(url: str, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            pytest.fail(f'起動に失敗しました: {process.stdout.read()}')
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    pytest.fail('起動がタイムアウトしました')
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='fork が使えない環境')
+def test_serves_with_workers_and_stops_on_sigterm(tmp_path):
+    """2ワーカーで応答し、SIGTERMで処理中のリクエストを終えてから停止する"""
+    port = _free_port()
+    log_file = tmp_path / 'app.log'
+    env = {
+        **os.environ,
+        'SERVER_DRAIN_DELAY_SECONDS': '0',
+        'SERVER_GRACEFUL_TIMEOUT_SECONDS': '5',
+        'LOG_FILE': str(log_file),
+    }
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'app.server', '--host', '127.0.0.1'],
+        cwd=BACKEND_DIR,
+        env={**env, 'SERVER_PORT': str(port), 'WEB_CONCURRENCY': '2'},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    try:
+        _wait_healthy(f'http://127.0.0.1:{port}/health', process)
+
+        process.send_signal(signal.SIGTERM)
+
+        assert process.wait(timeout=20) == 0
+        # ワーカーが同じファイルをローテーションしないよう、ログは標準出力のみに出力する
+        assert 'ワーカーで起動します' in process.stdout.read()
+        assert not log_file.exists()
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
@@ -0,0 +1,71 @@
+"""起動時のインポートのテスト"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.server import PRELOAD_MODULES
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# import app.main の時点では読み込まないモジュール（scripts/benchmarks/bench_startup.py と同じ）
+LAZY_MODULES = ('sqlalchemy', 'asyncpg', 'psycopg2', 'uvicorn', 'starlette.staticfiles')
+
+
+def _loaded_after(code: str, modules: tuple[str, ...]) -> list[str]:
+    script = f'import sys; {code}; print(",".join(m for m in {modules!r} if m in sys.modules))'
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [module for module in result.stdout.strip().split(',') if module]
+
+
+def test_import_main_does_not_load_lazy_modules():
+    """DBの層・uvicorn などは使用時に読み込む"""
+    assert _loaded_after('import app.main', LAZY_MODULES) == []
+
+
+def test_import_main_has_no_side_effects():
+    """インポートしただけではロギングの設定を変更しない"""
+    code = 'import logging, app.main; assert not logging.getLogger().handlers'
+
+    assert _loaded_after(code, ()) == []
+
+
+def test_preload_modules_load_db_stack():
+    """本番の起動では fork 前にDBの層を読み込む"""
+    code = f'import importlib; [importlib.import_module(m) for m in {PRELOAD_MODULES!r}]'
+
+    assert _loaded_after(code, ('sqlalchemy', 'sqlalchemy.orm')) == [
+        'sqlalchemy',
+        'sqlalchemy.orm',
+    ]
+
+
+def test_metrics_middleware_is_outermost():
+    """プロファイルを有効にした場合も MetricsMiddleware が最も外側で計測する"""
+    script = (
+        'import app.main; '
+        'print(",".join(m.cls.__name__ for m in app.main.app.user_middleware))'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=BACKEND_DIR,
+        env={
+            **os.environ,
+            'METRICS_ENABLED': 'true',
+            'PROFILING_SAMPLE_RATE': '0.5',
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    middlewares = result.stdout.strip().split(',')
+    assert middlewares[0] == 'MetricsMiddleware'
+    assert 'ProfilingMiddleware' in middlewares
@@ -0,0 +1,153 @@
+"""起動時のウォームアップとレディネスのテスト"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.config import get_settings
+from app.presentation import warmup
+from app.presentation.warmup import is_ready, run_warmup, set_ready
+
+
+def _settings(**overrides):
+    return get_settings().model_copy(update=overrides)
+
+
+class _Body(BaseModel):
+    name: str
+
+
+@pytest.fixture
+def small_app():
+    app = FastAPI()
+    calls = []
+
+    @app.get('/ping')
+    async def ping():
+        calls.append('ping')
+        return {'ok': True}
+
+    @app.post('/items')
+    async def create_item(body: _Body):
+        calls.append(body.name)
+        return body
+
+    app.state.calls = calls
+    return app
+
+
+@pytest.fixture
+def warmup_steps(monkeypatch):
+    """DB・鍵・bcrypt の手順を記録だけするものに置き換える"""
+    called = []
+
+    async def prewarm_db(settings):
+        called.append('db')
+
+    monkeypatch.setattr(warmup, '_prewarm_db', prewarm_db)
+    monkeypatch.setattr(warmup, 'warm_up_key_ring', lambda: called.append('jwt_keys'))
+
+    async def warm_up_password_hasher():
+        called.append('bcrypt')
+
+    monkeypatch.setattr(warmup, 'warm_up_password_hasher', warm_up_password_hasher)
+    monkeypatch.setattr(warmup, 'WARMUP_REQUESTS', (('GET', '/ping', b''),))
+    return called
+
+
+class TestInProcessRequest:
+    """プロセス内でのルートの呼び出しのテスト"""
+
+    async def test_calls_route(self, small_app):
+        assert await warmup._request(small_app, 'GET', '/ping') == 200
+        assert small_app.state.calls == ['ping']
+
+    async def test_validation_error_does_not_reach_route(self, small_app):
+        assert await warmup._request(small_app, 'POST', '/items', b'{}') == 422
+        assert small_app.state.calls == []
+
+    async def test_sends_body(self, small_app):
+        status_code = await warmup._request(small_app, 'POST', '/items', b'{"name":"a"}')
+
+        assert status_code == 200
+        assert small_app.state.calls == ['a']
+
+
+class TestRunWarmup:
+    """run_warmupのテスト"""
+
+    async def test_runs_all_steps(self, small_app, warmup_steps):
+        timings = await run_warmup(small_app, _settings())
+
+        assert warmup_steps == ['db', 'jwt_keys', 'bcrypt']
+        assert small_app.state.calls == ['ping']
+        assert list(timings) == ['db', 'jwt_keys', 'bcrypt', 'routes']
+
+    async def test_failed_step_is_skipped(self, small_app, warmup_steps, monkeypatch):
+        """DBに接続できなくても残りの手順を実行する"""
+
+        async def unreachable_db(settings):
+            raise ConnectionError('could not connect')
+
+        monkeypatch.setattr(warmup, '_prewarm_db', unreachable_db)
+
+        timings = await run_warmup(small_app, _settings())
+
+        assert 'db' not in timings
+        assert list(timings) == ['jwt_keys', 'bcrypt', 'routes']
+
+    async def test_stops_at_timeout(self, small_app, warmup_steps, monkeypatch):
+        async def slow_db(settings):
+            await asyncio.sleep(10)
+
+        monkeypatch.setattr(warmup, '_prewarm_db', slow_db)
+
+        timings = await run_warmup(small_app, _settings(warmup_timeout_seconds=0.05))
+
+        assert timings == {}
+        assert small_app.state.calls == []
+
+
+class TestHealth:
+    """/health のレディネスのテスト"""
+
+    @pytest.fixture
+    def client(self):
+        from app.main import app
+
+        # lifespan を実行しない（レディネスはテストで切り替える）
+        client = TestClient(app)
+        yield client
+        set_ready(False)
+
+    def test_not_ready_returns_503(self, client):
+        set_ready(False)
+
+        response = client.get('/health')
+
+        assert response.status_code == 503
+        assert response.json() == {'status': 'not_ready'}
+
+    def test_ready_returns_200(self, client):
+        set_ready(True)
+
+        response = client.get('/health')
+
+        assert response.status_code == 200
+        assert response.json() == {'status': 'healthy'}
+
+    def test_ready_after_lifespan_startup(self, monkeypatch):
+        from app.main import app
+
+        async def no_warmup(app, settings):
+            return {}
+
+        monkeypatch.setattr('app.main.run_warmup', no_warmup)
+
+        with TestClient(app) as client:
+            assert is_ready()
+            assert client.get('/health').status_code == 200
+        assert not is_ready()
@@ -194,7 +194,7 @@ describe('verifyToken', () => {
     await middleware(request);
 
     expect(mockFetch).toHaveBeenCalledWith(
-      expect.stringContaining('/auth/status'),
+      expect.stringContaining('/auth/verify'),
       expect.objectContaining({
         method: 'GET',
         headers: { Cookie: 'access_token=valid_token' },
@@ -97,10 +97,11 @@ export async function middleware(request: NextRequest) {
 
 /**
  * バックエンドAPIでトークンを検証
+ * （ページ遷移ごとに呼ばれるため、DIやバリデーションを経由しない軽量な /auth/verify を使う）
  */
 async function verifyToken(token: string): Promise<boolean> {
   try {
-    const response = await fetch(`${API_BASE_URL}/auth/status`, {
+    const response = await fetch(`${API_BASE_URL}/auth/verify`, {
       method: 'GET',
       headers: {
         Cookie: `access_token=${token}`,